@@ -0,0 +1,41 @@
+"""Add conversation history ring buffer tables
+
+Revision ID: 0004_conversation_history
+Revises: 0003_governance_token_metrics
+Create Date: 2026-10-19 00:00:00
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004_conversation_history"
+down_revision = "0003_governance_token_metrics"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "conversation_history_heads",
+        sa.Column("project_id", sa.Text(), nullable=False),
+        sa.Column("seq", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("NOW()")),
+        sa.PrimaryKeyConstraint("project_id"),
+    )
+    op.create_table(
+        "conversation_history",
+        sa.Column("project_id", sa.Text(), nullable=False),
+        sa.Column("slot", sa.Integer(), nullable=False),
+        sa.Column("seq", sa.BigInteger(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("NOW()")),
+        sa.PrimaryKeyConstraint("project_id", "slot"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("conversation_history")
+    op.drop_table("conversation_history_heads")
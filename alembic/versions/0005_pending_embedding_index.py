@@ -0,0 +1,27 @@
+"""Add partial index for memory entries awaiting an embedding
+
+Revision ID: 0005_pending_embedding_index
+Revises: 0004_conversation_history
+Create Date: 2026-10-19 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005_pending_embedding_index"
+down_revision = "0004_conversation_history"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset scans of the embedding backlog (server/memory/backfill.py) stay small as it drains
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_memory_pending_embedding ON memory_entries (created_at, id) "
+        "WHERE embedding IS NULL AND group_id IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_memory_pending_embedding")
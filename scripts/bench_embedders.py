@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark embedding backends: cold start, throughput and agreement.
+
+Each backend runs in a fresh interpreter so cold start includes imports and
+model loading, as on server startup. Throughput is measured through
+`semantic.embed_texts`, the path the server uses for batches. Vectors from
+every backend are compared with the first one listed (the PyTorch path by
+default): max absolute difference and minimum cosine similarity.
+
+Usage:
+    python scripts/bench_embedders.py --model-dir ./models/all-MiniLM-L6-v2
+    python scripts/bench_embedders.py --model-dir ./models/all-MiniLM-L6-v2 --backends onnx,onnx-int8 --texts 2000
+    python scripts/bench_embedders.py --quantize ./models/all-MiniLM-L6-v2   # writes model_quantized.onnx
+
+Backends: minilm (sentence-transformers/PyTorch), onnx (fp32 graph), onnx-int8 (quantized graph).
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+_WORDS = (
+    "cache database latency request token governance memory vector index query schema "
+    "retry timeout worker queue event stream batch model embedding rule project task"
+).split()
+
+
+def make_texts(n):
+    """Deterministic texts of 4 to ~200 words, mixing short notes and long entries."""
+    texts = []
+    for i in range(n):
+        length = 4 + (i * 37) % 200
+        texts.append(" ".join(_WORDS[(i + j * 7) % len(_WORDS)] for j in range(length)))
+    return texts
+
+
+def backend_env(backend, model_dir):
+    env = dict(os.environ)
+    env.pop("SEMANTIC_EMBED_PROCESSES", None)
+    if backend == "minilm":
+        env["SEMANTIC_MODEL"] = "minilm"
+    elif backend in ("onnx", "onnx-int8"):
+        env["SEMANTIC_MODEL"] = "onnx"
+        env["SEMANTIC_ONNX_MODEL_DIR"] = model_dir or ""
+        env["SEMANTIC_ONNX_QUANTIZED"] = "true" if backend == "onnx-int8" else "false"
+    else:
+        raise SystemExit(f"unknown backend: {backend}")
+    return env
+
+
+def run_child(n_texts, batch, vectors_path):
+    """Runs inside the benchmark subprocess; prints one JSON line."""
+    started = time.perf_counter()
+    import numpy as np
+
+    from server.memory.semantic import embed_texts
+
+    embed_texts(["warm up"])
+    cold_start = time.perf_counter() - started
+
+    texts = make_texts(n_texts)
+    vectors = []
+    started = time.perf_counter()
+    for i in range(0, len(texts), batch):
+        vectors.extend(embed_texts(texts[i:i + batch]))
+    elapsed = time.perf_counter() - started
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    np.save(vectors_path, matrix)
+    print(json.dumps({
+        "coldStartSeconds": round(cold_start, 3),
+        "textsPerSecond": round(len(texts) / elapsed, 1),
+        "dimension": int(matrix.shape[1]),
+    }))
+
+
+def compare(reference, other):
+    import numpy as np
+
+    ref = np.load(reference)
+    cur = np.load(other)
+    cosine = (ref * cur).sum(axis=1) / (np.linalg.norm(ref, axis=1) * np.linalg.norm(cur, axis=1))
+    return {"maxAbsDiff": float(np.abs(ref - cur).max()), "minCosine": float(cosine.min())}
+
+
+def quantize(model_dir):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    from server.memory.onnx_backend import FP32_MODEL_FILE, INT8_MODEL_FILE, find_model_file
+
+    source = find_model_file(model_dir, FP32_MODEL_FILE)
+    target = os.path.join(os.path.dirname(source), INT8_MODEL_FILE)
+    quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+    print(f"wrote {target}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="minilm,onnx,onnx-int8", help="comma-separated; the first is the reference")
+    parser.add_argument("--model-dir", default=os.getenv("SEMANTIC_ONNX_MODEL_DIR"), help="exported ONNX model directory")
+    parser.add_argument("--texts", type=int, default=512, help="texts to embed per backend")
+    parser.add_argument("--batch", type=int, default=32, help="texts per embed_texts call")
+    parser.add_argument("--quantize", metavar="MODEL_DIR", help="write model_quantized.onnx (int8) next to model.onnx and exit")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--vectors", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.quantize:
+        quantize(args.quantize)
+        return
+    if args.child:
+        run_child(args.texts, args.batch, args.vectors)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        reference = None
+        for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+            vectors = os.path.join(tmp, f"{backend}.npy")
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", "--texts", str(args.texts), "--batch", str(args.batch), "--vectors", vectors],
+                env=backend_env(backend, args.model_dir),
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode != 0:
+                results.append({"backend": backend, "error": (proc.stderr.strip().splitlines() or ["failed"])[-1]})
+                continue
+            row = {"backend": backend, **json.loads(proc.stdout.strip().splitlines()[-1])}
+            if reference is None:
+                reference = vectors
+            else:
+                row.update(compare(reference, vectors))
+            results.append(row)
+
+    for row in results:
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
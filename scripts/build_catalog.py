@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Build the precompiled token catalog snapshot (memory/.catalog.bin), plus the
+token embedding matrix (memory/.catalog.embeddings.npz) when semantic search
+is enabled.
+
+The server rebuilds a stale snapshot on its own; running this at image build
+or deploy time just means no worker pays the YAML parsing cost on startup.
+"""
+
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from server.memory.semantic import get_model_name, is_semantic_enabled  # noqa: E402
+from server.nf_client.catalog import CatalogStore  # noqa: E402
+from server.nf_client.embeddings import EmbeddingStore  # noqa: E402
+
+
+def main() -> int:
+    store = CatalogStore()
+    started = time.perf_counter()
+    catalog = store.build()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(
+        f"catalog: {len(catalog.tokens())} tokens, {len(catalog.policies()['policies'])} policies "
+        f"-> {store.snapshot_path} ({elapsed_ms:.1f}ms, content {catalog.content_hash[:12]})"
+    )
+    if is_semantic_enabled():
+        embeddings_store = EmbeddingStore(catalog_loader=lambda: catalog)
+        started = time.perf_counter()
+        embeddings = embeddings_store.build(catalog)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if embeddings is None:
+            print(f"embeddings: skipped, no embedder for SEMANTIC_MODEL={get_model_name()}")
+        else:
+            print(
+                f"embeddings: {embeddings.matrix.shape[0]}x{embeddings.matrix.shape[1]} ({get_model_name()}) "
+                f"-> {embeddings_store.path} ({elapsed_ms:.1f}ms)"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
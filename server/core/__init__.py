@@ -1,7 +1,10 @@
-from .events import Event, EventBus, bus
+from .events import TASK_CLAIMED, TASK_ENQUEUED, TASK_UPDATED, Event, EventBus, bus
 from .orchestrator import orchestrator
 
 __all__ = [
+    "TASK_CLAIMED",
+    "TASK_ENQUEUED",
+    "TASK_UPDATED",
     "Event",
     "EventBus",
     "bus",
@@ -2,7 +2,7 @@
 Event Bus: in-memory async pub/sub for Neural Forge Phase 1
 
 - Event: typed, project-scoped, carries payload and request_id for traceability
-- EventBus: subscribe/unsubscribe/publish with per-type handler registry
+- EventBus: subscribe/unsubscribe/publish/publish_many with exact and prefix ("family.*", "*") subscriptions
 - Metrics: in-memory counters for published/consumed/errors by event type
 - Logging: structured logs via server.utils.logger.log_json
 
@@ -11,14 +11,21 @@ Phase 1 scope: pure in-memory; no external broker or DB. Safe defaults, error is
 from __future__ import annotations
 
 import asyncio
+import os
 import time
-from collections import defaultdict
+from collections import Counter as TypeCounter, defaultdict
 from dataclasses import dataclass
-from typing import Any, Awaitable, Callable, DefaultDict, Dict, List, Optional
+from typing import Any, Awaitable, Callable, DefaultDict, Dict, List, Optional, Sequence, Set, Tuple
 
 from prometheus_client import Counter
 
-from server.observability.tracing import is_tracing_enabled
+from server.observability.tracing import (
+    NOOP_SPAN,
+    current_traceparent,
+    is_tracing_enabled,
+    refresh_tracing,
+    start_span,
+)
 from server.utils.logger import log_json
 
 
@@ -45,6 +52,31 @@ class Event:
 
 Handler = Callable[[Event], Awaitable[None]]
 
+# Task lifecycle events published by the task tools
+TASK_ENQUEUED = "task.enqueued"
+TASK_CLAIMED = "task.claimed"
+TASK_UPDATED = "task.updated"
+
+
+def _validate_key(key: str) -> None:
+    if not isinstance(key, str) or not key:
+        raise ValueError("event_type must be a non-empty string")
+    if "*" in key and key != "*" and not (key.endswith(".*") and "*" not in key[:-2]):
+        raise ValueError(f"invalid subscription pattern {key!r}: only a trailing '.*' or '*' is supported")
+
+
+def _matches(key: str, evt_type: str) -> bool:
+    if key == evt_type or key == "*":
+        return True
+    return key.endswith(".*") and evt_type.startswith(key[:-1])
+
+
+def _to_int(val: str | None, default: int) -> int:
+    try:
+        return int(val) if val is not None else int(default)
+    except Exception:
+        return int(default)
+
 
 class EventBus:
     """Lightweight async EventBus with per-type subscriptions.
@@ -52,32 +84,99 @@ class EventBus:
     Handlers are awaited sequentially per publish to ensure deterministic ordering.
     Errors in a handler are isolated: they are logged and counted, but do not stop
     other handlers from running.
+
+    Hot path: the per-type handler tuples, the tracing gate and the per-event log
+    sampling are resolved when handlers change or ``reload_config`` is called, not
+    on every publish. With tracing off, publish picks a path that never touches
+    OpenTelemetry. Per-event publish/consume logs are sampled 1-in-N
+    (``EVENTBUS_LOG_EVERY_N``, default 1 = every event, 0 = off); handler errors
+    are always logged.
     """
 
     def __init__(self) -> None:
+        # Subscription key (exact type, "prefix.*" or "*") -> handlers
         self._handlers: DefaultDict[str, List[Handler]] = defaultdict(list)
+        # (key, handler) in global registration order; defines delivery order
+        self._subscriptions: List[Tuple[str, Handler]] = []
+        # Resolved event type -> handlers, filled lazily and cleared on subscribe/unsubscribe
+        self._dispatch: Dict[str, Tuple[Handler, ...]] = {}
         # In-memory counters (Phase 1). Prometheus metrics are wired in app layer later.
         self.events_published_total: DefaultDict[str, int] = defaultdict(int)
         self.events_consumed_total: DefaultDict[str, int] = defaultdict(int)
         self.event_handler_errors_total: DefaultDict[str, int] = defaultdict(int)
         # Simple lock to serialize subscribe/unsubscribe modifications if needed.
         self._lock = asyncio.Lock()
+        # Labelled Prometheus children cached per event type (labels() takes a lock)
+        self._metric_children: Dict[str, Tuple[Any, Any, Any]] = {}
+        self._log_every = 1
+        self._log_tick = 0
+        self._tracing = False
+        self._publish_impl: Callable[[Event], Awaitable[None]] = self._publish_fast
+        self._apply_config()
+
+    def reload_config(self) -> None:
+        """Re-resolve the tracing gate and log sampling from the environment.
+
+        Call explicitly after changing tracing or logging configuration at runtime;
+        this also picks up a tracer provider installed since the last resolution.
+        """
+        refresh_tracing()
+        self._apply_config()
+
+    def _apply_config(self) -> None:
+        """Read the tracing gate and log sampling from the environment (no tracer probe)."""
+        try:
+            self._tracing = bool(is_tracing_enabled())
+        except Exception:
+            self._tracing = False
+        self._log_every = max(0, _to_int(os.getenv("EVENTBUS_LOG_EVERY_N"), 1))
+        self._publish_impl = self._publish_traced if self._tracing else self._publish_fast
+
+    def _rebuild_dispatch(self) -> None:
+        # Pattern matches depend on the full subscription list; resolve again lazily
+        self._dispatch = {}
+
+    def _handlers_for(self, evt_type: str) -> Tuple[Handler, ...]:
+        """Return handlers for a concrete event type, memoized until the next (un)subscribe.
+
+        A handler registered under several matching keys is delivered once, at the
+        position of its earliest registration.
+        """
+        handlers = self._dispatch.get(evt_type)
+        if handlers is None:
+            resolved: List[Handler] = []
+            seen: Set[Handler] = set()
+            for key, h in self._subscriptions:
+                if _matches(key, evt_type) and h not in seen:
+                    seen.add(h)
+                    resolved.append(h)
+            handlers = tuple(resolved)
+            self._dispatch[evt_type] = handlers
+        return handlers
 
     async def subscribe(self, event_type: str, handler: Handler) -> None:
-        """Register an async handler for an event type.
+        """Register an async handler for an event type or family.
+
+        ``event_type`` is an exact type ("conversation.message"), a prefix pattern
+        ("conversation.*") or "*" for every event. Wildcards are only allowed as the
+        final segment; anything else raises ValueError.
 
         Note: idempotent add (no duplicate entries) by identity.
         """
+        _validate_key(event_type)
         async with self._lock:
             handlers = self._handlers[event_type]
             if handler not in handlers:
                 handlers.append(handler)
+                self._subscriptions.append((event_type, handler))
+                self._rebuild_dispatch()
                 log_json(
                     "info",
                     "eventbus.subscribe",
                     evt_type=event_type,
                     handler=str(getattr(handler, "__name__", repr(handler))),
                 )
+            self._apply_config()
 
     async def unsubscribe(self, event_type: str, handler: Handler) -> None:
         """Remove a previously-registered handler if present."""
@@ -85,92 +184,193 @@ class EventBus:
             handlers = self._handlers.get(event_type)
             if handlers and handler in handlers:
                 handlers.remove(handler)
+                self._subscriptions.remove((event_type, handler))
+                self._rebuild_dispatch()
                 log_json(
                     "info",
                     "eventbus.unsubscribe",
                     evt_type=event_type,
                     handler=str(getattr(handler, "__name__", repr(handler))),
                 )
+            self._apply_config()
+
+    def _metrics_for(self, evt_type: str) -> Tuple[Any, Any, Any]:
+        children = self._metric_children.get(evt_type)
+        if children is None:
+            children = (
+                EVENTS_PUBLISHED.labels(evt_type),
+                EVENTS_CONSUMED.labels(evt_type),
+                EVENT_HANDLER_ERRORS.labels(evt_type),
+            )
+            self._metric_children[evt_type] = children
+        return children
+
+    def _should_log(self) -> bool:
+        every = self._log_every
+        if every <= 0:
+            return False
+        if every == 1:
+            return True
+        tick = self._log_tick
+        self._log_tick = tick + 1
+        return tick % every == 0
 
     async def publish(self, event: Event) -> None:
         """Publish an event and synchronously await all handlers for that type.
 
         Handlers are executed sequentially in registration order.
         """
+        await self._publish_impl(event)
+
+    async def _publish_fast(self, event: Event) -> None:
+        """Publish path used when tracing is disabled: no OpenTelemetry lookups."""
         evt_type = event.type
         self.events_published_total[evt_type] += 1
-        EVENTS_PUBLISHED.labels(evt_type).inc()
-        # Attempt tracing span around publish
-        _span_cm = None
-        _span_ctx = None
-        if is_tracing_enabled():
-            try:
-                from opentelemetry import trace
-                from opentelemetry.propagate import get_global_textmap
-
-                tracer = trace.get_tracer("neural-forge")
-                _span_cm = tracer.start_as_current_span("EventBus.publish")
-                _span_ctx = _span_cm.__enter__()
-                # Inject traceparent into event for downstream linking if not present
-                if not event.traceparent:
-                    carrier: Dict[str, str] = {}
-                    get_global_textmap().inject(carrier)
-                    event.traceparent = carrier.get("traceparent")
-                # Set useful attributes
-                payload = event.payload or {}
-                content = payload.get("content") if isinstance(payload, dict) else None
-                content_len = len(content) if isinstance(content, str) else 0
-                _span_ctx.set_attribute("evt_type", evt_type)
-                _span_ctx.set_attribute("project_id", event.project_id)
-                if event.request_id:
-                    _span_ctx.set_attribute("request_id", event.request_id)
-                _span_ctx.set_attribute("content_len", content_len)
-                _span_ctx.set_attribute("phase", "publish")
-            except Exception:
-                # Best-effort tracing: ignore if any otel error occurs
-                _span_cm = None
-                _span_ctx = None
-        log_json(
-            "info",
-            "eventbus.publish",
-            evt_type=evt_type,
-            project_id=event.project_id,
-            request_id=event.request_id,
-            phase="publish",
-        )
-        # Snapshot handlers to avoid holding lock during handler execution
-        handlers = list(self._handlers.get(evt_type, ()))
-        for h in handlers:
-            try:
-                await h(event)
-                self.events_consumed_total[evt_type] += 1
-                EVENTS_CONSUMED.labels(evt_type).inc()
+        self._metrics_for(evt_type)[0].inc()
+        log_event = self._should_log()
+        if log_event:
+            log_json(
+                "info",
+                "eventbus.publish",
+                evt_type=evt_type,
+                project_id=event.project_id,
+                request_id=event.request_id,
+                phase="publish",
+            )
+        handlers = self._handlers_for(evt_type)
+        if handlers:
+            consumed, errors = await self._invoke_handlers(event, handlers, log_consume=log_event)
+            self._count_delivery(evt_type, consumed, errors)
+
+    async def _publish_traced(self, event: Event) -> None:
+        """Publish path used when tracing is enabled: wraps delivery in a span."""
+        evt_type = event.type
+        self.events_published_total[evt_type] += 1
+        self._metrics_for(evt_type)[0].inc()
+        with start_span("EventBus.publish") as span:
+            # Inject traceparent into event for downstream linking if not present
+            if not event.traceparent:
+                event.traceparent = current_traceparent()
+            payload = event.payload or {}
+            content = payload.get("content") if isinstance(payload, dict) else None
+            span.set_attribute("evt_type", evt_type)
+            span.set_attribute("project_id", event.project_id)
+            if event.request_id:
+                span.set_attribute("request_id", event.request_id)
+            span.set_attribute("content_len", len(content) if isinstance(content, str) else 0)
+            span.set_attribute("phase", "publish")
+            log_event = self._should_log()
+            if log_event:
                 log_json(
                     "info",
-                    "eventbus.consume",
+                    "eventbus.publish",
                     evt_type=evt_type,
                     project_id=event.project_id,
                     request_id=event.request_id,
-                    phase="consume",
+                    phase="publish",
                 )
+            handlers = self._handlers_for(evt_type)
+            if handlers:
+                consumed, errors = await self._invoke_handlers(event, handlers, log_consume=log_event)
+                self._count_delivery(evt_type, consumed, errors)
+
+    async def publish_many(self, events: Sequence[Event]) -> None:
+        """Publish a batch of events in order, amortizing per-event bookkeeping.
+
+        Handlers observe exactly the same sequence of calls as repeated ``publish``
+        invocations. Metrics are incremented once per event type for the whole batch
+        and a single ``eventbus.publish_batch`` summary line replaces the per-event
+        publish/consume logs. Handler errors are still logged individually.
+        """
+        if not events:
+            return
+        published: TypeCounter[str] = TypeCounter(evt.type for evt in events)
+        for evt_type, count in published.items():
+            self.events_published_total[evt_type] += count
+            self._metrics_for(evt_type)[0].inc(count)
+
+        span = start_span("EventBus.publish_many") if self._tracing else NOOP_SPAN
+        if span.recording:
+            # One span covers the batch; link every event to it for downstream spans
+            span.__enter__()
+            traceparent = current_traceparent()
+            for evt in events:
+                if not evt.traceparent:
+                    evt.traceparent = traceparent
+            span.set_attribute("batch_size", len(events))
+            span.set_attribute("project_id", events[0].project_id)
+            if events[0].request_id:
+                span.set_attribute("request_id", events[0].request_id)
+            span.set_attribute("phase", "publish")
+
+        consumed_by_type: TypeCounter[str] = TypeCounter()
+        errors_by_type: TypeCounter[str] = TypeCounter()
+        try:
+            for evt in events:
+                handlers = self._handlers_for(evt.type)
+                if not handlers:
+                    continue
+                consumed, errors = await self._invoke_handlers(evt, handlers, log_consume=False)
+                if consumed:
+                    consumed_by_type[evt.type] += consumed
+                if errors:
+                    errors_by_type[evt.type] += errors
+        finally:
+            for evt_type in published:
+                self._count_delivery(evt_type, consumed_by_type[evt_type], errors_by_type[evt_type])
+            log_json(
+                "info",
+                "eventbus.publish_batch",
+                count=len(events),
+                types=dict(published),
+                consumed=sum(consumed_by_type.values()),
+                errors=sum(errors_by_type.values()),
+                project_id=events[0].project_id,
+                request_id=events[0].request_id,
+                phase="publish",
+            )
+            span.__exit__(None, None, None)
+
+    async def _invoke_handlers(
+        self, event: Event, handlers: Sequence[Handler], *, log_consume: bool
+    ) -> Tuple[int, int]:
+        """Await handlers sequentially, isolating errors. Returns (consumed, errors)."""
+        consumed = 0
+        errors = 0
+        for h in handlers:
+            try:
+                await h(event)
+                consumed += 1
+                if log_consume:
+                    log_json(
+                        "info",
+                        "eventbus.consume",
+                        evt_type=event.type,
+                        project_id=event.project_id,
+                        request_id=event.request_id,
+                        phase="consume",
+                    )
             except Exception as e:  # noqa: BLE001 - log and continue by design
-                self.event_handler_errors_total[evt_type] += 1
-                EVENT_HANDLER_ERRORS.labels(evt_type).inc()
+                errors += 1
                 log_json(
                     "error",
                     "eventbus.handler_error",
-                    evt_type=evt_type,
+                    evt_type=event.type,
                     project_id=event.project_id,
                     request_id=event.request_id,
                     error=str(e),
                     phase="error",
                 )
-        # Close span if opened
-        if _span_cm is not None:
-            try:
-                _span_cm.__exit__(None, None, None)
-            except Exception:
-                pass
+        return consumed, errors
+
+    def _count_delivery(self, evt_type: str, consumed: int, errors: int) -> None:
+        _, consumed_metric, errors_metric = self._metrics_for(evt_type)
+        if consumed:
+            self.events_consumed_total[evt_type] += consumed
+            consumed_metric.inc(consumed)
+        if errors:
+            self.event_handler_errors_total[evt_type] += errors
+            errors_metric.inc(errors)
 
     # Convenience helper for immediate publish without a pre-built Event
     async def publish_simple(
@@ -200,3 +400,4 @@ bus = EventBus()
 EVENTS_PUBLISHED = Counter("events_published_total", "Total events published", ["type"])
 EVENTS_CONSUMED = Counter("events_consumed_total", "Total events consumed", ["type"])
 EVENT_HANDLER_ERRORS = Counter("event_handler_errors_total", "Total event handler errors", ["type"])
+
@@ -0,0 +1,336 @@
+"""
+Task executor: drains the `tasks` table in-process.
+
+Queued tasks are claimed in batches (`claim_tasks_pg`, SKIP LOCKED, so several
+server processes and external `get_next_task` clients can share the queue) and
+dispatched by `payload["type"]` to async handlers registered with
+`register_task_handler`. A handler receives the claimed task
+({id, projectId, payload, createdAt}) and returns a result object, recorded with
+status `done` via `update_task_status_pg`; an exception records `failed` with
+the error. Tasks without a registered handler fail immediately.
+
+Concurrency is bounded globally and per project. Projects at their limit are
+excluded from the claim, and tasks claimed beyond a project's remaining slots
+are released back to the queue. Running tasks are heartbeated (updated_at) so
+the watchdog does not requeue them. On shutdown, running tasks get
+TASK_EXECUTOR_SHUTDOWN_SECONDS to finish; the rest are cancelled and requeued.
+
+Config (env):
+- TASK_EXECUTOR_ENABLED: run the executor in the orchestrator (default false)
+- TASK_EXECUTOR_CONCURRENCY: tasks running at once (default 4)
+- TASK_EXECUTOR_PROJECT_CONCURRENCY: tasks running at once per project (default 2)
+- TASK_EXECUTOR_BATCH_SIZE: maximum tasks claimed per query (default 10)
+- TASK_EXECUTOR_POLL_SECONDS: idle wait between claims when the queue is empty (default 1.0)
+- TASK_EXECUTOR_HEARTBEAT_SECONDS: heartbeat interval for running tasks (default 30)
+- TASK_EXECUTOR_SHUTDOWN_SECONDS: grace period for running tasks on stop (default 10)
+- TASK_EXECUTOR_PROJECT_ID: only claim tasks of this project (optional)
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, DefaultDict, Dict, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from server.core.events import TASK_UPDATED, Event, EventBus
+from server.db.engine import get_async_engine
+from server.db.repo import (
+    claim_tasks_pg,
+    get_memory_pg,
+    heartbeat_tasks_pg,
+    release_tasks_pg,
+    replace_memory_chunks_pg,
+    update_memory_embedding_pg,
+    update_task_status_pg,
+)
+from server.memory.chunking import chunk_rows, embed_chunks, needs_chunking
+from server.memory.semantic import compute_embedding, is_semantic_enabled
+from server.utils.logger import log_json
+
+TaskHandler = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+_HANDLERS: Dict[str, TaskHandler] = {}
+
+
+def _truthy(v: Optional[str]) -> bool:
+    if v is None:
+        return False
+    return v.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def is_executor_enabled() -> bool:
+    return _truthy(os.getenv("TASK_EXECUTOR_ENABLED", "false"))
+
+
+def register_task_handler(task_type: str, handler: TaskHandler) -> None:
+    """Route tasks whose payload ``type`` is ``task_type`` to ``handler`` (replaces any previous one)."""
+    _HANDLERS[task_type] = handler
+
+
+def get_task_handler(task_type: Optional[str]) -> Optional[TaskHandler]:
+    return _HANDLERS.get(task_type) if task_type else None
+
+
+class TaskExecutor:
+    """Claims queued tasks and runs them through registered handlers."""
+
+    def __init__(
+        self,
+        event_bus: EventBus,
+        *,
+        concurrency: Optional[int] = None,
+        project_concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        poll_seconds: Optional[float] = None,
+        heartbeat_seconds: Optional[float] = None,
+        shutdown_seconds: Optional[float] = None,
+        project_id: Optional[str] = None,
+    ) -> None:
+        self._bus = event_bus
+        self.concurrency = max(1, concurrency or _env_int("TASK_EXECUTOR_CONCURRENCY", 4))
+        self.project_concurrency = max(1, project_concurrency or _env_int("TASK_EXECUTOR_PROJECT_CONCURRENCY", 2))
+        self.batch_size = max(1, batch_size or _env_int("TASK_EXECUTOR_BATCH_SIZE", 10))
+        self.poll_seconds = max(0.01, poll_seconds or _env_float("TASK_EXECUTOR_POLL_SECONDS", 1.0))
+        self.heartbeat_seconds = max(0.01, heartbeat_seconds or _env_float("TASK_EXECUTOR_HEARTBEAT_SECONDS", 30.0))
+        self.shutdown_seconds = (
+            shutdown_seconds if shutdown_seconds is not None else _env_float("TASK_EXECUTOR_SHUTDOWN_SECONDS", 10.0)
+        )
+        self.project_id = project_id or (os.getenv("TASK_EXECUTOR_PROJECT_ID") or "").strip() or None
+        self._running: Dict[str, asyncio.Task] = {}
+        self._running_by_project: DefaultDict[str, int] = defaultdict(int)
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self.tasks_completed = 0
+        self.tasks_failed = 0
+
+    @property
+    def running_count(self) -> int:
+        return len(self._running)
+
+    def wake(self) -> None:
+        """Claim again now instead of after the idle poll (e.g. a task was just enqueued)."""
+        self._wake.set()
+
+    async def run(self) -> None:
+        """Claim and dispatch until stop(); cancellation also stops it."""
+        self._stopping = False
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        log_json(
+            "info",
+            "executor.started",
+            concurrency=self.concurrency,
+            project_concurrency=self.project_concurrency,
+            batch_size=self.batch_size,
+        )
+        try:
+            while not self._stopping:
+                claimed = await self._claim_batch()
+                if self._stopping:
+                    break
+                # A full batch suggests more work is queued; otherwise wait for a slot, an enqueue or the poll
+                if claimed < self.batch_size or self.running_count >= self.concurrency:
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            heartbeat.cancel()
+            try:
+                await heartbeat
+            except asyncio.CancelledError:
+                pass
+
+    async def stop(self) -> None:
+        """Stop claiming, let running tasks finish within the grace period, requeue the rest."""
+        self._stopping = True
+        self._wake.set()
+        if not self._running:
+            return
+        pending = list(self._running.values())
+        _, still_running = await asyncio.wait(pending, timeout=max(self.shutdown_seconds, 0.0))
+        if not still_running:
+            return
+        task_ids = [tid for tid, t in self._running.items() if t in still_running]
+        for t in still_running:
+            t.cancel()
+        await asyncio.gather(*still_running, return_exceptions=True)
+        engine = get_async_engine()
+        if engine is not None and task_ids:
+            try:
+                await release_tasks_pg(engine, task_ids=task_ids)
+            except Exception as exc:
+                log_json("error", "executor.release_failed", count=len(task_ids), error=str(exc))
+        log_json("warning", "executor.tasks_requeued_on_stop", count=len(task_ids))
+
+    async def _claim_batch(self) -> int:
+        free = self.concurrency - self.running_count
+        if free <= 0:
+            return 0
+        engine = get_async_engine()
+        if engine is None:
+            return 0
+        saturated = [p for p, n in self._running_by_project.items() if n >= self.project_concurrency]
+        try:
+            claimed = await claim_tasks_pg(
+                engine,
+                limit=min(free, self.batch_size),
+                project_id=self.project_id,
+                exclude_projects=saturated,
+            )
+        except Exception as exc:
+            TASK_EXECUTOR_CLAIM_ERRORS.inc()
+            log_json("error", "executor.claim_failed", error=str(exc))
+            return 0
+        overflow = []
+        for task in claimed:
+            # stop() may have run while the claim was in flight; hand the batch back
+            if self._stopping or self._running_by_project[str(task["projectId"])] >= self.project_concurrency:
+                overflow.append(task["id"])
+                continue
+            self._start(task)
+        if overflow:
+            try:
+                await release_tasks_pg(engine, task_ids=overflow)
+            except Exception as exc:
+                # Left in_progress; the watchdog requeues them after its TTL
+                log_json("error", "executor.release_failed", count=len(overflow), error=str(exc))
+        if claimed:
+            TASK_EXECUTOR_CLAIMED.inc(len(claimed) - len(overflow))
+        return len(claimed)
+
+    def _start(self, task: Dict[str, Any]) -> None:
+        task_id = str(task["id"])
+        project = str(task["projectId"])
+        self._running_by_project[project] += 1
+        self._running[task_id] = asyncio.create_task(self._execute(task))
+        TASK_EXECUTOR_RUNNING.set(len(self._running))
+
+    async def _execute(self, task: Dict[str, Any]) -> None:
+        task_id = str(task["id"])
+        project = str(task["projectId"])
+        payload = task.get("payload") or {}
+        task_type = payload.get("type") if isinstance(payload, dict) else None
+        handler = get_task_handler(task_type)
+        label = task_type if handler is not None else "unknown"
+        started = time.perf_counter()
+        status = "failed"
+        result: Dict[str, Any]
+        try:
+            if handler is None:
+                result = {"error": f"no handler registered for task type {task_type!r}"}
+            else:
+                result = dict(await handler(task) or {})
+                status = "done"
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # noqa: BLE001 - a failing task must not stop the executor
+            result = {"error": str(exc)}
+        finally:
+            self._running.pop(task_id, None)
+            self._running_by_project[project] -= 1
+            if self._running_by_project[project] <= 0:
+                del self._running_by_project[project]
+            TASK_EXECUTOR_RUNNING.set(len(self._running))
+            self._wake.set()
+        duration = time.perf_counter() - started
+        TASK_EXECUTOR_TASKS.labels(label, status).inc()
+        TASK_EXECUTOR_DURATION.labels(label).observe(duration)
+        if status == "done":
+            self.tasks_completed += 1
+        else:
+            self.tasks_failed += 1
+        log_json(
+            "info" if status == "done" else "error",
+            "executor.task_finished",
+            task_id=task_id,
+            project_id=project,
+            task_type=task_type,
+            status=status,
+            durationMs=int(duration * 1000),
+            error=result.get("error") if status == "failed" else None,
+        )
+        await self._record(task_id, project, status, result)
+
+    async def _record(self, task_id: str, project: str, status: str, result: Dict[str, Any]) -> None:
+        engine = get_async_engine()
+        if engine is None:
+            return
+        try:
+            await update_task_status_pg(engine, task_id=task_id, status=status, result=result)
+        except Exception as exc:
+            log_json("error", "executor.record_failed", task_id=task_id, status=status, error=str(exc))
+            return
+        await self._bus.publish(
+            Event(type=TASK_UPDATED, project_id=project, payload={"id": task_id, "status": status}, ts=time.time())
+        )
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            task_ids = list(self._running)
+            engine = get_async_engine()
+            if not task_ids or engine is None:
+                continue
+            try:
+                await heartbeat_tasks_pg(engine, task_ids=task_ids)
+            except Exception as exc:
+                log_json("warning", "executor.heartbeat_failed", count=len(task_ids), error=str(exc))
+
+
+async def _reembed_memory(task: Dict[str, Any]) -> Dict[str, Any]:
+    """memory.reembed: recompute the embedding of payload["memoryId"] (or its chunks) with the current model."""
+    mem_id = (task.get("payload") or {}).get("memoryId")
+    if not isinstance(mem_id, str) or not mem_id.strip():
+        raise ValueError("payload.memoryId (string) is required")
+    if not is_semantic_enabled():
+        raise RuntimeError("semantic search is disabled")
+    engine = get_async_engine()
+    if engine is None:
+        raise RuntimeError("DATABASE_URL not configured")
+    entry = await get_memory_pg(engine, mem_id=mem_id)
+    if entry is None:
+        raise LookupError(f"memory {mem_id} not found")
+    if needs_chunking(entry["content"]):
+        embedded = await embed_chunks(entry["content"])
+        if not embedded:
+            raise RuntimeError("embedding unavailable")
+        await replace_memory_chunks_pg(engine, mem_id=mem_id, chunks=chunk_rows(mem_id, embedded))
+        return {"memoryId": mem_id, "dimension": len(embedded[0][1]), "chunks": len(embedded)}
+    embedding = await compute_embedding(entry["content"])
+    if embedding is None:
+        raise RuntimeError("embedding unavailable")
+    await update_memory_embedding_pg(engine, mem_id=mem_id, embedding=embedding)
+    return {"memoryId": mem_id, "dimension": len(embedding)}
+
+
+register_task_handler("memory.reembed", _reembed_memory)
+
+
+# Prometheus metrics
+TASK_EXECUTOR_TASKS = Counter(
+    "task_executor_tasks_total", "Tasks finished by the in-process executor", ["type", "status"]
+)
+TASK_EXECUTOR_DURATION = Histogram(
+    "task_executor_task_duration_seconds", "Handler run time per task", ["type"]
+)
+TASK_EXECUTOR_CLAIMED = Counter("task_executor_claimed_total", "Tasks claimed by the in-process executor")
+TASK_EXECUTOR_CLAIM_ERRORS = Counter("task_executor_claim_errors_total", "Failed task claim queries")
+TASK_EXECUTOR_RUNNING = Gauge("task_executor_running", "Tasks currently running in the executor")
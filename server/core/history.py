@@ -0,0 +1,225 @@
+"""
+Conversation history backends for the orchestrator.
+
+The orchestrator keeps the last few messages of every active project in local
+deques. A history store is where those messages also live beyond the process:
+
+- memory (default): no backing store; history is per process and lost on restart
+- postgres: a ring buffer of `max_len` rows per project (`conversation_history`,
+  see alembic 0004). Appends are buffered and written for all projects in one
+  statement; reads requested in the same loop iteration share one query.
+
+A persistent store lets history survive restarts and LRU eviction, and lets
+several server processes see each other's messages (the orchestrator re-reads a
+project after ORCH_HISTORY_SYNC_SECONDS).
+
+Config (env):
+- ORCH_HISTORY_BACKEND: memory | postgres (default memory)
+- ORCH_HISTORY_FLUSH_SECONDS: write-behind interval for postgres (default 0.5)
+- ORCH_HISTORY_FLUSH_SIZE: pending projects that trigger an early write (default 100)
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+from prometheus_client import Counter
+
+from server.db.engine import get_async_engine
+from server.db.repo import append_conversation_history_pg, fetch_conversation_history_pg
+from server.utils.logger import log_json
+
+HISTORY_BACKEND = (os.getenv("ORCH_HISTORY_BACKEND") or "memory").strip().lower()
+FLUSH_SECONDS = float(os.getenv("ORCH_HISTORY_FLUSH_SECONDS", "0.5"))
+FLUSH_SIZE = int(os.getenv("ORCH_HISTORY_FLUSH_SIZE", "100"))
+
+HistoryReader = Callable[[List[str]], Awaitable[Dict[str, List[str]]]]
+HistoryWriter = Callable[[Dict[str, List[str]]], Awaitable[None]]
+
+
+class HistoryStore:
+    """In-process history: the orchestrator's own deques are the only copy."""
+
+    persistent = False
+
+    def append(self, project_key: str, content: str) -> None:
+        """Record a message; must not block the event loop."""
+
+    async def load(self, project_key: str) -> Optional[List[str]]:
+        """Stored history for a project, oldest first; None when unavailable."""
+        return None
+
+    async def stop(self) -> None:
+        """Write anything still buffered."""
+
+
+async def _read_from_postgres(project_keys: List[str]) -> Dict[str, List[str]]:
+    engine = get_async_engine()
+    if engine is None:
+        return {}
+    return await fetch_conversation_history_pg(engine, project_ids=project_keys)
+
+
+class PostgresHistoryStore(HistoryStore):
+    """Ring-buffer history in Postgres with batched reads and write-behind appends."""
+
+    persistent = True
+
+    def __init__(
+        self,
+        max_len: int,
+        *,
+        reader: Optional[HistoryReader] = None,
+        writer: Optional[HistoryWriter] = None,
+        flush_seconds: float = FLUSH_SECONDS,
+        flush_size: int = FLUSH_SIZE,
+    ) -> None:
+        self.max_len = max(max_len, 1)
+        self._reader: HistoryReader = reader or _read_from_postgres
+        self._writer: HistoryWriter = writer or self._write_to_postgres
+        self._flush_seconds = max(flush_seconds, 0.01)
+        self._flush_size = max(flush_size, 1)
+        self._pending: Dict[str, Deque[str]] = {}
+        self._reads: Dict[str, asyncio.Future] = {}
+        self._read_task: Optional[asyncio.Task] = None
+        self._ticker: Optional[asyncio.Task] = None
+        self._size_flush: Optional[asyncio.Task] = None
+        # Reads and writes never overlap, so a read plus the pending buffer is never double-counted
+        self._io_lock = asyncio.Lock()
+        self.reads = 0
+        self.writes = 0
+
+    async def _write_to_postgres(self, entries: Dict[str, List[str]]) -> None:
+        engine = get_async_engine()
+        if engine is None:
+            return
+        await append_conversation_history_pg(engine, entries=entries, max_len=self.max_len)
+
+    def append(self, project_key: str, content: str) -> None:
+        pending = self._pending.get(project_key)
+        if pending is None:
+            pending = self._pending[project_key] = deque(maxlen=self.max_len)
+        pending.append(content)
+        self._ensure_ticker()
+        if len(self._pending) >= self._flush_size:
+            self._schedule_flush()
+
+    async def load(self, project_key: str) -> Optional[List[str]]:
+        future = self._reads.get(project_key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._reads[project_key] = loop.create_future()
+            if self._read_task is None or self._read_task.done():
+                self._read_task = loop.create_task(self._read_batch())
+        return await asyncio.shield(future)
+
+    async def flush(self) -> None:
+        async with self._io_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            entries = {key: list(texts) for key, texts in batch.items()}
+            try:
+                await self._writer(entries)
+            except asyncio.CancelledError:
+                self._requeue(entries)
+                raise
+            except Exception as exc:
+                ORCH_HISTORY_WRITES.labels(result="error").inc()
+                log_json("warning", "orchestrator.history_write_failed", projects=len(entries), error=str(exc))
+                self._requeue(entries)
+                return
+            self.writes += 1
+            ORCH_HISTORY_WRITES.labels(result="ok").inc()
+
+    async def stop(self) -> None:
+        ticker, size_flush = self._ticker, self._size_flush
+        if ticker is not None and not ticker.done():
+            ticker.cancel()
+            try:
+                await ticker
+            except asyncio.CancelledError:
+                pass
+        if size_flush is not None and not size_flush.done():
+            await size_flush
+        self._ticker = None
+        self._size_flush = None
+        await self.flush()
+
+    async def _read_batch(self) -> None:
+        # Let every handler scheduled in this iteration register its project first
+        await asyncio.sleep(0)
+        async with self._io_lock:
+            futures, self._reads = self._reads, {}
+            keys = list(futures)
+            try:
+                stored: Optional[Dict[str, List[str]]] = await self._reader(keys)
+                self.reads += 1
+                ORCH_HISTORY_READS.labels(result="ok").inc()
+            except Exception as exc:
+                ORCH_HISTORY_READS.labels(result="error").inc()
+                log_json("warning", "orchestrator.history_read_failed", projects=len(keys), error=str(exc))
+                stored = None
+            for key, future in futures.items():
+                if future.done():
+                    continue
+                if stored is None:
+                    future.set_result(None)
+                    continue
+                # Appends not yet written are newer than anything stored
+                merged = list(stored.get(key) or []) + list(self._pending.get(key) or [])
+                future.set_result(merged[-self.max_len:])
+        if self._reads:
+            # Requested while this batch was in flight
+            self._read_task = asyncio.get_running_loop().create_task(self._read_batch())
+
+    def _requeue(self, entries: Dict[str, List[str]]) -> None:
+        # Messages appended while the write was in flight are newer than the failed batch
+        for key, texts in entries.items():
+            pending = deque(texts, maxlen=self.max_len)
+            pending.extend(self._pending.get(key) or [])
+            self._pending[key] = pending
+
+    def _ensure_ticker(self) -> None:
+        if self._ticker is not None and not self._ticker.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._ticker = loop.create_task(self._run_ticker())
+
+    def _schedule_flush(self) -> None:
+        if self._size_flush is not None and not self._size_flush.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._size_flush = loop.create_task(self.flush())
+
+    async def _run_ticker(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_seconds)
+            await self.flush()
+
+
+def create_history_store(max_len: int, backend: Optional[str] = None) -> HistoryStore:
+    """History store for ORCH_HISTORY_BACKEND (or ``backend``)."""
+    name = (backend or HISTORY_BACKEND).strip().lower()
+    if name == "postgres":
+        return PostgresHistoryStore(max_len)
+    if name not in ("", "memory"):
+        log_json("warning", "orchestrator.history_backend_unknown", backend=name, using="memory")
+    return HistoryStore()
+
+
+# Prometheus metrics
+ORCH_HISTORY_READS = Counter(
+    "orchestrator_history_reads_total", "Batched conversation history reads", ["result"]
+)
+ORCH_HISTORY_WRITES = Counter(
+    "orchestrator_history_writes_total", "Batched conversation history writes", ["result"]
+)
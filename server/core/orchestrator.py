@@ -5,7 +5,22 @@ Phase 1 scope:
 - Singleton orchestrator with start/stop and running state
 - Subscribes to "conversation.message" events
 - Stub handler updates in-memory metrics, logs, and exercises error path
-- Background loop stub for future work/task processing
+- Background loop that drives the TaskExecutor when it is enabled (idles otherwise)
+- Optional per-project coalescing of governance analysis for message bursts
+  (ORCH_GOVERNANCE_COALESCE_MS, default 0 = analyze every message)
+- Optional governance worker pool (ORCH_GOVERNANCE_WORKERS, default 0 = analyze
+  inline in the event handler). With workers, the handler only enqueues; each
+  evaluation must finish within ORCH_GOVERNANCE_DEADLINE_MS of being enqueued
+  or it is dropped. The bounded queue (ORCH_GOVERNANCE_QUEUE_MAX) drops its
+  oldest entry when full. ORCH_GOVERNANCE_CLASSIFY_PROCESSES > 0 moves activity
+  classification into a process pool.
+- Pluggable conversation history store (ORCH_HISTORY_BACKEND, see
+  server/core/history.py). With a persistent store, a project's local history is
+  reloaded when it is first seen and again after ORCH_HISTORY_SYNC_SECONDS, so it
+  survives restarts and eviction and includes messages handled by other processes.
+
+Task executor (optional, TASK_EXECUTOR_ENABLED):
+- Runs queued tasks in-process through registered handlers, see server/core/executor.py
 
 Watchdog (optional):
 - Periodically scans for stale in-progress tasks and requeues or fails them
@@ -17,18 +32,27 @@ import asyncio
 import os
 import time
 from collections import OrderedDict, defaultdict, deque
-from typing import Any, DefaultDict, Deque, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, DefaultDict, Deque, Dict, List, Optional, Tuple
 
 from prometheus_client import Counter, Histogram
 
 import server.observability.tracing as otel_tracing
-from server.core.events import Event, EventBus, bus
+from server.core.events import TASK_ENQUEUED, Event, EventBus, bus
+from server.core.executor import TaskExecutor, is_executor_enabled
+from server.core.history import HistoryStore, create_history_store
 from server.db.engine import get_async_engine
 from server.db.repo import (
     watchdog_fail_stale_inprogress_pg,
     watchdog_requeue_stale_inprogress_pg,
 )
-from server.governance import activate_pre_action_governance
+from server.governance import ActivityType, activate_pre_action_governance, governance_engine
+from server.governance.classifier import (
+    Classification,
+    ContextWindow,
+    classify_in_worker,
+    init_worker_classifier,
+)
 from server.utils.logger import log_json
 
 CONV_MSG = "conversation.message"
@@ -36,20 +60,50 @@ GOVERNANCE_GUIDANCE = "governance.guidance"
 _HISTORY_MAX_LEN = 5
 _HISTORY_MAX_PROJECTS = int(os.getenv("ORCH_HISTORY_MAX_PROJECTS", "512"))
 _HISTORY_IDLE_TTL_SECONDS = int(os.getenv("ORCH_HISTORY_IDLE_TTL_SECONDS", "3600"))
+_HISTORY_SYNC_SECONDS = float(os.getenv("ORCH_HISTORY_SYNC_SECONDS", "2.0"))
+_GOVERNANCE_COALESCE_MS = int(os.getenv("ORCH_GOVERNANCE_COALESCE_MS", "0"))
+_GOVERNANCE_WORKERS = int(os.getenv("ORCH_GOVERNANCE_WORKERS", "0"))
+_GOVERNANCE_QUEUE_MAX = int(os.getenv("ORCH_GOVERNANCE_QUEUE_MAX", "256"))
+_GOVERNANCE_DEADLINE_MS = int(os.getenv("ORCH_GOVERNANCE_DEADLINE_MS", "5000"))
+_GOVERNANCE_CLASSIFY_PROCESSES = int(os.getenv("ORCH_GOVERNANCE_CLASSIFY_PROCESSES", "0"))
+
+# Messages of history that analyze_context scores together with the new message
+_CONTEXT_WINDOW = 3
+
+# (latest event, its payload, its content, history before it, its classification)
+_PendingGovernance = Tuple[Event, Dict[str, Any], str, List[str], Optional[Classification[Any]]]
+# (evaluation, monotonic enqueue time, monotonic deadline)
+_GovernanceJob = Tuple[_PendingGovernance, float, float]
 
 
 class Orchestrator:
-    def __init__(self, event_bus: EventBus) -> None:
+    def __init__(self, event_bus: EventBus, history_store: Optional[HistoryStore] = None) -> None:
         self._bus = event_bus
         self._running = False
         self._lock = asyncio.Lock()
         self._bg_task: asyncio.Task | None = None
         self._watchdog_task: asyncio.Task | None = None
+        self._executor: TaskExecutor | None = None
         # Metrics: Phase 1 in-memory
         self.events_handled_total: DefaultDict[str, int] = defaultdict(int)
         self.handler_errors_total: DefaultDict[str, int] = defaultdict(int)
         self._recent_history: Dict[str, Deque[str]] = {}
         self._history_access: OrderedDict[str, float] = OrderedDict()
+        # Backing store for history, and when each local copy was last reloaded from it
+        self._history_store = history_store or create_history_store(_HISTORY_MAX_LEN)
+        self._history_synced: Dict[str, float] = {}
+        # Incremental classification state, kept alongside _recent_history
+        self._recent_windows: Dict[str, ContextWindow] = {}
+        # Governance coalescing: latest pending message and one timer per project
+        self._pending_governance: Dict[str, _PendingGovernance] = {}
+        self._governance_timers: Dict[str, asyncio.Task] = {}
+        self.governance_runs_total = 0
+        self.governance_coalesced_total = 0
+        # Governance worker pool (None = evaluate inline)
+        self._governance_queue: Optional[asyncio.Queue[_GovernanceJob]] = None
+        self._governance_workers: List[asyncio.Task] = []
+        self._classify_pool: Optional[ProcessPoolExecutor] = None
+        self.governance_dropped_total = 0
 
     @property
     def is_running(self) -> bool:
@@ -61,9 +115,13 @@ class Orchestrator:
                 return
             # Subscribe handlers
             await self._bus.subscribe(CONV_MSG, self._handle_conversation_message)
+            if is_executor_enabled():
+                self._executor = TaskExecutor(self._bus)
+                await self._bus.subscribe(TASK_ENQUEUED, self._wake_executor)
             self._running = True
-            # Background loop stub
+            # Background loop: runs the task executor when enabled
             self._bg_task = asyncio.create_task(self._run())
+            self._start_governance_workers()
             log_json("info", "orchestrator.start_ok")
             # Optional watchdog
             if _truthy(os.getenv("TASK_WATCHDOG_ENABLED", "false")):
@@ -78,8 +136,12 @@ class Orchestrator:
                 return
             try:
                 await self._bus.unsubscribe(CONV_MSG, self._handle_conversation_message)
+                if self._executor is not None:
+                    await self._bus.unsubscribe(TASK_ENQUEUED, self._wake_executor)
             finally:
                 self._running = False
+                if self._executor is not None:
+                    await self._executor.stop()
                 if self._bg_task:
                     self._bg_task.cancel()
                     try:
@@ -87,6 +149,7 @@ class Orchestrator:
                     except asyncio.CancelledError:
                         pass
                     self._bg_task = None
+                self._executor = None
                 if self._watchdog_task:
                     self._watchdog_task.cancel()
                     try:
@@ -94,16 +157,70 @@ class Orchestrator:
                     except asyncio.CancelledError:
                         pass
                     self._watchdog_task = None
+                await self._flush_pending_governance()
+                await self._stop_governance_workers()
+                await self._history_store.stop()
                 log_json("info", "orchestrator.stop_ok")
 
+    def _start_governance_workers(self) -> None:
+        if _GOVERNANCE_CLASSIFY_PROCESSES > 0:
+            patterns = {activity.value: list(p) for activity, p in governance_engine.activity_patterns.items()}
+            self._classify_pool = ProcessPoolExecutor(
+                max_workers=_GOVERNANCE_CLASSIFY_PROCESSES,
+                initializer=init_worker_classifier,
+                initargs=(patterns,),
+            )
+        if _GOVERNANCE_WORKERS <= 0:
+            return
+        self._governance_queue = asyncio.Queue(maxsize=max(1, _GOVERNANCE_QUEUE_MAX))
+        self._governance_workers = [
+            asyncio.create_task(self._governance_worker()) for _ in range(_GOVERNANCE_WORKERS)
+        ]
+        log_json(
+            "info",
+            "orchestrator.governance_workers_started",
+            workers=_GOVERNANCE_WORKERS,
+            queue_max=self._governance_queue.maxsize,
+            deadline_ms=_GOVERNANCE_DEADLINE_MS,
+            classify_processes=_GOVERNANCE_CLASSIFY_PROCESSES,
+        )
+
+    async def _stop_governance_workers(self) -> None:
+        """Let queued evaluations finish (bounded by the deadline), then stop the workers."""
+        queue = self._governance_queue
+        if queue is not None:
+            try:
+                await asyncio.wait_for(queue.join(), timeout=_GOVERNANCE_DEADLINE_MS / 1000.0)
+            except asyncio.TimeoutError:
+                pass
+            for task in self._governance_workers:
+                task.cancel()
+            for task in self._governance_workers:
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+            self._governance_workers = []
+            self._governance_queue = None
+        if self._classify_pool is not None:
+            self._classify_pool.shutdown(wait=False, cancel_futures=True)
+            self._classify_pool = None
+
     async def _run(self) -> None:
-        # Background loop stub for future processing
         try:
+            if self._executor is not None:
+                await self._executor.run()
+                return
+            # Nothing to process in-process without the executor
             while self._running:
                 await asyncio.sleep(0.05)
         except asyncio.CancelledError:
             pass
 
+    async def _wake_executor(self, event: Event) -> None:
+        if self._executor is not None:
+            self._executor.wake()
+
     async def _watchdog_loop(self) -> None:
         """Periodic scanner that requeues or fails stale in-progress tasks.
 
@@ -129,118 +246,70 @@ class Orchestrator:
                 limit = _to_int(os.getenv("TASK_WATCHDOG_BATCH_LIMIT", "100"), 100)
                 project_id = os.getenv("TASK_WATCHDOG_PROJECT_ID")
 
-                gate_enabled = False
-                try:
-                    gate_enabled = bool(otel_tracing.is_tracing_enabled())
-                except Exception:
-                    gate_enabled = False
-                provider_is_sdk = False
-                try:
-                    from opentelemetry import trace as _t
-
-                    prov = _t.get_tracer_provider()
-                    provider_is_sdk = hasattr(prov, "add_span_processor")
-                except Exception:
-                    provider_is_sdk = False
-
-                _span_cm = None
-                _span_obj = None
-                if gate_enabled or provider_is_sdk:
-                    try:
-                        from opentelemetry import trace
-                        tracer = trace.get_tracer("neural-forge")
-                        _span_cm = tracer.start_as_current_span("Watchdog.scan")
-                        _span_obj = _span_cm.__enter__()
+                with otel_tracing.start_span("Watchdog.scan") as span:
+                    if span.recording:
+                        span.set_attribute("phase", "scan")
+                        span.set_attribute("action", action)
+                        span.set_attribute("ttl_seconds", int(ttl_s))
+                        span.set_attribute("limit", int(limit))
+                        if project_id:
+                            span.set_attribute("project_id", project_id)
+
+                    start = time.perf_counter()
+                    affected = 0
+                    engine = get_async_engine()
+                    if engine is None:
                         try:
-                            _span_obj.set_attribute("phase", "scan")
-                            _span_obj.set_attribute("action", action)
-                            _span_obj.set_attribute("ttl_seconds", int(ttl_s))
-                            _span_obj.set_attribute("limit", int(limit))
-                            if project_id:
-                                _span_obj.set_attribute("project_id", project_id)
+                            log_json("warning", "watchdog.no_db")
                         except Exception:
                             pass
-                    except Exception:
-                        _span_cm = None
-                        _span_obj = None
-
-                start = time.perf_counter()
-                affected = 0
-                engine = get_async_engine()
-                if engine is None:
-                    try:
-                        log_json("warning", "watchdog.no_db")
-                    except Exception:
-                        pass
-                    WATCHDOG_ERRORS_TOTAL.labels(action).inc()
-                    await asyncio.sleep(max(1, interval_s))
-                    if _span_cm is not None:
-                        try:
-                            _span_cm.__exit__(None, None, None)
-                        except Exception:
-                            pass
-                    continue
-
-                try:
-                    if action == "fail":
-                        affected = await watchdog_fail_stale_inprogress_pg(
-                            engine,
-                            ttl_seconds=ttl_s,
-                            limit=limit,
-                            project_id=project_id if project_id and project_id.strip() else None,
-                            reason="ttl_exceeded",
-                        )
+                        WATCHDOG_ERRORS_TOTAL.labels(action).inc()
+                        span.set_attribute("db_available", False)
+                        span.set_error()
                     else:
-                        affected = await watchdog_requeue_stale_inprogress_pg(
-                            engine,
-                            ttl_seconds=ttl_s,
-                            limit=limit,
-                            project_id=project_id if project_id and project_id.strip() else None,
-                        )
-                    duration = time.perf_counter() - start
-                    WATCHDOG_SCANS_TOTAL.labels(action).inc()
-                    WATCHDOG_DURATION.labels(action).observe(duration)
-                    outcome = "ok" if affected > 0 else "none"
-                    WATCHDOG_ACTIONS_TOTAL.labels(action, outcome).inc()
-                    try:
-                        log_json(
-                            "info",
-                            "watchdog.scan",
-                            action=action,
-                            ttlSeconds=int(ttl_s),
-                            limit=int(limit),
-                            affected=int(affected),
-                            projectId=project_id,
-                            durationMs=int(duration * 1000),
-                        )
-                    except Exception:
-                        pass
-                    if _span_obj is not None:
                         try:
-                            _span_obj.set_attribute("affected", int(affected))
-                            _span_obj.set_attribute("duration_ms", int(duration * 1000))
-                        except Exception:
-                            pass
-                except Exception as e:
-                    WATCHDOG_ERRORS_TOTAL.labels(action).inc()
-                    try:
-                        log_json("error", "watchdog.scan_error", action=action, error=str(e))
-                    except Exception:
-                        pass
-                    if _span_obj is not None:
-                        try:
-                            from opentelemetry.trace import Status, StatusCode
-
-                            _span_obj.record_exception(e)
-                            _span_obj.set_status(Status(StatusCode.ERROR))
-                        except Exception:
-                            pass
-                finally:
-                    if _span_cm is not None:
-                        try:
-                            _span_cm.__exit__(None, None, None)
-                        except Exception:
-                            pass
+                            if action == "fail":
+                                affected = await watchdog_fail_stale_inprogress_pg(
+                                    engine,
+                                    ttl_seconds=ttl_s,
+                                    limit=limit,
+                                    project_id=project_id if project_id and project_id.strip() else None,
+                                    reason="ttl_exceeded",
+                                )
+                            else:
+                                affected = await watchdog_requeue_stale_inprogress_pg(
+                                    engine,
+                                    ttl_seconds=ttl_s,
+                                    limit=limit,
+                                    project_id=project_id if project_id and project_id.strip() else None,
+                                )
+                            duration = time.perf_counter() - start
+                            WATCHDOG_SCANS_TOTAL.labels(action).inc()
+                            WATCHDOG_DURATION.labels(action).observe(duration)
+                            outcome = "ok" if affected > 0 else "none"
+                            WATCHDOG_ACTIONS_TOTAL.labels(action, outcome).inc()
+                            try:
+                                log_json(
+                                    "info",
+                                    "watchdog.scan",
+                                    action=action,
+                                    ttlSeconds=int(ttl_s),
+                                    limit=int(limit),
+                                    affected=int(affected),
+                                    projectId=project_id,
+                                    durationMs=int(duration * 1000),
+                                )
+                            except Exception:
+                                pass
+                            span.set_attribute("affected", int(affected))
+                            span.set_attribute("duration_ms", int(duration * 1000))
+                        except Exception as e:
+                            WATCHDOG_ERRORS_TOTAL.labels(action).inc()
+                            try:
+                                log_json("error", "watchdog.scan_error", action=action, error=str(e))
+                            except Exception:
+                                pass
+                            span.set_error(e)
                 await asyncio.sleep(max(1, interval_s))
         except asyncio.CancelledError:
             pass
@@ -254,19 +323,23 @@ class Orchestrator:
             if last_seen >= cutoff:
                 break
             self._history_access.popitem(last=False)
-            self._recent_history.pop(project_id, None)
+            self._forget_history(project_id)
 
     def _evict_oldest_history(self) -> None:
         if self._history_access:
             project_id, _ = self._history_access.popitem(last=False)
-            self._recent_history.pop(project_id, None)
+            self._forget_history(project_id)
             return
         if self._recent_history:
-            project_id = next(iter(self._recent_history))
-            self._recent_history.pop(project_id, None)
+            self._forget_history(next(iter(self._recent_history)))
+
+    def _forget_history(self, key: str) -> None:
+        self._recent_history.pop(key, None)
+        self._recent_windows.pop(key, None)
+        self._history_synced.pop(key, None)
 
     def _get_project_history(self, project_id: str) -> Deque[str]:
-        key = project_id.strip().lower() if isinstance(project_id, str) else str(project_id)
+        key = _project_key(project_id)
         if _HISTORY_MAX_PROJECTS <= 0:
             return deque(maxlen=_HISTORY_MAX_LEN)
 
@@ -284,140 +357,262 @@ class Orchestrator:
         self._history_access.move_to_end(key)
         return history
 
+    async def _sync_history(self, project_id: str) -> None:
+        """Reload a project's local history from a persistent store when it is missing or stale."""
+        if not self._history_store.persistent:
+            return
+        key = _project_key(project_id)
+        now = time.monotonic()
+        synced = self._history_synced.get(key)
+        if key in self._recent_history and synced is not None and now - synced < _HISTORY_SYNC_SECONDS:
+            return
+        stored = await self._history_store.load(key)
+        if stored is None:
+            return
+        history = self._get_project_history(project_id)
+        if list(history) != stored[-_HISTORY_MAX_LEN:]:
+            history.clear()
+            history.extend(stored)
+            self._recent_windows.pop(key, None)
+        if key in self._recent_history:
+            self._history_synced[key] = now
+
+    def _remember(self, project_id: str, history: Deque[str], content: str) -> None:
+        history.append(content)
+        self._history_store.append(_project_key(project_id), content)
+
+    def _get_context_window(self, project_id: str, history: Deque[str]) -> Optional[ContextWindow]:
+        """Window mirroring the tail of ``history``; call right after _get_project_history."""
+        classifier = governance_engine.activity_classifier
+        if not classifier.supports_incremental:
+            return None
+        key = _project_key(project_id)
+        window = self._recent_windows.get(key) if key in self._recent_history else None
+        if window is None:
+            window = ContextWindow(classifier, _CONTEXT_WINDOW)
+            for text in list(history)[-_CONTEXT_WINDOW:]:
+                window.push(classifier.scan(text.lower()))
+            if key in self._recent_history:
+                self._recent_windows[key] = window
+        return window
+
+    def _classify_incremental(self, window: Optional[ContextWindow], content: str) -> Optional[Classification[Any]]:
+        """Score the window plus ``content`` in O(len(content)) and slide the window."""
+        if window is None:
+            return None
+        scan = governance_engine.activity_classifier.scan(content.lower())
+        classification = window.classify(scan)
+        window.push(scan)
+        return classification
+
     async def _handle_conversation_message(self, event: Event) -> None:
         # Structured log with content length to avoid logging full content by default
         content_len = 0
-        _span_cm = None
-        _span_obj = None
-        try:
-            _gate = bool(otel_tracing.is_tracing_enabled())
-        except Exception:
-            _gate = False
-        # Also honor an active SDK tracer provider set by tests or runtime instrumentation
-        _provider_is_sdk = False
+        with otel_tracing.start_span("Orchestrator.handle", traceparent=event.traceparent) as span:
+            try:
+                payload: Dict[str, Any] = event.payload or {}
+                msg = payload.get("content")
+                content_len = len(msg) if isinstance(msg, str) else 0
+                # Test-only hook: allow forcing an error to verify error path
+                if payload.get("force_error"):
+                    raise RuntimeError("forced_error")
+
+                # TODO: parse role, route by role/type in later phases
+                self.events_handled_total[event.type] += 1
+                if span.recording:
+                    span.set_attribute("evt_type", event.type)
+                    span.set_attribute("project_id", event.project_id)
+                    if event.request_id:
+                        span.set_attribute("request_id", event.request_id)
+                    span.set_attribute("content_len", content_len)
+                    span.set_attribute("phase", "consume")
+                log_json(
+                    "info",
+                    "orchestrator.handle",
+                    evt_type=event.type,
+                    project_id=event.project_id,
+                    request_id=event.request_id,
+                    content_len=content_len,
+                )
+                await self._maybe_emit_governance(event, payload)
+            except Exception as e:  # noqa: BLE001 - intended isolation for handlers
+                self.handler_errors_total[event.type] += 1
+                ORCH_HANDLER_ERRORS.labels(event.type).inc()
+                span.set_error(e)
+                log_json(
+                    "error",
+                    "orchestrator.handler_error",
+                    evt_type=event.type,
+                    project_id=event.project_id,
+                    request_id=event.request_id,
+                    error=str(e),
+                )
+                # Re-raise to allow EventBus to record handler error metrics; EventBus
+                # will isolate and continue with other handlers per design.
+                raise
+
+    async def _maybe_emit_governance(self, event: Event, payload: Dict[str, Any]) -> None:
+        content = payload.get("content") if isinstance(payload, dict) else None
+        if not isinstance(content, str) or not content.strip():
+            return
+
+        await self._sync_history(event.project_id)
+        history = self._get_project_history(event.project_id)
+        history_snapshot = list(history)
+        classification = None
+        if self._classify_pool is None:
+            classification = self._classify_incremental(self._get_context_window(event.project_id, history), content)
+        if _GOVERNANCE_COALESCE_MS > 0:
+            # History is updated immediately; analysis runs once per window on the latest message
+            self._remember(event.project_id, history, content)
+            self._schedule_governance(event, payload, content, history_snapshot, classification)
+            return
         try:
-            from opentelemetry import trace as _t
-            prov = _t.get_tracer_provider()
-            # Heuristic: SDK providers expose add_span_processor
-            _provider_is_sdk = hasattr(prov, "add_span_processor")
-        except Exception:
-            _provider_is_sdk = False
+            await self._dispatch_governance(event, payload, content, history_snapshot, classification)
+        finally:
+            self._remember(event.project_id, history, content)
+
+    def _schedule_governance(
+        self,
+        event: Event,
+        payload: Dict[str, Any],
+        content: str,
+        history_snapshot: List[str],
+        classification: Optional[Classification[Any]] = None,
+    ) -> None:
+        key = _project_key(event.project_id)
+        if key in self._pending_governance:
+            self.governance_coalesced_total += 1
+            ORCH_GOVERNANCE_COALESCED.inc()
+        self._pending_governance[key] = (event, payload, content, history_snapshot, classification)
+        if key not in self._governance_timers:
+            self._governance_timers[key] = asyncio.create_task(
+                self._governance_after_window(key, _GOVERNANCE_COALESCE_MS / 1000.0)
+            )
+
+    async def _governance_after_window(self, key: str, delay_s: float) -> None:
         try:
-            log_json("info", "orchestrator.gate_dbg", enabled=_gate, provider_is_sdk=_provider_is_sdk)
-        except Exception:
-            pass
-        if _gate or _provider_is_sdk:
+            await asyncio.sleep(delay_s)
+        except asyncio.CancelledError:
+            return
+        self._governance_timers.pop(key, None)
+        pending = self._pending_governance.pop(key, None)
+        if pending is not None:
+            await self._dispatch_governance(*pending)
+
+    async def _flush_pending_governance(self) -> None:
+        """Cancel coalescing timers and run governance for any pending messages now."""
+        timers = list(self._governance_timers.values())
+        self._governance_timers.clear()
+        for task in timers:
+            task.cancel()
+        for task in timers:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        pending = list(self._pending_governance.values())
+        self._pending_governance.clear()
+        for item in pending:
+            await self._dispatch_governance(*item)
+
+    async def _dispatch_governance(
+        self,
+        event: Event,
+        payload: Dict[str, Any],
+        content: str,
+        history_snapshot: List[str],
+        classification: Optional[Classification[Any]] = None,
+    ) -> None:
+        """Evaluate inline, or hand the evaluation to the worker pool when it is running."""
+        item: _PendingGovernance = (event, payload, content, history_snapshot, classification)
+        queue = self._governance_queue
+        if queue is None:
+            await self._run_governance(*item)
+            return
+        now = time.monotonic()
+        if queue.full():
+            # Newer messages carry the more relevant context: drop the oldest
+            (stale, _, _) = queue.get_nowait()
+            queue.task_done()
+            self._drop_governance(stale[0], "queue_full")
+        queue.put_nowait((item, now, now + _GOVERNANCE_DEADLINE_MS / 1000.0))
+
+    async def _governance_worker(self) -> None:
+        queue = self._governance_queue
+        assert queue is not None
+        while True:
+            item, enqueued_at, deadline = await queue.get()
             try:
-                from opentelemetry import trace
+                started = time.monotonic()
+                ORCH_GOVERNANCE_QUEUE_SECONDS.observe(started - enqueued_at)
+                if started >= deadline:
+                    self._drop_governance(item[0], "deadline_queued")
+                    continue
+                await self._run_governance(*item, deadline=deadline)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001 - keep the worker alive
+                log_json("error", "orchestrator.governance_worker_error", error=str(exc))
+            finally:
+                queue.task_done()
 
-                tracer = trace.get_tracer("neural-forge")
-                links = []
-                # Best-effort link to upstream context; never fail span creation due to linking
-                try:
-                    if event.traceparent:
-                        from opentelemetry.propagate import get_global_textmap
-                        from opentelemetry.trace import Link
-
-                        carrier = {"traceparent": event.traceparent}
-                        ctx = get_global_textmap().extract(carrier)
-                        parent_span = trace.get_current_span(ctx)
-                        parent_sc = parent_span.get_span_context()
-                        if parent_sc and getattr(parent_sc, "is_valid", False):
-                            links = [Link(parent_sc)]
-                except Exception:
-                    links = []
-                # Create child span with start_as_current_span for reliable activation
-                _span_cm = tracer.start_as_current_span("Orchestrator.handle", links=links)
-                _span_obj = _span_cm.__enter__()
-                try:
-                    sc = _span_obj.get_span_context()
-                    from opentelemetry import trace as _t
-                    cur = _t.get_current_span()
-                    cur_sc = cur.get_span_context() if cur else None
-                    log_json(
-                        "info",
-                        "orchestrator.span_started_dbg",
-                        created_span_id=f"{sc.span_id:016x}" if getattr(sc, "span_id", None) is not None else None,
-                        created_trace_id=f"{sc.trace_id:032x}" if getattr(sc, "trace_id", None) is not None else None,
-                        current_span_id=f"{cur_sc.span_id:016x}" if cur_sc and getattr(cur_sc, "span_id", None) is not None else None,
-                        current_trace_id=f"{cur_sc.trace_id:032x}" if cur_sc and getattr(cur_sc, "trace_id", None) is not None else None,
-                    )
-                except Exception:
-                    pass
-            except Exception as e:
-                _span_cm = None
-                _span_obj = None
-                try:
-                    log_json("error", "orchestrator.span_start_error", error=str(e))
-                except Exception:
-                    pass
+    def _drop_governance(self, event: Event, reason: str) -> None:
+        self.governance_dropped_total += 1
+        ORCH_GOVERNANCE_DROPPED.labels(reason).inc()
         try:
-            payload: Dict[str, Any] = event.payload or {}
-            msg = payload.get("content")
-            content_len = len(msg) if isinstance(msg, str) else 0
-            # Test-only hook: allow forcing an error to verify error path
-            if payload.get("force_error"):
-                raise RuntimeError("forced_error")
-
-            # TODO: parse role, route by role/type in later phases
-            self.events_handled_total[event.type] += 1
-            if _span_obj is not None:
-                _span_obj.set_attribute("evt_type", event.type)
-                _span_obj.set_attribute("project_id", event.project_id)
-                if event.request_id:
-                    _span_obj.set_attribute("request_id", event.request_id)
-                _span_obj.set_attribute("content_len", content_len)
-                _span_obj.set_attribute("phase", "consume")
             log_json(
-                "info",
-                "orchestrator.handle",
-                evt_type=event.type,
+                "warning",
+                "orchestrator.governance_dropped",
                 project_id=event.project_id,
                 request_id=event.request_id,
-                content_len=content_len,
+                reason=reason,
             )
-            await self._maybe_emit_governance(event, payload)
-        except Exception as e:  # noqa: BLE001 - intended isolation for handlers
-            self.handler_errors_total[event.type] += 1
-            ORCH_HANDLER_ERRORS.labels(event.type).inc()
-            if _span_obj is not None:
-                try:
-                    from opentelemetry.trace import Status, StatusCode
+        except Exception:
+            pass
 
-                    _span_obj.record_exception(e)
-                    _span_obj.set_status(Status(StatusCode.ERROR))
-                except Exception:
-                    pass
-            log_json(
-                "error",
-                "orchestrator.handler_error",
-                evt_type=event.type,
-                project_id=event.project_id,
-                request_id=event.request_id,
-                error=str(e),
+    async def _evaluate_governance(
+        self,
+        event: Event,
+        content: str,
+        history_snapshot: List[str],
+        classification: Optional[Classification[Any]],
+    ) -> Optional[str]:
+        if classification is None and self._classify_pool is not None:
+            # Same context analyze_context would score, classified in a worker process
+            text = " ".join(history_snapshot[-_CONTEXT_WINDOW:] + [content]).lower()
+            loop = asyncio.get_running_loop()
+            found = await loop.run_in_executor(self._classify_pool, classify_in_worker, text)
+            classification = Classification(
+                scores={ActivityType(key): score for key, score in found.scores.items()},
+                keywords=found.keywords,
             )
-            # Re-raise to allow EventBus to record handler error metrics; EventBus
-            # will isolate and continue with other handlers per design.
-            raise
-        finally:
-            if _span_cm is not None:
-                try:
-                    _span_cm.__exit__(None, None, None)
-                except Exception:
-                    pass
-
-    async def _maybe_emit_governance(self, event: Event, payload: Dict[str, Any]) -> None:
-        content = payload.get("content") if isinstance(payload, dict) else None
-        if not isinstance(content, str) or not content.strip():
-            return
+        return await activate_pre_action_governance(
+            content, history_snapshot, project_id=event.project_id, classification=classification
+        )
 
-        history = self._get_project_history(event.project_id)
-        history_snapshot = list(history)
+    async def _run_governance(
+        self,
+        event: Event,
+        payload: Dict[str, Any],
+        content: str,
+        history_snapshot: List[str],
+        classification: Optional[Classification[Any]] = None,
+        deadline: Optional[float] = None,
+    ) -> None:
+        self.governance_runs_total += 1
+        ORCH_GOVERNANCE_RUNS.inc()
         guidance: str | None
+        started = time.monotonic()
         try:
-            guidance = await activate_pre_action_governance(
-                content, history_snapshot, project_id=event.project_id
-            )
+            evaluation = self._evaluate_governance(event, content, history_snapshot, classification)
+            if deadline is None:
+                guidance = await evaluation
+            else:
+                guidance = await asyncio.wait_for(evaluation, timeout=max(deadline - started, 0.0))
+        except asyncio.TimeoutError:
+            self._drop_governance(event, "deadline_exceeded")
+            return
         except Exception as exc:  # noqa: BLE001 - best-effort governance
             guidance = None
             try:
@@ -430,8 +625,9 @@ class Orchestrator:
                 )
             except Exception:
                 pass
+
         finally:
-            history.append(content)
+            ORCH_GOVERNANCE_EVAL_SECONDS.observe(time.monotonic() - started)
 
         if not guidance:
             return
@@ -484,6 +680,30 @@ ORCH_HANDLER_ERRORS = Counter(
     ["type"],
 )
 
+# Governance analysis runs and messages whose analysis was coalesced into a later run
+ORCH_GOVERNANCE_RUNS = Counter(
+    "orchestrator_governance_runs_total",
+    "Total governance analyses run by the orchestrator",
+)
+ORCH_GOVERNANCE_COALESCED = Counter(
+    "orchestrator_governance_coalesced_total",
+    "Governance analyses skipped because a newer message in the same window superseded them",
+)
+# Governance worker pool: time queued, time evaluating, evaluations dropped (queue_full / deadline_*)
+ORCH_GOVERNANCE_QUEUE_SECONDS = Histogram(
+    "orchestrator_governance_queue_seconds",
+    "Time a governance evaluation waited for a worker",
+)
+ORCH_GOVERNANCE_EVAL_SECONDS = Histogram(
+    "orchestrator_governance_evaluation_seconds",
+    "Time spent evaluating governance for one message",
+)
+ORCH_GOVERNANCE_DROPPED = Counter(
+    "orchestrator_governance_dropped_total",
+    "Governance evaluations dropped before guidance was published",
+    ["reason"],
+)
+
 # Watchdog metrics
 WATCHDOG_SCANS_TOTAL = Counter(
     "tasks_watchdog_scans_total",
@@ -518,3 +738,7 @@ def _to_int(val: str | None, default: int) -> int:
         return int(val) if val is not None else int(default)
     except Exception:
         return int(default)
+
+
+def _project_key(project_id: str) -> str:
+    return project_id.strip().lower() if isinstance(project_id, str) else str(project_id)
@@ -0,0 +1,191 @@
+"""
+SSE broker: fans EventBus events out to connected `/sse` clients.
+
+- One EventBus subscription per streamed family (governance.*, task.*), shared by all clients
+- Clients are indexed by project so an event only touches that project's listeners
+- Each client has a bounded buffer; when full the oldest frame is dropped (slow-consumer policy)
+- Every streamed event gets a monotonically increasing id; a ring buffer allows
+  Last-Event-ID resume after reconnect
+- Idle clients hold no task of their own: the response generator waits on an asyncio.Event
+
+Config (env):
+- SSE_CLIENT_BUFFER: frames buffered per client (default 256)
+- SSE_REPLAY_BUFFER: frames kept for Last-Event-ID resume (default 1024)
+- SSE_HEARTBEAT_SECONDS: idle heartbeat interval (default 10)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+from prometheus_client import Counter, Gauge
+
+from server.core.events import Event, EventBus, _matches, _validate_key, bus
+from server.utils.logger import log_json
+
+# Event families streamed to clients
+STREAM_TYPES: Tuple[str, ...] = ("governance.*", "task.*")
+
+CLIENT_BUFFER = int(os.getenv("SSE_CLIENT_BUFFER", "256"))
+REPLAY_BUFFER = int(os.getenv("SSE_REPLAY_BUFFER", "1024"))
+HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "10"))
+
+# Frame id, project key, event type, encoded frame
+_Frame = Tuple[int, str, str, str]
+
+
+class SseClient:
+    """A connected SSE consumer with a bounded, drop-oldest frame buffer."""
+
+    __slots__ = ("project_key", "types", "_frames", "_ready", "dropped", "_dropped_unreported")
+
+    def __init__(self, project_key: Optional[str], types: Tuple[str, ...], buffer_size: int) -> None:
+        self.project_key = project_key
+        self.types = types
+        self._frames: Deque[str] = deque(maxlen=max(1, buffer_size))
+        self._ready = asyncio.Event()
+        self.dropped = 0
+        self._dropped_unreported = 0
+
+    def wants(self, evt_type: str) -> bool:
+        for key in self.types:
+            if _matches(key, evt_type):
+                return True
+        return False
+
+    def offer(self, frame: str) -> None:
+        frames = self._frames
+        if len(frames) == frames.maxlen:
+            # deque(maxlen) discards the oldest entry on append
+            self.dropped += 1
+            self._dropped_unreported += 1
+            SSE_EVENTS_DROPPED.inc()
+        frames.append(frame)
+        self._ready.set()
+
+    async def drain(self, timeout: float) -> List[str]:
+        """Wait up to ``timeout`` seconds for frames and return everything buffered.
+
+        A synthetic ``dropped`` frame precedes the batch when frames were discarded,
+        so clients know to resync.
+        """
+        if not self._frames:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        out: List[str] = []
+        if self._dropped_unreported:
+            out.append(f"event: dropped\ndata: {json.dumps({'count': self._dropped_unreported})}\n\n")
+            self._dropped_unreported = 0
+        out.extend(self._frames)
+        self._frames.clear()
+        self._ready.clear()
+        return out
+
+
+class SseBroker:
+    def __init__(self, event_bus: EventBus, *, buffer_size: int = CLIENT_BUFFER, replay_size: int = REPLAY_BUFFER) -> None:
+        self._bus = event_bus
+        self._buffer_size = buffer_size
+        # Project key -> clients; None holds clients listening to every project
+        self._clients: Dict[Optional[str], Set[SseClient]] = {}
+        self._replay: Deque[_Frame] = deque(maxlen=max(0, replay_size))
+        self._seq = 0
+        self._running = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(clients) for clients in self._clients.values())
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        for key in STREAM_TYPES:
+            await self._bus.subscribe(key, self._on_event)
+        self._running = True
+        log_json("info", "sse.broker_start", types=list(STREAM_TYPES))
+
+    async def stop(self) -> None:
+        if not self._running:
+            return
+        for key in STREAM_TYPES:
+            await self._bus.unsubscribe(key, self._on_event)
+        self._running = False
+        log_json("info", "sse.broker_stop", connections=self.connection_count)
+
+    def connect(
+        self,
+        project_id: Optional[str] = None,
+        types: Optional[Sequence[str]] = None,
+        last_event_id: Optional[int] = None,
+    ) -> SseClient:
+        """Register a client. Raises ValueError for invalid type filters."""
+        keys = tuple(types) if types else STREAM_TYPES
+        for key in keys:
+            _validate_key(key)
+        project_key = _project_key(project_id) if project_id else None
+        client = SseClient(project_key, keys, self._buffer_size)
+        if last_event_id is not None:
+            for seq, frame_project, evt_type, frame in self._replay:
+                if seq > last_event_id and (project_key is None or frame_project == project_key) and client.wants(evt_type):
+                    client.offer(frame)
+        self._clients.setdefault(project_key, set()).add(client)
+        SSE_CONNECTIONS.inc()
+        return client
+
+    def disconnect(self, client: SseClient) -> None:
+        clients = self._clients.get(client.project_key)
+        if clients is None or client not in clients:
+            return
+        clients.discard(client)
+        if not clients:
+            self._clients.pop(client.project_key, None)
+        SSE_CONNECTIONS.dec()
+
+    async def _on_event(self, event: Event) -> None:
+        self._seq += 1
+        seq = self._seq
+        project_key = _project_key(event.project_id)
+        data = json.dumps(
+            {
+                "type": event.type,
+                "projectId": event.project_id,
+                "payload": event.payload,
+                "ts": event.ts,
+                "requestId": event.request_id,
+            },
+            ensure_ascii=False,
+            default=str,
+        )
+        # Encoded once and shared by every recipient
+        frame = f"id: {seq}\nevent: {event.type}\ndata: {data}\n\n"
+        if self._replay.maxlen:
+            self._replay.append((seq, project_key, event.type, frame))
+        for key in (project_key, None):
+            clients = self._clients.get(key)
+            if not clients:
+                continue
+            for client in clients:
+                if client.wants(event.type):
+                    client.offer(frame)
+
+
+def _project_key(project_id: str) -> str:
+    return project_id.strip().lower() if isinstance(project_id, str) else str(project_id)
+
+
+# Prometheus metrics
+SSE_CONNECTIONS = Gauge("sse_connections", "Currently connected SSE clients")
+SSE_EVENTS_DROPPED = Counter("sse_events_dropped_total", "SSE frames dropped for slow consumers")
+
+# Singleton broker used by the /sse endpoint
+sse_broker = SseBroker(bus)
@@ -58,3 +58,18 @@ CREATE TABLE IF NOT EXISTS governance_token_metrics (
 );
 CREATE INDEX IF NOT EXISTS idx_token_metrics_project_updated ON governance_token_metrics(project_id, updated_at DESC);
 CREATE INDEX IF NOT EXISTS idx_token_metrics_activation ON governance_token_metrics(activation_count DESC);
+
+-- Orchestrator conversation history: one ring buffer of recent messages per project
+CREATE TABLE IF NOT EXISTS conversation_history_heads (
+  project_id TEXT PRIMARY KEY,
+  seq BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE TABLE IF NOT EXISTS conversation_history (
+  project_id TEXT NOT NULL,
+  slot INTEGER NOT NULL,
+  seq BIGINT NOT NULL,
+  content TEXT NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (project_id, slot)
+);
@@ -1,6 +1,6 @@
 import json
 from datetime import datetime, timezone
-from typing import Any, Dict, Sequence
+from typing import Any, Dict, Mapping, Optional, Sequence
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncEngine
@@ -11,13 +11,15 @@ from server.utils.logger import log_json
 def _to_pgvector_literal(vec: list[float]) -> str:
     """Format a Python list[float] as a pgvector literal string: '[v1, v2, ...]'
 
-    The caller is responsible for casting with ::vector in SQL when binding.
+    The caller is responsible for casting with CAST(:param AS vector) in SQL when binding
+    (``:param::vector`` is not recognized as a bind parameter by SQLAlchemy's text()).
     """
     # Use a compact but precise repr to avoid huge payloads; 6 decimal places is plenty
     return "[" + ", ".join(f"{float(v):.6f}" for v in vec) + "]"
 
 
-def _normalize_project_id(project_id: str | None) -> str:
+def normalize_project_id(project_id: str | None) -> str:
+    """Project id as stored in the database: stripped, "global" when empty."""
     if project_id and project_id.strip():
         return project_id.strip()
     return "global"
@@ -112,7 +114,7 @@ async def add_memory_pg(
     if embedding is not None:
         columns.append("embedding")
         # Bind as text and cast to vector on the server side
-        values.append(":embedding::vector")
+        values.append("CAST(:embedding AS vector)")
         params["embedding"] = _to_pgvector_literal(embedding)
 
     cols = ", ".join(columns)
@@ -123,13 +125,112 @@ async def add_memory_pg(
         await conn.execute(q, params)
 
 
+# Chunk rows (see server/memory/chunking.py) carry their parent's id in group_id;
+# parents and ungrouped entries are the rows callers list and keyword-search
+MEMORY_ENTRY_FILTER = "(group_id IS NULL OR group_id = id)"
+
+
+async def _insert_memory_chunks(
+    conn: Any,
+    *,
+    parent_id: str,
+    project_id: str,
+    quarantined: bool,
+    chunks: Sequence[Mapping[str, Any]],
+) -> None:
+    """Insert chunk rows for ``parent_id`` in one statement on an open transaction."""
+    if not chunks:
+        return
+    values: list[str] = []
+    params: Dict[str, Any] = {"group_id": parent_id, "project_id": project_id, "quarantined": quarantined}
+    for i, chunk in enumerate(chunks):
+        values.append(
+            f"(:id_{i}, :project_id, :content_{i}, CAST(:metadata_{i} AS JSONB), :quarantined, :group_id, "
+            f"CAST(:embedding_{i} AS vector))"
+        )
+        params[f"id_{i}"] = chunk["id"]
+        params[f"content_{i}"] = chunk["content"]
+        params[f"metadata_{i}"] = json.dumps(chunk.get("metadata") or {})
+        params[f"embedding_{i}"] = _to_pgvector_literal(chunk["embedding"])
+    q = text(
+        "INSERT INTO memory_entries (id, project_id, content, metadata, quarantined, group_id, embedding) "
+        f"VALUES {', '.join(values)}"
+    )
+    await conn.execute(q, params)
+
+
+async def add_memory_group_pg(
+    engine: AsyncEngine,
+    *,
+    mem_id: str,
+    project_id: str,
+    content: str,
+    metadata: Dict[str, Any] | None,
+    quarantined: bool,
+    chunks: Sequence[Mapping[str, Any]],
+) -> None:
+    """Insert a chunked memory entry: the parent row (group_id = its own id, no embedding)
+    and its embedded chunk rows, in one transaction.
+
+    ``chunks`` items: {"id", "content", "embedding", "metadata"} (see `chunking.chunk_rows`).
+    """
+    q = text(
+        """
+        INSERT INTO memory_entries (id, project_id, content, metadata, quarantined, group_id)
+        VALUES (:id, :project_id, :content, CAST(:metadata AS JSONB), :quarantined, :id)
+        """
+    )
+    async with engine.begin() as conn:
+        await conn.execute(
+            q,
+            {
+                "id": mem_id,
+                "project_id": project_id,
+                "content": content,
+                "metadata": json.dumps(metadata or {}),
+                "quarantined": quarantined,
+            },
+        )
+        await _insert_memory_chunks(
+            conn, parent_id=mem_id, project_id=project_id, quarantined=quarantined, chunks=chunks
+        )
+
+
+async def replace_memory_chunks_pg(
+    engine: AsyncEngine, *, mem_id: str, chunks: Sequence[Mapping[str, Any]]
+) -> bool:
+    """Replace the chunk rows of ``mem_id`` and turn it into a group parent; False if it does not exist."""
+    async with engine.begin() as conn:
+        res = await conn.execute(
+            text(
+                """
+                UPDATE memory_entries SET group_id = id, embedding = NULL
+                WHERE id = :id
+                RETURNING project_id, quarantined
+                """
+            ),
+            {"id": mem_id},
+        )
+        row = res.first()
+        if not row:
+            return False
+        await conn.execute(
+            text("DELETE FROM memory_entries WHERE group_id = :id AND id <> :id"), {"id": mem_id}
+        )
+        await _insert_memory_chunks(
+            conn, parent_id=mem_id, project_id=row[0], quarantined=bool(row[1]), chunks=chunks
+        )
+    return True
+
+
 async def update_task_status_pg(
     engine: AsyncEngine,
     *,
     task_id: str,
     status: str,
     result: Dict[str, Any] | None,
-) -> bool:
+) -> Optional[str]:
+    """Update a task's status. Returns the task's project_id, or None if no row matched."""
     q = text(
         """
         UPDATE tasks
@@ -137,6 +238,7 @@ async def update_task_status_pg(
             result = CAST(:result AS JSONB),
             updated_at = NOW()
         WHERE id = :task_id
+        RETURNING project_id
         """
     )
     async with engine.begin() as conn:
@@ -145,7 +247,8 @@ async def update_task_status_pg(
             "result": json.dumps(result or {}),
             "task_id": task_id,
         })
-        return bool(res.rowcount and res.rowcount > 0)
+        row = res.first()
+        return str(row[0]) if row is not None else None
 
 
 async def save_diff_pg(
@@ -329,17 +432,25 @@ async def semantic_search_memory_pg(
     k: int,
     include_quarantined: bool,
     threshold: float | None = None,
+    group_scoring: str = "max",
+    candidate_factor: int = 4,
 ) -> list[Dict[str, Any]]:
     """Vector similarity search using pgvector.
 
-    - Orders by cosine distance (`embedding <=> :qvec`). Lower is better.
+    - Ranks rows by cosine distance (`embedding <=> :qvec`). Lower is better.
     - Filters to rows with non-null embeddings.
     - Optional `threshold` filters by max distance.
+    - Chunk hits collapse to their parent entry (`COALESCE(group_id, id)`): the
+      nearest ``k * candidate_factor`` rows are grouped and each group scored by
+      ``group_scoring``: "max" (best chunk, 1 - distance) or "sum" (sum of
+      1 - distance over matching chunks, favouring entries that match throughout).
+      Each item carries ``score`` and ``chunkHits``.
     """
     clauses = ["embedding IS NOT NULL"]
     params: Dict[str, Any] = {
         "qvec": _to_pgvector_literal(query_embedding),
         "k": int(k),
+        "candidates": int(k) * max(int(candidate_factor), 1),
     }
     if project_id and project_id.strip():
         clauses.append("project_id = :project_id")
@@ -351,12 +462,27 @@ async def semantic_search_memory_pg(
         params["threshold"] = float(threshold)
 
     where = " AND ".join(clauses)
+    score = "SUM(1 - distance)" if group_scoring == "sum" else "1 - MIN(distance)"
+    parent_filter = "" if include_quarantined else "WHERE m.quarantined = FALSE"
     q = text(
         f"""
-        SELECT id, project_id, content, metadata::text, quarantined, created_at
-        FROM memory_entries
-        WHERE {where}
-        ORDER BY embedding <=> :qvec
+        WITH hits AS (
+            SELECT COALESCE(group_id, id) AS entry_id, (embedding <=> :qvec) AS distance
+            FROM memory_entries
+            WHERE {where}
+            ORDER BY embedding <=> :qvec
+            LIMIT :candidates
+        ), entries AS (
+            SELECT entry_id, {score} AS score, MIN(distance) AS distance, COUNT(*) AS chunk_hits
+            FROM hits
+            GROUP BY entry_id
+        )
+        SELECT m.id, m.project_id, m.content, m.metadata::text, m.quarantined, m.created_at,
+               e.score, e.chunk_hits
+        FROM entries e
+        JOIN memory_entries m ON m.id = e.entry_id
+        {parent_filter}
+        ORDER BY e.score DESC, e.distance
         LIMIT :k
         """
     )
@@ -372,6 +498,8 @@ async def semantic_search_memory_pg(
                     "metadata": json.loads(row[3]) if row[3] else {},
                     "quarantined": bool(row[4]),
                     "createdAt": row[5].isoformat() if hasattr(row[5], "isoformat") else str(row[5]),
+                    "score": float(row[6]),
+                    "chunkHits": int(row[7]),
                 }
             )
     return items
@@ -444,6 +572,205 @@ async def claim_next_task_pg(
         }
 
 
+async def claim_tasks_pg(
+    engine: AsyncEngine,
+    *,
+    limit: int,
+    project_id: str | None = None,
+    exclude_projects: Sequence[str] | None = None,
+) -> list[Dict[str, Any]]:
+    """Claim up to ``limit`` of the oldest queued tasks in one statement.
+
+    Same semantics as `claim_next_task_pg`, batched; ``exclude_projects`` skips
+    projects the caller cannot run more tasks for right now.
+    """
+    cond = ["status = 'queued'"]
+    params: Dict[str, Any] = {"limit": max(int(limit), 1)}
+    if project_id and project_id.strip():
+        cond.append("project_id = :project_id")
+        params["project_id"] = project_id
+    excluded = [p for p in (exclude_projects or []) if p]
+    if excluded:
+        placeholders = []
+        for idx, pid in enumerate(excluded):
+            params[f"exclude_{idx}"] = pid
+            placeholders.append(f":exclude_{idx}")
+        cond.append(f"project_id NOT IN ({', '.join(placeholders)})")
+    q = text(
+        f"""
+        WITH next_tasks AS (
+          SELECT id
+          FROM tasks
+          WHERE {" AND ".join(cond)}
+          ORDER BY created_at ASC
+          FOR UPDATE SKIP LOCKED
+          LIMIT :limit
+        )
+        UPDATE tasks t
+        SET status = 'in_progress', updated_at = NOW()
+        FROM next_tasks nt
+        WHERE t.id = nt.id
+        RETURNING t.id, t.project_id, t.payload::text, t.created_at
+        """
+    )
+    async with engine.begin() as conn:
+        res = await conn.execute(q, params)
+        rows = res.fetchall()
+    claimed = [
+        {
+            "id": row[0],
+            "projectId": row[1],
+            "payload": json.loads(row[2]) if row[2] else {},
+            "createdAt": row[3].isoformat() if hasattr(row[3], "isoformat") else str(row[3]),
+        }
+        for row in rows
+    ]
+    # UPDATE ... RETURNING does not preserve the CTE order
+    claimed.sort(key=lambda task: task["createdAt"])
+    return claimed
+
+
+def _task_id_params(task_ids: Sequence[str]) -> tuple[str, Dict[str, Any]]:
+    params: Dict[str, Any] = {}
+    placeholders = []
+    for idx, tid in enumerate(task_ids):
+        params[f"task_id_{idx}"] = tid
+        placeholders.append(f":task_id_{idx}")
+    return ", ".join(placeholders), params
+
+
+async def heartbeat_tasks_pg(engine: AsyncEngine, *, task_ids: Sequence[str]) -> int:
+    """Refresh updated_at of in-progress tasks so the watchdog does not treat them as stale."""
+    if not task_ids:
+        return 0
+    placeholders, params = _task_id_params(task_ids)
+    q = text(
+        f"""
+        UPDATE tasks SET updated_at = NOW()
+        WHERE id IN ({placeholders}) AND status = 'in_progress'
+        """
+    )
+    async with engine.begin() as conn:
+        res = await conn.execute(q, params)
+        return int(res.rowcount or 0)
+
+
+async def release_tasks_pg(engine: AsyncEngine, *, task_ids: Sequence[str]) -> int:
+    """Return claimed but unstarted in-progress tasks to the queue."""
+    if not task_ids:
+        return 0
+    placeholders, params = _task_id_params(task_ids)
+    q = text(
+        f"""
+        UPDATE tasks SET status = 'queued', updated_at = NOW()
+        WHERE id IN ({placeholders}) AND status = 'in_progress'
+        """
+    )
+    async with engine.begin() as conn:
+        res = await conn.execute(q, params)
+        return int(res.rowcount or 0)
+
+
+async def update_memory_embedding_pg(engine: AsyncEngine, *, mem_id: str, embedding: list[float]) -> bool:
+    q = text("UPDATE memory_entries SET embedding = CAST(:embedding AS vector) WHERE id = :id")
+    async with engine.begin() as conn:
+        res = await conn.execute(q, {"id": mem_id, "embedding": _to_pgvector_literal(embedding)})
+        return bool(res.rowcount)
+
+
+# Entries written without an embedding and not yet embedded (chunk parents have group_id set)
+_PENDING_EMBEDDING = "embedding IS NULL AND group_id IS NULL"
+
+
+async def update_memory_embeddings_pg(engine: AsyncEngine, *, embeddings: Mapping[str, list[float]]) -> int:
+    """Set the embeddings of several entries in one statement; returns rows updated."""
+    if not embeddings:
+        return 0
+    values: list[str] = []
+    params: Dict[str, Any] = {}
+    for i, (mem_id, vec) in enumerate(embeddings.items()):
+        values.append(f"(:id_{i}, :embedding_{i})")
+        params[f"id_{i}"] = mem_id
+        params[f"embedding_{i}"] = _to_pgvector_literal(vec)
+    q = text(
+        f"""
+        UPDATE memory_entries AS m
+        SET embedding = CAST(v.embedding AS vector)
+        FROM (VALUES {", ".join(values)}) AS v(id, embedding)
+        WHERE m.id = v.id
+        """
+    )
+    async with engine.begin() as conn:
+        res = await conn.execute(q, params)
+        return int(res.rowcount or 0)
+
+
+async def list_pending_embeddings_pg(
+    engine: AsyncEngine,
+    *,
+    limit: int,
+    project_id: str | None = None,
+    after: tuple[str, str] | None = None,
+) -> list[Dict[str, Any]]:
+    """Entries still waiting for an embedding, oldest first.
+
+    Keyset pagination on (created_at, id): pass the last row's
+    ``(createdAt, id)`` as ``after`` to continue (see `idx_memory_pending_embedding`).
+    """
+    clauses = [_PENDING_EMBEDDING]
+    params: Dict[str, Any] = {"limit": int(limit)}
+    if project_id and project_id.strip():
+        clauses.append("project_id = :project_id")
+        params["project_id"] = project_id
+    if after is not None:
+        clauses.append("(created_at, id) > (CAST(:after_created AS TIMESTAMPTZ), :after_id)")
+        params["after_created"], params["after_id"] = after
+    where = " AND ".join(clauses)
+    q = text(
+        f"""
+        SELECT id, project_id, content, created_at, EXTRACT(EPOCH FROM (NOW() - created_at))
+        FROM memory_entries
+        WHERE {where}
+        ORDER BY created_at, id
+        LIMIT :limit
+        """
+    )
+    async with engine.connect() as conn:
+        res = await conn.execute(q, params)
+        return [
+            {
+                "id": row[0],
+                "projectId": row[1],
+                "content": row[2],
+                "createdAt": row[3].isoformat() if hasattr(row[3], "isoformat") else str(row[3]),
+                "ageSeconds": float(row[4] or 0.0),
+            }
+            for row in res
+        ]
+
+
+async def pending_embedding_stats_pg(engine: AsyncEngine, *, project_id: str | None = None) -> Dict[str, Any]:
+    """Backlog of entries waiting for an embedding and the age of the oldest one."""
+    clauses = [_PENDING_EMBEDDING]
+    params: Dict[str, Any] = {}
+    if project_id and project_id.strip():
+        clauses.append("project_id = :project_id")
+        params["project_id"] = project_id
+    q = text(
+        f"""
+        SELECT COUNT(*), EXTRACT(EPOCH FROM (NOW() - MIN(created_at)))
+        FROM memory_entries
+        WHERE {" AND ".join(clauses)}
+        """
+    )
+    async with engine.connect() as conn:
+        row = (await conn.execute(q, params)).first()
+    return {
+        "pending": int(row[0]) if row and row[0] is not None else 0,
+        "lagSeconds": float(row[1]) if row and row[1] is not None else 0.0,
+    }
+
+
 async def get_memory_pg(engine: AsyncEngine, *, mem_id: str) -> Dict[str, Any] | None:
     q = text(
         """
@@ -476,7 +803,7 @@ async def search_memory_pg(
     include_quarantined: bool,
 ) -> list[Dict[str, Any]]:
     like = f"%{query}%"
-    clauses = ["content ILIKE :like"]
+    clauses = ["content ILIKE :like", MEMORY_ENTRY_FILTER]
     params: Dict[str, Any] = {"like": like, "limit": int(limit)}
     if project_id and project_id.strip():
         clauses.append("project_id = :project_id")
@@ -667,7 +994,7 @@ async def record_governance_token_metric_pg(
     token = (token_id or "").strip()
     if not token:
         return None
-    project = _normalize_project_id(project_id)
+    project = normalize_project_id(project_id)
     effectiveness = float(sample_effectiveness) if sample_effectiveness is not None else 0.0
     applied = applied_at or datetime.now(timezone.utc)
     params = {
@@ -707,6 +1034,74 @@ async def record_governance_token_metric_pg(
         return _row_to_metric(row)
 
 
+async def record_governance_token_metrics_batch_pg(
+    engine: AsyncEngine,
+    *,
+    aggregates: Sequence[Dict[str, Any]],
+) -> list[Dict[str, Any]]:
+    """Apply pre-aggregated activations for many tokens in one multi-row UPSERT.
+
+    Each aggregate carries ``token_id``, ``project_id``, ``activation_count`` (> 0),
+    ``effectiveness_sum`` (sum of the samples) and ``last_applied_at``. The update
+    folds the batch into the running average exactly as applying the samples one
+    by one through `record_governance_token_metric_pg` would:
+    (avg * n + sum) / (n + count).
+    """
+    merged: Dict[tuple[str, str], Dict[str, Any]] = {}
+    for agg in aggregates:
+        token = (agg.get("token_id") or "").strip()
+        count = int(agg.get("activation_count") or 0)
+        if not token or count <= 0:
+            continue
+        key = (token, normalize_project_id(agg.get("project_id")))
+        applied = agg.get("last_applied_at")
+        # A row may only be targeted once per INSERT ... ON CONFLICT statement
+        current = merged.get(key)
+        if current is None:
+            merged[key] = {"count": count, "sum": float(agg.get("effectiveness_sum") or 0.0), "applied": applied}
+        else:
+            current["count"] += count
+            current["sum"] += float(agg.get("effectiveness_sum") or 0.0)
+            if applied is not None and (current["applied"] is None or applied > current["applied"]):
+                current["applied"] = applied
+    if not merged:
+        return []
+
+    now = datetime.now(timezone.utc)
+    params: Dict[str, Any] = {"updated_at": now}
+    values: list[str] = []
+    for idx, ((token, project), agg) in enumerate(merged.items()):
+        params[f"token_id_{idx}"] = token
+        params[f"project_id_{idx}"] = project
+        params[f"count_{idx}"] = agg["count"]
+        # Stored as the batch average so a first insert is already correct
+        params[f"effectiveness_{idx}"] = agg["sum"] / agg["count"]
+        params[f"applied_{idx}"] = agg["applied"] or now
+        values.append(f"(:token_id_{idx}, :project_id_{idx}, :count_{idx}, :effectiveness_{idx}, :applied_{idx}, :updated_at)")
+
+    q = text(
+        f"""
+        INSERT INTO governance_token_metrics (
+            token_id, project_id, activation_count, effectiveness_score, last_applied_at, updated_at
+        )
+        VALUES {', '.join(values)}
+        ON CONFLICT (token_id, project_id) DO UPDATE SET
+            activation_count = governance_token_metrics.activation_count + EXCLUDED.activation_count,
+            effectiveness_score = (
+                (COALESCE(governance_token_metrics.effectiveness_score, 0) * governance_token_metrics.activation_count)
+                + EXCLUDED.effectiveness_score * EXCLUDED.activation_count
+            ) / (governance_token_metrics.activation_count + EXCLUDED.activation_count),
+            last_applied_at = GREATEST(governance_token_metrics.last_applied_at, EXCLUDED.last_applied_at),
+            updated_at = EXCLUDED.updated_at
+        RETURNING token_id, project_id, activation_count, effectiveness_score, last_applied_at, created_at, updated_at
+        """
+    )
+    async with engine.begin() as conn:
+        res = await conn.execute(q, params)
+        rows = res.fetchall()
+    return [_row_to_metric(row) for row in rows]
+
+
 async def fetch_governance_token_metrics_pg(
     engine: AsyncEngine,
     *,
@@ -729,7 +1124,7 @@ async def fetch_governance_token_metrics_pg(
             clauses.append(f"token_id IN ({', '.join(placeholders)})")
 
     if project_id is not None:
-        params["project_id"] = _normalize_project_id(project_id)
+        params["project_id"] = normalize_project_id(project_id)
         clauses.append("project_id = :project_id")
 
     if min_activation_count and min_activation_count > 0:
@@ -767,3 +1162,93 @@ async def fetch_governance_token_metrics_pg(
         rows = res.fetchall()
 
     return [_row_to_metric(row) for row in rows]
+
+
+async def append_conversation_history_pg(
+    engine: AsyncEngine,
+    *,
+    entries: Mapping[str, Sequence[str]],
+    max_len: int,
+) -> None:
+    """Append messages to per-project ring buffers of ``max_len`` slots in one statement.
+
+    ``conversation_history_heads`` holds each project's message counter. The
+    batch bumps the counters and writes message ``seq`` into slot
+    ``seq % max_len``, overwriting the oldest entry, so an append costs the same
+    however long the conversation is.
+    """
+    max_len = max(int(max_len), 1)
+    params: Dict[str, Any] = {"max_len": max_len}
+    heads: list[str] = []
+    batch: list[str] = []
+    for idx, (project_id, texts) in enumerate(entries.items()):
+        # Only the newest max_len messages survive; a slot may be written once per statement
+        kept = [t for t in texts if isinstance(t, str)][-max_len:]
+        if not kept:
+            continue
+        params[f"project_id_{idx}"] = project_id
+        params[f"count_{idx}"] = len(kept)
+        heads.append(f"(:project_id_{idx}, :count_{idx})")
+        for pos, content in enumerate(kept):
+            params[f"content_{idx}_{pos}"] = content
+            # Distance from the newest message of the batch for this project
+            batch.append(f"(:project_id_{idx}, {len(kept) - 1 - pos}, :content_{idx}_{pos})")
+    if not heads:
+        return
+
+    q = text(
+        f"""
+        WITH heads AS (
+            INSERT INTO conversation_history_heads (project_id, seq)
+            VALUES {', '.join(heads)}
+            ON CONFLICT (project_id) DO UPDATE SET
+                seq = conversation_history_heads.seq + EXCLUDED.seq,
+                updated_at = NOW()
+            RETURNING project_id, seq
+        ), batch (project_id, back, content) AS (
+            VALUES {', '.join(batch)}
+        )
+        INSERT INTO conversation_history (project_id, slot, seq, content)
+        SELECT b.project_id, MOD(h.seq - b.back - 1, :max_len), h.seq - b.back, b.content
+        FROM batch b JOIN heads h ON h.project_id = b.project_id
+        ON CONFLICT (project_id, slot) DO UPDATE SET
+            seq = EXCLUDED.seq,
+            content = EXCLUDED.content,
+            created_at = NOW()
+        """
+    )
+    async with engine.begin() as conn:
+        await conn.execute(q, params)
+
+
+async def fetch_conversation_history_pg(
+    engine: AsyncEngine,
+    *,
+    project_ids: Sequence[str],
+) -> Dict[str, list[str]]:
+    """Ring-buffer contents for several projects, oldest message first."""
+    ids = list(dict.fromkeys(pid for pid in project_ids if pid))
+    if not ids:
+        return {}
+    params: Dict[str, Any] = {}
+    placeholders = []
+    for idx, pid in enumerate(ids):
+        params[f"project_id_{idx}"] = pid
+        placeholders.append(f":project_id_{idx}")
+
+    q = text(
+        f"""
+        SELECT project_id, content
+        FROM conversation_history
+        WHERE project_id IN ({', '.join(placeholders)})
+        ORDER BY project_id, seq
+        """
+    )
+    async with engine.connect() as conn:
+        res = await conn.execute(q, params)
+        rows = res.fetchall()
+
+    history: Dict[str, list[str]] = {pid: [] for pid in ids}
+    for row in rows:
+        history.setdefault(row[0], []).append(row[1])
+    return history
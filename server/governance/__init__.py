@@ -11,6 +11,7 @@ from .pre_action_engine import (
     GovernanceRecommendation,
     PreActionGovernanceEngine,
     activate_pre_action_governance,
+    activate_pre_action_governance_batch,
     governance_engine,
 )
 
@@ -20,5 +21,6 @@ __all__ = [
     'GovernanceRecommendation',
     'ActivityType',
     'activate_pre_action_governance',
+    'activate_pre_action_governance_batch',
     'governance_engine'
 ]
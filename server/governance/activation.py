@@ -0,0 +1,164 @@
+"""
+Associative spreading activation over the token catalog.
+
+Tokens reference each other through `associative_strength`, `linkedTags` and
+`pattern_combinations`. `AssociationGraph.from_tokens` turns those references
+into a weighted directed graph stored as a compressed sparse column matrix
+(edges grouped by target), built once per catalog load.
+
+`spread` implements the cascading activation described in cognitive-engine.md:
+directly triggered tokens are seeded with an activation in (0, 1], and each hop
+propagates ``activation * strength * (1 - decay)`` along edges, keeping the
+strongest path into every node. A hop is a handful of NumPy operations over
+the edge arrays, so its cost is linear in the number of edges with no Python
+loop per token. The number of hops is bounded and propagation stops early once
+the latency budget is spent or nothing changes.
+
+Config (env):
+- GOVERNANCE_ACTIVATION_HOPS: maximum cascade depth (default 3, 0 disables)
+- GOVERNANCE_ACTIVATION_DECAY: strength lost per hop (default 0.1)
+- GOVERNANCE_ACTIVATION_MIN_STRENGTH: weaker associations do not cascade (default 0.7)
+- GOVERNANCE_ACTIVATION_BUDGET_MS: time budget for one spread (default 5)
+- GOVERNANCE_ACTIVATION_MIN: weaker activations are not reported (default 0.5)
+"""
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+MAX_HOPS = int(os.getenv("GOVERNANCE_ACTIVATION_HOPS", "3"))
+DECAY = float(os.getenv("GOVERNANCE_ACTIVATION_DECAY", "0.1"))
+MIN_STRENGTH = float(os.getenv("GOVERNANCE_ACTIVATION_MIN_STRENGTH", "0.7"))
+BUDGET_MS = float(os.getenv("GOVERNANCE_ACTIVATION_BUDGET_MS", "5"))
+MIN_ACTIVATION = float(os.getenv("GOVERNANCE_ACTIVATION_MIN", "0.5"))
+
+# Strength assumed for linkedTags entries without an explicit associative_strength
+LINK_STRENGTHS: Dict[str, float] = {
+    "direct_links": 0.8,
+    "cross_category": 0.7,
+}
+
+
+class AssociationGraph:
+    """Token association graph in CSC form: incoming edges grouped by target node."""
+
+    __slots__ = ("names", "categories", "_ids", "_sources", "_weights", "_targets", "_starts")
+
+    def __init__(self, names: List[str], categories: List[str], edges: Mapping[Tuple[int, int], float]) -> None:
+        self.names = names
+        self.categories = categories
+        self._ids: Dict[str, int] = {name: i for i, name in enumerate(names)}
+        # Sort edges by target so each node's incoming edges are contiguous
+        ordered = sorted(edges.items(), key=lambda item: (item[0][1], item[0][0]))
+        self._sources = np.fromiter((src for (src, _), _ in ordered), dtype=np.int32, count=len(ordered))
+        self._weights = np.fromiter((w for _, w in ordered), dtype=np.float32, count=len(ordered))
+        targets = np.fromiter((dst for (_, dst), _ in ordered), dtype=np.int32, count=len(ordered))
+        # Targets that have incoming edges and where their segment starts (reduceat offsets)
+        self._targets: np.ndarray
+        self._starts: np.ndarray
+        self._targets, self._starts = np.unique(targets, return_index=True) if len(targets) else (targets, targets)
+
+    @classmethod
+    def from_tokens(cls, tokens: Iterable[Mapping[str, Any]], *, min_strength: float = MIN_STRENGTH) -> "AssociationGraph":
+        tokens = list(tokens)
+        names: List[str] = []
+        categories: List[str] = []
+        ids: Dict[str, int] = {}
+        for token in tokens:
+            name = str(token.get("name") or token.get("tag") or "")
+            if not name or name in ids:
+                continue
+            ids[name] = len(names)
+            names.append(name)
+            categories.append(str(token.get("kind") or ""))
+        # References may use the tag rather than the file name
+        for token in tokens:
+            ref_tag, ref_name = token.get("tag"), token.get("name")
+            if isinstance(ref_tag, str) and ref_tag not in ids and ref_name in ids:
+                ids[ref_tag] = ids[ref_name]
+
+        edges: Dict[Tuple[int, int], float] = {}
+
+        def link(src: int, ref: Any, strength: Any) -> None:
+            dst = ids.get(ref) if isinstance(ref, str) else None
+            try:
+                weight = min(float(strength), 1.0)
+            except (TypeError, ValueError):
+                return
+            if dst is None or dst == src or weight < min_strength:
+                return
+            edges[(src, dst)] = max(edges.get((src, dst), 0.0), weight)
+
+        for token in tokens:
+            src = ids.get(str(token.get("name") or token.get("tag") or ""))
+            if src is None:
+                continue
+            strengths = token.get("associative_strength") or {}
+            linked = token.get("linkedTags") or {}
+            if isinstance(strengths, dict):
+                for ref, strength in strengths.items():
+                    link(src, ref, strength)
+            if isinstance(linked, dict):
+                for field, default in LINK_STRENGTHS.items():
+                    refs = linked.get(field)
+                    if isinstance(refs, list):
+                        for ref in refs:
+                            if not (isinstance(strengths, dict) and ref in strengths):
+                                link(src, ref, default)
+            combinations = token.get("pattern_combinations") or {}
+            if isinstance(combinations, dict):
+                for combo in combinations.values():
+                    if isinstance(combo, dict) and isinstance(combo.get("tokens"), list):
+                        for ref in combo["tokens"]:
+                            link(src, ref, combo.get("strength", 0.0))
+
+        return cls(names, categories, edges)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._sources)
+
+    def node_id(self, name: str) -> Optional[int]:
+        return self._ids.get(name)
+
+    def spread(
+        self,
+        seeds: Mapping[str, float],
+        *,
+        hops: int = MAX_HOPS,
+        decay: float = DECAY,
+        budget_ms: float = BUDGET_MS,
+        min_activation: float = MIN_ACTIVATION,
+    ) -> Dict[str, float]:
+        """Propagate seed activations; return other tokens reaching ``min_activation``."""
+        activation = np.zeros(len(self.names), dtype=np.float32)
+        seed_ids = [i for i in (self._ids.get(name) for name in seeds) if i is not None]
+        for name, value in seeds.items():
+            node = self._ids.get(name)
+            if node is not None:
+                activation[node] = max(activation[node], min(float(value), 1.0))
+        if not seed_ids or not len(self._sources) or hops <= 0:
+            return {}
+
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        retain = np.float32(1.0 - decay)
+        for _ in range(hops):
+            contributions = activation[self._sources] * self._weights * retain
+            incoming = np.maximum.reduceat(contributions, self._starts)
+            current = activation[self._targets]
+            improved = incoming > current
+            if not improved.any():
+                break
+            activation[self._targets] = np.where(improved, incoming, current)
+            if time.perf_counter() >= deadline:
+                break
+
+        activation[seed_ids] = 0.0
+        reached = np.nonzero((activation > 0) & (activation >= min_activation))[0]
+        return {self.names[i]: float(activation[i]) for i in reached}
@@ -0,0 +1,570 @@
+"""
+Compiled activity classifier for the pre-action governance engine.
+
+The engine's activity patterns are plain keyword alternations of the form
+``\\b(?:a|b c|d)\\b`` plus one proximity rule ``\\b(?:verbs).*(?:nouns)\\b``.
+Running ``re.findall`` once per pattern rescans the whole context ~35 times, and the
+proximity rule backtracks quadratically on long lines full of verbs.
+
+``ActivityClassifier`` compiles the patterns once into:
+
+- one word scan: every keyword match starts at a word equal to one of the
+  keywords' first words, so each word is looked up in a table of those first
+  words and the owning patterns are anchored at that position only
+- per proximity rule, one verb-prefix scan and one noun-suffix scan; matches are
+  bucketed by line, which reproduces the greedy ``.*`` result (at most one match
+  per line) without backtracking
+
+Every scan is a word tokenizer or a literal alternation, so work is bounded by a
+constant per input character and the number of hits. Results (counts, scores, keywords and their
+order) are identical to the per-pattern ``re.findall`` implementation. Patterns
+outside these two shapes fall back to ``re.findall``.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Generic, Hashable, List, Optional, Sequence, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+_KEYWORD_PATTERN = re.compile(r"^\\b\(\?:([^()]*)\)\\b$")
+_PROXIMITY_PATTERN = re.compile(r"^\\b\(\?:([^()]*)\)\.\*\(\?:([^()]*)\)\\b$")
+_ESCAPE = re.compile(r"\\(.)")
+_WORD = re.compile(r"\w+")
+_REGEX_META = set(".^$*+?{}[]|()\\")
+
+# Score added per match; mirrors the legacy per-pattern accumulation
+MATCH_WEIGHT = 0.2
+
+_Span = Tuple[int, int]
+
+
+@dataclass
+class Classification(Generic[K]):
+    """Per-activity scores (only activities with matches, in pattern order) and keywords."""
+
+    scores: Dict[K, float]
+    keywords: List[str]
+
+
+def _parse_alternatives(body: str) -> Optional[List[str]]:
+    """Split ``a|b\\'c`` into literal alternatives, or None if any is not a plain literal."""
+    alts: List[str] = []
+    for raw in body.split("|"):
+        literal = _ESCAPE.sub(lambda m: m.group(1) if not m.group(1).isalnum() else "\x00", raw)
+        if not literal or "\x00" in literal or any(ch in _REGEX_META for ch in literal):
+            return None
+        alts.append(literal)
+    return alts
+
+
+def _is_affix_free(words: Sequence[str], *, suffix: bool) -> bool:
+    folded = [w.lower() for w in words]
+    for i, a in enumerate(folded):
+        for j, b in enumerate(folded):
+            if i != j and (b.endswith(a) if suffix else b.startswith(a)):
+                return False
+    return True
+
+
+@dataclass
+class _LineSummary:
+    has_newline: bool
+    # (first verb, last noun) of the first and the last line
+    first: Tuple[Optional[_Span], Optional[_Span]]
+    inner: List[_Span]
+    last: Tuple[Optional[_Span], Optional[_Span]]
+
+
+def _line_match(verb: Optional[_Span], noun: Optional[_Span]) -> Optional[_Span]:
+    if verb is None or noun is None or noun[0] < verb[1]:
+        return None
+    return verb[0], noun[1]
+
+
+class _ProximityRule:
+    """``\\b(?:verbs).*(?:nouns)\\b``: first verb on a line, last noun after it."""
+
+    __slots__ = ("verbs", "nouns")
+
+    def __init__(self, verbs: List[str], nouns: List[str]) -> None:
+        alt_v = "|".join(re.escape(v) for v in verbs)
+        alt_n = "|".join(re.escape(n) for n in nouns)
+        self.verbs = re.compile(rf"\b(?:{alt_v})", re.IGNORECASE)
+        self.nouns = re.compile(rf"(?:{alt_n})\b", re.IGNORECASE)
+
+    @classmethod
+    def parse(cls, pattern: str) -> Optional["_ProximityRule"]:
+        m = _PROXIMITY_PATTERN.match(pattern)
+        if not m:
+            return None
+        verbs = _parse_alternatives(m.group(1))
+        nouns = _parse_alternatives(m.group(2))
+        if not verbs or not nouns:
+            return None
+        # Each verb/noun must be a single word, and no alternative may shadow another
+        if not all(_WORD.fullmatch(w) for w in verbs + nouns):
+            return None
+        if not _is_affix_free(verbs, suffix=False) or not _is_affix_free(nouns, suffix=True):
+            return None
+        return cls(verbs, nouns)
+
+    def _anchors(self, text: str, newlines: List[int], *, nouns: bool = False) -> Tuple[Dict[int, _Span], Dict[int, _Span]]:
+        # `.` does not cross "\n", so each line yields at most one (greedy) match:
+        # from the first verb to the last noun, provided the noun starts after the verb.
+        first_verb: Dict[int, _Span] = {}
+        for m in self.verbs.finditer(text):
+            line = bisect_right(newlines, m.start())
+            if line not in first_verb:
+                first_verb[line] = m.span()
+        last_noun: Dict[int, _Span] = {}
+        # Without a verb, nouns only matter if the line continues another message's line
+        if first_verb or nouns:
+            for m in self.nouns.finditer(text):
+                last_noun[bisect_right(newlines, m.start())] = m.span()
+        return first_verb, last_noun
+
+    def find(self, text: str, newlines: List[int]) -> List[str]:
+        first_verb, last_noun = self._anchors(text, newlines)
+        found: List[str] = []
+        for line in sorted(first_verb):
+            span = _line_match(first_verb.get(line), last_noun.get(line))
+            if span is not None:
+                found.append(text[span[0]:span[1]])
+        return found
+
+    def summarize(self, text: str, newlines: List[int]) -> "_LineSummary":
+        """Anchors of the first and last line (which may continue across a junction)
+        and the matches of every line in between."""
+        first_verb, last_noun = self._anchors(text, newlines, nouns=True)
+        last = len(newlines)
+        inner: List[_Span] = []
+        for line in sorted(first_verb):
+            if 0 < line < last:
+                span = _line_match(first_verb[line], last_noun.get(line))
+                if span is not None:
+                    inner.append(span)
+        return _LineSummary(
+            has_newline=bool(newlines),
+            first=(first_verb.get(0), last_noun.get(0)),
+            inner=inner,
+            last=(first_verb.get(last), last_noun.get(last)),
+        )
+
+
+class ActivityClassifier(Generic[K]):
+    """Scores every activity in a fixed number of linear scans over the text."""
+
+    def __init__(self, patterns: Dict[K, List[str]]) -> None:
+        # Flat pattern list in legacy evaluation order: (activity, pattern)
+        self._order: List[Tuple[K, str]] = [(k, p) for k, plist in patterns.items() for p in plist]
+        self._keyword_res: Dict[int, "re.Pattern[str]"] = {}
+        self._proximity: Dict[int, _ProximityRule] = {}
+        self._fallback: Dict[int, str] = {}
+        self._max_alt_len = 1
+        first_words: Dict[str, List[int]] = {}
+        for idx, (_, pattern) in enumerate(self._order):
+            m = _KEYWORD_PATTERN.match(pattern)
+            alts = _parse_alternatives(m.group(1)) if m else None
+            if alts is not None and all(a[0].isalnum() and a[-1].isalnum() for a in alts):
+                self._keyword_res[idx] = re.compile(pattern, re.IGNORECASE)
+                self._max_alt_len = max(self._max_alt_len, *(len(a) for a in alts))
+                for alt in alts:
+                    word = _WORD.match(alt)
+                    key = word.group(0).lower() if word else alt.lower()
+                    owners = first_words.setdefault(key, [])
+                    if idx not in owners:
+                        owners.append(idx)
+                continue
+            rule = _ProximityRule.parse(pattern)
+            if rule is not None:
+                self._proximity[idx] = rule
+                continue
+            self._fallback[idx] = pattern
+        self._first_words = first_words
+        # Slow path for non-ASCII words, which may still match under IGNORECASE (e.g. "ſ"
+        # matches "s"): one capture group per first word, m.lastindex -> owning patterns
+        words = sorted(first_words)
+        self._group_owners: List[List[int]] = [[]] + [first_words[w] for w in words]
+        self._candidates: Optional["re.Pattern[str]"] = None
+        if words:
+            groups = "|".join(f"({re.escape(w)})" for w in words)
+            self._candidates = re.compile(f"(?:{groups})", re.IGNORECASE)
+
+    @property
+    def fallback_patterns(self) -> List[str]:
+        """Patterns that could not be compiled and are evaluated with ``re.findall``."""
+        return list(self._fallback.values())
+
+    def _owners(self, word: str) -> Optional[List[int]]:
+        owners = self._first_words.get(word)
+        if owners is None and not word.isascii() and self._candidates is not None:
+            folded = self._candidates.fullmatch(word)
+            if folded is not None:
+                owners = self._group_owners[folded.lastindex or 0]
+        return owners
+
+    def classify(self, text: str) -> Classification[K]:
+        """Classify already-lowercased ``text`` (the engine lowercases the context)."""
+        matches: Dict[int, List[str]] = {}
+        if self._candidates is not None:
+            cursors: Dict[int, int] = {}
+            keyword_res = self._keyword_res
+            for word in _WORD.finditer(text):
+                owners = self._owners(word.group(0))
+                if owners is None:
+                    continue
+                pos = word.start()
+                for idx in owners:
+                    # findall is non-overlapping per pattern
+                    if pos < cursors.get(idx, 0):
+                        continue
+                    m = keyword_res[idx].match(text, pos)
+                    if m is not None:
+                        matches.setdefault(idx, []).append(m.group(0))
+                        cursors[idx] = m.end()
+        if self._proximity:
+            newlines = [m.start() for m in re.finditer("\n", text)] if "\n" in text else []
+            for idx, rule in self._proximity.items():
+                found = rule.find(text, newlines)
+                if found:
+                    matches[idx] = found
+        for idx, pattern in self._fallback.items():
+            found = re.findall(pattern, text, re.IGNORECASE)
+            if found:
+                matches[idx] = found
+        keywords: List[str] = []
+        for idx in range(len(self._order)):
+            keywords.extend(matches.get(idx, ()))
+        return Classification(scores=self._score({idx: len(found) for idx, found in matches.items()}), keywords=keywords)
+
+    def _score(self, counts: Dict[int, int]) -> Dict[K, float]:
+        """Per-activity scores, accumulated in the same order as the legacy loop."""
+        scores: Dict[K, float] = {}
+        current: Optional[K] = None
+        score = 0.0
+        for idx, (activity, _) in enumerate(self._order):
+            if activity != current:
+                if current is not None and score > 0:
+                    scores[current] = min(score, 1.0)
+                current = activity
+                score = 0.0
+            count = counts.get(idx)
+            if count:
+                score += count * MATCH_WEIGHT
+        if current is not None and score > 0:
+            scores[current] = min(score, 1.0)
+        return scores
+
+    # Incremental scoring -------------------------------------------------
+    #
+    # analyze_context scores " ".join(last 3 messages + new message). A match of a
+    # keyword pattern at position p only reads text[p - 1 : p + max_alt_len + 1], so
+    # per message everything except a short tail (positions whose match could run
+    # into the next message) is independent of its neighbours and can be computed
+    # once. Combining a window then only rescans those tails against the following
+    # text and re-runs the per-pattern non-overlap rule where a match spills over
+    # a junction. Proximity rules are combined from per-line summaries.
+
+    @property
+    def supports_incremental(self) -> bool:
+        return not self._fallback
+
+    def scan(self, text: str) -> "MessageScan":
+        """Precompute the position-independent part of ``text``'s classification."""
+        tail_start = max(0, len(text) - self._max_alt_len + 1)
+        hits: Dict[int, List[Tuple[int, int]]] = {}
+        for word in _WORD.finditer(text):
+            pos = word.start()
+            if pos >= tail_start:
+                break
+            owners = self._owners(word.group(0))
+            if owners is None:
+                continue
+            for idx in owners:
+                m = self._keyword_res[idx].match(text, pos)
+                if m is not None:
+                    hits.setdefault(idx, []).append(m.span())
+        selected: Dict[int, List[int]] = {}
+        selected_end: Dict[int, int] = {}
+        keywords: Counter[str] = Counter()
+        for idx, spans in hits.items():
+            chosen, end = _select(spans, 0)
+            selected[idx] = chosen
+            selected_end[idx] = end
+            keywords.update(text[spans[i][0]:spans[i][1]] for i in chosen)
+        lines: Dict[int, _LineSummary] = {}
+        if self._proximity:
+            newlines = [m.start() for m in re.finditer("\n", text)] if "\n" in text else []
+            for idx, rule in self._proximity.items():
+                lines[idx] = rule.summarize(text, newlines)
+        return MessageScan(
+            text=text,
+            tail_start=tail_start,
+            hits=hits,
+            selected=selected,
+            selected_end=selected_end,
+            keywords=keywords,
+            tail_hits=self._tail_hits(text, tail_start, ""),
+            lines=lines,
+        )
+
+    def _tail_hits(self, text: str, tail_start: int, following: str) -> Dict[int, List[Tuple[int, int, str]]]:
+        """Matches starting in the tail of ``text`` when it is followed by ``following``."""
+        out: Dict[int, List[Tuple[int, int, str]]] = {}
+        if tail_start >= len(text):
+            return out
+        base = max(0, tail_start - 1)
+        local = text[base:] + following[: self._max_alt_len + 1]
+        for word in _WORD.finditer(text, tail_start):
+            pos = word.start()
+            if pos > 0 and _WORD.match(text, pos - 1):
+                continue  # started mid-word
+            owners = self._owners(word.group(0))
+            if owners is None:
+                continue
+            for idx in owners:
+                m = self._keyword_res[idx].match(local, pos - base)
+                if m is not None:
+                    out.setdefault(idx, []).append((pos, base + m.end(), m.group(0)))
+        return out
+
+    def combine(self, scans: Sequence["MessageScan"], totals: Optional["ScanTotals"] = None) -> Classification[K]:
+        """Classify ``" ".join(scan.text for scan in scans)`` from per-message scans.
+
+        ``totals`` may carry the pre-summed independent counts of ``scans`` (see
+        ``ContextWindow``); otherwise they are summed here. Scores equal
+        ``classify`` on the joined text; keywords are de-duplicated.
+        """
+        if totals is None:
+            totals = ScanTotals()
+            for scan in scans:
+                totals.add(scan)
+        counts: Counter[int] = Counter(totals.counts)
+        keywords: Counter[str] = Counter(totals.keywords)
+        offsets: List[int] = []
+        offset = 0
+        for scan in scans:
+            offsets.append(offset)
+            offset += len(scan.text) + 1
+
+        # Tails: the last message keeps its isolated tail, the others see what follows
+        tails: List[Dict[int, List[Tuple[int, int, str]]]] = []
+        for k, scan in enumerate(scans):
+            if k == len(scans) - 1:
+                tails.append(scan.tail_hits)
+            else:
+                tails.append(self._tail_hits(scan.text, scan.tail_start, self._following(scans, k)))
+
+        for idx in self._keyword_res:
+            cursor = 0
+            for k, scan in enumerate(scans):
+                entry = cursor - offsets[k]
+                spans = scan.hits.get(idx)
+                local = scan.selected_end.get(idx, 0)
+                if entry > 0 and spans:
+                    # A match spilled over the junction: re-run selection until it resyncs
+                    chosen = scan.selected[idx]
+                    added, removed, local = _resync(spans, chosen, entry, scan.selected_end[idx])
+                    for i in removed:
+                        counts[idx] -= 1
+                        keywords[scan.text[spans[i][0]:spans[i][1]]] -= 1
+                    for i in added:
+                        counts[idx] += 1
+                        keywords[scan.text[spans[i][0]:spans[i][1]]] += 1
+                local = max(local, entry)
+                for start, end, found in tails[k].get(idx, ()):
+                    if start >= local:
+                        counts[idx] += 1
+                        keywords[found] += 1
+                        local = end
+                cursor = offsets[k] + local
+
+        for idx in self._proximity:
+            proximity_spans: List[Tuple[int, int]] = _combine_lines([scan.lines[idx] for scan in scans], offsets)
+            if proximity_spans:
+                counts[idx] += len(proximity_spans)
+                keywords.update(_slice(scans, offsets, start, end) for start, end in proximity_spans)
+
+        return Classification(scores=self._score(counts), keywords=[kw for kw, n in keywords.items() if n > 0])
+
+    def _following(self, scans: Sequence["MessageScan"], k: int) -> str:
+        """Enough of the text after message ``k`` to decide any match in its tail."""
+        need = self._max_alt_len + 1
+        parts: List[str] = []
+        size = 0
+        for scan in scans[k + 1:]:
+            parts.append(" ")
+            parts.append(scan.text[:need])
+            size += 1 + len(parts[-1])
+            if size >= need:
+                break
+        return "".join(parts)
+
+
+@dataclass
+class MessageScan:
+    """Per-message classification state reused across sliding context windows."""
+
+    text: str
+    tail_start: int
+    # Keyword pattern -> every match starting before tail_start (not just non-overlapping)
+    hits: Dict[int, List[Tuple[int, int]]]
+    # Non-overlapping selection over hits (indexes) and where the last one ends
+    selected: Dict[int, List[int]]
+    selected_end: Dict[int, int]
+    keywords: Counter[str]
+    # Matches starting in the tail when the message ends the text
+    tail_hits: Dict[int, List[Tuple[int, int, str]]]
+    lines: Dict[int, "_LineSummary"]
+
+
+class ScanTotals:
+    """Running sums of the independent part of several scans."""
+
+    __slots__ = ("counts", "keywords")
+
+    def __init__(self) -> None:
+        self.counts: Counter[int] = Counter()
+        self.keywords: Counter[str] = Counter()
+
+    def add(self, scan: MessageScan) -> None:
+        self.counts.update({idx: len(chosen) for idx, chosen in scan.selected.items()})
+        self.keywords.update(scan.keywords)
+
+    def remove(self, scan: MessageScan) -> None:
+        self.counts.subtract({idx: len(chosen) for idx, chosen in scan.selected.items()})
+        self.keywords.subtract(scan.keywords)
+
+
+class ContextWindow:
+    """Rolling per-project window of message scans with summed independent counts.
+
+    ``classify(scan)`` scores the window plus ``scan`` as analyze_context would
+    score ``" ".join(history[-size:] + [message])``; ``push(scan)`` then slides the
+    window, adding the new message's contribution and subtracting the evicted one.
+    """
+
+    __slots__ = ("_classifier", "_scans", "_totals")
+
+    def __init__(self, classifier: ActivityClassifier[Any], size: int = 3) -> None:
+        self._classifier = classifier
+        self._scans: Deque[MessageScan] = deque(maxlen=size)
+        self._totals = ScanTotals()
+
+    def __len__(self) -> int:
+        return len(self._scans)
+
+    def classify(self, scan: MessageScan) -> Classification[Any]:
+        scans = list(self._scans) + [scan]
+        if len(scans) == 1:
+            return self._classifier.combine(scans)
+        totals = ScanTotals()
+        totals.counts = self._totals.counts + Counter()
+        totals.keywords = Counter(self._totals.keywords)
+        totals.add(scan)
+        return self._classifier.combine(scans, totals)
+
+    def push(self, scan: MessageScan) -> None:
+        scans = self._scans
+        if scans.maxlen is not None and len(scans) == scans.maxlen:
+            self._totals.remove(scans[0])
+        scans.append(scan)
+        self._totals.add(scan)
+
+
+def _select(spans: Sequence[Tuple[int, int]], cursor: int) -> Tuple[List[int], int]:
+    """Leftmost non-overlapping selection (re.findall order) starting at ``cursor``."""
+    chosen: List[int] = []
+    for i, (start, end) in enumerate(spans):
+        if start >= cursor:
+            chosen.append(i)
+            cursor = end
+    return chosen, cursor
+
+
+def _resync(
+    spans: Sequence[Tuple[int, int]], chosen: Sequence[int], entry: int, chosen_end: int
+) -> Tuple[List[int], List[int], int]:
+    """Re-select from ``entry`` until the selection meets the precomputed one.
+
+    Returns (added, removed, end) relative to ``chosen``.
+    """
+    added: List[int] = []
+    cursor = entry
+    j = 0
+    for i, (start, end) in enumerate(spans):
+        if start < cursor:
+            continue
+        while j < len(chosen) and chosen[j] < i:
+            j += 1
+        if j < len(chosen) and chosen[j] == i:
+            # Both selections pick i: everything after is identical
+            return added, list(chosen[:j]), chosen_end
+        added.append(i)
+        cursor = end
+    return added, list(chosen), cursor
+
+
+def _combine_lines(summaries: Sequence[_LineSummary], offsets: Sequence[int]) -> List[_Span]:
+    """Proximity matches of the joined text, as global spans, from per-message summaries."""
+
+    def shift(span: Optional[_Span], off: int) -> Optional[_Span]:
+        return None if span is None else (span[0] + off, span[1] + off)
+
+    found: List[_Span] = []
+    verb: Optional[_Span] = None
+    noun: Optional[_Span] = None
+    for summary, off in zip(summaries, offsets):
+        first_verb, first_noun = summary.first
+        if verb is None:
+            verb = shift(first_verb, off)
+        if first_noun is not None:
+            noun = shift(first_noun, off)
+        if not summary.has_newline:
+            continue
+        span = _line_match(verb, noun)
+        if span is not None:
+            found.append(span)
+        found.extend((start + off, end + off) for start, end in summary.inner)
+        verb, noun = shift(summary.last[0], off), shift(summary.last[1], off)
+    span = _line_match(verb, noun)
+    if span is not None:
+        found.append(span)
+    return found
+
+
+def _slice(scans: Sequence[MessageScan], offsets: Sequence[int], start: int, end: int) -> str:
+    """``" ".join(texts)[start:end]`` without building the joined string."""
+    parts: List[str] = []
+    for scan, off in zip(scans, offsets):
+        stop = off + len(scan.text)
+        if stop < start:
+            continue
+        if off >= end:
+            break
+        if parts or off > start:
+            parts.append(" ")
+        parts.append(scan.text[max(start - off, 0):min(end, stop) - off])
+    return "".join(parts)
+
+
+# Process-pool entry points: each worker process compiles the patterns once, in
+# its initializer, and classifies plain strings (activity keys are strings so
+# results pickle without importing the engine).
+_worker_classifier: Optional[ActivityClassifier[str]] = None
+
+
+def init_worker_classifier(patterns: Dict[str, List[str]]) -> None:
+    global _worker_classifier
+    _worker_classifier = ActivityClassifier(patterns)
+
+
+def classify_in_worker(text: str) -> Classification[str]:
+    if _worker_classifier is None:
+        raise RuntimeError("init_worker_classifier() was not run in this process")
+    return _worker_classifier.classify(text)
@@ -0,0 +1,215 @@
+"""
+Write-behind buffer for governance token metrics.
+
+Every governance activation updates the usage metrics of up to RULE_LIMIT
+tokens. Instead of one transaction per token, samples are aggregated in memory
+per (token_id, project_id) as an activation count, a sum of effectiveness
+samples and the latest application time, and written as one multi-row UPSERT
+(`record_governance_token_metrics_batch_pg`). Folding `count` samples with sum
+`s` into a stored average `avg` over `n` activations as `(avg * n + s) / (n + count)`
+gives the same result as applying them one by one.
+
+- A flush runs every GOVERNANCE_METRICS_FLUSH_SECONDS, as soon as
+  GOVERNANCE_METRICS_FLUSH_SIZE keys are pending, and on `stop()` (shutdown)
+- The buffer holds at most GOVERNANCE_METRICS_BUFFER_MAX keys; samples for a
+  pending key are always merged, samples for new keys beyond the bound are dropped
+- A failed write merges the batch back so the next flush retries it
+
+Config (env):
+- GOVERNANCE_METRICS_FLUSH_SECONDS: periodic flush interval (default 2.0)
+- GOVERNANCE_METRICS_FLUSH_SIZE: pending keys that trigger an early flush (default 200)
+- GOVERNANCE_METRICS_BUFFER_MAX: maximum pending keys (default 1000)
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+from server.db.engine import get_async_engine
+from server.db.repo import normalize_project_id, record_governance_token_metrics_batch_pg
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SECONDS = float(os.getenv("GOVERNANCE_METRICS_FLUSH_SECONDS", "2.0"))
+FLUSH_SIZE = int(os.getenv("GOVERNANCE_METRICS_FLUSH_SIZE", "200"))
+BUFFER_MAX = int(os.getenv("GOVERNANCE_METRICS_BUFFER_MAX", "1000"))
+
+MetricsWriter = Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]]
+FlushListener = Callable[[List[Dict[str, Any]]], None]
+
+# (token_id, normalized project_id)
+_Key = Tuple[str, str]
+
+
+class _Pending:
+    __slots__ = ("count", "total", "applied_at")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.applied_at: Optional[datetime] = None
+
+    def merge(self, count: int, total: float, applied_at: Optional[datetime]) -> None:
+        self.count += count
+        self.total += total
+        if applied_at is not None and (self.applied_at is None or applied_at > self.applied_at):
+            self.applied_at = applied_at
+
+
+async def _write_to_postgres(aggregates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    engine = get_async_engine()
+    if engine is None:
+        return []
+    return await record_governance_token_metrics_batch_pg(engine, aggregates=aggregates)
+
+
+class TokenMetricsBuffer:
+    """Aggregates token metric samples in memory and writes them in batches."""
+
+    def __init__(
+        self,
+        writer: Optional[MetricsWriter] = None,
+        *,
+        flush_seconds: float = FLUSH_SECONDS,
+        flush_size: int = FLUSH_SIZE,
+        max_pending: int = BUFFER_MAX,
+        on_flush: Optional[FlushListener] = None,
+    ) -> None:
+        self._writer: MetricsWriter = writer or _write_to_postgres
+        self._flush_seconds = max(flush_seconds, 0.05)
+        self._flush_size = max(flush_size, 1)
+        self._max_pending = max(max_pending, self._flush_size)
+        self.on_flush = on_flush
+        self._pending: Dict[_Key, _Pending] = {}
+        self._ticker: Optional[asyncio.Task] = None
+        self._size_flush: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def add(self, token_id: str, project_id: Optional[str], sample: float, applied_at: Optional[datetime] = None) -> bool:
+        """Buffer one activation sample. Returns False when it was dropped because the buffer is full."""
+        key = (token_id, normalize_project_id(project_id))
+        pending = self._pending.get(key)
+        if pending is None:
+            if len(self._pending) >= self._max_pending:
+                self.dropped += 1
+                GOVERNANCE_METRICS_DROPPED.inc()
+                self._schedule_flush()
+                return False
+            pending = self._pending[key] = _Pending()
+            GOVERNANCE_METRICS_PENDING.set(len(self._pending))
+        pending.merge(1, float(sample), applied_at)
+        self._ensure_ticker()
+        if len(self._pending) >= self._flush_size:
+            self._schedule_flush()
+        return True
+
+    def is_pending(self, token_id: str, project_id: Optional[str]) -> bool:
+        return (token_id, normalize_project_id(project_id)) in self._pending
+
+    async def flush(self) -> List[Dict[str, Any]]:
+        """Write everything pending in one batch and return the stored records."""
+        if not self._pending:
+            return []
+        batch, self._pending = self._pending, {}
+        GOVERNANCE_METRICS_PENDING.set(0)
+        aggregates = [
+            {
+                "token_id": token_id,
+                "project_id": project_id,
+                "activation_count": pending.count,
+                "effectiveness_sum": pending.total,
+                "last_applied_at": pending.applied_at,
+            }
+            for (token_id, project_id), pending in batch.items()
+        ]
+        try:
+            records = await self._writer(aggregates)
+        except asyncio.CancelledError:
+            self._requeue(batch)
+            raise
+        except Exception as exc:
+            GOVERNANCE_METRICS_FLUSHES.labels(result="error").inc()
+            logger.warning("Failed to flush %d governance token metrics: %s", len(aggregates), exc)
+            self._requeue(batch)
+            return []
+        GOVERNANCE_METRICS_FLUSHES.labels(result="ok").inc()
+        if records and self.on_flush is not None:
+            try:
+                self.on_flush(records)
+            except Exception as exc:
+                logger.debug("Token metrics flush listener failed: %s", exc)
+        return records
+
+    async def start(self) -> None:
+        self._ensure_ticker()
+
+    async def stop(self) -> None:
+        """Cancel the periodic flush and write whatever is still pending."""
+        ticker, size_flush = self._ticker, self._size_flush
+        if ticker is not None and not ticker.done():
+            # A write interrupted by the cancellation is merged back and retried below
+            ticker.cancel()
+            try:
+                await ticker
+            except asyncio.CancelledError:
+                pass
+        if size_flush is not None and not size_flush.done():
+            await size_flush
+        self._ticker = None
+        self._size_flush = None
+        await self.flush()
+
+    def _requeue(self, batch: Dict[_Key, _Pending]) -> None:
+        # Samples buffered while the write was in flight are already in _pending
+        for key, pending in batch.items():
+            current = self._pending.get(key)
+            if current is None:
+                if len(self._pending) >= self._max_pending:
+                    self.dropped += pending.count
+                    GOVERNANCE_METRICS_DROPPED.inc(pending.count)
+                    continue
+                current = self._pending[key] = _Pending()
+            current.merge(pending.count, pending.total, pending.applied_at)
+        GOVERNANCE_METRICS_PENDING.set(len(self._pending))
+
+    def _ensure_ticker(self) -> None:
+        if self._ticker is not None and not self._ticker.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._ticker = loop.create_task(self._run_ticker())
+
+    def _schedule_flush(self) -> None:
+        if self._size_flush is not None and not self._size_flush.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._size_flush = loop.create_task(self.flush())
+
+    async def _run_ticker(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_seconds)
+            await self.flush()
+
+
+# Prometheus metrics
+GOVERNANCE_METRICS_FLUSHES = Counter(
+    "governance_metrics_flushes_total", "Governance token metric batch writes", ["result"]
+)
+GOVERNANCE_METRICS_DROPPED = Counter(
+    "governance_metrics_dropped_total", "Governance token metric samples dropped because the buffer was full"
+)
+GOVERNANCE_METRICS_PENDING = Gauge("governance_metrics_pending", "Governance token metric keys waiting to be written")
@@ -6,29 +6,48 @@ It detects when AI is about to plan/code, analyzes context, retrieves relevant
 Neural Forge rules, and provides governance guidance automatically.
 """
 
-import copy
+import asyncio
 import logging
 import os
-import re
 import time
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
 
 from server.db.engine import get_async_engine
-from server.db.repo import (
-    fetch_governance_token_metrics_pg,
-    record_governance_token_metric_pg,
-)
+from server.db.repo import fetch_governance_token_metrics_pg, normalize_project_id
+from server.governance.activation import MAX_HOPS as ACTIVATION_HOPS, AssociationGraph
+from server.governance.classifier import ActivityClassifier, Classification, MessageScan
+from server.governance.metrics_buffer import TokenMetricsBuffer
+from server.governance.rule_index import RuleIndex, effectiveness_of, query_terms, top_k
+from server.governance.rules import AppliedRule, GovernanceRule
+from server.memory.semantic import compute_embedding, is_semantic_enabled
+from server.nf_client.catalog import catalog_watcher
+from server.nf_client.embeddings import EmbeddingStore, get_embedding_store
 from server.nf_client.tokens import fetch_tokens
+from server.nf_client.watcher import watcher_for
 
 logger = logging.getLogger(__name__)
 
 
 TokenLoader = Callable[[str, List[str]], Dict[str, Any]]
 
+# Rules returned per recommendation, and the weight of a rule's observed effectiveness
+RULE_LIMIT = 10
+USAGE_WEIGHT = 0.5
+# Weight of the spreading activation reaching a rule linked to the matched ones
+ASSOCIATION_WEIGHT = 0.5
+# Weight of the cosine similarity between the message and a token's embedding,
+# and the similarity below which a token is not considered related
+SEMANTIC_WEIGHT = float(os.getenv("GOVERNANCE_SEMANTIC_WEIGHT", "0.75"))
+SEMANTIC_MIN_SCORE = float(os.getenv("GOVERNANCE_SEMANTIC_MIN_SCORE", "0.3"))
+# Memoized recommendations: lifetime in seconds and number of distinct contexts kept
+RECOMMENDATION_TTL = float(os.getenv("GOVERNANCE_RECOMMENDATION_TTL", "30"))
+RECOMMENDATION_CACHE_SIZE = int(os.getenv("GOVERNANCE_RECOMMENDATION_CACHE_SIZE", "256"))
+
 
 DOMAIN_CATEGORY_MAPPING: Dict[str, List[str]] = {
     "security": ["security"],
@@ -72,11 +91,41 @@ class GovernanceContext:
 class GovernanceRecommendation:
     """Governance recommendation with rules and guidance"""
     activity_type: ActivityType
-    relevant_rules: List[Dict[str, Any]]
+    relevant_rules: List[AppliedRule]
     summary: str
     key_principles: List[str]
     warnings: List[str]
     confidence: float
+    # Memoized skeleton the recommendation was built from, reused by format_governance_output
+    template: Optional["RecommendationTemplate"] = field(default=None, repr=False, compare=False)
+
+
+# (activity, domains, project, normalized keyword terms, message when ranked semantically)
+RecommendationKey = Tuple[ActivityType, Tuple[str, ...], str, frozenset, Optional[str]]
+
+
+class RecommendationTemplate:
+    """Everything in a recommendation that does not depend on the request's confidence."""
+
+    __slots__ = ("rules", "summary", "key_principles", "warnings", "text", "generation", "expires_at")
+
+    def __init__(
+        self,
+        rules: Tuple[GovernanceRule, ...],
+        summary: str,
+        key_principles: List[str],
+        warnings: List[str],
+        generation: int,
+        expires_at: float,
+    ) -> None:
+        self.rules = rules
+        self.summary = summary
+        self.key_principles = key_principles
+        self.warnings = warnings
+        # Formatted output split around the confidence line, filled on first format
+        self.text: Optional[Tuple[str, str]] = None
+        self.generation = generation
+        self.expires_at = expires_at
 
 
 class PreActionGovernanceEngine:
@@ -93,46 +142,32 @@ class PreActionGovernanceEngine:
         token_loader: Optional[TokenLoader] = None,
         tags_dir: Optional[Path | str] = None,
         cache_ttl: float = 60.0,
+        metrics_buffer: Optional[TokenMetricsBuffer] = None,
+        recommendation_ttl: float = RECOMMENDATION_TTL,
+        embedding_store: Optional[EmbeddingStore] = None,
     ):
         self.activity_patterns = self._initialize_activity_patterns()
+        self.activity_classifier: ActivityClassifier[ActivityType] = ActivityClassifier(self.activity_patterns)
         self.domain_mappings = self._initialize_domain_mappings()
         self._token_loader: TokenLoader = token_loader or fetch_tokens
         self._cache_ttl = max(cache_ttl, 0.0)
         base_tags_dir = tags_dir if tags_dir is not None else Path(__file__).resolve().parents[2] / "memory" / "tags"
         self._tags_dir = Path(base_tags_dir).resolve()
+        # Cache entries remember the watcher generation they were built at. fetch_tokens
+        # serves from the catalog snapshot, so share the catalog's watcher: a generation
+        # seen here is one the catalog has seen too, and it cannot hand back stale tokens
+        self._watcher = catalog_watcher() if token_loader is None else watcher_for(str(self._tags_dir))
         self.rule_cache: Dict[str, Dict[str, Any]] = {}
+        self._domain_loads: Dict[str, "asyncio.Future[Optional[Dict[str, Any]]]"] = {}
         self.token_metrics_cache: Dict[str, Dict[str, Any]] = {}
+        # Usage metrics are written behind; flushed records replace the projected cache entries
+        self.metrics_buffer = metrics_buffer or TokenMetricsBuffer()
+        self.metrics_buffer.on_flush = self._apply_flushed_metrics
+        self._association_cache: Optional[Dict[str, Any]] = None
+        self._embedding_store = embedding_store or get_embedding_store()
+        self._recommendation_ttl = max(recommendation_ttl, 0.0)
+        self._recommendation_cache: "OrderedDict[RecommendationKey, RecommendationTemplate]" = OrderedDict()
 
-    def _compute_domain_snapshot(self, categories: List[str]) -> Dict[str, Any]:
-        """Capture filesystem metadata for a domain's backing token files."""
-        files: List[str] = []
-        latest_mtime = 0.0
-
-        if not categories:
-            return {"files": files, "latest_mtime": latest_mtime}
-
-        for category in categories:
-            category_dir = self._tags_dir / category
-            if not category_dir.exists() or not category_dir.is_dir():
-                continue
-            for root, _, filenames in os.walk(category_dir):
-                for filename in filenames:
-                    path = Path(root) / filename
-                    if not path.is_file():
-                        continue
-                    if path.suffix.lower() not in {".yml", ".yaml"}:
-                        continue
-                    try:
-                        stat = path.stat()
-                    except OSError:
-                        continue
-                    rel_path = str(path.relative_to(self._tags_dir))
-                    files.append(rel_path)
-                    latest_mtime = max(latest_mtime, stat.st_mtime)
-
-        files.sort()
-        return {"files": files, "latest_mtime": latest_mtime}
-        
     def _initialize_activity_patterns(self) -> Dict[ActivityType, List[str]]:
         """Initialize regex patterns for detecting different AI activities"""
         return {
@@ -211,6 +246,7 @@ class PreActionGovernanceEngine:
         user_message: str,
         conversation_history: Optional[List[str]] = None,
         project_id: Optional[str] = None,
+        classification: Optional[Classification[ActivityType]] = None,
     ) -> GovernanceContext:
         """
         Analyze user message and conversation to detect AI activity context
@@ -218,34 +254,24 @@ class PreActionGovernanceEngine:
         Args:
             user_message: The current user message
             conversation_history: Previous messages for context (optional)
+            classification: Precomputed classification of the same context, e.g. from
+                an incremental ContextWindow (optional)
             
         Returns:
             GovernanceContext with detected activity and confidence
         """
-        # Combine current message with recent history for better context
-        full_context = user_message
-        if conversation_history:
-            # Use last 3 messages for context
-            recent_history = conversation_history[-3:]
-            full_context = " ".join(recent_history + [user_message])
-        
-        # Detect activity type and confidence
-        activity_scores = {}
-        detected_keywords = []
-        
-        for activity_type, patterns in self.activity_patterns.items():
-            score = 0.0
-            activity_keywords = []
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, full_context.lower(), re.IGNORECASE)
-                if matches:
-                    score += len(matches) * 0.2  # Each match adds 0.2 to confidence
-                    activity_keywords.extend(matches)
-            
-            if score > 0:
-                activity_scores[activity_type] = min(score, 1.0)  # Cap at 1.0
-                detected_keywords.extend(activity_keywords)
+        if classification is None:
+            # Combine current message with recent history for better context
+            full_context = user_message
+            if conversation_history:
+                # Use last 3 messages for context
+                recent_history = conversation_history[-3:]
+                full_context = " ".join(recent_history + [user_message])
+
+            # Detect activity type and confidence: each match adds 0.2, capped at 1.0 per activity
+            classification = self.activity_classifier.classify(full_context.lower())
+        activity_scores = classification.scores
+        detected_keywords = classification.keywords
         
         # Determine primary activity type
         if not activity_scores:
@@ -267,6 +293,40 @@ class PreActionGovernanceEngine:
             project_id=project_id,
         )
     
+    async def analyze_contexts(
+        self,
+        messages: Sequence[Tuple[str, Optional[List[str]]]],
+        project_id: Optional[str] = None,
+    ) -> List[GovernanceContext]:
+        """Analyze many (message, history) pairs; same results as analyze_context on each.
+
+        Each distinct message text (current or from a history) is scanned once and
+        every context is combined from those scans, so messages sharing a
+        conversation do not re-scan it.
+        """
+        classifier = self.activity_classifier
+        scans: Dict[str, MessageScan] = {}
+
+        def scan(text: str) -> MessageScan:
+            found = scans.get(text)
+            if found is None:
+                found = scans[text] = classifier.scan(text)
+            return found
+
+        contexts: List[GovernanceContext] = []
+        for user_message, conversation_history in messages:
+            classification = None
+            if classifier.supports_incremental:
+                # Same window as analyze_context: the last 3 history messages plus the message
+                window = list(conversation_history or [])[-3:] + [user_message]
+                classification = classifier.combine([scan(text.lower()) for text in window])
+            contexts.append(
+                await self.analyze_context(
+                    user_message, conversation_history, project_id=project_id, classification=classification
+                )
+            )
+        return contexts
+
     async def should_activate_governance(self, context: GovernanceContext) -> bool:
         """
         Determine if governance should be activated based on context
@@ -302,13 +362,24 @@ class PreActionGovernanceEngine:
         Returns:
             GovernanceRecommendation with relevant rules and guidance
         """
-        # This would integrate with the existing Neural Forge rule system
-        # For now, we'll create a structured response based on the context
-        
-        relevant_rules = await self._get_relevant_rules(context)
-        summary = self._generate_summary(context, relevant_rules)
-        key_principles = self._extract_key_principles(context, relevant_rules)
-        warnings = self._generate_warnings(context, relevant_rules)
+        # Rules, summary, principles and warnings only depend on the memo key;
+        # confidence and the usage metric side effects are per request
+        key = self._recommendation_key(context)
+        template = self._cached_recommendation(key)
+        if template is None:
+            generation = self._watcher.generation()
+            relevant_rules = await self._get_relevant_rules(context)
+            template = RecommendationTemplate(
+                rules=tuple(rule.rule for rule in relevant_rules),
+                summary=self._generate_summary(context, relevant_rules),
+                key_principles=self._extract_key_principles(context, relevant_rules),
+                warnings=self._generate_warnings(context, relevant_rules),
+                generation=generation,
+                expires_at=time.time() + self._recommendation_ttl,
+            )
+            self._store_recommendation(key, template)
+        else:
+            relevant_rules = [AppliedRule(rule, self.token_metrics_cache.get(rule.token_ref)) for rule in template.rules]
 
         try:
             await self._record_token_metrics(context, relevant_rules)
@@ -318,81 +389,368 @@ class PreActionGovernanceEngine:
         return GovernanceRecommendation(
             activity_type=context.activity_type,
             relevant_rules=relevant_rules,
-            summary=summary,
-            key_principles=key_principles,
-            warnings=warnings,
-            confidence=context.confidence
+            summary=template.summary,
+            key_principles=list(template.key_principles),
+            warnings=list(template.warnings),
+            confidence=context.confidence,
+            template=template,
         )
-    
-    async def _get_relevant_rules(self, context: GovernanceContext) -> List[Dict[str, Any]]:
-        """Retrieve relevant Neural Forge rules based on context"""
-        # This will integrate with the existing rule loading system
-        # For now, return structured rule data based on domains
-        
-        rules = []
+
+    def _recommendation_key(self, context: GovernanceContext) -> RecommendationKey:
+        return (
+            context.activity_type,
+            tuple(context.relevant_domains),
+            normalize_project_id(context.project_id),
+            # Keywords drive the trigger ranking, so they are part of the key
+            frozenset(query_terms(context.detected_keywords)),
+            context.user_intent if self._semantic_ranking_enabled() else None,
+        )
+
+    def _cached_recommendation(self, key: RecommendationKey) -> Optional[RecommendationTemplate]:
+        template = self._recommendation_cache.get(key)
+        if template is None:
+            return None
+        if time.time() > template.expires_at or template.generation != self._watcher.generation():
+            del self._recommendation_cache[key]
+            return None
+        self._recommendation_cache.move_to_end(key)
+        return template
+
+    def _store_recommendation(self, key: RecommendationKey, template: RecommendationTemplate) -> None:
+        if self._recommendation_ttl <= 0 or RECOMMENDATION_CACHE_SIZE <= 0:
+            return
+        self._recommendation_cache[key] = template
+        self._recommendation_cache.move_to_end(key)
+        while len(self._recommendation_cache) > RECOMMENDATION_CACHE_SIZE:
+            self._recommendation_cache.popitem(last=False)
+
+    async def _get_relevant_rules(self, context: GovernanceContext) -> List[AppliedRule]:
+        """Retrieve the most relevant Neural Forge rules for the context.
+
+        Rules are scored through each domain's inverted trigger index against the
+        detected keywords, plus a bonus for rules that have proven effective. The
+        directly matched tokens then seed spreading activation over the token
+        association graph, so strongly linked rules are surfaced too, even from
+        other domains. The top ``RULE_LIMIT`` are picked with a heap; when fewer
+        rules match, the rest are filled in catalog order. With semantic search
+        enabled, tokens whose embedding is close to the message's are scored as
+        well, from any domain. The cached rules are
+        shared, not copied: each selected rule is wrapped with this request's
+        usage metrics.
+        """
+        terms = query_terms(context.detected_keywords)
+        sources: List[Tuple[List[GovernanceRule], RuleIndex]] = []
+        source_by_domain: Dict[str, int] = {}
+        entries = await self._load_domain_entries(context.relevant_domains)
         for domain in context.relevant_domains:
-            domain_rules = await self._load_domain_rules(domain)
-            rules.extend(domain_rules)
-        
-        return rules[:10]  # Limit to top 10 most relevant rules
-    
-    async def _load_domain_rules(self, domain: str) -> List[Dict[str, Any]]:
-        """Load rules for a specific domain from Neural Forge memory"""
+            entry = entries[domain]
+            source_by_domain.setdefault(domain, len(sources))
+            if entry is not None:
+                sources.append((entry["rules"], entry["index"]))
+            else:
+                fallback = [GovernanceRule.from_dict(rule) for rule in self._get_fallback_rules(domain)]
+                sources.append((fallback, self._build_rule_index(fallback)))
+        fill_sources = len(sources)
+
+        scores: Dict[Tuple[int, int], float] = {}
+        if terms:
+            for source, (rules, index) in enumerate(sources):
+                for position, score in index.score(terms).items():
+                    metrics = self.token_metrics_cache.get(rules[position].token_ref)
+                    scores[(source, position)] = score + USAGE_WEIGHT * effectiveness_of(metrics)
+        if self._semantic_ranking_enabled():
+            await self._add_semantic_rules(context, scores, sources, source_by_domain)
+        if scores:
+            await self._add_associated_rules(scores, sources, source_by_domain)
+
+        selected: List[AppliedRule] = []
+        seen: Set[str] = set()
+
+        def take(rule: GovernanceRule) -> None:
+            ref = rule.token_ref or rule.name
+            if ref in seen:
+                return
+            seen.add(ref)
+            selected.append(AppliedRule(rule, self.token_metrics_cache.get(rule.token_ref)))
+
+        # Over-select so duplicates across domains cannot starve the result
+        ranked = ((score, source, position) for (source, position), score in scores.items())
+        for source, position in top_k(ranked, RULE_LIMIT * 2):
+            if len(selected) >= RULE_LIMIT:
+                break
+            take(sources[source][0][position])
+        for rules, _ in sources[:fill_sources]:
+            for rule in rules:
+                if len(selected) >= RULE_LIMIT:
+                    return selected
+                take(rule)
+        return selected
+
+    async def _add_associated_rules(
+        self,
+        scores: Dict[Tuple[int, int], float],
+        sources: List[Tuple[List[GovernanceRule], RuleIndex]],
+        source_by_domain: Dict[str, int],
+    ) -> None:
+        """Spread activation from the matched rules and score the rules it reaches."""
+        graph = await self._load_association_graph()
+        if graph is None or not len(graph):
+            return
+        best = max(scores.values())
+        seeds: Dict[str, float] = {}
+        for (source, position), score in scores.items():
+            name = sources[source][0][position].name
+            if name:
+                seeds[name] = max(seeds.get(name, 0.0), score / best)
+
+        for name, activation in graph.spread(seeds).items():
+            node = graph.node_id(name)
+            category = graph.categories[node] if node is not None else ""
+            key = await self._rule_position(category, name, sources, source_by_domain)
+            if key is not None:
+                scores[key] = scores.get(key, 0.0) + ASSOCIATION_WEIGHT * activation
+
+    def _semantic_ranking_enabled(self) -> bool:
+        return SEMANTIC_WEIGHT > 0 and is_semantic_enabled()
+
+    async def _add_semantic_rules(
+        self,
+        context: GovernanceContext,
+        scores: Dict[Tuple[int, int], float],
+        sources: List[Tuple[List[GovernanceRule], RuleIndex]],
+        source_by_domain: Dict[str, int],
+    ) -> None:
+        """Score the tokens most similar to the message with one matrix-vector product."""
+        text = context.user_intent.strip() or " ".join(context.detected_keywords)
+        if not text:
+            return
         try:
-            categories = DOMAIN_CATEGORY_MAPPING.get(domain)
-            if not categories:
-                return self._get_fallback_rules(domain)
+            embeddings = self._embedding_store.current()
+            if embeddings is None:
+                # First use or catalog change: loading or embedding the catalog blocks
+                embeddings = await asyncio.to_thread(self._embedding_store.get)
+            if not embeddings:
+                return
+            vector = await compute_embedding(text)
+        except Exception as e:
+            logger.warning(f"Semantic rule ranking unavailable: {e}")
+            return
+        if vector is None:
+            return
+        for category, name, similarity in embeddings.similar(vector, RULE_LIMIT * 2, SEMANTIC_MIN_SCORE):
+            key = await self._rule_position(category, name, sources, source_by_domain)
+            if key is not None:
+                scores[key] = scores.get(key, 0.0) + SEMANTIC_WEIGHT * similarity
+
+    async def _rule_position(
+        self,
+        category: str,
+        name: str,
+        sources: List[Tuple[List[GovernanceRule], RuleIndex]],
+        source_by_domain: Dict[str, int],
+    ) -> Optional[Tuple[int, int]]:
+        """(source, position) of a rule, loading its domain as an extra source if needed."""
+        source = source_by_domain.get(category)
+        if source is None:
+            entry = await self._load_domain_entry(category)
+            if entry is None:
+                return None
+            source = source_by_domain[category] = len(sources)
+            sources.append((entry["rules"], entry["index"]))
+        position = sources[source][1].position_of(name)
+        if position is None:
+            return None
+        return source, position
 
+    async def _load_association_graph(self) -> Optional[AssociationGraph]:
+        """Build the token association graph once per catalog change."""
+        if ACTIVATION_HOPS <= 0:
+            return None
+        try:
             now = time.time()
-            snapshot = self._compute_domain_snapshot(categories)
-            cached_entry = self.rule_cache.get(domain)
+            generation = self._watcher.generation()
+            cached = self._association_cache
+            if cached and now <= cached["expires_at"] and cached["generation"] == generation:
+                return cached["graph"]
+
+            categories = sorted(p.name for p in self._tags_dir.iterdir() if p.is_dir()) if self._tags_dir.is_dir() else []
+            tokens_response = await asyncio.to_thread(self._token_loader, "neural-forge", categories) if categories else {}
+            tokens_data = tokens_response.get("tokens", []) if isinstance(tokens_response, dict) else []
+            graph = AssociationGraph.from_tokens(tokens_data)
+            self._association_cache = {"graph": graph, "generation": generation, "expires_at": now + self._cache_ttl}
+            return graph
+        except Exception as e:
+            logger.warning(f"Failed to build token association graph: {e}")
+            self._association_cache = None
+            return None
+
+    async def _load_domain_rules(self, domain: str) -> List[Dict[str, Any]]:
+        """Load rules for a specific domain from Neural Forge memory, as plain dicts"""
+        entry = await self._load_domain_entry(domain)
+        if entry is None:
+            return self._get_fallback_rules(domain)
+        return [AppliedRule(rule, self.token_metrics_cache.get(rule.token_ref)).to_dict() for rule in entry["rules"]]
+
+    async def _load_domain_entry(self, domain: str) -> Optional[Dict[str, Any]]:
+        """Return the cached rules and trigger index for a domain, reloading when stale.
+
+        The returned entry is shared with the cache and must not be mutated.
+        Returns None when the domain has no token categories or loading fails.
+        """
+        return (await self._load_domain_entries([domain]))[domain]
 
+    async def _load_domain_entries(self, domains: Sequence[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Cached entries for several domains, loading the stale ones together.
+
+        Stale domains are parsed concurrently off the event loop and their usage
+        metrics are fetched in one query. A domain already being loaded by another
+        request is awaited instead of loaded twice (single flight); if that request
+        is cancelled or fails before finishing, the waiters load the domain themselves.
+        """
+        now = time.time()
+        # Read before loading: a change while loading leaves the entry stale, not wrong
+        generation = self._watcher.generation()
+        entries: Dict[str, Optional[Dict[str, Any]]] = {}
+        in_flight: Dict[str, "asyncio.Future[Optional[Dict[str, Any]]]"] = {}
+        stale: List[str] = []
+        for domain in dict.fromkeys(domains):
+            if not DOMAIN_CATEGORY_MAPPING.get(domain):
+                entries[domain] = None
+                continue
+            cached_entry = self.rule_cache.get(domain)
             if cached_entry:
                 expired = now > cached_entry.get("expires_at", 0.0)
-                snapshot_changed = cached_entry.get("snapshot") != snapshot
-                if not expired and not snapshot_changed:
-                    return copy.deepcopy(cached_entry.get("rules", []))
+                if not expired and cached_entry.get("generation") == generation:
+                    entries[domain] = cached_entry
+                    continue
+            loading = self._domain_loads.get(domain)
+            if loading is not None:
+                in_flight[domain] = loading
+            else:
+                stale.append(domain)
 
-            tokens_response = self._token_loader("neural-forge", categories)
-            tokens_data = tokens_response.get("tokens", []) if isinstance(tokens_response, dict) else []
-            metrics_overlay: Dict[str, Dict[str, Any]] = {}
-            if tokens_data:
-                metrics_overlay = await self._load_metrics_for_tokens(tokens_data)
-
-            rules: List[Dict[str, Any]] = []
-            for token in tokens_data:
-                token_ref = self._token_metric_key(token)
-                overlay = metrics_overlay.get(token_ref) or self.token_metrics_cache.get(token_ref)
-                rule = {
-                    "name": token.get("name", "Unknown"),
-                    "description": token.get("description", "No description available"),
-                    "priority": self._determine_priority(token),
-                    "triggers": self._extract_triggers(token),
-                    "category": token.get("kind", domain),
-                    "rules": token.get("rules", []),
-                    "tokenRef": token_ref,
-                    "source": token.get("source"),
-                }
-                if overlay:
-                    rule["usageMetrics"] = overlay
-                    self.token_metrics_cache[token_ref] = overlay
-                rules.append(rule)
+        if stale:
+            loop = asyncio.get_running_loop()
+            futures = {domain: loop.create_future() for domain in stale}
+            self._domain_loads.update(futures)
+            loaded: Dict[str, Optional[Dict[str, Any]]] = {}
+            try:
+                loaded = await self._load_domains(stale, generation, now)
+                entries.update(loaded)
+            finally:
+                for domain, future in futures.items():
+                    if self._domain_loads.get(domain) is future:
+                        del self._domain_loads[domain]
+                    if domain in loaded:
+                        future.set_result(loaded[domain])
+                    else:
+                        # Cancelled (e.g. by its deadline) or raised: waiters retry the load
+                        future.cancel()
 
-            cached_rules = copy.deepcopy(rules)
-            updated_snapshot = self._compute_domain_snapshot(categories)
-            self.rule_cache[domain] = {
-                "rules": cached_rules,
-                "snapshot": updated_snapshot,
-                "expires_at": now + self._cache_ttl,
-            }
+        retry: List[str] = []
+        for domain, future in in_flight.items():
+            try:
+                entries[domain] = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # This request itself was cancelled
+                retry.append(domain)
+        if retry:
+            entries.update(await self._load_domain_entries(retry))
+        return entries
 
-            return rules
+    async def _load_domains(
+        self, domains: List[str], generation: int, now: float
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        async def fetch(domain: str) -> Optional[List[Dict[str, Any]]]:
+            try:
+                tokens_response = await asyncio.to_thread(
+                    self._token_loader, "neural-forge", DOMAIN_CATEGORY_MAPPING[domain]
+                )
+            except Exception as e:
+                logger.warning(f"Failed to load real Neural Forge rules for {domain}: {e}")
+                return None
+            return tokens_response.get("tokens", []) if isinstance(tokens_response, dict) else []
 
-        except Exception as e:
-            logger.warning(f"Failed to load real Neural Forge rules for {domain}: {e}")
-            self.rule_cache.pop(domain, None)
-            # Fallback to essential mock rules if real data fails
-            return self._get_fallback_rules(domain)
+        token_lists = await asyncio.gather(*(fetch(domain) for domain in domains))
+        all_tokens = [token for tokens in token_lists if tokens for token in tokens]
+        metrics_overlay: Dict[str, Dict[str, Any]] = {}
+        if all_tokens:
+            # One metrics query for every domain being loaded
+            metrics_overlay = await self._load_metrics_for_tokens(all_tokens)
+
+        entries: Dict[str, Optional[Dict[str, Any]]] = {}
+        for domain, tokens_data in zip(domains, token_lists):
+            entry = None
+            if tokens_data is not None:
+                try:
+                    entry = self._build_domain_entry(domain, tokens_data, metrics_overlay, generation, now)
+                except Exception as e:
+                    logger.warning(f"Failed to load real Neural Forge rules for {domain}: {e}")
+            if entry is None:
+                self.rule_cache.pop(domain, None)
+                # Callers fall back to essential mock rules if real data fails
+            else:
+                self.rule_cache[domain] = entry
+            entries[domain] = entry
+        return entries
+
+    def _build_domain_entry(
+        self,
+        domain: str,
+        tokens_data: List[Dict[str, Any]],
+        metrics_overlay: Dict[str, Dict[str, Any]],
+        generation: int,
+        now: float,
+    ) -> Dict[str, Any]:
+        rules: List[GovernanceRule] = []
+        for token in tokens_data:
+            token_ref = self._token_metric_key(token)
+            overlay = metrics_overlay.get(token_ref)
+            if overlay:
+                self.token_metrics_cache[token_ref] = overlay
+            rules.append(
+                GovernanceRule(
+                    name=token.get("name", "Unknown"),
+                    description=token.get("description", "No description available"),
+                    priority=self._determine_priority(token),
+                    triggers=tuple(self._extract_triggers(token)),
+                    category=token.get("kind", domain),
+                    rules=tuple(token.get("rules", [])),
+                    token_ref=token_ref,
+                    source=token.get("source"),
+                )
+            )
+
+        return {
+            "rules": rules,
+            "index": self._build_rule_index(rules, tokens_data),
+            "generation": generation,
+            "expires_at": now + self._cache_ttl,
+        }
+
+    def _build_rule_index(
+        self, rules: List[GovernanceRule], tokens: Optional[List[Dict[str, Any]]] = None
+    ) -> RuleIndex:
+        """Index rule triggers plus the backing tokens' appliesTo/patterns/linkedTags terms."""
+        documents: List[Dict[str, List[str]]] = []
+        for position, rule in enumerate(rules):
+            token = tokens[position] if tokens is not None else {}
+            linked: List[str] = []
+            linked_tags = token.get("linkedTags")
+            if isinstance(linked_tags, dict):
+                for values in linked_tags.values():
+                    if isinstance(values, list):
+                        linked.extend(values)
+            documents.append(
+                {
+                    "triggers": list(rule.triggers),
+                    "appliesTo": list(token.get("appliesTo") or []),
+                    "patterns": list(token.get("patterns") or []),
+                    "linkedTags": linked,
+                }
+            )
+        return RuleIndex(documents, keys=[rule.name for rule in rules])
 
     def _token_metric_key(self, token: Dict[str, Any]) -> str:
         """Derive a stable identifier for a token for metric storage."""
@@ -538,7 +896,7 @@ class PreActionGovernanceEngine:
         return weights.get(priority.lower(), 0.6)
 
     def _compute_effectiveness_sample(
-        self, context: GovernanceContext, rule: Dict[str, Any]
+        self, context: GovernanceContext, rule: Mapping[str, Any]
     ) -> float:
         base = max(0.0, min(context.confidence, 1.0))
         weight = self._priority_weight(rule.get("priority"))
@@ -551,7 +909,7 @@ class PreActionGovernanceEngine:
         return max(0.0, min(base * weight, 1.0))
 
     async def _record_token_metrics(
-        self, context: GovernanceContext, rules: List[Dict[str, Any]]
+        self, context: GovernanceContext, rules: List[AppliedRule]
     ) -> None:
         if not rules:
             return
@@ -567,23 +925,40 @@ class PreActionGovernanceEngine:
             token_ref = rule.get("tokenRef") or rule.get("source")
             if not token_ref:
                 continue
-            try:
-                sample = self._compute_effectiveness_sample(context, rule)
-                record = await record_governance_token_metric_pg(
-                    engine,
-                    token_id=str(token_ref),
-                    project_id=project_id,
-                    sample_effectiveness=sample,
-                    applied_at=now,
-                )
-            except Exception as exc:
-                logger.debug("Failed to record token metrics for %s: %s", token_ref, exc)
+            token_ref = str(token_ref)
+            sample = self._compute_effectiveness_sample(context, rule)
+            if not self.metrics_buffer.add(token_ref, project_id, sample, now):
                 continue
-            if record:
-                self.token_metrics_cache[record["tokenId"]] = record
-                rule["usageMetrics"] = record
-    
-    def _generate_summary(self, context: GovernanceContext, rules: List[Dict[str, Any]]) -> str:
+            record = self._project_token_metric(token_ref, project_id, sample, now)
+            self.token_metrics_cache[token_ref] = record
+            rule.usage_metrics = record
+
+    def _project_token_metric(
+        self, token_ref: str, project_id: Optional[str], sample: float, applied_at: datetime
+    ) -> Dict[str, Any]:
+        """Fold one sample into the cached metrics the way the buffered UPSERT will."""
+        project = normalize_project_id(project_id)
+        previous = self.token_metrics_cache.get(token_ref)
+        if not previous or previous.get("projectId") != project:
+            previous = {"tokenId": token_ref, "projectId": project, "createdAt": applied_at.isoformat()}
+        count = int(previous.get("activationCount") or 0)
+        score = float(previous.get("effectivenessScore") or 0.0)
+        return {
+            **previous,
+            "activationCount": count + 1,
+            "effectivenessScore": (score * count + sample) / (count + 1),
+            "lastAppliedAt": applied_at.isoformat(),
+            "updatedAt": applied_at.isoformat(),
+        }
+
+    def _apply_flushed_metrics(self, records: List[Dict[str, Any]]) -> None:
+        for record in records:
+            token_ref = record.get("tokenId")
+            # Samples buffered during the write are already folded into the projection
+            if token_ref and not self.metrics_buffer.is_pending(token_ref, record.get("projectId")):
+                self.token_metrics_cache[token_ref] = record
+
+    def _generate_summary(self, context: GovernanceContext, rules: List[AppliedRule]) -> str:
         """Generate a summary of governance recommendations"""
         activity_name = context.activity_type.value.replace("_", " ").title()
         rule_count = len(rules)
@@ -603,7 +978,7 @@ class PreActionGovernanceEngine:
             
         return summary
     
-    def _extract_key_principles(self, context: GovernanceContext, rules: List[Dict[str, Any]]) -> List[str]:
+    def _extract_key_principles(self, context: GovernanceContext, rules: List[AppliedRule]) -> List[str]:
         """Extract key principles from relevant rules"""
         principles = []
         
@@ -613,7 +988,7 @@ class PreActionGovernanceEngine:
         
         return principles[:5]  # Limit to top 5 principles
     
-    def _generate_warnings(self, context: GovernanceContext, rules: List[Dict[str, Any]]) -> List[str]:
+    def _generate_warnings(self, context: GovernanceContext, rules: List[AppliedRule]) -> List[str]:
         """Generate warnings based on activity type and rules"""
         warnings = []
         
@@ -634,12 +1009,30 @@ class PreActionGovernanceEngine:
     
     async def format_governance_output(self, recommendation: GovernanceRecommendation) -> str:
         """Format governance recommendation for injection into AI planning"""
-        
+        template = recommendation.template
+        # Only reuse the memoized text when the caller has not edited the recommendation
+        if template is not None and not (
+            recommendation.summary == template.summary
+            and recommendation.key_principles == template.key_principles
+            and recommendation.warnings == template.warnings
+        ):
+            template = None
+        if template is not None and template.text is not None:
+            head, tail = template.text
+        else:
+            head, tail = self._format_skeleton(recommendation)
+            if template is not None:
+                template.text = (head, tail)
+        return f"{head}\n**Confidence:** {recommendation.confidence:.1%}\n{tail}"
+
+    def _format_skeleton(self, recommendation: GovernanceRecommendation) -> Tuple[str, str]:
+        """Formatted output before and after the confidence line."""
+        head = []
+        head.append("🧠 **NEURAL FORGE GOVERNANCE ACTIVATED**")
+        head.append("")
+        head.append(f"**Activity Detected:** {recommendation.activity_type.value.replace('_', ' ').title()}")
+
         output = []
-        output.append("🧠 **NEURAL FORGE GOVERNANCE ACTIVATED**")
-        output.append("")
-        output.append(f"**Activity Detected:** {recommendation.activity_type.value.replace('_', ' ').title()}")
-        output.append(f"**Confidence:** {recommendation.confidence:.1%}")
         output.append("")
         
         if recommendation.summary:
@@ -660,7 +1053,7 @@ class PreActionGovernanceEngine:
         output.append("")
         output.append("---")
         
-        return "\n".join(output)
+        return "\n".join(head), "\n".join(output)
 
 
 # Global instance for use across the application
@@ -671,6 +1064,7 @@ async def activate_pre_action_governance(
     user_message: str,
     conversation_history: Optional[List[str]] = None,
     project_id: Optional[str] = None,
+    classification: Optional[Classification[ActivityType]] = None,
 ) -> Optional[str]:
     """
     Main entry point for pre-action governance activation
@@ -682,6 +1076,7 @@ async def activate_pre_action_governance(
         user_message: Current user message to analyze
         conversation_history: Previous conversation messages for context
         project_id: Optional project identifier to scope governance metrics
+        classification: Optional precomputed classification of the same context
         
     Returns:
         Formatted governance guidance string or None if no activation needed
@@ -691,7 +1086,7 @@ async def activate_pre_action_governance(
     
     # Analyze context
     context = await governance_engine.analyze_context(
-        user_message, conversation_history, project_id=project_id
+        user_message, conversation_history, project_id=project_id, classification=classification
     )
     
     # Only activate if confidence is above threshold (lowered for better coverage)
@@ -710,3 +1105,41 @@ async def activate_pre_action_governance(
     logger.info(f"Pre-action governance activated for {context.activity_type.value} with {context.confidence:.1%} confidence")
     
     return governance_output
+
+
+async def activate_pre_action_governance_batch(
+    messages: Sequence[Tuple[str, Optional[List[str]]]],
+    project_id: Optional[str] = None,
+    force_activation: bool = False,
+) -> List[Optional[str]]:
+    """
+    Batch entry point: governance guidance for many messages, in order
+
+    Messages are classified together (shared history is scanned once), each
+    domain's rules are loaded once through the engine caches, repeated contexts
+    hit the recommendation memo, and the usage metrics of the whole batch are
+    written in a single flush.
+
+    Args:
+        messages: (user_message, conversation_history) pairs
+        project_id: Optional project identifier to scope governance metrics
+        force_activation: Return guidance even when confidence is below the threshold
+
+    Returns:
+        Formatted guidance per message, None where no activation is needed
+    """
+    contexts = await governance_engine.analyze_contexts(messages, project_id=project_id)
+    outputs: List[Optional[str]] = []
+    for context in contexts:
+        if not force_activation and (
+            context.confidence < 0.10 or not await governance_engine.should_activate_governance(context)
+        ):
+            outputs.append(None)
+            continue
+        recommendation = await governance_engine.get_governance_recommendations(context)
+        outputs.append(await governance_engine.format_governance_output(recommendation))
+    await governance_engine.metrics_buffer.flush()
+
+    activated = sum(1 for output in outputs if output)
+    logger.info(f"Pre-action governance batch: {activated}/{len(outputs)} messages activated")
+    return outputs
@@ -0,0 +1,125 @@
+"""
+Inverted trigger index for governance rule selection.
+
+Each domain's rules are indexed once, when the domain is (re)loaded into the
+engine's rule cache. Terms come from the rule triggers and from the token's
+`appliesTo`, `patterns` and `linkedTags` metadata; each term maps to the rules
+that mention it together with a field weight. At request time only the
+postings for the detected keywords are touched, so scoring cost depends on
+the query, not on the number of tokens in the catalog.
+
+Terms are normalized the same way on both sides: lowercase, split into words
+on anything that is not a letter or digit (so "access_control" and
+"Access control" are the same phrase). Every phrase is indexed as a whole and,
+at a reduced weight, word by word.
+"""
+from __future__ import annotations
+
+import heapq
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+# Relative weight of each metadata field when a query term matches it
+FIELD_WEIGHTS: Dict[str, float] = {
+    "triggers": 1.0,
+    "appliesTo": 0.8,
+    "patterns": 0.8,
+    "linkedTags": 0.5,
+}
+# Matching a single word of a phrase counts for less than matching the phrase
+WORD_WEIGHT = 0.5
+MIN_WORD_LENGTH = 3
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({"and", "are", "for", "from", "how", "into", "let", "the", "this", "that", "with", "use"})
+
+# (score, -source, -position): the heap prefers higher scores, then earlier sources/positions
+_Ranked = Tuple[float, int, int]
+
+
+def terms_for(text: str) -> Dict[str, float]:
+    """Return normalized terms for ``text`` with their relative weight."""
+    words = _WORD_RE.findall(text.lower().replace("_", " "))
+    if not words:
+        return {}
+    terms: Dict[str, float] = {" ".join(words): 1.0}
+    if len(words) > 1:
+        for word in words:
+            if len(word) >= MIN_WORD_LENGTH and word not in _STOPWORDS:
+                terms.setdefault(word, WORD_WEIGHT)
+    return terms
+
+
+def query_terms(keywords: Iterable[str]) -> Set[str]:
+    """Normalize detected keywords into the distinct terms to look up."""
+    terms: Set[str] = set()
+    for keyword in keywords:
+        if isinstance(keyword, str):
+            terms.update(terms_for(keyword))
+    return terms
+
+
+class RuleIndex:
+    """Term -> {rule position: weight} postings for one domain's rules.
+
+    ``keys`` optionally names each document (e.g. the token name) so callers can
+    find a rule's position without scanning the rule list.
+    """
+
+    __slots__ = ("size", "_postings", "_positions")
+
+    def __init__(self, documents: Sequence[Mapping[str, Iterable[str]]], keys: Optional[Sequence[str]] = None) -> None:
+        self.size = len(documents)
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._positions: Dict[str, int] = {}
+        for position, key in enumerate(keys or ()):
+            self._positions.setdefault(key, position)
+        for position, fields in enumerate(documents):
+            for field, values in fields.items():
+                field_weight = FIELD_WEIGHTS.get(field, 0.5)
+                for value in values:
+                    if not isinstance(value, str):
+                        continue
+                    for term, weight in terms_for(value).items():
+                        posting = self._postings.setdefault(term, {})
+                        # A term is counted once per rule, at its strongest field
+                        posting[position] = max(posting.get(position, 0.0), field_weight * weight)
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def position_of(self, key: str) -> Optional[int]:
+        return self._positions.get(key)
+
+    def score(self, terms: Iterable[str]) -> Dict[int, float]:
+        """Sum posting weights of ``terms`` per matching rule position."""
+        scores: Dict[int, float] = {}
+        for term in terms:
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            for position, weight in posting.items():
+                scores[position] = scores.get(position, 0.0) + weight
+        return scores
+
+
+def top_k(scored: Iterable[Tuple[float, int, int]], k: int) -> List[Tuple[int, int]]:
+    """Pick the ``k`` best ``(score, source, position)`` entries.
+
+    Ties go to the earlier source, then the earlier position, which keeps
+    the catalog order for rules of equal relevance.
+    """
+    ranked: Iterable[_Ranked] = ((score, -source, -position) for score, source, position in scored)
+    return [(-source, -position) for _, source, position in heapq.nlargest(k, ranked)]
+
+
+def effectiveness_of(metrics: Optional[Mapping[str, object]]) -> float:
+    """Clamp a usage-metrics row's effectiveness score into [0, 1]."""
+    if not metrics:
+        return 0.0
+    value = metrics.get("effectivenessScore")
+    try:
+        score = float(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return 0.0
+    return max(0.0, min(score, 1.0))
@@ -0,0 +1,108 @@
+"""
+Immutable governance rule records.
+
+Rules loaded from the token catalog are cached per domain and shared by every
+request, so they are frozen, slotted records rather than dicts: a cache hit
+hands out references instead of deep copies. Anything that varies per request
+(currently the token's usage metrics) lives in an `AppliedRule` overlay that
+wraps the shared record.
+
+Both types implement the read-only Mapping protocol with the legacy dict keys
+(`rule["name"]`, `rule.get("tokenRef")`, ...) so summary/formatting code and
+callers that treated rules as dicts keep working. `to_dict()` returns a plain,
+mutable copy for serialization.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+_FIELDS: Dict[str, str] = {
+    "name": "name",
+    "description": "description",
+    "priority": "priority",
+    "triggers": "triggers",
+    "category": "category",
+    "rules": "rules",
+    "tokenRef": "token_ref",
+    "source": "source",
+}
+_LIST_FIELDS = ("triggers", "rules")
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class GovernanceRule(Mapping):
+    name: str
+    description: str
+    priority: str
+    triggers: Tuple[str, ...]
+    category: Optional[str]
+    rules: Tuple[Any, ...]
+    token_ref: str
+    source: Optional[str]
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "GovernanceRule":
+        return cls(
+            name=data.get("name", "Unknown"),
+            description=data.get("description", "No description available"),
+            priority=data.get("priority", "medium"),
+            triggers=tuple(data.get("triggers") or ()),
+            category=data.get("category"),
+            rules=tuple(data.get("rules") or ()),
+            token_ref=data.get("tokenRef") or "",
+            source=data.get("source"),
+        )
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, _FIELDS[key])
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_FIELDS)
+
+    def __len__(self) -> int:
+        return len(_FIELDS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {key: getattr(self, attr) for key, attr in _FIELDS.items()}
+        for key in _LIST_FIELDS:
+            data[key] = list(data[key])
+        return data
+
+
+class AppliedRule(Mapping):
+    """A shared rule plus the usage metrics observed for it in one request."""
+
+    __slots__ = ("rule", "usage_metrics")
+
+    def __init__(self, rule: GovernanceRule, usage_metrics: Optional[Dict[str, Any]] = None) -> None:
+        self.rule = rule
+        self.usage_metrics = usage_metrics
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "usageMetrics":
+            if self.usage_metrics is None:
+                raise KeyError(key)
+            return self.usage_metrics
+        return self.rule[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from _FIELDS
+        if self.usage_metrics is not None:
+            yield "usageMetrics"
+
+    def __len__(self) -> int:
+        return len(_FIELDS) + (self.usage_metrics is not None)
+
+    def __repr__(self) -> str:
+        return f"AppliedRule({self.rule.name!r}, usage_metrics={self.usage_metrics!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = self.rule.to_dict()
+        if self.usage_metrics is not None:
+            data["usageMetrics"] = dict(self.usage_metrics)
+        return data
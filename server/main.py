@@ -11,25 +11,34 @@ from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_
 from sqlalchemy import text
 
 from server.core import orchestrator
+from server.core.events import bus as event_bus
 from server.core.orchestrator import (
     WATCHDOG_ACTIONS_TOTAL,
     WATCHDOG_DURATION,
     WATCHDOG_ERRORS_TOTAL,
     WATCHDOG_SCANS_TOTAL,
 )
+from server.core.sse import HEARTBEAT_SECONDS as SSE_HEARTBEAT_SECONDS, sse_broker
 from server.db.engine import get_async_engine
 from server.db.repo import (
+    MEMORY_ENTRY_FILTER,
     fetch_governance_token_metrics_pg,
     watchdog_count_stale_inprogress_pg,
     watchdog_fail_stale_inprogress_pg,
     watchdog_list_stale_inprogress_pg,
     watchdog_requeue_stale_inprogress_pg,
 )
+from server.governance.pre_action_engine import governance_engine
+from server.memory.backfill import embedding_backfill, is_async_embedding_enabled
+from server.memory.semantic import close_embedder, is_semantic_enabled
+from server.nf_client.catalog import get_catalog
+from server.nf_client.embeddings import get_token_embeddings
 from server.observability.tracing import (
     get_tracing_status,
     instrument_fastapi_app,
     is_tracing_enabled,
     setup_tracing,
+    spans_enabled,
 )
 from server.utils.logger import log_json
 from server.utils.time import utc_now_iso_z
@@ -77,18 +86,38 @@ async def lifespan(app: FastAPI):
                 instrument_fastapi_app(app)
     except Exception as e:
         log_json("warning", "otel.init_failed", error=str(e))
+    # Load (or rebuild) the token catalog snapshot before serving requests
+    try:
+        get_catalog()
+        # Token embeddings for semantic rule ranking (no-op unless semantic search is enabled)
+        await asyncio.to_thread(get_token_embeddings)
+    except Exception as e:
+        log_json("warning", "catalog.load_failed", error=str(e))
+    # Re-resolve EventBus hot-path config now that tracing/logging are settled
+    event_bus.reload_config()
+    await sse_broker.start()
+    await governance_engine.metrics_buffer.start()
     # Start orchestrator if enabled
     orch_flag = os.getenv("ORCHESTRATOR_ENABLED", "true")
     if _truthy(orch_flag):
         await orchestrator.start()
     else:
         log_json("info", "orchestrator.disabled", reason="ORCHESTRATOR_ENABLED=false")
+    # Background embedding of entries added with MEMORY_EMBED_ASYNC (and older NULL-embedding rows)
+    if is_async_embedding_enabled():
+        await embedding_backfill.start()
     try:
         yield
     finally:
         orch_flag = os.getenv("ORCHESTRATOR_ENABLED", "true")
         if _truthy(orch_flag) and orchestrator.is_running:
             await orchestrator.stop()
+        await embedding_backfill.stop()
+        # Stop embedding worker processes, if any
+        close_embedder()
+        # Write buffered governance token metrics before the engine is disposed
+        await governance_engine.metrics_buffer.stop()
+        await sse_broker.stop()
 
 app = FastAPI(title="Windsurf MCP Memory/Planning", lifespan=lifespan)
 
@@ -152,12 +181,39 @@ async def register_post():
 
 @app.get("/sse")
 async def sse(request: Request, authorization: str | None = Header(None)):
+    """Stream governance.* and task.* events.
+
+    Query params: projectId (optional filter), types (comma-separated, e.g.
+    "governance.*,task.claimed"). Honors Last-Event-ID (header or lastEventId
+    query param) to resume from the broker's replay buffer.
+    """
     require_auth(authorization, request)
+    project_id = request.query_params.get("projectId") or None
+    raw_types = request.query_params.get("types") or ""
+    types = [t.strip() for t in raw_types.split(",") if t.strip()] or None
+    raw_last = request.headers.get("last-event-id") or request.query_params.get("lastEventId")
+    last_event_id = None
+    if raw_last:
+        try:
+            last_event_id = int(raw_last)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ERR.BAD_REQUEST")
+    try:
+        client = sse_broker.connect(project_id, types, last_event_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ERR.BAD_REQUEST")
+
     async def eventgen():
-        yield "event: ready\ndata: {}\n\n"
-        while True:
-            await asyncio.sleep(10)
-            yield "event: heartbeat\ndata: {}\n\n"
+        try:
+            yield "event: ready\ndata: {}\n\n"
+            while True:
+                frames = await client.drain(SSE_HEARTBEAT_SECONDS)
+                if frames:
+                    yield "".join(frames)
+                else:
+                    yield "event: heartbeat\ndata: {}\n\n"
+        finally:
+            sse_broker.disconnect(client)
     return StreamingResponse(eventgen(), media_type="text/event-stream")
 
 @app.post("/sse")
@@ -211,6 +267,35 @@ async def handle_mcp_message(message: dict) -> dict:
                     "required": ["user_message"]
                 }
             },
+            {
+                "name": "activate_governance_batch",
+                "description": "Activate pre-action governance for many messages in one call; results keep input order",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "projectId": {"type": "string"},
+                        "messages": {
+                            "type": "array",
+                            "items": {
+                                "oneOf": [
+                                    {"type": "string"},
+                                    {
+                                        "type": "object",
+                                        "properties": {
+                                            "user_message": {"type": "string"},
+                                            "conversation_history": {"type": "array", "items": {"type": "string"}}
+                                        },
+                                        "required": ["user_message"]
+                                    },
+                                    {"type": "array", "minItems": 1, "maxItems": 2}
+                                ]
+                            }
+                        },
+                        "force_activation": {"type": "boolean"}
+                    },
+                    "required": ["messages"]
+                }
+            },
             {
                 "name": "add_memory",
                 "description": "Add a new memory item",
@@ -239,6 +324,29 @@ async def handle_mcp_message(message: dict) -> dict:
                     "required": ["type", "projectId", "content"]
                 }
             },
+            {
+                "name": "ingest_events",
+                "description": "Ingest a batch of conversation message events in order (e.g. a transcript replay)",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "projectId": {"type": "string"},
+                        "events": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "type": {"type": "string", "enum": ["conversation.message"]},
+                                    "role": {"type": "string"},
+                                    "content": {"type": "string"}
+                                },
+                                "required": ["type", "content"]
+                            }
+                        }
+                    },
+                    "required": ["projectId", "events"]
+                }
+            },
             {
                 "name": "get_memory",
                 "description": "Retrieve a memory item by ID",
@@ -525,7 +633,8 @@ async def admin_stats(
                 params["project_id"] = projectId
             w = f" WHERE {' AND '.join(where)}" if where else ""
             async with engine.connect() as conn:
-                r = await conn.execute(text(f"SELECT COUNT(*) FROM memory_entries{w}"), params)
+                mem_where = " AND ".join([*where, MEMORY_ENTRY_FILTER])
+                r = await conn.execute(text(f"SELECT COUNT(*) FROM memory_entries WHERE {mem_where}"), params)
                 row_pg = r.fetchone()
                 mem_count = int(row_pg[0]) if row_pg and row_pg[0] is not None else 0
 
@@ -604,14 +713,14 @@ async def admin_memory_meta(
             if engine is None:
                 raise HTTPException(status_code=503, detail="ERR.DB_UNAVAILABLE: DATABASE_URL not configured")
 
-            cond = []
+            cond = [MEMORY_ENTRY_FILTER]
             params: Dict[str, Any] = {"limit": int(limit), "offset": int(offset)}
             if projectId and projectId.strip():
                 cond.append("project_id = :project_id")
                 params["project_id"] = projectId
             if quarantinedOnly:
                 cond.append("quarantined = TRUE")
-            where = f" WHERE {' AND '.join(cond)}" if cond else ""
+            where = f" WHERE {' AND '.join(cond)}"
             q_pg = text(
                 f"""
                 SELECT id, project_id, quarantined, created_at, LENGTH(content) AS size
@@ -889,6 +998,88 @@ async def admin_token_metrics(
         log_json("error", "admin_token_metrics_exception", error=str(e))
         raise HTTPException(status_code=500, detail=f"ERR.UNAVAILABLE: {e}")
 
+@app.post("/admin/memory/embeddings/backfill")
+async def admin_memory_embeddings_backfill(
+    request: Request,
+    authorization: str | None = Header(None),
+    projectId: str | None = None,
+    limit: int | None = None,
+    afterCreatedAt: str | None = None,
+    afterId: str | None = None,
+):
+    """Admin: embed memory entries that have no embedding yet, in the background.
+
+    Walks pending rows oldest first with a keyset cursor (createdAt, id).
+    - projectId: optional filter
+    - limit: maximum rows to process (default: the whole backlog)
+    - afterCreatedAt/afterId: resume after the cursor reported by a previous job
+    Only one job runs at a time; poll GET on this path for progress.
+    """
+    require_auth(authorization, request)
+    endpoint = "admin_memory_embeddings_backfill"
+    REQ_COUNTER.labels(endpoint).inc()
+    try:
+        with REQ_LATENCY.labels(endpoint).time():
+            if get_async_engine() is None:
+                raise HTTPException(status_code=503, detail="ERR.DB_UNAVAILABLE: DATABASE_URL not configured")
+            if not is_semantic_enabled():
+                raise HTTPException(status_code=409, detail="ERR.SEMANTIC_DISABLED: semantic search is not enabled")
+            if (afterCreatedAt is None) != (afterId is None):
+                raise HTTPException(status_code=400, detail="ERR.BAD_REQUEST: afterCreatedAt and afterId go together")
+            max_rows = int(limit) if limit is not None and int(limit) > 0 else None
+            proj = projectId if (projectId and projectId.strip()) else None
+            after = (afterCreatedAt, afterId) if afterCreatedAt is not None and afterId is not None else None
+
+            started, job = embedding_backfill.start_job(project_id=proj, after=after, max_rows=max_rows)
+            log_json("info", "admin_memory_embeddings_backfill", started=started, projectId=proj, limit=max_rows)
+            return {
+                "serverVersion": SERVER_VERSION,
+                "timestamp": utc_now_iso_z(),
+                "status": "started" if started else "running",
+                "job": job,
+            }
+    except HTTPException as e:
+        ERR_COUNTER.labels(endpoint, str(e.status_code)).inc()
+        log_json("error", "admin_memory_embeddings_backfill_http_error", status_code=e.status_code)
+        raise e
+    except Exception as e:
+        ERR_COUNTER.labels(endpoint, "500").inc()
+        log_json("error", "admin_memory_embeddings_backfill_exception", error=str(e))
+        raise HTTPException(status_code=500, detail=f"ERR.UNAVAILABLE: {e}")
+
+@app.get("/admin/memory/embeddings/backfill")
+async def admin_memory_embeddings_backfill_status(
+    request: Request,
+    authorization: str | None = Header(None),
+):
+    """Admin: embedding backlog (pending rows, age of the oldest) and the last backfill job."""
+    require_auth(authorization, request)
+    endpoint = "admin_memory_embeddings_backfill_status"
+    REQ_COUNTER.labels(endpoint).inc()
+    try:
+        with REQ_LATENCY.labels(endpoint).time():
+            engine = get_async_engine()
+            if engine is None:
+                raise HTTPException(status_code=503, detail="ERR.DB_UNAVAILABLE: DATABASE_URL not configured")
+            stats = await embedding_backfill.refresh_stats(engine)
+            return {
+                "serverVersion": SERVER_VERSION,
+                "timestamp": utc_now_iso_z(),
+                "asyncEmbedding": is_async_embedding_enabled(),
+                "workerRunning": embedding_backfill.is_running,
+                "pending": stats["pending"],
+                "lagSeconds": stats["lagSeconds"],
+                "job": embedding_backfill.job_status(),
+            }
+    except HTTPException as e:
+        ERR_COUNTER.labels(endpoint, str(e.status_code)).inc()
+        log_json("error", "admin_memory_embeddings_backfill_status_http_error", status_code=e.status_code)
+        raise e
+    except Exception as e:
+        ERR_COUNTER.labels(endpoint, "500").inc()
+        log_json("error", "admin_memory_embeddings_backfill_status_exception", error=str(e))
+        raise HTTPException(status_code=500, detail=f"ERR.UNAVAILABLE: {e}")
+
 # Tool registration stubs
 from .tools import (
     activate_governance,
@@ -901,6 +1092,7 @@ from .tools import (
     get_rules,
     get_token_metrics,
     ingest_event,
+    ingest_events,
     list_recent,
     log_error,
     save_diff,
@@ -910,8 +1102,10 @@ from .tools import (
 
 TOOLS.update({
     "activate_governance": activate_governance.activate_governance,
+    "activate_governance_batch": activate_governance.activate_governance_batch,
     "add_memory": add_memory.handler,
     "ingest_event": ingest_event.handler,
+    "ingest_events": ingest_events.handler,
     "get_memory": get_memory.handler,
     "search_memory": search_memory.handler,
     "save_diff": save_diff.handler,
@@ -933,32 +1127,33 @@ async def tool(name: str, request: Request, authorization: str | None = Header(N
     # is disabled in app lifespan and instrumented ad-hoc in tests.
     otel_cm = None
     otel_span = None
-    try:  # Lazy import to avoid hard dependency
-        from opentelemetry import trace as _trace
-        from opentelemetry.trace import SpanKind as _SpanKind
-        current = _trace.get_current_span()
-        has_active = False
-        try:
-            sc = current.get_span_context()  # type: ignore[attr-defined]
-            has_active = bool(sc and getattr(sc, "is_valid", False))
-        except Exception:
+    if spans_enabled():
+        try:  # Lazy import to avoid hard dependency
+            from opentelemetry import trace as _trace
+            from opentelemetry.trace import SpanKind as _SpanKind
+            current = _trace.get_current_span()
             has_active = False
-        if not has_active:
-            tracer = _trace.get_tracer("server.fastapi")
-            route_template = "/tool/{name}"
-            method = request.method
-            path = request.url.path
-            otel_cm = tracer.start_as_current_span(f"{method} {route_template}", kind=_SpanKind.SERVER)
-            otel_span = otel_cm.__enter__()
             try:
-                otel_span.set_attribute("http.method", method)
-                otel_span.set_attribute("http.route", route_template)
-                otel_span.set_attribute("http.target", path)
+                sc = current.get_span_context()  # type: ignore[attr-defined]
+                has_active = bool(sc and getattr(sc, "is_valid", False))
             except Exception:
-                pass
-    except Exception:
-        otel_cm = None
-        otel_span = None
+                has_active = False
+            if not has_active:
+                tracer = _trace.get_tracer("server.fastapi")
+                route_template = "/tool/{name}"
+                method = request.method
+                path = request.url.path
+                otel_cm = tracer.start_as_current_span(f"{method} {route_template}", kind=_SpanKind.SERVER)
+                otel_span = otel_cm.__enter__()
+                try:
+                    otel_span.set_attribute("http.method", method)
+                    otel_span.set_attribute("http.route", route_template)
+                    otel_span.set_attribute("http.target", path)
+                except Exception:
+                    pass
+        except Exception:
+            otel_cm = None
+            otel_span = None
 
     require_auth(authorization, request)
     if name not in TOOLS:
@@ -0,0 +1,256 @@
+"""
+Background embedding of memory entries.
+
+With MEMORY_EMBED_ASYNC enabled, `add_memory` inserts entries without an
+embedding and wakes this pipeline instead of waiting on the model. The
+pipeline also covers entries written while semantic search was disabled: any
+row with a NULL embedding that is not a chunk parent is pending.
+
+Pending rows are walked oldest first with keyset pagination on
+(created_at, id), embedded in batches (one model call per batch, one UPDATE
+per batch) and long entries are chunked like synchronous writes. A pass
+ends when the backlog is exhausted; rows that failed are retried by the next
+pass. The admin backfill (`POST /admin/memory/embeddings/backfill`) runs the
+same pass once, optionally per project; its cursor is reported so an
+interrupted run can be resumed with ``after``.
+
+Config (env):
+- MEMORY_EMBED_ASYNC: embed new entries in the background (default false)
+- MEMORY_EMBED_BATCH_SIZE: rows per batch (default 64)
+- MEMORY_EMBED_POLL_SECONDS: interval between backlog passes when not woken (default 5.0)
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from server.db.engine import get_async_engine
+from server.db.repo import (
+    list_pending_embeddings_pg,
+    pending_embedding_stats_pg,
+    replace_memory_chunks_pg,
+    update_memory_embeddings_pg,
+)
+from server.memory.chunking import chunk_rows, embed_chunks, needs_chunking
+from server.memory.semantic import compute_embeddings, is_semantic_enabled
+from server.utils.logger import log_json
+from server.utils.time import utc_now_iso_z
+
+
+def _truthy(v: Optional[str]) -> bool:
+    return (v or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+EMBED_ASYNC = _truthy(os.getenv("MEMORY_EMBED_ASYNC"))
+BATCH_SIZE = int(os.getenv("MEMORY_EMBED_BATCH_SIZE", "64"))
+POLL_SECONDS = float(os.getenv("MEMORY_EMBED_POLL_SECONDS", "5.0"))
+
+
+def is_async_embedding_enabled() -> bool:
+    return EMBED_ASYNC and is_semantic_enabled()
+
+
+class EmbeddingBackfill:
+    """Embeds pending memory entries in batches; one pass at a time."""
+
+    def __init__(self, *, batch_size: int = BATCH_SIZE, poll_seconds: float = POLL_SECONDS) -> None:
+        self.batch_size = max(batch_size, 1)
+        self.poll_seconds = max(poll_seconds, 0.01)
+        self._wake = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._job: Optional[asyncio.Task] = None
+        self._job_status: Optional[Dict[str, Any]] = None
+        # The background loop and an admin job never embed the same rows concurrently
+        self._pass_lock = asyncio.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._loop_task is not None and not self._loop_task.done()
+
+    async def start(self) -> None:
+        if self.is_running:
+            return
+        self._wake = asyncio.Event()
+        self._loop_task = asyncio.create_task(self._run())
+        log_json("info", "memory.embed_backfill_started", batch_size=self.batch_size, poll_seconds=self.poll_seconds)
+
+    async def stop(self) -> None:
+        for task in (self._loop_task, self._job):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._loop_task = None
+        self._job = None
+
+    def wake(self) -> None:
+        """Start a pass now rather than at the next poll."""
+        self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.run_pass()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                log_json("warning", "memory.embed_backfill_failed", error=str(exc))
+
+    async def run_pass(
+        self,
+        *,
+        project_id: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        max_rows: Optional[int] = None,
+        progress: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Embed pending rows after ``after`` until the backlog (or ``max_rows``) is exhausted."""
+        progress = progress if progress is not None else {}
+        progress.update({"embedded": 0, "failed": 0, "cursor": list(after) if after else None})
+        engine = get_async_engine()
+        if engine is None or not is_semantic_enabled():
+            return progress
+        async with self._pass_lock:
+            cursor = after
+            seen = 0
+            while max_rows is None or seen < max_rows:
+                limit = self.batch_size if max_rows is None else min(self.batch_size, max_rows - seen)
+                rows = await list_pending_embeddings_pg(engine, limit=limit, project_id=project_id, after=cursor)
+                if not rows:
+                    break
+                embedded, failed = await self._embed_batch(engine, rows)
+                seen += len(rows)
+                cursor = (rows[-1]["createdAt"], rows[-1]["id"])
+                progress["embedded"] += embedded
+                progress["failed"] += failed
+                progress["cursor"] = list(cursor)
+                if failed == len(rows):
+                    # Nothing in a whole batch could be embedded; leave the rest for the next pass
+                    break
+            await self.refresh_stats(engine)
+        return progress
+
+    async def _embed_batch(self, engine: Any, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+        started = time.perf_counter()
+        short: List[Dict[str, Any]] = []
+        long: List[Dict[str, Any]] = []
+        for row in rows:
+            (long if needs_chunking(row["content"]) else short).append(row)
+        embedded = failed = 0
+        done: List[Dict[str, Any]] = []
+        if short:
+            try:
+                vectors = await compute_embeddings([row["content"] for row in short])
+            except Exception as exc:
+                log_json("warning", "memory.embed_batch_failed", rows=len(short), error=str(exc))
+                vectors = None
+            if vectors is None:
+                failed += len(short)
+            else:
+                await update_memory_embeddings_pg(
+                    engine, embeddings={row["id"]: vec for row, vec in zip(short, vectors)}
+                )
+                embedded += len(short)
+                done.extend(short)
+        for row in long:
+            try:
+                chunks = await embed_chunks(row["content"])
+                if not chunks:
+                    raise RuntimeError("embedding unavailable")
+                await replace_memory_chunks_pg(engine, mem_id=row["id"], chunks=chunk_rows(row["id"], chunks))
+            except Exception as exc:
+                log_json("warning", "memory.embed_chunks_failed", memoryId=row["id"], error=str(exc))
+                failed += 1
+                continue
+            embedded += 1
+            done.append(row)
+        for row in done:
+            MEMORY_EMBED_DELAY.observe(row.get("ageSeconds", 0.0))
+        MEMORY_EMBED_BATCH_SECONDS.observe(time.perf_counter() - started)
+        MEMORY_EMBEDDED.labels(result="ok").inc(embedded)
+        MEMORY_EMBEDDED.labels(result="error").inc(failed)
+        return embedded, failed
+
+    async def refresh_stats(self, engine: Any = None) -> Dict[str, Any]:
+        """Update the backlog gauges; returns {"pending", "lagSeconds"}."""
+        engine = engine or get_async_engine()
+        if engine is None:
+            return {"pending": 0, "lagSeconds": 0.0}
+        stats = await pending_embedding_stats_pg(engine)
+        MEMORY_EMBED_PENDING.set(stats["pending"])
+        MEMORY_EMBED_LAG.set(stats["lagSeconds"])
+        return stats
+
+    def start_job(
+        self,
+        *,
+        project_id: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        max_rows: Optional[int] = None,
+    ) -> Tuple[bool, Dict[str, Any]]:
+        """Start an admin backfill unless one is running; returns (started, job status)."""
+        if self._job is not None and not self._job.done():
+            return False, dict(self._job_status or {})
+        status: Dict[str, Any] = {
+            "state": "running",
+            "projectId": project_id,
+            "maxRows": max_rows,
+            "startedAt": utc_now_iso_z(),
+            "finishedAt": None,
+        }
+        self._job_status = status
+        self._job = asyncio.create_task(self._run_job(status, project_id, after, max_rows))
+        return True, dict(status)
+
+    async def _run_job(
+        self,
+        status: Dict[str, Any],
+        project_id: Optional[str],
+        after: Optional[Tuple[str, str]],
+        max_rows: Optional[int],
+    ) -> None:
+        try:
+            await self.run_pass(project_id=project_id, after=after, max_rows=max_rows, progress=status)
+            status["state"] = "done"
+        except asyncio.CancelledError:
+            status["state"] = "cancelled"
+            raise
+        except Exception as exc:
+            status["state"] = "failed"
+            status["error"] = str(exc)
+        finally:
+            status["finishedAt"] = utc_now_iso_z()
+            log_json("info", "memory.embed_backfill_job", **{k: v for k, v in status.items() if k != "maxRows"})
+
+    def job_status(self) -> Optional[Dict[str, Any]]:
+        return dict(self._job_status) if self._job_status is not None else None
+
+
+embedding_backfill = EmbeddingBackfill()
+
+
+# Prometheus metrics
+MEMORY_EMBED_PENDING = Gauge("memory_embedding_pending", "Memory entries waiting for an embedding")
+MEMORY_EMBED_LAG = Gauge(
+    "memory_embedding_lag_seconds", "Age of the oldest memory entry waiting for an embedding"
+)
+MEMORY_EMBEDDED = Counter(
+    "memory_embeddings_total", "Memory entries embedded in the background", ["result"]
+)
+MEMORY_EMBED_DELAY = Histogram(
+    "memory_embedding_delay_seconds", "Time from insert to background embedding per entry"
+)
+MEMORY_EMBED_BATCH_SECONDS = Histogram(
+    "memory_embedding_batch_seconds", "Time to embed and store one background batch"
+)
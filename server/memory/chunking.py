@@ -0,0 +1,132 @@
+"""
+Chunking for memory entries longer than the embedding model's input window.
+
+MiniLM truncates its input at about 256 word pieces, so a single vector for a
+long entry only describes its beginning. Long content is split into
+overlapping windows of MEMORY_CHUNK_TOKENS tokens, each embedded separately
+and stored as its own `memory_entries` row sharing the parent's `group_id`:
+
+- parent row: id = group_id, full content, no embedding (keyword search and
+  get/list operate on parents only)
+- chunk rows: id = "<parent>#<index>", the window's text, its embedding and
+  metadata {"chunk": {"parent", "index", "count", "start", "end"}}
+
+Semantic search ranks chunks and collapses hits back to their parent
+(`semantic_search_memory_pg`).
+
+Tokens are words and punctuation marks (`\\w+|[^\\w\\s]`), a lower bound on
+word pieces; the default window leaves headroom for words the model splits.
+Chunks are produced lazily from a single regex scan and slice the original
+text, so whitespace and formatting are preserved.
+
+Config (env):
+- MEMORY_CHUNK_TOKENS: tokens per chunk; content up to this length is not chunked (default 200)
+- MEMORY_CHUNK_OVERLAP: tokens shared by consecutive chunks (default 40)
+- MEMORY_CHUNK_EMBED_BATCH: chunks per embedding call (default 32)
+"""
+from __future__ import annotations
+
+import os
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from server.memory.semantic import compute_embeddings
+
+CHUNK_TOKENS = int(os.getenv("MEMORY_CHUNK_TOKENS", "200"))
+CHUNK_OVERLAP = int(os.getenv("MEMORY_CHUNK_OVERLAP", "40"))
+EMBED_BATCH = int(os.getenv("MEMORY_CHUNK_EMBED_BATCH", "32"))
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+@dataclass(frozen=True, slots=True)
+class Chunk:
+    index: int
+    start: int
+    end: int
+    text: str
+
+
+def _limits(max_tokens: Optional[int], overlap: Optional[int]) -> Tuple[int, int]:
+    size = max(1, max_tokens if max_tokens is not None else CHUNK_TOKENS)
+    shared = overlap if overlap is not None else CHUNK_OVERLAP
+    # Every chunk must advance by at least one token
+    return size, min(max(0, shared), size - 1)
+
+
+def needs_chunking(text: str, max_tokens: Optional[int] = None) -> bool:
+    """True when ``text`` has more than ``max_tokens`` tokens (stops scanning at the limit)."""
+    size, _ = _limits(max_tokens, 0)
+    for count, _ in enumerate(_TOKEN_RE.finditer(text or ""), start=1):
+        if count > size:
+            return True
+    return False
+
+
+def iter_chunks(text: str, max_tokens: Optional[int] = None, overlap: Optional[int] = None) -> Iterator[Chunk]:
+    """Yield windows of ``max_tokens`` tokens, consecutive windows sharing ``overlap`` tokens."""
+    size, shared = _limits(max_tokens, overlap)
+    # (start, end) offsets of the tokens in the current window
+    window: Deque[Tuple[int, int]] = deque()
+    index = 0
+    fresh = 0  # tokens not yet emitted in any chunk
+    for match in _TOKEN_RE.finditer(text or ""):
+        window.append(match.span())
+        fresh += 1
+        if len(window) == size:
+            start, end = window[0][0], window[-1][1]
+            yield Chunk(index, start, end, text[start:end])
+            index += 1
+            fresh = 0
+            for _ in range(size - shared):
+                window.popleft()
+    if fresh and window:
+        start, end = window[0][0], window[-1][1]
+        yield Chunk(index, start, end, text[start:end])
+
+
+async def embed_chunks(
+    text: str,
+    *,
+    max_tokens: Optional[int] = None,
+    overlap: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Optional[List[Tuple[Chunk, List[float]]]]:
+    """Chunk ``text`` and embed the chunks in batches; None when no embedder is configured."""
+    batch_limit = max(1, batch_size or EMBED_BATCH)
+    embedded: List[Tuple[Chunk, List[float]]] = []
+    batch: List[Chunk] = []
+
+    async def flush() -> bool:
+        vectors = await compute_embeddings([chunk.text for chunk in batch])
+        if vectors is None:
+            return False
+        embedded.extend(zip(batch, vectors))
+        batch.clear()
+        return True
+
+    for chunk in iter_chunks(text, max_tokens, overlap):
+        batch.append(chunk)
+        if len(batch) >= batch_limit and not await flush():
+            return None
+    if batch and not await flush():
+        return None
+    return embedded
+
+
+def chunk_rows(parent_id: str, embedded: List[Tuple[Chunk, List[float]]]) -> List[Dict[str, Any]]:
+    """Row values for `add_memory_group_pg`."""
+    count = len(embedded)
+    return [
+        {
+            "id": f"{parent_id}#{chunk.index}",
+            "content": chunk.text,
+            "embedding": vector,
+            "metadata": {
+                "chunk": {"parent": parent_id, "index": chunk.index, "count": count, "start": chunk.start, "end": chunk.end}
+            },
+        }
+        for chunk, vector in embedded
+    ]
@@ -0,0 +1,337 @@
+"""
+Process pool for embedding inference.
+
+In-process inference shares the event loop's GIL with every request. With
+SEMANTIC_EMBED_PROCESSES > 0 the embedder configured by SEMANTIC_MODEL runs
+in that many worker processes instead (see `semantic.get_embedder`):
+
+- each worker loads the model once at startup and serves one batch at a time
+- batches go over a duplex pipe; results come back as the raw bytes of a
+  float32 (n, dim) array and are viewed with `np.frombuffer`, never converted
+  element by element
+- a caller that finds its worker dead or unresponsive restarts it and retries
+  once on the replacement; a health thread pings idle workers every
+  SEMANTIC_EMBED_HEALTH_SECONDS and restarts the ones that do not answer
+
+Workers are started with the "spawn" method (the parent may already hold
+model threads) and split the host's cores between them unless
+SEMANTIC_EMBED_THREADS is set.
+
+Config (env):
+- SEMANTIC_EMBED_PROCESSES: worker processes; 0 keeps inference in-process (default 0)
+- SEMANTIC_EMBED_THREADS: intra-op threads per worker (default cpu_count // processes)
+- SEMANTIC_EMBED_TIMEOUT_SECONDS: max wait for a worker and for one batch (default 60)
+- SEMANTIC_EMBED_START_SECONDS: max wait for a worker to load its model (default 120)
+- SEMANTIC_EMBED_HEALTH_SECONDS: idle-worker ping interval; 0 disables (default 15)
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing.connection import Connection
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
+from prometheus_client import Counter, Gauge, Histogram
+
+from server.utils.logger import log_json
+
+EMBED_PROCESSES = int(os.getenv("SEMANTIC_EMBED_PROCESSES", "0"))
+EMBED_THREADS = int(os.getenv("SEMANTIC_EMBED_THREADS", "0"))
+TIMEOUT_SECONDS = float(os.getenv("SEMANTIC_EMBED_TIMEOUT_SECONDS", "60"))
+START_SECONDS = float(os.getenv("SEMANTIC_EMBED_START_SECONDS", "120"))
+HEALTH_SECONDS = float(os.getenv("SEMANTIC_EMBED_HEALTH_SECONDS", "15"))
+
+# Seconds a ping may take before the worker is considered hung
+_PING_SECONDS = 5.0
+
+
+def _load_encoder(model: str, threads: int) -> Callable[[List[str]], Any]:
+    """Batch encoder for ``model`` ("mock", "minilm:<sentence-transformers name>" or "onnx:...")."""
+    if model == "mock":
+        from server.memory.semantic import _mock_embed
+
+        return lambda texts: [_mock_embed(t) for t in texts]
+    if model.startswith("minilm:"):
+        if threads > 0:
+            try:
+                import torch  # type: ignore
+
+                torch.set_num_threads(threads)
+            except Exception:
+                pass
+        from sentence_transformers import SentenceTransformer  # type: ignore
+
+        st_model = SentenceTransformer(model.split(":", 1)[1])
+        return lambda texts: st_model.encode(texts, convert_to_numpy=True)
+    if model.startswith("onnx:"):
+        # Paths and options come from the SEMANTIC_ONNX_* environment inherited from the parent
+        from server.memory.onnx_backend import load_onnx_embedder
+
+        return load_onnx_embedder(threads=threads).embed
+    raise RuntimeError(f"Unsupported embedding worker model={model}")
+
+
+def _worker_main(conn: Connection, model: str, threads: int) -> None:
+    """Worker process: load the model, then answer ping/embed requests until stopped."""
+    if threads > 0:
+        os.environ.setdefault("OMP_NUM_THREADS", str(threads))
+    # Tokenizer threads would compete with the other workers for the same cores
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    try:
+        encode = _load_encoder(model, threads)
+    except Exception as exc:
+        conn.send(("error", f"{type(exc).__name__}: {exc}"))
+        return
+    conn.send(("ready", os.getpid()))
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        kind = message[0]
+        if kind == "stop":
+            return
+        if kind == "ping":
+            conn.send(("pong",))
+            continue
+        try:
+            matrix = np.ascontiguousarray(encode(message[1]), dtype=np.float32)
+        except Exception as exc:
+            conn.send(("error", f"{type(exc).__name__}: {exc}"))
+            continue
+        conn.send(("ok", matrix.shape[0], matrix.shape[1]))
+        conn.send_bytes(matrix.data)
+
+
+class _WorkerLost(Exception):
+    """The worker died, hung or closed its pipe."""
+
+
+class _Worker:
+    __slots__ = ("index", "process", "conn")
+
+    def __init__(self, index: int, process: Any, conn: Connection) -> None:
+        self.index = index
+        self.process = process
+        self.conn = conn
+
+
+class EmbeddingPool:
+    """Fixed set of embedding worker processes shared by all threads of this process."""
+
+    def __init__(
+        self,
+        model: str,
+        processes: int,
+        *,
+        threads: int = EMBED_THREADS,
+        timeout: float = TIMEOUT_SECONDS,
+        start_timeout: float = START_SECONDS,
+        health_seconds: float = HEALTH_SECONDS,
+    ) -> None:
+        self.model = model
+        self.processes = max(processes, 1)
+        self.threads = threads if threads > 0 else max(1, (os.cpu_count() or 1) // self.processes)
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.health_seconds = health_seconds
+        self.restarts = 0
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        # Restarts run from caller threads and the health thread at once
+        self._workers_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Spawn every worker and wait until each has loaded the model."""
+        spawned = [self._spawn(i) for i in range(self.processes)]
+        try:
+            for worker in spawned:
+                self._await_ready(worker)
+        except Exception:
+            for worker in spawned:
+                self._terminate(worker)
+            raise
+        self._workers = spawned
+        for worker in spawned:
+            self._idle.put(worker)
+        EMBED_POOL_ALIVE.set(len(spawned))
+        if self.health_seconds > 0:
+            self._health_thread = threading.Thread(target=self._health_loop, name="embed-pool-health", daemon=True)
+            self._health_thread.start()
+        log_json("info", "embed_pool.started", model=self.model, processes=self.processes, threads=self.threads)
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._workers_lock:
+            workers, self._workers = self._workers, []
+            EMBED_POOL_ALIVE.set(0)
+        for worker in workers:
+            try:
+                worker.conn.send(("stop",))
+            except Exception:
+                pass
+        for worker in workers:
+            worker.process.join(timeout=2.0)
+            self._terminate(worker)
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed ``texts`` in one worker call; returns a float32 (len(texts), dim) array."""
+        batch = list(texts)
+        if not batch:
+            return np.empty((0, 0), dtype=np.float32)
+        started = time.perf_counter()
+        worker = self._acquire()
+        try:
+            for attempt in range(2):
+                try:
+                    result = self._request(worker, batch)
+                except _WorkerLost as exc:
+                    worker = self._restart(worker, str(exc))
+                    if attempt:
+                        EMBED_POOL_REQUESTS.labels(result="lost").inc()
+                        raise RuntimeError(f"embedding worker lost: {exc}") from exc
+                    continue
+                EMBED_POOL_REQUESTS.labels(result="ok").inc()
+                EMBED_POOL_SECONDS.observe(time.perf_counter() - started)
+                return result
+        finally:
+            self._idle.put(worker)
+        raise AssertionError("unreachable")
+
+    def check_health(self) -> int:
+        """Ping every idle worker once and restart the dead ones; returns the number restarted."""
+        restarted = 0
+        for _ in range(self._idle.qsize()):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                self._ping(worker)
+            except _WorkerLost as exc:
+                worker = self._restart(worker, str(exc))
+                restarted += 1
+            finally:
+                self._idle.put(worker)
+        return restarted
+
+    def _acquire(self) -> _Worker:
+        if self._closed.is_set():
+            raise RuntimeError("embedding pool is closed")
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            EMBED_POOL_REQUESTS.labels(result="busy").inc()
+            raise TimeoutError(f"no embedding worker free within {self.timeout}s") from None
+
+    def _request(self, worker: _Worker, texts: List[str]) -> np.ndarray:
+        try:
+            worker.conn.send(("embed", texts))
+            if not worker.conn.poll(self.timeout):
+                raise _WorkerLost(f"no reply within {self.timeout}s")
+            header = worker.conn.recv()
+            if header[0] == "error":
+                EMBED_POOL_REQUESTS.labels(result="error").inc()
+                raise RuntimeError(header[1])
+            rows, dim = header[1], header[2]
+            payload = worker.conn.recv_bytes()
+        except (EOFError, OSError) as exc:
+            raise _WorkerLost(f"{type(exc).__name__}: {exc}") from exc
+        return np.frombuffer(payload, dtype=np.float32).reshape(rows, dim)
+
+    def _ping(self, worker: _Worker) -> None:
+        if not worker.process.is_alive():
+            raise _WorkerLost(f"exited with code {worker.process.exitcode}")
+        try:
+            worker.conn.send(("ping",))
+            if not worker.conn.poll(_PING_SECONDS):
+                raise _WorkerLost("ping timed out")
+            worker.conn.recv()
+        except (EOFError, OSError) as exc:
+            raise _WorkerLost(f"{type(exc).__name__}: {exc}") from exc
+
+    def _spawn(self, index: int) -> _Worker:
+        parent_conn, child_conn = self._ctx.Pipe(duplex=True)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.model, self.threads),
+            name=f"embed-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(index, process, parent_conn)
+
+    def _await_ready(self, worker: _Worker) -> None:
+        try:
+            if not worker.conn.poll(self.start_timeout):
+                raise RuntimeError(f"embedding worker did not start within {self.start_timeout}s")
+            status = worker.conn.recv()
+        except (EOFError, OSError) as exc:
+            raise RuntimeError(f"embedding worker exited during startup: {exc}") from exc
+        if status[0] != "ready":
+            raise RuntimeError(f"embedding worker failed to load {self.model}: {status[1]}")
+
+    def _restart(self, worker: _Worker, reason: str) -> _Worker:
+        """Replace a lost worker; keeps the old one in rotation if the replacement fails to start."""
+        self._terminate(worker)
+        if self._closed.is_set():
+            return worker
+        log_json("warning", "embed_pool.worker_restart", worker=worker.index, reason=reason)
+        replacement = self._spawn(worker.index)
+        try:
+            self._await_ready(replacement)
+        except Exception as exc:
+            self._terminate(replacement)
+            log_json("error", "embed_pool.worker_restart_failed", worker=worker.index, error=str(exc))
+            return worker
+        with self._workers_lock:
+            closed = self._closed.is_set()
+            if not closed:
+                self._workers = [replacement if w is worker else w for w in self._workers]
+                self.restarts += 1
+                EMBED_POOL_ALIVE.set(sum(1 for w in self._workers if w.process.is_alive()))
+        if closed:
+            # close() ran while the replacement was starting and never saw it
+            self._terminate(replacement)
+            return worker
+        EMBED_POOL_RESTARTS.inc()
+        return replacement
+
+    @staticmethod
+    def _terminate(worker: _Worker) -> None:
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join(timeout=2.0)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join(timeout=2.0)
+        try:
+            worker.conn.close()
+        except Exception:
+            pass
+
+    def _health_loop(self) -> None:
+        while not self._closed.wait(self.health_seconds):
+            try:
+                self.check_health()
+            except Exception as exc:
+                log_json("warning", "embed_pool.health_check_failed", error=str(exc))
+
+
+# Prometheus metrics
+EMBED_POOL_REQUESTS = Counter(
+    "embedding_pool_requests_total", "Embedding batches sent to worker processes", ["result"]
+)
+EMBED_POOL_SECONDS = Histogram(
+    "embedding_pool_request_seconds", "Time to embed one batch in a worker process, including waiting for one"
+)
+EMBED_POOL_RESTARTS = Counter("embedding_pool_restarts_total", "Embedding worker processes restarted")
+EMBED_POOL_ALIVE = Gauge("embedding_pool_workers_alive", "Embedding worker processes running")
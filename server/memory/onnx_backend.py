@@ -0,0 +1,142 @@
+"""
+ONNX Runtime embedder (SEMANTIC_MODEL=onnx).
+
+Runs an exported MiniLM graph with ONNX Runtime on CPU instead of importing
+PyTorch and sentence-transformers. The steps match the sentence-transformers
+all-MiniLM-L6-v2 pipeline, so vectors agree with `SEMANTIC_MODEL=minilm`
+within float tolerance (int8 graphs agree to roughly two decimals):
+
+1. fast (Rust) WordPiece tokenizer from `tokenizer.json`, truncated to
+   SEMANTIC_ONNX_MAX_LENGTH tokens and padded to the longest text in the batch
+2. one session run per batch; texts are sorted by length first so batches
+   carry little padding, and results are returned in input order
+3. attention-masked mean pooling over the last hidden state, then L2
+   normalization
+
+Export the model and tokenizer once, e.g.
+`optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2 <dir>`,
+and optionally write an int8 copy with `scripts/bench_embedders.py --quantize <dir>`.
+
+Config (env):
+- SEMANTIC_ONNX_MODEL_DIR: directory with model.onnx and tokenizer.json (required; an onnx/ subdirectory is also searched)
+- SEMANTIC_ONNX_QUANTIZED: load model_quantized.onnx, the int8 graph (default false)
+- SEMANTIC_ONNX_THREADS: ONNX Runtime intra-op threads; 0 lets the runtime decide (default 0)
+- SEMANTIC_ONNX_MAX_LENGTH: tokens per text after truncation (default 256, MiniLM's max_seq_length)
+- SEMANTIC_ONNX_BATCH_SIZE: texts per session run (default 32)
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+FP32_MODEL_FILE = "model.onnx"
+INT8_MODEL_FILE = "model_quantized.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+def _truthy(v: Optional[str]) -> bool:
+    return (v or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def mean_pool_normalize(hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Mean of the unmasked token vectors, L2-normalized; (batch, seq, dim) -> (batch, dim) float32."""
+    hidden = np.asarray(hidden, dtype=np.float32)
+    if hidden.ndim == 2:
+        # Graph already pools (sentence_embedding output)
+        pooled = hidden
+    else:
+        mask = np.asarray(attention_mask, dtype=np.float32)[:, :, None]
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32, copy=False)
+
+
+def find_model_file(model_dir: str, name: str) -> str:
+    for candidate in (os.path.join(model_dir, name), os.path.join(model_dir, "onnx", name)):
+        if os.path.isfile(candidate):
+            return candidate
+    raise RuntimeError(f"SEMANTIC_MODEL=onnx: {name} not found in {model_dir} (or its onnx/ subdirectory)")
+
+
+class OnnxEmbedder:
+    """Tokenizer plus ONNX Runtime session producing normalized sentence embeddings."""
+
+    def __init__(
+        self,
+        model_path: str,
+        tokenizer_path: str,
+        *,
+        max_length: int = 256,
+        batch_size: int = 32,
+        threads: int = 0,
+    ) -> None:
+        try:
+            import onnxruntime as ort  # type: ignore
+            from tokenizers import Tokenizer  # type: ignore
+        except Exception as e:
+            raise RuntimeError(
+                "SEMANTIC_MODEL=onnx requires onnxruntime and tokenizers. Install both and export the model."
+            ) from e
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.model_path = model_path
+        self.batch_size = max(batch_size, 1)
+        self._session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self._session.get_inputs()}
+        # last_hidden_state (or token_embeddings / sentence_embedding): the first output either way
+        self._output_name = self._session.get_outputs()[0].name
+        tokenizer = Tokenizer.from_file(tokenizer_path)
+        tokenizer.enable_truncation(max_length=max_length)
+        pad_id = tokenizer.token_to_id("[PAD]")
+        tokenizer.enable_padding(pad_id=pad_id if pad_id is not None else 0, pad_token="[PAD]")
+        self._tokenizer = tokenizer
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed ``texts`` in length-sorted batches; returns float32 (len(texts), dim) in input order."""
+        items = [t or "" for t in texts]
+        if not items:
+            return np.empty((0, 0), dtype=np.float32)
+        order = sorted(range(len(items)), key=lambda i: len(items[i]))
+        parts: List[np.ndarray] = []
+        for start in range(0, len(order), self.batch_size):
+            parts.append(self._embed_batch([items[i] for i in order[start:start + self.batch_size]]))
+        sorted_vectors = np.concatenate(parts)
+        result = np.empty_like(sorted_vectors)
+        result[np.asarray(order)] = sorted_vectors
+        return result
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self._tokenizer.encode_batch(texts)
+        input_ids = np.asarray([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.asarray([e.attention_mask for e in encodings], dtype=np.int64)
+        feed: dict[str, Any] = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feed["token_type_ids"] = np.asarray([e.type_ids for e in encodings], dtype=np.int64)
+        hidden = self._session.run([self._output_name], feed)[0]
+        return mean_pool_normalize(hidden, attention_mask)
+
+
+def load_onnx_embedder(threads: Optional[int] = None) -> OnnxEmbedder:
+    """OnnxEmbedder configured from the SEMANTIC_ONNX_* environment."""
+    model_dir = (os.getenv("SEMANTIC_ONNX_MODEL_DIR") or "").strip()
+    if not model_dir:
+        raise RuntimeError("SEMANTIC_MODEL=onnx requires SEMANTIC_ONNX_MODEL_DIR (exported model and tokenizer.json)")
+    model_file = INT8_MODEL_FILE if _truthy(os.getenv("SEMANTIC_ONNX_QUANTIZED")) else FP32_MODEL_FILE
+    return OnnxEmbedder(
+        find_model_file(model_dir, model_file),
+        find_model_file(model_dir, TOKENIZER_FILE),
+        max_length=int(os.getenv("SEMANTIC_ONNX_MAX_LENGTH", "256")),
+        batch_size=int(os.getenv("SEMANTIC_ONNX_BATCH_SIZE", "32")),
+        threads=threads if threads is not None else int(os.getenv("SEMANTIC_ONNX_THREADS", "0")),
+    )
+
+
+def onnx_model_name() -> str:
+    """Model identifier for `semantic.get_model_name`; int8 vectors are kept apart from fp32 ones."""
+    model_dir = (os.getenv("SEMANTIC_ONNX_MODEL_DIR") or "").strip().rstrip("/\\")
+    suffix = ":int8" if _truthy(os.getenv("SEMANTIC_ONNX_QUANTIZED")) else ""
+    return f"onnx:{os.path.basename(model_dir) or 'unset'}{suffix}"
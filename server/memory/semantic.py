@@ -1,10 +1,12 @@
 import asyncio
 import hashlib
 import os
+import threading
 from typing import Callable, Optional
 
 _DIM = 384  # all-MiniLM-L6-v2 dimension; used for mock too
 _embedder: Optional[Callable[[str], list[float]]] = None
+_embedder_lock = threading.Lock()
 
 
 def _truthy(v: str | None) -> bool:
@@ -19,13 +21,25 @@ def is_semantic_enabled() -> bool:
         return True
     # Secondary: enabled if a non-disabled model is selected
     model = os.getenv("SEMANTIC_MODEL", "disabled").strip().lower()
-    return model in ("mock", "minilm")
+    return model in ("mock", "minilm", "onnx")
 
 
 def get_dimension() -> int:
     return _DIM
 
 
+def get_model_name() -> str:
+    """Identifier of the configured embedding model; vectors from different models are not comparable."""
+    model = os.getenv("SEMANTIC_MODEL", "disabled").strip().lower()
+    if model == "minilm":
+        return f"minilm:{os.getenv('SENTENCE_TRANSFORMERS_MODEL', 'all-MiniLM-L6-v2')}"
+    if model == "onnx":
+        from server.memory.onnx_backend import onnx_model_name
+
+        return onnx_model_name()
+    return model
+
+
 def _mock_embed(text: str) -> list[float]:
     # Deterministic simple hash -> vector for tests/CI, normalized
     if not text:
@@ -49,6 +63,14 @@ setattr(_mock_embed, "_semantic_offload", False)
 
 
 def get_embedder() -> Optional[Callable[[str], list[float]]]:
+    if _embedder is not None:
+        return _embedder
+    # Loading a model (or starting worker processes) must happen once even with concurrent first calls
+    with _embedder_lock:
+        return _load_embedder()
+
+
+def _load_embedder() -> Optional[Callable[[str], list[float]]]:
     global _embedder
     if _embedder is not None:
         return _embedder
@@ -56,6 +78,12 @@ def get_embedder() -> Optional[Callable[[str], list[float]]]:
     if model in ("", "disabled", "off", "false"):
         _embedder = None
         return _embedder
+    if model in ("mock", "minilm", "onnx"):
+        from server.memory.embed_pool import EMBED_PROCESSES
+
+        if EMBED_PROCESSES > 0:
+            _embedder = _pool_embedder(get_model_name(), EMBED_PROCESSES)
+            return _embedder
     if model == "mock":
         _embedder = _mock_embed
         return _embedder
@@ -75,14 +103,65 @@ def get_embedder() -> Optional[Callable[[str], list[float]]]:
             vec = st_model.encode([t])[0]
             return [float(x) for x in vec]
 
+        def _st_embed_batch(texts: list[str]) -> list[list[float]]:
+            return [[float(x) for x in vec] for vec in st_model.encode(texts)]
+
         # Mark that this embedder should be executed off-thread
         setattr(_st_embed, "_semantic_offload", True)
+        setattr(_st_embed, "_semantic_batch", _st_embed_batch)
         _embedder = _st_embed
         return _embedder
+    if model == "onnx":
+        # Exported MiniLM on ONNX Runtime; no torch import (see server/memory/onnx_backend.py)
+        from server.memory.onnx_backend import load_onnx_embedder
+
+        onnx_model = load_onnx_embedder()
+
+        def _onnx_embed(t: str) -> list[float]:
+            return onnx_model.embed([t])[0].tolist()
+
+        def _onnx_embed_batch(texts: list[str]) -> list[list[float]]:
+            return onnx_model.embed(texts).tolist()
+
+        setattr(_onnx_embed, "_semantic_offload", True)
+        setattr(_onnx_embed, "_semantic_batch", _onnx_embed_batch)
+        _embedder = _onnx_embed
+        return _embedder
     # Unknown model
     raise RuntimeError(f"Unsupported SEMANTIC_MODEL={model}")
 
 
+def _pool_embedder(model_name: str, processes: int) -> Callable[[str], list[float]]:
+    """Embedder backed by worker processes (see server/memory/embed_pool.py)."""
+    from server.memory.embed_pool import EmbeddingPool
+
+    pool = EmbeddingPool(model_name, processes)
+    pool.start()
+
+    # Callers expect list[float] (pgvector literals, JSON); ndarray.tolist() converts the
+    # whole float32 buffer in one C-level pass, not a Python loop over elements
+    def _pool_embed(t: str) -> list[float]:
+        return pool.embed([t])[0].tolist()
+
+    def _pool_embed_batch(texts: list[str]) -> list[list[float]]:
+        return pool.embed(texts).tolist()
+
+    # Callers still block on the pipe, so keep them off the event loop
+    setattr(_pool_embed, "_semantic_offload", True)
+    setattr(_pool_embed, "_semantic_batch", _pool_embed_batch)
+    setattr(_pool_embed, "_semantic_pool", pool)
+    return _pool_embed
+
+
+def close_embedder() -> None:
+    """Release the configured embedder (stops embedding worker processes)."""
+    global _embedder
+    pool = getattr(_embedder, "_semantic_pool", None)
+    _embedder = None
+    if pool is not None:
+        pool.close()
+
+
 async def compute_embedding(text: str) -> Optional[list[float]]:
     emb = get_embedder()
     if emb is None:
@@ -96,3 +175,24 @@ async def compute_embedding(text: str) -> Optional[list[float]]:
             loop = asyncio.get_running_loop()
             return await loop.run_in_executor(None, emb, normalized)
     return emb(normalized)
+
+
+def embed_texts(texts: list[str]) -> Optional[list[list[float]]]:
+    """Embed many texts synchronously, in one model call when the embedder supports batching."""
+    emb = get_embedder()
+    if emb is None:
+        return None
+    batch = getattr(emb, "_semantic_batch", None)
+    if batch is not None:
+        return batch([t or "" for t in texts])
+    return [emb(t or "") for t in texts]
+
+
+async def compute_embeddings(texts: list[str]) -> Optional[list[list[float]]]:
+    """Async `embed_texts`: one batched model call, off the event loop when the embedder is heavy."""
+    emb = get_embedder()
+    if emb is None:
+        return None
+    if getattr(emb, "_semantic_offload", False):
+        return await asyncio.to_thread(embed_texts, texts)
+    return embed_texts(texts)
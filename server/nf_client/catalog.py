@@ -0,0 +1,258 @@
+"""
+Precompiled snapshot of the token and policy catalog.
+
+Parsing the catalog means opening every token YAML under `memory/tags` and
+every `.rules.yml` policy under `memory/` with the pure-Python YAML loader.
+The snapshot does that once and stores the parsed result in a single binary
+file that every worker can load in milliseconds:
+
+    MAGIC | format version (u16) | sha256(payload) | payload (UTF-8 JSON)
+
+The payload is plain data, so loading a snapshot never executes code even if
+someone else can write to the memory directory. Values YAML parses into
+non-JSON types (dates, timestamps) are stored as strings; a freshly built
+catalog goes through the same encoding, so both paths return identical records.
+
+The payload records a fingerprint of the source files (relative path, size
+and mtime of each). When the memory/ file watcher reports a change, the next
+load re-stats the sources and rebuilds the snapshot if the fingerprint no
+longer matches, so editing a YAML file is picked up without a restart. A
+snapshot with a different format version or a bad digest is ignored and
+rebuilt. The file is read through mmap and written atomically, so concurrent
+workers either see the previous snapshot or the new one.
+
+Build it ahead of time with `make catalog` (scripts/build_catalog.py).
+
+Config (env):
+- NF_CATALOG_PATH: snapshot location (default memory/.catalog.bin)
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from server.nf_client.watcher import FileWatcher, watcher_for
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FORMAT_VERSION = 2
+MAGIC = b"NFCATALOG"
+_HEADER = struct.Struct(">H32s")
+
+# (relative path, size, mtime_ns) per source file
+_SourceStat = Tuple[str, int, int]
+
+
+def _project_root() -> str:
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def _default_memory_dir() -> str:
+    return os.path.join(_project_root(), "memory")
+
+
+def _default_snapshot_path() -> str:
+    return os.getenv("NF_CATALOG_PATH") or os.path.join(_default_memory_dir(), ".catalog.bin")
+
+
+class TokenCatalog:
+    """Parsed tokens and policies. Returned records are shallow copies; treat nested values as read-only."""
+
+    __slots__ = ("fingerprint", "content_hash", "built_at", "_tokens_by_kind", "_policies", "_graph")
+
+    def __init__(self, payload: Dict[str, Any]) -> None:
+        self.fingerprint: str = payload["fingerprint"]
+        self.content_hash: str = payload["contentHash"]
+        self.built_at: float = payload["builtAt"]
+        self._tokens_by_kind: Dict[str, List[Dict[str, Any]]] = {}
+        for token in payload["tokens"]:
+            self._tokens_by_kind.setdefault(token["kind"], []).append(token)
+        self._policies: List[Dict[str, Any]] = payload["policies"]
+        self._graph: Dict[str, List[str]] = payload["resolutionGraph"]
+
+    @property
+    def kinds(self) -> List[str]:
+        return sorted(self._tokens_by_kind)
+
+    def tokens(self, kinds: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Tokens of the given kinds (all kinds when empty), ordered by kind then file name."""
+        selected = self.kinds if not kinds else sorted(set(kinds).intersection(self._tokens_by_kind))
+        return [dict(token) for kind in selected for token in self._tokens_by_kind[kind]]
+
+    def policies(self) -> Dict[str, Any]:
+        return {
+            "policies": [dict(policy) for policy in self._policies],
+            "resolutionGraph": {tagset: list(includes) for tagset, includes in self._graph.items()},
+        }
+
+
+class CatalogStore:
+    """Loads, validates and rebuilds the catalog snapshot for one memory directory."""
+
+    def __init__(
+        self,
+        memory_dir: Optional[str] = None,
+        snapshot_path: Optional[str] = None,
+        *,
+        watcher: Optional[FileWatcher] = None,
+    ) -> None:
+        self.memory_dir = os.path.abspath(memory_dir or _default_memory_dir())
+        self.snapshot_path = snapshot_path or _default_snapshot_path()
+        self._watcher = watcher
+        self._catalog: Optional[TokenCatalog] = None
+        self._generation: Optional[int] = None
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    @property
+    def watcher(self) -> FileWatcher:
+        if self._watcher is None:
+            self._watcher = watcher_for(self.memory_dir)
+        return self._watcher
+
+    def get(self) -> TokenCatalog:
+        generation = self.watcher.generation()
+        catalog = self._catalog
+        if catalog is not None and generation == self._generation:
+            return catalog
+        with self._lock:
+            fingerprint = _fingerprint(self._source_stats())
+            if self._catalog is None or self._catalog.fingerprint != fingerprint:
+                self._catalog = self._read_snapshot(fingerprint) or self.build(fingerprint)
+            self._generation = generation
+            return self._catalog
+
+    def build(self, fingerprint: Optional[str] = None) -> TokenCatalog:
+        """Parse the YAML sources and write a fresh snapshot."""
+        # Imported here: the parsers' modules serve their fetch_* calls from this one
+        from server.nf_client.governance import _scan_policies
+        from server.nf_client.tokens import _scan_tokens
+
+        stats = self._source_stats()
+        started = time.perf_counter()
+        policies = _scan_policies(self.memory_dir)
+        payload = {
+            "fingerprint": fingerprint or _fingerprint(stats),
+            "contentHash": self._content_hash(stats),
+            "builtAt": time.time(),
+            "tokens": _scan_tokens(os.path.join(self.memory_dir, "tags")),
+            "policies": policies["policies"],
+            "resolutionGraph": policies["resolutionGraph"],
+        }
+        self.builds += 1
+        body = _encode_payload(payload)
+        self._write_snapshot(body)
+        logger.info(
+            "built token catalog: %d tokens, %d policies in %.1fms",
+            len(payload["tokens"]),
+            len(payload["policies"]),
+            (time.perf_counter() - started) * 1000,
+        )
+        return TokenCatalog(json.loads(body))
+
+    def invalidate(self) -> None:
+        """Force a source re-stat on the next `get`."""
+        self._generation = None
+
+    def _source_stats(self) -> List[_SourceStat]:
+        """Stat every token YAML (memory/tags/<kind>/*.yml) and .rules.yml policy."""
+        stats: List[_SourceStat] = []
+        tags_dir = os.path.join(self.memory_dir, "tags")
+        for root, dirs, files in os.walk(self.memory_dir):
+            is_kind_dir = os.path.dirname(root) == tags_dir
+            for fn in files:
+                if not (fn.endswith(".rules.yml") or (is_kind_dir and fn.lower().endswith((".yml", ".yaml")))):
+                    continue
+                path = os.path.join(root, fn)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                stats.append((os.path.relpath(path, self.memory_dir), st.st_size, st.st_mtime_ns))
+        stats.sort()
+        return stats
+
+    def _content_hash(self, stats: List[_SourceStat]) -> str:
+        digest = hashlib.sha256()
+        for rel_path, _, _ in stats:
+            digest.update(rel_path.encode("utf-8") + b"\0")
+            try:
+                with open(os.path.join(self.memory_dir, rel_path), "rb") as fh:
+                    digest.update(fh.read())
+            except OSError:
+                continue
+        return digest.hexdigest()
+
+    def _read_snapshot(self, fingerprint: str) -> Optional[TokenCatalog]:
+        try:
+            with open(self.snapshot_path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                offset = len(MAGIC)
+                if mm[:offset] != MAGIC:
+                    return None
+                version, digest = _HEADER.unpack_from(mm, offset)
+                if version != CATALOG_FORMAT_VERSION:
+                    return None
+                body = memoryview(mm)[offset + _HEADER.size:]
+                try:
+                    if hashlib.sha256(body).digest() != digest:
+                        logger.warning("token catalog snapshot %s failed its digest check", self.snapshot_path)
+                        return None
+                    payload = json.loads(bytes(body))
+                finally:
+                    body.release()
+        except (OSError, ValueError):
+            # Missing, empty or unreadable snapshot: rebuild from sources
+            return None
+        except Exception as exc:
+            logger.warning("failed to load token catalog snapshot %s: %s", self.snapshot_path, exc)
+            return None
+        if not isinstance(payload, dict) or payload.get("fingerprint") != fingerprint:
+            return None
+        return TokenCatalog(payload)
+
+    def _write_snapshot(self, body: bytes) -> None:
+        header = MAGIC + _HEADER.pack(CATALOG_FORMAT_VERSION, hashlib.sha256(body).digest())
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as fh:
+                fh.write(header)
+                fh.write(body)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as exc:
+            # Read-only deployments still work; every worker just parses the sources once
+            logger.warning("failed to write token catalog snapshot %s: %s", self.snapshot_path, exc)
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+def _encode_payload(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _fingerprint(stats: List[_SourceStat]) -> str:
+    digest = hashlib.sha256(str(CATALOG_FORMAT_VERSION).encode("ascii"))
+    for rel_path, size, mtime_ns in stats:
+        digest.update(f"{rel_path}\0{size}\0{mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+# Process-wide store for the repository catalog
+_store = CatalogStore()
+
+
+def get_catalog() -> TokenCatalog:
+    return _store.get()
+
+
+def catalog_watcher() -> FileWatcher:
+    """Watcher behind `get_catalog`; caches of catalog data should key on its generation."""
+    return _store.watcher
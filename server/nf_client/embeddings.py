@@ -0,0 +1,234 @@
+"""
+Token embedding matrix for semantic rule ranking.
+
+Every catalog token's name, description and rules are embedded once through
+`server/memory/semantic.py` and stored as an L2-normalized float32 matrix next
+to the catalog snapshot. Ranking a message against all tokens is then a single
+matrix-vector product followed by a partial sort.
+
+The file is a NumPy .npz archive (no pickled objects) holding the matrix, the
+token kinds, names and refs, the catalog content hash and the embedding model.
+It is rebuilt when the catalog content or the configured model changes, and
+written atomically so concurrent workers share one copy.
+
+Nothing is built while semantic search is disabled (see `is_semantic_enabled`).
+
+Config (env):
+- NF_EMBEDDINGS_PATH: matrix location (default .catalog.embeddings.npz beside the catalog snapshot)
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from server.memory.semantic import embed_texts, get_dimension, get_model_name, is_semantic_enabled
+from server.nf_client.catalog import TokenCatalog, _default_snapshot_path, get_catalog
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_FORMAT_VERSION = 1
+
+
+def _default_embeddings_path() -> str:
+    return os.getenv("NF_EMBEDDINGS_PATH") or os.path.join(
+        os.path.dirname(_default_snapshot_path()), ".catalog.embeddings.npz"
+    )
+
+
+def token_text(token: Dict[str, Any]) -> str:
+    """Text embedded for a token: its name, description and rules."""
+    parts = [str(token.get("name") or ""), str(token.get("description") or "")]
+    parts.extend(str(rule) for rule in token.get("rules") or [])
+    return "\n".join(part for part in parts if part)
+
+
+def token_ref(token: Dict[str, Any]) -> str:
+    source = token.get("source")
+    if isinstance(source, str) and source.strip():
+        return source.strip()
+    return f"{token.get('kind') or 'unknown'}::{token.get('name') or 'unknown'}"
+
+
+class TokenEmbeddings:
+    """Row-normalized embedding matrix over the catalog tokens."""
+
+    __slots__ = ("matrix", "kinds", "names", "refs", "content_hash", "model")
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        kinds: Sequence[str],
+        names: Sequence[str],
+        refs: Sequence[str],
+        content_hash: str,
+        model: str,
+    ) -> None:
+        self.matrix = matrix
+        self.kinds = list(kinds)
+        self.names = list(names)
+        self.refs = list(refs)
+        self.content_hash = content_hash
+        self.model = model
+
+    def __len__(self) -> int:
+        return len(self.refs)
+
+    def similar(self, vector: Sequence[float], k: int, min_score: float = 0.0) -> List[Tuple[str, str, float]]:
+        """(kind, name, cosine) of the ``k`` tokens closest to ``vector``, best first."""
+        if not len(self) or k <= 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if not norm or query.shape != (self.matrix.shape[1],):
+            return []
+        scores = self.matrix @ (query / norm)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.kinds[i], self.names[i], float(scores[i])) for i in top if scores[i] >= min_score]
+
+
+class EmbeddingStore:
+    """Loads, validates and rebuilds the token embedding matrix."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        *,
+        catalog_loader: Callable[[], TokenCatalog] = get_catalog,
+    ) -> None:
+        self.path = path or _default_embeddings_path()
+        self._catalog_loader = catalog_loader
+        self._embeddings: Optional[TokenEmbeddings] = None
+        # (content hash, model) that failed to embed; not retried until either changes
+        self._failed: Optional[Tuple[str, str]] = None
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def current(self) -> Optional[TokenEmbeddings]:
+        """The loaded matrix if it still matches the catalog and model, without loading or building."""
+        if not is_semantic_enabled():
+            return None
+        embeddings = self._embeddings
+        if embeddings is None:
+            return None
+        if embeddings.content_hash != self._catalog_loader().content_hash or embeddings.model != get_model_name():
+            return None
+        return embeddings
+
+    def get(self) -> Optional[TokenEmbeddings]:
+        """Current matrix, loaded from disk or rebuilt as needed; None when semantic search is off."""
+        if not is_semantic_enabled():
+            return None
+        catalog = self._catalog_loader()
+        model = get_model_name()
+        embeddings = self._embeddings
+        if embeddings is not None and embeddings.content_hash == catalog.content_hash and embeddings.model == model:
+            return embeddings
+        with self._lock:
+            embeddings = self._embeddings
+            if embeddings is not None and embeddings.content_hash == catalog.content_hash and embeddings.model == model:
+                return embeddings
+            if self._failed == (catalog.content_hash, model):
+                return None
+            embeddings = self._read(catalog.content_hash, model)
+            if embeddings is None:
+                try:
+                    embeddings = self.build(catalog, model)
+                except Exception as exc:
+                    logger.warning("failed to embed catalog tokens with %s: %s", model, exc)
+                    embeddings = None
+                if embeddings is None:
+                    self._failed = (catalog.content_hash, model)
+                    return None
+            self._embeddings = embeddings
+            return embeddings
+
+    def build(self, catalog: Optional[TokenCatalog] = None, model: Optional[str] = None) -> Optional[TokenEmbeddings]:
+        """Embed every catalog token and write the matrix file."""
+        catalog = catalog or self._catalog_loader()
+        model = model or get_model_name()
+        tokens = catalog.tokens()
+        started = time.perf_counter()
+        vectors = embed_texts([token_text(token) for token in tokens])
+        if vectors is None:
+            return None
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(tokens), -1 if tokens else get_dimension())
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms > 0, norms, 1.0)
+        embeddings = TokenEmbeddings(
+            matrix,
+            [str(token.get("kind") or "") for token in tokens],
+            [str(token.get("name") or "") for token in tokens],
+            [token_ref(token) for token in tokens],
+            catalog.content_hash,
+            model,
+        )
+        self.builds += 1
+        self._write(embeddings)
+        logger.info(
+            "embedded %d catalog tokens with %s in %.1fms",
+            len(tokens),
+            model,
+            (time.perf_counter() - started) * 1000,
+        )
+        return embeddings
+
+    def _read(self, content_hash: str, model: str) -> Optional[TokenEmbeddings]:
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if (
+                    int(data["version"]) != EMBEDDINGS_FORMAT_VERSION
+                    or str(data["content_hash"]) != content_hash
+                    or str(data["model"]) != model
+                ):
+                    return None
+                matrix = np.ascontiguousarray(data["matrix"], dtype=np.float32)
+                kinds, names, refs = (data[key].tolist() for key in ("kinds", "names", "refs"))
+        except OSError:
+            return None
+        except Exception as exc:
+            logger.warning("failed to load token embeddings %s: %s", self.path, exc)
+            return None
+        if matrix.ndim != 2 or not (len(kinds) == len(names) == len(refs) == matrix.shape[0]):
+            return None
+        return TokenEmbeddings(matrix, kinds, names, refs, content_hash, model)
+
+    def _write(self, embeddings: TokenEmbeddings) -> None:
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as fh:
+                np.savez(
+                    fh,
+                    version=np.array(EMBEDDINGS_FORMAT_VERSION),
+                    content_hash=np.array(embeddings.content_hash),
+                    model=np.array(embeddings.model),
+                    matrix=embeddings.matrix,
+                    kinds=np.array(embeddings.kinds, dtype=str),
+                    names=np.array(embeddings.names, dtype=str),
+                    refs=np.array(embeddings.refs, dtype=str),
+                )
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            logger.warning("failed to write token embeddings %s: %s", self.path, exc)
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+# Process-wide store for the repository catalog
+_store = EmbeddingStore()
+
+
+def get_embedding_store() -> EmbeddingStore:
+    return _store
+
+
+def get_token_embeddings() -> Optional[TokenEmbeddings]:
+    return _store.get()
@@ -1,9 +1,11 @@
 import logging
 import os
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import yaml  # type: ignore[import-untyped]
 
+from server.nf_client.catalog import get_catalog
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,14 +18,13 @@ def _memory_dir() -> str:
     return os.path.join(_project_root(), "memory")
 
 
-def _iter_rule_files() -> List[str]:
+def _iter_rule_files(base: Optional[str] = None) -> List[str]:
     paths: List[str] = []
-    base = _memory_dir()
-    for root, _dirs, files in os.walk(base):
+    for root, _dirs, files in os.walk(base or _memory_dir()):
         for f in files:
             if f.endswith(".rules.yml"):
                 paths.append(os.path.join(root, f))
-    return paths
+    return sorted(paths)
 
 
 def _parse_rules_file(path: str) -> Dict[str, Any]:
@@ -64,9 +65,14 @@ def _parse_rules_file(path: str) -> Dict[str, Any]:
 
 def fetch_policies(project_id: str, scopes: List[str]):
     # For now, we ignore project_id and scopes; policies are global within repository memory/
+    return get_catalog().policies()
+
+
+def _scan_policies(memory_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Parse every .rules.yml policy under memory/."""
     policies: List[Dict[str, Any]] = []
     graph: Dict[str, List[str]] = {}
-    for p in _iter_rule_files():
+    for p in _iter_rule_files(memory_dir):
         parsed = _parse_rules_file(p)
         tagset = parsed.get("tagSet", "").strip()
         if not tagset:
@@ -1,9 +1,11 @@
 import logging
 import os
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import yaml  # type: ignore[import-untyped]
 
+from server.nf_client.catalog import get_catalog
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,20 +17,23 @@ def _tags_dir() -> str:
     return os.path.join(_project_root(), "memory", "tags")
 
 
-def _list_kinds() -> List[str]:
-    base = _tags_dir()
+def _list_kinds(base: Optional[str] = None) -> List[str]:
+    base = base or _tags_dir()
     if not os.path.isdir(base):
         return []
     return sorted([d for d in os.listdir(base) if os.path.isdir(os.path.join(base, d))])
 
 
 def fetch_tokens(project_id: str, kinds: List[str]):
-    base = _tags_dir()
-    available = set(_list_kinds())
-    selected = available if not kinds else (available.intersection(set(kinds)))
+    """Return tokens of the requested kinds (all kinds when empty) from the catalog snapshot."""
+    return {"tokens": get_catalog().tokens(kinds)}
+
 
+def _scan_tokens(tags_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Parse every token YAML under memory/tags, ordered by kind then file name."""
+    base = tags_dir or _tags_dir()
     tokens: List[Dict[str, Any]] = []
-    for kind in sorted(selected):
+    for kind in _list_kinds(base):
         kdir = os.path.join(base, kind)
         if not os.path.isdir(kdir):
             continue
@@ -38,30 +43,33 @@ def fetch_tokens(project_id: str, kinds: List[str]):
                 continue
             if not fn.lower().endswith((".yml", ".yaml")):
                 continue
-            # Token identity and metadata derived from path
-            token: Dict[str, Any] = {
-                "kind": kind,
-                "name": os.path.splitext(fn)[0],
-                "source": os.path.relpath(path, _project_root()),
-            }
-
-            data: Dict[str, Any] = {}
-            try:
-                with open(path, "r", encoding="utf-8") as fh:
-                    loaded = yaml.safe_load(fh)
-                    if isinstance(loaded, dict):
-                        data = loaded
-            except Exception as exc:  # pragma: no cover - logged for visibility
-                logger.warning("failed to parse token metadata from %s: %s", path, exc)
-                data = {}
-
-            if data:
-                token.update(_normalize_token_payload(data))
-
-            token.setdefault("tag", token["name"])
-
-            tokens.append(token)
-    return {"tokens": tokens}
+            tokens.append(_load_token_file(kind, path))
+    return tokens
+
+
+def _load_token_file(kind: str, path: str) -> Dict[str, Any]:
+    # Token identity and metadata derived from path
+    token: Dict[str, Any] = {
+        "kind": kind,
+        "name": os.path.splitext(os.path.basename(path))[0],
+        "source": os.path.relpath(path, _project_root()),
+    }
+
+    data: Dict[str, Any] = {}
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            loaded = yaml.safe_load(fh)
+            if isinstance(loaded, dict):
+                data = loaded
+    except Exception as exc:  # pragma: no cover - logged for visibility
+        logger.warning("failed to parse token metadata from %s: %s", path, exc)
+        data = {}
+
+    if data:
+        token.update(_normalize_token_payload(data))
+
+    token.setdefault("tag", token["name"])
+    return token
 
 
 def _normalize_token_payload(raw: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,244 @@
+"""
+File watcher for the token catalog: turns filesystem changes into a generation counter.
+
+Caches built from files under `memory/` remember the generation they were
+built at; checking freshness is then an integer comparison instead of an
+`os.walk` plus a `stat` per file.
+
+Backends:
+- inotify (Linux): one watch per directory under the root, opened non-blocking.
+  `generation()` drains pending events with a single `read` that returns
+  immediately when nothing changed. Directories created later are added to
+  the watch set as their events arrive; a queue overflow counts as a change.
+- polling (elsewhere, when inotify is unavailable or out of watches, including
+  when a directory created later cannot be watched):
+  `generation()` re-stats the tree at most every NF_WATCH_POLL_SECONDS and
+  bumps the counter when the (path, size, mtime) fingerprint differs.
+
+Files whose name starts with ".catalog" (the compiled snapshot and its
+temporary files) are ignored so writing the snapshot does not invalidate it.
+
+Config (env):
+- NF_WATCH_BACKEND: auto | inotify | poll (default auto)
+- NF_WATCH_POLL_SECONDS: polling interval for the fallback (default 2.0)
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BACKEND = os.getenv("NF_WATCH_BACKEND", "auto").strip().lower()
+POLL_SECONDS = float(os.getenv("NF_WATCH_POLL_SECONDS", "2.0"))
+
+IGNORED_PREFIX = ".catalog"
+_IGNORED_PREFIX_BYTES = IGNORED_PREFIX.encode("ascii")
+
+# inotify(7) constants
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+    | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF
+)
+_EVENT = struct.Struct("iIII")
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") else None
+
+
+class _Inotify:
+    """Recursive inotify watch over a directory tree."""
+
+    def __init__(self, libc: ctypes.CDLL, root: str) -> None:
+        self._libc = libc
+        self._root = root
+        self._dirs: Dict[int, str] = {}
+        # Reused read buffer: generation() drains on the hot path and must not allocate
+        self._buffer = bytearray(64 * 1024)
+        self._view = memoryview(self._buffer)
+        # Set when a new directory could not be watched (e.g. out of watches); edits there
+        # would go unnoticed, so the owning FileWatcher falls back to polling
+        self.failed = False
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        try:
+            self._watch_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_tree(self, top: str) -> None:
+        for root, _dirs, _files in os.walk(top):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(root), _WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if root == top or err == errno.ENOSPC:
+                    raise OSError(err, f"inotify_add_watch failed for {root}")
+                continue  # Directory vanished while walking
+            self._dirs[wd] = root
+
+    def drain(self) -> bool:
+        """Consume pending events; True when any relevant change happened."""
+        changed = False
+        while True:
+            try:
+                size = os.readv(self.fd, [self._buffer])
+            except BlockingIOError:
+                return changed
+            if not size:
+                return changed
+            offset = 0
+            while offset + _EVENT.size <= size:
+                wd, mask, _cookie, length = _EVENT.unpack_from(self._buffer, offset)
+                name_start = offset + _EVENT.size
+                offset = name_start + length
+                if mask & _IN_Q_OVERFLOW:
+                    changed = True
+                    continue
+                if mask & _IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                if self._buffer.startswith(_IGNORED_PREFIX_BYTES, name_start, offset):
+                    continue
+                changed = True
+                parent = self._dirs.get(wd)
+                if parent and length and mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                    # Only new directories need the name decoded
+                    name = os.fsdecode(bytes(self._view[name_start:offset]).rstrip(b"\0"))
+                    try:
+                        self._watch_tree(os.path.join(parent, name))
+                    except OSError as exc:
+                        logger.warning("failed to watch new directory %s: %s", name, exc)
+                        self.failed = True
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class FileWatcher:
+    """Generation counter for a directory tree, bumped whenever something in it changes."""
+
+    def __init__(self, root: str, *, backend: str = BACKEND, poll_seconds: float = POLL_SECONDS) -> None:
+        self.root = os.path.abspath(root)
+        self._requested = backend
+        self._poll_seconds = max(poll_seconds, 0.0)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._pid = -1
+        self._inotify: Optional[_Inotify] = None
+        self._fingerprint: Optional[Tuple[Tuple[str, int, int], ...]] = None
+        self._polled_at = 0.0
+        self.backend = "poll"
+
+    def _start(self) -> None:
+        # (Re)open per process so forked workers do not share one inotify queue
+        self._pid = os.getpid()
+        self._inotify = None
+        self.backend = "poll"
+        libc = _load_libc() if self._requested in ("auto", "inotify") else None
+        if libc is not None and os.path.isdir(self.root):
+            try:
+                self._inotify = _Inotify(libc, self.root)
+                self.backend = "inotify"
+            except OSError as exc:
+                logger.warning("inotify unavailable for %s, polling instead: %s", self.root, exc)
+        if self._inotify is None:
+            self._fingerprint = self._scan()
+            self._polled_at = time.monotonic()
+
+    def generation(self) -> int:
+        """Current generation; call on the hot path, it never walks the tree under inotify."""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._start()
+            if self._inotify is not None:
+                if self._inotify.drain():
+                    self._generation += 1
+                if self._inotify.failed:
+                    self._fall_back_to_polling()
+            elif time.monotonic() - self._polled_at >= self._poll_seconds:
+                fingerprint = self._scan()
+                self._polled_at = time.monotonic()
+                if fingerprint != self._fingerprint:
+                    self._fingerprint = fingerprint
+                    self._generation += 1
+            return self._generation
+
+    def _fall_back_to_polling(self) -> None:
+        """Switch to polling once inotify cannot cover the whole tree any more."""
+        logger.warning("inotify lost part of %s, polling instead", self.root)
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        self.backend = "poll"
+        self._fingerprint = self._scan()
+        self._polled_at = time.monotonic()
+
+    def _scan(self) -> Tuple[Tuple[str, int, int], ...]:
+        entries: List[Tuple[str, int, int]] = []
+        for root, _dirs, files in os.walk(self.root):
+            entries.append((root, 0, 0))
+            for fn in files:
+                if fn.startswith(IGNORED_PREFIX):
+                    continue
+                path = os.path.join(root, fn)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, st.st_size, st.st_mtime_ns))
+        entries.sort()
+        return tuple(entries)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+            self._pid = -1
+
+
+_watchers: Dict[str, FileWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def watcher_for(root: str) -> FileWatcher:
+    """Shared watcher per directory, so every cache over the same tree uses one inotify instance."""
+    key = os.path.abspath(root)
+    with _watchers_lock:
+        watcher = _watchers.get(key)
+        if watcher is None:
+            watcher = _watchers[key] = FileWatcher(key)
+        return watcher
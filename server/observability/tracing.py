@@ -1,5 +1,5 @@
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Mapping, Optional, Union
 
 # Lazy imports inside functions to avoid hard dependency at import time
 from server.utils.logger import log_json
@@ -30,6 +30,191 @@ def is_tracing_enabled() -> bool:
     return env == "dev"
 
 
+# ---------------------------------------------------------------------------
+# Span facade for hot paths
+#
+# Spans are created when the gate is on (is_tracing_enabled) or when an SDK
+# tracer provider is installed, e.g. by tests or runtime instrumentation.
+# Resolving that means importing opentelemetry and probing the provider, so it
+# is done once, on first use, and cached. Hot paths never read the environment;
+# after changing TRACING_ENABLED/ENV or the tracer provider, call
+# refresh_tracing() (setup_tracing and an explicit EventBus.reload_config do;
+# subscribe/unsubscribe do not).
+# With tracing off, start_span returns a shared no-op span.
+# ---------------------------------------------------------------------------
+
+
+class _NoopSpan:
+    """Stand-in span used when tracing is off; every method does nothing."""
+
+    __slots__ = ()
+    recording = False
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, exc: Optional[BaseException] = None) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    """Context manager around an OpenTelemetry span made current for its duration.
+
+    Errors from the tracing SDK never propagate to the caller.
+    """
+
+    __slots__ = ("_cm", "_span")
+    recording = True
+
+    def __init__(self, cm: Any) -> None:
+        self._cm = cm
+        self._span: Any = None
+
+    def __enter__(self) -> "_Span":
+        try:
+            self._span = self._cm.__enter__()
+        except Exception:
+            self._cm = None
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._cm is not None:
+            try:
+                self._cm.__exit__(None, None, None)
+            except Exception:
+                pass
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self._span is None:
+            return
+        try:
+            self._span.set_attribute(key, value)
+        except Exception:
+            pass
+
+    def set_error(self, exc: Optional[BaseException] = None) -> None:
+        """Mark the span as failed, recording ``exc`` when given."""
+        if self._span is None:
+            return
+        try:
+            from opentelemetry.trace import Status, StatusCode
+
+            if exc is not None:
+                self._span.record_exception(exc)
+            self._span.set_status(Status(StatusCode.ERROR))
+        except Exception:
+            pass
+
+
+class _TracerState:
+    __slots__ = ("active", "tracer", "trace", "textmap")
+
+    def __init__(self, active: bool, tracer: Any = None, trace: Any = None, textmap: Any = None) -> None:
+        self.active = active
+        self.tracer = tracer
+        self.trace = trace
+        self.textmap = textmap
+
+
+_tracer_state: Optional[_TracerState] = None
+
+
+def _resolve_tracer_state() -> _TracerState:
+    try:
+        gate = bool(is_tracing_enabled())
+    except Exception:
+        gate = False
+    try:
+        from opentelemetry import trace
+        from opentelemetry.propagate import get_global_textmap
+
+        # Heuristic: SDK providers expose add_span_processor
+        provider_is_sdk = hasattr(trace.get_tracer_provider(), "add_span_processor")
+    except Exception:
+        return _TracerState(False)
+    active = gate or provider_is_sdk
+    previous = _tracer_state
+    if previous is None or previous.active != active:
+        log_json("debug", "otel.span_gate_resolved", enabled=gate, provider_is_sdk=provider_is_sdk)
+    if not active:
+        return _TracerState(False)
+    return _TracerState(True, trace.get_tracer("neural-forge"), trace, get_global_textmap())
+
+
+def _current_state() -> _TracerState:
+    global _tracer_state
+    state = _tracer_state
+    if state is None:
+        state = _tracer_state = _resolve_tracer_state()
+    return state
+
+
+def refresh_tracing() -> bool:
+    """Re-resolve the span gate and tracer (after changing config or the tracer provider)."""
+    global _tracer_state
+    _tracer_state = _resolve_tracer_state()
+    return _tracer_state.active
+
+
+def spans_enabled() -> bool:
+    return _current_state().active
+
+
+def start_span(
+    name: str,
+    *,
+    traceparent: Optional[str] = None,
+    attributes: Optional[Mapping[str, Any]] = None,
+) -> Union[_Span, _NoopSpan]:
+    """Span context manager for ``name``, linked to ``traceparent`` when valid.
+
+    Returns NOOP_SPAN when tracing is off. Use as ``with start_span(...) as span``.
+    """
+    state = _current_state()
+    if not state.active:
+        return NOOP_SPAN
+    links = None
+    if traceparent:
+        # Best-effort link to upstream context; never fail span creation due to linking
+        try:
+            from opentelemetry.trace import Link
+
+            parent = state.trace.get_current_span(state.textmap.extract({"traceparent": traceparent}))
+            parent_sc = parent.get_span_context()
+            if parent_sc and getattr(parent_sc, "is_valid", False):
+                links = [Link(parent_sc)]
+        except Exception:
+            links = None
+    try:
+        cm = state.tracer.start_as_current_span(name, links=links, attributes=dict(attributes) if attributes else None)
+    except Exception as e:
+        log_json("error", "otel.span_start_error", span=name, error=str(e))
+        return NOOP_SPAN
+    return _Span(cm)
+
+
+def current_traceparent() -> Optional[str]:
+    """W3C traceparent of the current span, or None when tracing is off."""
+    state = _current_state()
+    if not state.active:
+        return None
+    try:
+        carrier: Dict[str, str] = {}
+        state.textmap.inject(carrier)
+        return carrier.get("traceparent")
+    except Exception:
+        return None
+
+
 def _parse_headers_env(raw: Optional[str]) -> Dict[str, str]:
     if not raw:
         return {}
@@ -57,6 +242,7 @@ def setup_tracing(service_name: str, service_version: str) -> bool:
             "endpoint": None,
             "resource": {},
         })
+        refresh_tracing()
         return False
 
     try:
@@ -133,6 +319,7 @@ def setup_tracing(service_name: str, service_version: str) -> bool:
     })
 
     log_json("info", "otel.tracing_initialized", enabled=True)
+    refresh_tracing()
     return True
 
 
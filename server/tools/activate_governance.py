@@ -6,13 +6,20 @@ as an MCP tool that can be called by Windsurf/Cursor to automatically
 apply Neural Forge governance before AI planning and coding activities.
 """
 
+import os
 import uuid
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
-from server.governance.pre_action_engine import activate_pre_action_governance
+from server.governance.pre_action_engine import (
+    activate_pre_action_governance,
+    activate_pre_action_governance_batch,
+)
 from server.utils.logger import log_json
 from server.utils.time import utc_now_iso_z
 
+# Maximum messages accepted by activate_governance_batch
+BATCH_MAX_MESSAGES = int(os.getenv("GOVERNANCE_BATCH_MAX_MESSAGES", "500"))
+
 
 async def activate_governance(args: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -117,3 +124,114 @@ async def activate_governance(args: Dict[str, Any]) -> Dict[str, Any]:
             "timestamp": start_time,
             "requestId": request_id,
         }
+
+
+def _parse_batch_item(item: Any, index: int) -> Tuple[str, List[str]]:
+    """Accept "message", {"user_message", "conversation_history"} or [message, history]."""
+    history: Any = []
+    if isinstance(item, str):
+        message = item
+    elif isinstance(item, dict):
+        message = item.get("user_message", "")
+        history = item.get("conversation_history") or []
+    elif isinstance(item, (list, tuple)) and 1 <= len(item) <= 2:
+        message = item[0]
+        history = item[1] if len(item) == 2 and item[1] is not None else []
+    else:
+        raise ValueError(f"messages[{index}] must be a string, an object or a [message, history] pair")
+    if not isinstance(message, str) or not message:
+        raise ValueError(f"messages[{index}].user_message is required")
+    if not isinstance(history, list) or not all(isinstance(h, str) for h in history):
+        raise ValueError(f"messages[{index}].conversation_history must be a list of strings")
+    return message, history
+
+
+async def activate_governance_batch(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Activate pre-action governance analysis for many messages in one call
+
+    Messages are classified together, each rule domain is loaded once and the
+    usage metrics of the whole batch are written in one flush.
+
+    Args:
+        args: Dictionary containing:
+            - messages (List): Each a message string, an object with user_message and
+              optional conversation_history, or a [message, history] pair
+            - projectId (str, optional): Project used to scope governance metrics
+            - force_activation (bool, optional): Force governance activation regardless of confidence
+
+    Returns:
+        Dictionary with one result per message, in input order
+    """
+    start_time = utc_now_iso_z()
+    request_id = str(uuid.uuid4())
+
+    try:
+        raw_messages = args.get("messages")
+        project_id: Optional[str] = args.get("projectId")
+        force_activation = bool(args.get("force_activation", False))
+
+        if not isinstance(raw_messages, list) or not raw_messages:
+            raise ValueError("messages must be a non-empty list")
+        if len(raw_messages) > BATCH_MAX_MESSAGES:
+            raise ValueError(f"messages accepts at most {BATCH_MAX_MESSAGES} items")
+        messages = [_parse_batch_item(item, i) for i, item in enumerate(raw_messages)]
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": start_time,
+            "requestId": request_id,
+        }
+
+    try:
+        outputs = await activate_pre_action_governance_batch(
+            messages,
+            project_id=project_id,
+            force_activation=force_activation,
+        )
+        results = [
+            {
+                "index": i,
+                "governance_activated": bool(output),
+                "guidance": output or None,
+            }
+            for i, output in enumerate(outputs)
+        ]
+        activated = sum(1 for r in results if r["governance_activated"])
+
+        log_json("info", "activate_governance_batch completed",
+            endpoint="activate_governance_batch",
+            success=True,
+            start_time=start_time,
+            message_count=len(results),
+            activated_count=activated,
+            requestId=request_id,
+        )
+
+        return {
+            "success": True,
+            "results": results,
+            "count": len(results),
+            "activated": activated,
+            "timestamp": start_time,
+            "requestId": request_id,
+        }
+
+    except Exception as e:
+        error_msg = f"Error activating governance: {str(e)}"
+
+        log_json("error", "activate_governance_batch failed",
+            endpoint="activate_governance_batch",
+            success=False,
+            start_time=start_time,
+            error=error_msg,
+            requestId=request_id,
+        )
+
+        return {
+            "success": False,
+            "error": error_msg,
+            "timestamp": start_time,
+            "requestId": request_id,
+        }
@@ -2,7 +2,9 @@ import uuid
 from typing import Any, Dict
 
 from server.db.engine import get_async_engine
-from server.db.repo import add_memory_pg
+from server.db.repo import add_memory_group_pg, add_memory_pg
+from server.memory.backfill import embedding_backfill, is_async_embedding_enabled
+from server.memory.chunking import chunk_rows, embed_chunks, needs_chunking
 from server.memory.semantic import compute_embedding, is_semantic_enabled
 from server.utils.time import utc_now_iso_z
 
@@ -18,6 +20,11 @@ async def handler(req: Dict[str, Any]):
         "metadata": { ... } | null,        # optional
         "quarantined": bool | null         # optional
       }
+
+    With semantic search enabled, content longer than MEMORY_CHUNK_TOKENS is
+    stored as a group of embedded chunks (see server/memory/chunking.py). With
+    MEMORY_EMBED_ASYNC the entry is inserted without an embedding and embedded
+    in the background (server/memory/backfill.py).
     """
     request_id = str(uuid.uuid4())
     ts = utc_now_iso_z()
@@ -49,21 +56,41 @@ async def handler(req: Dict[str, Any]):
     if engine is not None:
         # Use PostgreSQL via SQLAlchemy
         emb = None
-        if is_semantic_enabled():
+        chunks = None
+        embed_later = is_async_embedding_enabled()
+        if is_semantic_enabled() and not embed_later:
             try:
-                emb = await compute_embedding(content)
+                if needs_chunking(content):
+                    embedded = await embed_chunks(content)
+                    chunks = chunk_rows(mem_id, embedded) if embedded else None
+                else:
+                    emb = await compute_embedding(content)
             except Exception:
                 emb = None
-        await add_memory_pg(
-            engine,
-            mem_id=mem_id,
-            project_id=project_id,
-            content=content,
-            metadata=metadata,
-            quarantined=bool(quarantined),
-            embedding=emb,
-            group_id=None,
-        )
+                chunks = None
+        if chunks:
+            await add_memory_group_pg(
+                engine,
+                mem_id=mem_id,
+                project_id=project_id,
+                content=content,
+                metadata=metadata,
+                quarantined=bool(quarantined),
+                chunks=chunks,
+            )
+        else:
+            await add_memory_pg(
+                engine,
+                mem_id=mem_id,
+                project_id=project_id,
+                content=content,
+                metadata=metadata,
+                quarantined=bool(quarantined),
+                embedding=emb,
+                group_id=None,
+            )
+        if embed_later:
+            embedding_backfill.wake()
     else:
         return {
             "error": {"code": "ERR.DB_UNAVAILABLE", "message": "DATABASE_URL not configured"},
@@ -1,6 +1,9 @@
+import time
 import uuid
 from typing import Any, Dict
 
+from server.core import bus
+from server.core.events import TASK_ENQUEUED, Event
 from server.db.engine import get_async_engine
 from server.db.repo import enqueue_task_pg
 from server.utils.time import utc_now_iso_z
@@ -39,6 +42,15 @@ async def handler(req: Dict[str, Any]):
     engine = get_async_engine()
     if engine is not None:
         await enqueue_task_pg(engine, task_id=task_id, project_id=project_id.strip(), payload=payload)
+        await bus.publish(
+            Event(
+                type=TASK_ENQUEUED,
+                project_id=project_id.strip(),
+                payload={"id": task_id, "status": "queued"},
+                ts=time.time(),
+                request_id=request_id,
+            )
+        )
     else:
         return {
             "error": {"code": "ERR.DB_UNAVAILABLE", "message": "DATABASE_URL not configured"},
@@ -1,9 +1,12 @@
+import time
 import uuid
 from typing import Any, Dict
 
 from prometheus_client import Counter
 
 import server.observability.tracing as otel_tracing
+from server.core import bus
+from server.core.events import TASK_CLAIMED, Event
 from server.db.engine import get_async_engine
 from server.db.repo import claim_next_task_pg
 from server.utils.logger import log_json
@@ -30,48 +33,15 @@ async def handler(req: Dict[str, Any]):
     ts = utc_now_iso_z()
 
     project_id = req.get("projectId")
-    # Start OTEL span if enabled or if a SDK provider is present
-    _span_cm = None
-    _span_obj = None
-    _gate = False
-    _provider_is_sdk = False
-    try:
-        _gate = bool(otel_tracing.is_tracing_enabled())
-    except Exception:
-        _gate = False
-    try:
-        from opentelemetry import trace as _t  # type: ignore
-        prov = _t.get_tracer_provider()
-        _provider_is_sdk = hasattr(prov, "add_span_processor")
-    except Exception:
-        _provider_is_sdk = False
-    if _gate or _provider_is_sdk:
-        try:
-            from opentelemetry import trace  # type: ignore
-
-            tracer = trace.get_tracer("neural-forge")
-            _span_cm = tracer.start_as_current_span("Task.claim")
-            _span_obj = _span_cm.__enter__()
-            if _span_obj is not None:
-                _span_obj.set_attribute("phase", "claim")
-                if isinstance(project_id, str):
-                    _span_obj.set_attribute("project_id", project_id)
-        except Exception:
-            _span_cm = None
-            _span_obj = None
-
     resp: Dict[str, Any]
-    try:
+    with otel_tracing.start_span("Task.claim") as span:
+        span.set_attribute("phase", "claim")
+        if isinstance(project_id, str):
+            span.set_attribute("project_id", project_id)
         engine = get_async_engine()
         if engine is None:
-            if _span_obj is not None:
-                try:
-                    from opentelemetry.trace import Status, StatusCode  # type: ignore
-
-                    _span_obj.set_attribute("db_available", False)
-                    _span_obj.set_status(Status(StatusCode.ERROR))
-                except Exception:
-                    pass
+            span.set_attribute("db_available", False)
+            span.set_error()
             TASK_CLAIMS_TOTAL.labels("db_unavailable").inc()
             log_json(
                 "error",
@@ -92,11 +62,7 @@ async def handler(req: Dict[str, Any]):
             project_id=project_id if isinstance(project_id, str) else None,
         )
         if not claimed:
-            if _span_obj is not None:
-                try:
-                    _span_obj.set_attribute("claimed", False)
-                except Exception:
-                    pass
+            span.set_attribute("claimed", False)
             TASK_CLAIMS_TOTAL.labels("none").inc()
             log_json(
                 "info",
@@ -111,14 +77,10 @@ async def handler(req: Dict[str, Any]):
                 "timestamp": ts,
             }
         else:
-            if _span_obj is not None:
-                try:
-                    _span_obj.set_attribute("claimed", True)
-                    tid = claimed.get("id")
-                    if tid is not None:
-                        _span_obj.set_attribute("task_id", str(tid))
-                except Exception:
-                    pass
+            span.set_attribute("claimed", True)
+            tid = claimed.get("id")
+            if tid is not None:
+                span.set_attribute("task_id", str(tid))
             TASK_CLAIMS_TOTAL.labels("claimed").inc()
             log_json(
                 "info",
@@ -134,17 +96,20 @@ async def handler(req: Dict[str, Any]):
                 "payload": claimed["payload"],
                 "createdAt": claimed["createdAt"],
             }
+            await bus.publish(
+                Event(
+                    type=TASK_CLAIMED,
+                    project_id=str(claimed["projectId"]),
+                    payload={"id": str(claimed["id"]), "status": "in_progress"},
+                    ts=time.time(),
+                    request_id=request_id,
+                )
+            )
             resp = {
                 "requestId": request_id,
                 "serverVersion": SERVER_VERSION,
                 "task": task,
                 "timestamp": ts,
             }
-    finally:
-        if _span_cm is not None:
-            try:
-                _span_cm.__exit__(None, None, None)
-            except Exception:
-                pass
 
     return resp
@@ -29,7 +29,7 @@ from __future__ import annotations
 import os
 import time
 import uuid
-from typing import Any, Dict
+from typing import Any, Dict, Optional, cast
 
 from server.core import bus
 from server.core.events import Event
@@ -45,6 +45,24 @@ MAX_CONTENT = int(os.getenv("INGEST_EVENT_MAX_CONTENT_CHARS", "100000"))
 PROJECT_ID_MAX_LENGTH = int(os.getenv("INGEST_EVENT_PROJECT_ID_MAX_LENGTH", "128"))
 
 
+def validate_message(evt_type: Any, role: Any, content: Any) -> Optional[str]:
+    """Validate the per-message fields shared by ingest_event and ingest_events.
+
+    Returns an error message for the first invalid field, or None when valid.
+    """
+    if not isinstance(evt_type, str) or not evt_type.strip():
+        return "type (string) is required"
+    if evt_type not in SUPPORTED_TYPES:
+        return f"unsupported event type: {evt_type}"
+    if role is not None and not isinstance(role, str):
+        return "role must be a string if provided"
+    if not isinstance(content, str) or not content:
+        return "content (string) is required"
+    if len(content) > MAX_CONTENT:
+        return f"content exceeds max length ({MAX_CONTENT})"
+    return None
+
+
 async def handler(req: Dict[str, Any]):
     request_id = str(uuid.uuid4())
     ts = utc_now_iso_z()
@@ -62,16 +80,9 @@ async def handler(req: Dict[str, Any]):
     role = req.get("role")
     content = req.get("content")
 
-    if not isinstance(evt_type, str) or not evt_type.strip():
-        return bad("type (string) is required")
-    if evt_type not in SUPPORTED_TYPES:
-        return bad(f"unsupported event type: {evt_type}")
-    if role is not None and not isinstance(role, str):
-        return bad("role must be a string if provided")
-    if not isinstance(content, str) or not content:
-        return bad("content (string) is required")
-    if len(content) > MAX_CONTENT:
-        return bad(f"content exceeds max length ({MAX_CONTENT})")
+    error = validate_message(evt_type, role, content)
+    if error:
+        return bad(error)
 
     try:
         project_id_norm = normalize_project_id(
@@ -89,7 +100,7 @@ async def handler(req: Dict[str, Any]):
         payload["force_error"] = True
     await bus.publish(
         Event(
-            type=evt_type,
+            type=cast(str, evt_type),  # checked by validate_message
             project_id=project_id_norm,
             payload=payload,
             ts=time.time(),
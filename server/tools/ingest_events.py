@@ -0,0 +1,117 @@
+"""
+Ingest Events tool (batched)
+
+Accepts a whole transcript in one request and publishes it to the EventBus in order.
+The batch is validated in a single pass before anything is published, the project id
+is normalized once, and bus bookkeeping is amortized via ``EventBus.publish_many``.
+
+Request (camelCase):
+  {
+    "projectId": "string",                    # required, applies to every event
+    "events": [                               # required, 1..INGEST_EVENTS_MAX_BATCH
+      {
+        "type": "conversation.message",       # required
+        "role": "user|assistant|system",      # optional (normalized to lowercase)
+        "content": "string"                   # required, length-capped by env
+      },
+      ...
+    ]
+  }
+
+Response:
+  {
+    "requestId": "uuid",
+    "serverVersion": "1.x.x",
+    "timestamp": "UTC ISO8601 Z",
+    "status": "ok",
+    "projectId": "...",
+    "count": 3
+  }
+
+Validation is all-or-nothing: the first invalid event is reported with its index and
+no event from the batch is published. Errors use code ERR.BAD_REQUEST.
+"""
+from __future__ import annotations
+
+import os
+import time
+import uuid
+from typing import Any, Dict, List, cast
+
+from server.core import bus
+from server.core.events import Event
+from server.tools.ingest_event import PROJECT_ID_MAX_LENGTH, validate_message
+from server.utils.identifiers import (
+    ProjectIdNormalizationError,
+    normalize_project_id,
+)
+from server.utils.time import utc_now_iso_z
+
+SERVER_VERSION = "1.3.0"
+MAX_BATCH = int(os.getenv("INGEST_EVENTS_MAX_BATCH", "1000"))
+
+
+async def handler(req: Dict[str, Any]):
+    request_id = str(uuid.uuid4())
+    ts = utc_now_iso_z()
+
+    def bad(msg: str):
+        return {
+            "error": {"code": "ERR.BAD_REQUEST", "message": msg},
+            "requestId": request_id,
+            "serverVersion": SERVER_VERSION,
+            "timestamp": ts,
+        }
+
+    items = req.get("events")
+    if not isinstance(items, list) or not items:
+        return bad("events (non-empty list) is required")
+    if len(items) > MAX_BATCH:
+        return bad(f"events exceeds max batch size ({MAX_BATCH})")
+
+    try:
+        project_id_norm = normalize_project_id(
+            req.get("projectId"), max_length=PROJECT_ID_MAX_LENGTH
+        )
+    except ProjectIdNormalizationError as exc:
+        return bad(str(exc))
+
+    now = time.time()
+    events: List[Event] = []
+    for idx, item in enumerate(items):
+        if not isinstance(item, dict):
+            return bad(f"events[{idx}] must be an object")
+        evt_type = item.get("type")
+        role = item.get("role")
+        content = item.get("content")
+        error = validate_message(evt_type, role, content)
+        if error:
+            return bad(f"events[{idx}]: {error}")
+
+        payload: Dict[str, Any] = {
+            "role": role.lower() if isinstance(role, str) else None,
+            "content": content,
+        }
+        # Test hook: propagate force_error if provided to exercise error path
+        if isinstance(item.get("force_error"), bool) and item["force_error"]:
+            payload["force_error"] = True
+        events.append(
+            Event(
+                type=cast(str, evt_type),  # checked by validate_message
+                project_id=project_id_norm,
+                payload=payload,
+                ts=now,
+                request_id=request_id,
+            )
+        )
+
+    await bus.publish_many(events)
+
+    return {
+        "requestId": request_id,
+        "serverVersion": SERVER_VERSION,
+        "timestamp": ts,
+        "status": "ok",
+        "projectId": project_id_norm,
+        "count": len(events),
+    }
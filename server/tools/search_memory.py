@@ -18,7 +18,8 @@ async def handler(req: Dict[str, Any]):
         "includeQuarantined": bool | null,  # optional (default false)
         "mode": "keyword"|"semantic"|"hybrid" | null,  # optional (default keyword)
         "k": number | null,                 # optional top-k for semantic/hybrid (default = limit)
-        "threshold": number | null          # optional max cosine distance for semantic/hybrid
+        "threshold": number | null,         # optional max cosine distance for semantic/hybrid
+        "scoring": "max"|"sum" | null       # optional chunk-group scoring for semantic/hybrid (default max)
       }
     """
     request_id = str(uuid.uuid4())
@@ -31,6 +32,7 @@ async def handler(req: Dict[str, Any]):
     mode = (req.get("mode") or "keyword").strip().lower() if isinstance(req.get("mode"), str) else "keyword"
     k = req.get("k")
     threshold = req.get("threshold")
+    scoring = req.get("scoring") or "max"
 
     def bad(msg: str):
         return {
@@ -57,6 +59,8 @@ async def handler(req: Dict[str, Any]):
             return bad("k must be an integer if provided")
         if k <= 0 or k > 200:
             k = limit
+    if scoring not in ("max", "sum"):
+        return bad("scoring must be 'max' or 'sum' if provided")
 
     engine = get_async_engine()
     if engine is None:
@@ -110,6 +114,7 @@ async def handler(req: Dict[str, Any]):
                 k=k,
                 include_quarantined=include_quarantined,
                 threshold=float(threshold) if isinstance(threshold, (int, float)) else None,
+                group_scoring=scoring,
             )
         else:
             rows = await keyword_search()
@@ -124,6 +129,7 @@ async def handler(req: Dict[str, Any]):
                 k=k,
                 include_quarantined=include_quarantined,
                 threshold=float(threshold) if isinstance(threshold, (int, float)) else None,
+                group_scoring=scoring,
             )
             rows = dedupe_merge(sem, kw)
         else:
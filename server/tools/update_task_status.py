@@ -1,9 +1,12 @@
+import time
 import uuid
 from typing import Any, Dict
 
 from prometheus_client import Counter
 
 import server.observability.tracing as otel_tracing
+from server.core import bus
+from server.core.events import TASK_UPDATED, Event
 from server.db.engine import get_async_engine
 from server.db.repo import update_task_status_pg
 from server.utils.logger import log_json
@@ -51,48 +54,15 @@ async def handler(req: Dict[str, Any]):
         return bad("status must be one of queued|in_progress|done|failed")
     if result is not None and not isinstance(result, dict):
         return bad("result must be an object if provided")
-    # Start OTEL span if enabled or SDK provider present
-    _span_cm = None
-    _span_obj = None
-    _gate = False
-    _provider_is_sdk = False
-    try:
-        _gate = bool(otel_tracing.is_tracing_enabled())
-    except Exception:
-        _gate = False
-    try:
-        from opentelemetry import trace as _t  # type: ignore
-        prov = _t.get_tracer_provider()
-        _provider_is_sdk = hasattr(prov, "add_span_processor")
-    except Exception:
-        _provider_is_sdk = False
-    if _gate or _provider_is_sdk:
-        try:
-            from opentelemetry import trace  # type: ignore
-
-            tracer = trace.get_tracer("neural-forge")
-            _span_cm = tracer.start_as_current_span("Task.update_status")
-            _span_obj = _span_cm.__enter__()
-            if _span_obj is not None:
-                _span_obj.set_attribute("phase", "update")
-                _span_obj.set_attribute("task_id", task_id)
-                _span_obj.set_attribute("new_status", status)
-        except Exception:
-            _span_cm = None
-            _span_obj = None
-
     resp: Dict[str, Any]
-    try:
+    with otel_tracing.start_span("Task.update_status") as span:
+        span.set_attribute("phase", "update")
+        span.set_attribute("task_id", task_id)
+        span.set_attribute("new_status", status)
         engine = get_async_engine()
         if engine is None:
-            if _span_obj is not None:
-                try:
-                    from opentelemetry.trace import Status, StatusCode  # type: ignore
-
-                    _span_obj.set_attribute("db_available", False)
-                    _span_obj.set_status(Status(StatusCode.ERROR))
-                except Exception:
-                    pass
+            span.set_attribute("db_available", False)
+            span.set_error()
             TASK_UPDATES_TOTAL.labels(status, "db_unavailable").inc()
             log_json("error", "task.update.db_unavailable", request_id=request_id, task_id=task_id, status=status)
             return {
@@ -102,18 +72,14 @@ async def handler(req: Dict[str, Any]):
                 "timestamp": ts,
             }
 
-        ok = await update_task_status_pg(
+        task_project = await update_task_status_pg(
             engine,
             task_id=task_id.strip(),
             status=status,
             result=result,
         )
-        if not ok:
-            if _span_obj is not None:
-                try:
-                    _span_obj.set_attribute("update_ok", False)
-                except Exception:
-                    pass
+        if task_project is None:
+            span.set_attribute("update_ok", False)
             TASK_UPDATES_TOTAL.labels(status, "not_found").inc()
             log_json("warning", "task.update.not_found", request_id=request_id, task_id=task_id, status=status)
             resp = {
@@ -123,13 +89,18 @@ async def handler(req: Dict[str, Any]):
                 "timestamp": ts,
             }
         else:
-            if _span_obj is not None:
-                try:
-                    _span_obj.set_attribute("update_ok", True)
-                except Exception:
-                    pass
+            span.set_attribute("update_ok", True)
             TASK_UPDATES_TOTAL.labels(status, "ok").inc()
             log_json("info", "task.update.ok", request_id=request_id, task_id=task_id, status=status)
+            await bus.publish(
+                Event(
+                    type=TASK_UPDATED,
+                    project_id=task_project,
+                    payload={"id": task_id, "status": status},
+                    ts=time.time(),
+                    request_id=request_id,
+                )
+            )
             resp = {
                 "requestId": request_id,
                 "serverVersion": SERVER_VERSION,
@@ -137,11 +108,5 @@ async def handler(req: Dict[str, Any]):
                 "status": status,
                 "timestamp": ts,
             }
-    finally:
-        if _span_cm is not None:
-            try:
-                _span_cm.__exit__(None, None, None)
-            except Exception:
-                pass
 
     return resp
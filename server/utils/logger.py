@@ -54,7 +54,11 @@ def get_logger() -> logging.Logger:
 
 def log_json(level: str, message: str, **extra: Any) -> None:
     logger = get_logger()
-    rec = logger.makeRecord(logger.name, getattr(logging, level.upper(), logging.INFO),
+    levelno = getattr(logging, level.upper(), logging.INFO)
+    # Skip record construction entirely when the level is filtered out
+    if not logger.isEnabledFor(levelno):
+        return
+    rec = logger.makeRecord(logger.name, levelno,
                             fn="", lno=0, msg=message, args=(), exc_info=None)
     setattr(rec, "extra_dict", extra)
     logger.handle(rec)
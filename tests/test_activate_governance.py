@@ -1,3 +1,4 @@
+import asyncio
 import os
 
 from fastapi.testclient import TestClient
@@ -41,3 +42,87 @@ def test_activate_governance_includes_request_id(monkeypatch):
     assert "requestId" in payload
     assert isinstance(payload["requestId"], str)
     assert payload["requestId"]
+
+
+def test_activate_governance_batch_keeps_order_and_validates(monkeypatch):
+    client = make_client()
+    calls = []
+
+    async def fake_batch(messages, *, project_id=None, force_activation=False):
+        calls.append((messages, project_id, force_activation))
+        return [f"guidance for {m}" if "plan" in m else None for m, _ in messages]
+
+    monkeypatch.setattr(
+        "server.tools.activate_governance.activate_pre_action_governance_batch",
+        fake_batch,
+    )
+
+    response = client.post(
+        "/tool/activate_governance_batch",
+        headers={"Authorization": f"Bearer {TOKEN}"},
+        json={
+            "projectId": "p1",
+            "messages": [
+                "plan a cache",
+                {"user_message": "thanks", "conversation_history": ["hi"]},
+                ["plan the rollout", ["earlier"]],
+            ],
+        },
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["success"] is True and payload["count"] == 3 and payload["activated"] == 2
+    assert [(r["index"], r["governance_activated"]) for r in payload["results"]] == [(0, True), (1, False), (2, True)]
+    assert calls == [([("plan a cache", []), ("thanks", ["hi"]), ("plan the rollout", ["earlier"])], "p1", False)]
+
+    response = client.post(
+        "/tool/activate_governance_batch",
+        headers={"Authorization": f"Bearer {TOKEN}"},
+        json={"messages": ["ok", {"conversation_history": []}]},
+    )
+    assert response.json()["success"] is False
+    assert response.json()["error"] == "messages[1].user_message is required"
+    assert len(calls) == 1
+
+
+def test_batch_matches_single_activations(monkeypatch):
+    from server.governance import pre_action_engine
+    from server.governance.pre_action_engine import (
+        activate_pre_action_governance,
+        activate_pre_action_governance_batch,
+        governance_engine,
+    )
+
+    monkeypatch.setattr(pre_action_engine, "get_async_engine", lambda: None)
+    history = ["We need a new REST endpoint for payments", "It must validate the JWT"]
+    messages = [
+        ("Let's design the API and add authentication", history),
+        ("thanks!", []),
+        ("Write a python function to optimize the database query latency", history[:1]),
+        ("Let's design the API and add authentication", history),
+    ]
+    flushes = []
+    flush = governance_engine.metrics_buffer.flush
+
+    async def counting_flush():
+        flushes.append(1)
+        return await flush()
+
+    monkeypatch.setattr(governance_engine.metrics_buffer, "flush", counting_flush)
+
+    async def run():
+        contexts = await governance_engine.analyze_contexts(messages, project_id="p1")
+        singles = [await governance_engine.analyze_context(m, h, project_id="p1") for m, h in messages]
+        batch = await activate_pre_action_governance_batch(messages, project_id="p1")
+        single = [await activate_pre_action_governance(m, h, project_id="p1") for m, h in messages]
+        return contexts, singles, batch, single
+
+    contexts, singles, batch, single = asyncio.run(run())
+
+    assert [(c.activity_type, c.confidence, sorted(c.detected_keywords)) for c in contexts] == [
+        (c.activity_type, c.confidence, sorted(c.detected_keywords)) for c in singles
+    ]
+    assert batch == single
+    assert batch[0] and batch[1] is None and batch[2]
+    assert flushes == [1]
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+
+from server.nf_client import catalog, governance, tokens
+from server.nf_client.catalog import CatalogStore
+from server.nf_client.watcher import FileWatcher
+
+
+def _memory(tmp_path):
+    memory = tmp_path / "memory"
+    (memory / "tags" / "security").mkdir(parents=True)
+    (memory / "engineering").mkdir()
+    (memory / "tags" / "security" / "RateLimitGuard.yml").write_text("description: limits\nbestPractices: [a, b]\n", encoding="utf-8")
+    (memory / "tags" / "security" / "README.md").write_text("not a token", encoding="utf-8")
+    (memory / "engineering" / "Security.rules.yml").write_text("tagset: SecurityPrinciples\nincludes: [security/RateLimitGuard]\n", encoding="utf-8")
+    return memory
+
+
+def _touch(path, text):
+    path.write_text(text, encoding="utf-8")
+    ts = time.time() + 5
+    os.utime(path, (ts, ts))
+
+
+def test_snapshot_shared_between_stores(tmp_path):
+    memory = _memory(tmp_path)
+    snapshot = str(tmp_path / "catalog.bin")
+
+    first = CatalogStore(str(memory), snapshot)
+    catalog = first.get()
+    assert first.builds == 1
+    assert [t["name"] for t in catalog.tokens()] == ["RateLimitGuard"]
+    assert catalog.tokens(["security"])[0]["rules"] == ["a", "b"]
+    assert catalog.tokens(["missing"]) == []
+    assert catalog.policies()["resolutionGraph"] == {"SecurityPrinciples": ["security/RateLimitGuard"]}
+
+    # Another worker loads the snapshot instead of parsing YAML
+    second = CatalogStore(str(memory), snapshot)
+    loaded = second.get()
+    assert second.builds == 0
+    assert loaded.tokens() == catalog.tokens()
+    assert loaded.content_hash == catalog.content_hash
+
+
+def test_source_change_rebuilds_snapshot(tmp_path):
+    memory = _memory(tmp_path)
+    store = CatalogStore(str(memory), str(tmp_path / "catalog.bin"))
+    before = store.get()
+
+    _touch(memory / "tags" / "security" / "RateLimitGuard.yml", "description: updated\n")
+    _touch(memory / "tags" / "security" / "Secrets.yaml", "description: secrets\n")
+    after = store.get()
+
+    assert store.builds == 2
+    assert after.fingerprint != before.fingerprint
+    assert after.content_hash != before.content_hash
+    assert [(t["name"], t["description"]) for t in after.tokens()] == [("RateLimitGuard", "updated"), ("Secrets", "secrets")]
+    # Unchanged sources do not trigger another build
+    store.get()
+    assert store.builds == 2
+
+
+def test_corrupt_or_foreign_snapshot_is_rebuilt(tmp_path):
+    memory = _memory(tmp_path)
+    snapshot = tmp_path / "catalog.bin"
+    CatalogStore(str(memory), str(snapshot)).get()
+
+    data = bytearray(snapshot.read_bytes())
+    data[-1] ^= 0xFF
+    snapshot.write_bytes(bytes(data))
+    store = CatalogStore(str(memory), str(snapshot))
+    assert store.get().tokens()[0]["name"] == "RateLimitGuard"
+    assert store.builds == 1
+
+    snapshot.write_bytes(b"")
+    store = CatalogStore(str(memory), str(snapshot))
+    store.get()
+    assert store.builds == 1
+
+
+def test_unchanged_generation_skips_restat(tmp_path):
+    memory = _memory(tmp_path)
+    store = CatalogStore(str(memory), str(tmp_path / "catalog.bin"), watcher=FileWatcher(str(memory), backend="poll", poll_seconds=3600))
+    stats_calls = []
+    source_stats = store._source_stats
+    store._source_stats = lambda: stats_calls.append(1) or source_stats()
+
+    store.get()
+    store.get()
+    assert len(stats_calls) == 2  # fingerprint + build on the first load only
+    _touch(memory / "tags" / "security" / "RateLimitGuard.yml", "description: updated\n")
+    assert store.get().tokens()[0]["description"] == "limits"
+    store.invalidate()
+    assert store.get().tokens()[0]["description"] == "updated"
+
+
+def test_fetch_functions_match_direct_parsing():
+    assert tokens.fetch_tokens("nf", [])["tokens"] == tokens._scan_tokens()
+    assert [t["name"] for t in tokens.fetch_tokens("nf", ["security", "nope"])["tokens"]] == [
+        t["name"] for t in tokens._scan_tokens() if t["kind"] == "security"
+    ]
+    assert governance.fetch_policies("nf", []) == governance._scan_policies()
+
+
+def test_snapshot_payload_is_data_only(tmp_path):
+    memory = _memory(tmp_path)
+    snapshot = tmp_path / "catalog.bin"
+    CatalogStore(str(memory), str(snapshot)).get()
+
+    body = snapshot.read_bytes()[len(catalog.MAGIC) + catalog._HEADER.size:]
+    assert json.loads(body)["tokens"][0]["name"] == "RateLimitGuard"
+
+    # A snapshot in the old pickle format is never deserialized, only rebuilt
+    old = pickle.dumps({"fingerprint": "x"})
+    snapshot.write_bytes(catalog.MAGIC + catalog._HEADER.pack(1, hashlib.sha256(old).digest()) + old)
+    store = CatalogStore(str(memory), str(snapshot))
+    assert store.get().tokens()[0]["name"] == "RateLimitGuard"
+    assert store.builds == 1
@@ -0,0 +1,81 @@
+import os
+import signal
+import threading
+
+import numpy as np
+import pytest
+
+from server.memory import embed_pool, semantic
+
+
+@pytest.fixture
+def pool():
+    p = embed_pool.EmbeddingPool("mock", 2, threads=1, timeout=10, start_timeout=30, health_seconds=0)
+    p.start()
+    yield p
+    p.close()
+
+
+def _kill(worker):
+    os.kill(worker.process.pid, signal.SIGKILL)
+    worker.process.join(timeout=5)
+
+
+def test_workers_return_float32_batches(pool):
+    texts = ["alpha", "beta", ""]
+    result = pool.embed(texts)
+
+    assert result.dtype == np.float32 and result.shape == (3, semantic.get_dimension())
+    expected = np.asarray([semantic._mock_embed(t) for t in texts], dtype=np.float32)
+    assert np.array_equal(result, expected)
+    assert pool.embed([]).shape[0] == 0
+
+
+def test_crashed_worker_is_restarted_and_request_retried(pool):
+    for worker in list(pool._workers):
+        _kill(worker)
+
+    result = pool.embed(["still works"])
+
+    assert np.array_equal(result[0], np.asarray(semantic._mock_embed("still works"), dtype=np.float32))
+    assert pool.restarts >= 1
+
+
+def test_health_check_restarts_dead_idle_workers(pool):
+    victim = pool._workers[0]
+    _kill(victim)
+
+    assert pool.check_health() == 1
+    assert all(w.process.is_alive() for w in pool._workers)
+    assert victim not in pool._workers
+    assert pool.check_health() == 0
+
+
+def test_semantic_embedder_uses_pool_when_configured(monkeypatch):
+    monkeypatch.setenv("SEMANTIC_MODEL", "mock")
+    monkeypatch.setattr(embed_pool, "EMBED_PROCESSES", 1)
+    monkeypatch.setattr(semantic, "_embedder", None)
+    try:
+        vectors = semantic.embed_texts(["one", "two"])
+        pool = getattr(semantic.get_embedder(), "_semantic_pool")
+        assert pool.processes == 1
+        assert np.allclose(vectors, [semantic._mock_embed("one"), semantic._mock_embed("two")], atol=1e-6)
+    finally:
+        semantic.close_embedder()
+    assert semantic._embedder is None and not pool._workers
+
+
+def test_concurrent_restarts_keep_every_replacement(pool):
+    victims = list(pool._workers)
+    for worker in victims:
+        _kill(worker)
+
+    threads = [threading.Thread(target=pool._restart, args=(w, "killed")) for w in victims]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(pool._workers) == 2 and not set(victims) & set(pool._workers)
+    assert all(w.process.is_alive() for w in pool._workers)
+    assert pool.restarts == 2
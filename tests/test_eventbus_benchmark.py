@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+import server.core.events as eventsmod
+from server.core import Event, EventBus
+from server.utils.logger import get_logger
+
+_N_EVENTS = 2000
+
+
+class _CaptureHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+def _make_bus(monkeypatch, *, tracing: bool, log_every: str) -> EventBus:
+    monkeypatch.setattr(eventsmod, "is_tracing_enabled", lambda: tracing)
+    monkeypatch.setenv("EVENTBUS_LOG_EVERY_N", log_every)
+    return EventBus()
+
+
+async def _noop(evt: Event) -> None:
+    return None
+
+
+def _per_event_us(bus: EventBus, n: int = _N_EVENTS) -> float:
+    async def run() -> float:
+        await bus.subscribe("conversation.message", _noop)
+        events = [Event(type="conversation.message", project_id="p1", payload={"content": "x"}, ts=time.time()) for _ in range(n)]
+        start = time.perf_counter()
+        for evt in events:
+            await bus.publish(evt)
+        return (time.perf_counter() - start) / n * 1e6
+
+    return asyncio.run(run())
+
+
+def test_fast_path_selected_when_tracing_off(monkeypatch):
+    bus = _make_bus(monkeypatch, tracing=False, log_every="0")
+    assert bus._publish_impl == bus._publish_fast
+
+    monkeypatch.setattr(eventsmod, "is_tracing_enabled", lambda: True)
+    bus.reload_config()
+    assert bus._publish_impl == bus._publish_traced
+
+
+def test_sampled_logging_keeps_all_errors(monkeypatch):
+    bus = _make_bus(monkeypatch, tracing=False, log_every="3")
+
+    async def flaky(evt: Event) -> None:
+        if evt.payload.get("fail"):
+            raise RuntimeError("boom")
+
+    async def run() -> None:
+        await bus.subscribe("conversation.message", flaky)
+        for i in range(7):
+            await bus.publish(Event(type="conversation.message", project_id="p1", payload={"fail": i % 2 == 1}, ts=time.time()))
+
+    logger = get_logger()
+    cap = _CaptureHandler()
+    logger.addHandler(cap)
+    try:
+        asyncio.run(run())
+    finally:
+        logger.removeHandler(cap)
+
+    # 1-in-3 sampling logs events 0, 3 and 6; every failure (1, 3, 5) is logged
+    assert cap.messages.count("eventbus.publish") == 3
+    assert cap.messages.count("eventbus.handler_error") == 3
+    assert bus.events_published_total["conversation.message"] == 7
+    assert bus.events_consumed_total["conversation.message"] == 4
+    assert bus.event_handler_errors_total["conversation.message"] == 3
+
+
+@pytest.mark.benchmark
+def test_publish_overhead_per_event(monkeypatch, record_property):
+    fast = _per_event_us(_make_bus(monkeypatch, tracing=False, log_every="0"))
+    verbose = _per_event_us(_make_bus(monkeypatch, tracing=True, log_every="1"))
+
+    # Per-event publish overhead in microseconds, reported in the JUnit XML (--junitxml)
+    record_property("fast_us", round(fast, 2))
+    record_property("verbose_us", round(verbose, 2))
+    assert fast < 500.0
+    assert fast < verbose
@@ -83,3 +83,112 @@ def test_unsubscribe_stops_invocation():
     assert bus.events_published_total["conversation.message"] == 1
     assert bus.events_consumed_total["conversation.message"] == 0
     assert bus.event_handler_errors_total["conversation.message"] == 0
+
+
+def test_publish_many_preserves_order_and_aggregates_metrics():
+    bus = EventBus()
+    seen: List[str] = []
+
+    async def handler(evt: Event) -> None:
+        seen.append(evt.payload["msg"])
+
+    events = [
+        Event(type="conversation.message", project_id="p1", payload={"msg": f"m{i}"}, ts=time.time())
+        for i in range(5)
+    ]
+    asyncio.run(bus.subscribe("conversation.message", handler))
+    asyncio.run(bus.publish_many(events))
+
+    assert seen == [f"m{i}" for i in range(5)]
+    assert bus.events_published_total["conversation.message"] == 5
+    assert bus.events_consumed_total["conversation.message"] == 5
+    assert bus.event_handler_errors_total["conversation.message"] == 0
+
+
+def test_publish_many_isolates_errors_per_event():
+    bus = EventBus()
+    seen: List[str] = []
+
+    async def flaky(evt: Event) -> None:
+        if evt.payload["msg"] == "bad":
+            raise RuntimeError("boom")
+        seen.append(evt.payload["msg"])
+
+    events = [
+        Event(type="conversation.message", project_id="p1", payload={"msg": msg}, ts=time.time())
+        for msg in ("a", "bad", "b")
+    ]
+    asyncio.run(bus.subscribe("conversation.message", flaky))
+    asyncio.run(bus.publish_many(events))
+
+    assert seen == ["a", "b"]
+    assert bus.events_published_total["conversation.message"] == 3
+    assert bus.events_consumed_total["conversation.message"] == 2
+    assert bus.event_handler_errors_total["conversation.message"] == 1
+
+
+def test_wildcard_subscriptions_follow_registration_order():
+    bus = EventBus()
+    calls: List[str] = []
+
+    def make(name: str):
+        async def h(evt: Event) -> None:
+            calls.append(f"{name}:{evt.type}")
+
+        return h
+
+    async def run() -> None:
+        await bus.subscribe("*", make("all"))
+        await bus.subscribe("conversation.message", make("exact"))
+        await bus.subscribe("conversation.*", make("family"))
+        await bus.subscribe("governance.*", make("gov"))
+        await bus.publish(_make_event("conversation.message"))
+        await bus.publish(_make_event("governance.guidance"))
+        await bus.publish(_make_event("task.enqueued"))
+
+    asyncio.run(run())
+
+    assert calls == [
+        "all:conversation.message",
+        "exact:conversation.message",
+        "family:conversation.message",
+        "all:governance.guidance",
+        "gov:governance.guidance",
+        "all:task.enqueued",
+    ]
+    assert bus.events_consumed_total["conversation.message"] == 3
+
+
+def test_wildcard_dispatch_table_rebuilt_on_unsubscribe_and_dedupes():
+    bus = EventBus()
+    seen: List[str] = []
+
+    async def h(evt: Event) -> None:
+        seen.append(evt.type)
+
+    async def run() -> None:
+        await bus.subscribe("conversation.*", h)
+        await bus.subscribe("conversation.message", h)
+        await bus.publish(_make_event("conversation.message"))
+        await bus.unsubscribe("conversation.*", h)
+        await bus.publish(_make_event("conversation.partial"))
+        await bus.publish(_make_event("conversation.message"))
+
+    asyncio.run(run())
+
+    # Same handler matched twice is delivered once; removed pattern stops matching
+    assert seen == ["conversation.message", "conversation.message"]
+
+
+def test_invalid_subscription_pattern_rejected():
+    bus = EventBus()
+
+    async def h(evt: Event) -> None:
+        return None
+
+    for key in ("conversation*", "*.message", "conv.*.x", ""):
+        try:
+            asyncio.run(bus.subscribe(key, h))
+        except ValueError:
+            continue
+        raise AssertionError(f"pattern {key!r} should be rejected")
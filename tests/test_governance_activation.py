@@ -0,0 +1,120 @@
+import asyncio
+import random
+import time
+
+import pytest
+
+from server.governance.activation import AssociationGraph
+from server.governance.pre_action_engine import ActivityType, GovernanceContext, PreActionGovernanceEngine
+
+
+def _reference_spread(edges, seeds, hops, decay, min_activation):
+    """Plain-Python max-product propagation, one hop at a time."""
+    activation = dict(seeds)
+    for _ in range(hops):
+        nxt = dict(activation)
+        for (src, dst), weight in edges.items():
+            value = activation.get(src, 0.0) * weight * (1 - decay)
+            if value > nxt.get(dst, 0.0):
+                nxt[dst] = value
+        activation = nxt
+    return {n: v for n, v in activation.items() if n not in seeds and v > 0 and v >= min_activation}
+
+
+def test_graph_built_from_strengths_links_and_combinations():
+    tokens = [
+        {"name": "A", "kind": "security", "associative_strength": {"B": 0.9, "C": 0.5, "Missing": 0.99}, "linkedTags": {"direct_links": ["B", "D"]}},
+        {"name": "B", "kind": "security", "linkedTags": {"cross_category": ["C"]}},
+        {"name": "C", "kind": "performance", "pattern_combinations": {"stack": {"tokens": ["A", "C", "D"], "strength": 0.95}}},
+        {"name": "D", "kind": "data"},
+    ]
+    graph = AssociationGraph.from_tokens(tokens)
+    # A->B (explicit 0.9 wins over the direct_links default), A->D (default 0.8), B->C (0.7), C->A and C->D (0.95)
+    # A->C at 0.5 is below the cascade threshold and unknown references are ignored
+    assert graph.edge_count == 5
+
+    reached = graph.spread({"A": 1.0}, hops=2, decay=0.1, min_activation=0.0)
+    assert reached == pytest.approx({"B": 0.9 * 0.9, "D": 0.8 * 0.9, "C": 0.9 * 0.9 * 0.7 * 0.9})
+    assert set(graph.spread({"A": 1.0}, hops=1, decay=0.1, min_activation=0.0)) == {"B", "D"}
+    assert graph.spread({"Unknown": 1.0}) == {}
+
+
+def test_spread_matches_reference_on_random_graphs():
+    rng = random.Random(3)
+    for _ in range(50):
+        n = rng.randint(2, 40)
+        names = [f"T{i}" for i in range(n)]
+        tokens = [
+            {"name": name, "associative_strength": {rng.choice(names): round(rng.uniform(0.6, 1.0), 2) for _ in range(rng.randint(0, 5))}}
+            for name in names
+        ]
+        graph = AssociationGraph.from_tokens(tokens)
+        edges = {}
+        for token in tokens:
+            for ref, weight in token["associative_strength"].items():
+                if ref != token["name"] and weight >= 0.7:
+                    edges[(token["name"], ref)] = weight
+        seeds = {name: rng.uniform(0.3, 1.0) for name in rng.sample(names, rng.randint(1, 3))}
+        hops = rng.randint(1, 4)
+        expected = _reference_spread(edges, seeds, hops, 0.1, 0.2)
+        result = graph.spread(seeds, hops=hops, decay=0.1, budget_ms=1000, min_activation=0.2)
+        # Nodes right at the threshold may fall on either side with float32 rounding
+        assert set(result) ^ set(expected) <= {k for k, v in {**expected, **result}.items() if abs(v - 0.2) < 1e-5}
+        for name in set(result) & set(expected):
+            assert result[name] == pytest.approx(expected[name], rel=1e-5)
+
+
+@pytest.mark.benchmark
+def test_spread_latency_on_large_catalog():
+    rng = random.Random(5)
+    n = 5000
+    names = [f"Token{i}" for i in range(n)]
+    tokens = [{"name": name, "associative_strength": {rng.choice(names): rng.uniform(0.7, 1.0) for _ in range(12)}} for name in names]
+    graph = AssociationGraph.from_tokens(tokens)
+
+    seeds = {name: 1.0 for name in rng.sample(names, 5)}
+    graph.spread(seeds)  # warm up
+    start = time.perf_counter()
+    reached = graph.spread(seeds, hops=3)
+    spread_ms = (time.perf_counter() - start) * 1000
+
+    assert reached
+    assert spread_ms < 20.0
+
+
+def test_engine_surfaces_linked_rules_from_other_domains():
+    tokens = {
+        "security": [
+            {"kind": "security", "name": f"Filler{i}", "description": "", "rules": [], "source": f"security/Filler{i}.yml"} for i in range(12)
+        ]
+        + [
+            {
+                "kind": "security",
+                "name": "RateLimitGuard",
+                "description": "",
+                "rules": [],
+                "source": "security/RateLimitGuard.yml",
+                "linkedTags": {"context_triggers": ["rate_limiting"]},
+                "associative_strength": {"CachingPatterns": 0.9},
+            }
+        ],
+        "performance": [
+            {"kind": "performance", "name": "CachingPatterns", "description": "", "rules": [], "source": "performance/CachingPatterns.yml"}
+        ],
+    }
+
+    def loader(project_id, kinds):
+        return {"tokens": [dict(t) for kind in kinds for t in tokens.get(kind, [])]}
+
+    engine = PreActionGovernanceEngine(token_loader=loader, cache_ttl=3600)
+    context = GovernanceContext(
+        activity_type=ActivityType.SECURITY,
+        confidence=0.6,
+        detected_keywords=["rate limiting"],
+        user_intent="",
+        relevant_domains=["security"],
+    )
+    rules = asyncio.run(engine._get_relevant_rules(context))
+
+    assert [r["name"] for r in rules[:2]] == ["RateLimitGuard", "CachingPatterns"]
+    assert len(rules) == 10
@@ -0,0 +1,126 @@
+import asyncio
+import random
+import re
+import time
+
+import pytest
+
+from server.governance.classifier import ActivityClassifier, ContextWindow
+from server.governance.pre_action_engine import ActivityType, PreActionGovernanceEngine
+
+ENGINE = PreActionGovernanceEngine()
+PATTERNS = ENGINE.activity_patterns
+
+
+def _legacy_classify(text: str):
+    """Reference: the original per-pattern re.findall scoring."""
+    scores = {}
+    keywords = []
+    for activity, patterns in PATTERNS.items():
+        score = 0.0
+        activity_keywords = []
+        for pattern in patterns:
+            matches = re.findall(pattern, text, re.IGNORECASE)
+            if matches:
+                score += len(matches) * 0.2
+                activity_keywords.extend(matches)
+        if score > 0:
+            scores[activity] = min(score, 1.0)
+            keywords.extend(activity_keywords)
+    return scores, keywords
+
+
+def _vocabulary():
+    words = []
+    for patterns in PATTERNS.values():
+        for pattern in patterns:
+            words += re.findall(r"[a-z/']+(?: [a-z]+)*", pattern.replace("\\'", "'"))
+    # Near misses: prefixes/suffixes, underscores, digits and IGNORECASE-only letters
+    return words + ["builder", "unicode", "xapi", "buildcode", "api_", "_test", "tests2", "ſecurity", "ınfra", "é", "2"]
+
+
+def test_compiled_classifier_matches_legacy_on_random_corpus():
+    assert ENGINE.activity_classifier.fallback_patterns == []
+    vocab = _vocabulary()
+    rng = random.Random(7)
+    seps = ["", " ", " ", "  ", "\n", ", ", "-", "'"]
+    for _ in range(3000):
+        parts = [rng.choice(vocab) for _ in range(rng.randint(0, 25))]
+        text = "".join(rng.choice(seps) + part for part in parts).lower()
+        result = ENGINE.activity_classifier.classify(text)
+        assert (result.scores, result.keywords) == _legacy_classify(text), text
+
+
+def test_context_window_matches_full_rescan():
+    classifier = ENGINE.activity_classifier
+    # Short fragments make phrases ("unit test", "step by step") and the proximity rule span messages
+    vocab = _vocabulary() + ["unit", "step", "by", "design", "how", "to", "let", "s", "ci", "cd", "\n"]
+    rng = random.Random(11)
+    seps = ["", " ", "  ", "\n", ", ", "-", "'", "/"]
+    for _ in range(400):
+        window = ContextWindow(classifier, 3)
+        history = []
+        for _ in range(8):
+            parts = [rng.choice(vocab) for _ in range(rng.randint(0, rng.choice([2, 6, 20])))]
+            message = "".join(rng.choice(seps) + part for part in parts).lower()
+            scan = classifier.scan(message)
+            incremental = window.classify(scan)
+            full = classifier.classify(" ".join(history[-3:] + [message]))
+            assert incremental.scores == full.scores, (history[-3:], message)
+            assert set(incremental.keywords) == set(full.keywords), (history[-3:], message)
+            window.push(scan)
+            history.append(message)
+
+
+def test_analyze_context_uses_compiled_classifier():
+    history = ["Let's plan the rollout", "we need a migration"]
+    message = "Write a Python function for the API\nthen deploy to production"
+    context = asyncio.run(ENGINE.analyze_context(message, history))
+    scores, keywords = _legacy_classify(" ".join(history + [message]).lower())
+
+    assert set(context.detected_keywords) == set(keywords)
+    assert context.activity_type == max(scores.items(), key=lambda x: x[1])[0]
+    assert context.confidence == scores[context.activity_type]
+    assert "write a python function for the api" in context.detected_keywords
+
+
+def test_unrecognized_patterns_fall_back_to_findall():
+    classifier = ActivityClassifier({ActivityType.TESTING: [r"\btest\w*\b", r"\b(?:mock|stub)\b"]})
+    assert classifier.fallback_patterns == [r"\btest\w*\b"]
+    result = classifier.classify("testing with a mock and tests")
+    assert result.scores == {ActivityType.TESTING: 0.6000000000000001}
+    assert result.keywords == ["testing", "tests", "mock"]
+
+
+def _elapsed_ms(fn, text: str) -> float:
+    start = time.perf_counter()
+    fn(text)
+    return (time.perf_counter() - start) * 1000
+
+
+def test_adversarial_input_matches_legacy():
+    text = ("build " * 2048)[:2048]
+    result = ENGINE.activity_classifier.classify(text)
+    assert (result.scores, result.keywords) == _legacy_classify(text)
+
+
+@pytest.mark.benchmark
+def test_adversarial_inputs_scale_linearly():
+    classify = ENGINE.activity_classifier.classify
+    size = 100_000  # INGEST_EVENT_MAX_CONTENT_CHARS default
+    adversarial = {
+        "verbs_without_noun": ("build " * size)[:size],
+        "dense_keywords": ("unit test api " * size)[:size],
+        "single_word": "a" * size,
+        "many_lines": ("write\n" * size)[:size],
+    }
+    for name, text in adversarial.items():
+        per_kb = _elapsed_ms(classify, text) / (size / 1024)
+        # Generous bound; the legacy implementation needs seconds for "verbs_without_noun"
+        assert per_kb < 20.0, name
+
+    # Same input at 8KB: the legacy proximity pattern backtracks quadratically
+    small = ("build " * 8192)[:8192]
+    legacy_ms = _elapsed_ms(_legacy_classify, small)
+    compiled_ms = _elapsed_ms(classify, small)
+    assert compiled_ms < legacy_ms
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import time
+
+from server.governance.pre_action_engine import ActivityType, GovernanceContext, PreActionGovernanceEngine
+
+DOMAINS = ["security", "performance", "reliability"]
+
+
+def _engine(delay):
+    calls = []
+    lock = threading.Lock()
+
+    def loader(project_id, kinds):
+        with lock:
+            calls.append(tuple(kinds))
+        time.sleep(delay)  # stands in for YAML parsing
+        return {"tokens": [{"kind": kind, "name": f"{kind}-rule", "source": f"{kind}/rule.yml"} for kind in kinds]}
+
+    engine = PreActionGovernanceEngine(token_loader=loader, cache_ttl=3600)
+    metric_queries = []
+
+    async def load_metrics(tokens):
+        metric_queries.append(sorted(t["source"] for t in tokens))
+        await asyncio.sleep(delay)  # stands in for the database round trip
+        return {}
+
+    engine._load_metrics_for_tokens = load_metrics
+    engine._load_association_graph = lambda: asyncio.sleep(0)
+    return engine, calls, metric_queries
+
+
+def _context():
+    return GovernanceContext(ActivityType.ARCHITECTURE, 0.6, [], "", list(DOMAINS))
+
+
+def test_cold_domains_load_concurrently_with_one_metrics_query():
+    engine, calls, metric_queries = _engine(0.2)
+
+    started = time.perf_counter()
+    rules = asyncio.run(engine._get_relevant_rules(_context()))
+    elapsed = time.perf_counter() - started
+
+    assert [r["name"] for r in rules] == [f"{domain}-rule" for domain in DOMAINS]
+    assert sorted(calls) == sorted((domain,) for domain in DOMAINS)
+    assert metric_queries == [sorted(f"{domain}/rule.yml" for domain in DOMAINS)]
+    # Three parses overlap, then one query: ~2 delays instead of ~6 sequentially
+    assert elapsed < 0.2 * 4
+
+
+def test_concurrent_requests_share_a_cold_domain_load():
+    engine, calls, metric_queries = _engine(0.05)
+
+    async def run():
+        return await asyncio.gather(*(engine._get_relevant_rules(_context()) for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert len(calls) == len(DOMAINS) and len(metric_queries) == 1
+    assert all([r.rule for r in result] == [r.rule for r in results[0]] for result in results)
+    assert not engine._domain_loads
+
+
+def test_waiters_reload_when_the_owning_request_is_cancelled():
+    engine, calls, _ = _engine(0.05)
+
+    async def run():
+        owner = asyncio.create_task(engine._load_domain_entries(["security"]))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(engine._load_domain_entries(["security"]))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        return await waiter
+
+    entries = asyncio.run(run())
+
+    assert [r.name for r in entries["security"]["rules"]] == ["security-rule"]
+    assert not engine._domain_loads
@@ -0,0 +1,177 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+from server.db.repo import record_governance_token_metrics_batch_pg
+from server.governance.metrics_buffer import TokenMetricsBuffer
+from server.governance.pre_action_engine import ActivityType, GovernanceContext, PreActionGovernanceEngine
+from server.governance.rules import AppliedRule, GovernanceRule
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class _Table:
+    """In-memory governance_token_metrics applying the batch UPSERT arithmetic."""
+
+    def __init__(self):
+        self.rows = {}
+        self.batches = []
+
+    async def write(self, aggregates):
+        self.batches.append(aggregates)
+        out = []
+        for agg in aggregates:
+            key = (agg["token_id"], agg["project_id"])
+            count, avg = agg["activation_count"], agg["effectiveness_sum"] / agg["activation_count"]
+            row = self.rows.get(key)
+            if row is None:
+                row = {"tokenId": key[0], "projectId": key[1], "activationCount": count, "effectivenessScore": avg}
+            else:
+                n = row["activationCount"]
+                row = {
+                    **row,
+                    "activationCount": n + count,
+                    "effectivenessScore": (row["effectivenessScore"] * n + avg * count) / (n + count),
+                }
+            row["lastAppliedAt"] = agg["last_applied_at"]
+            self.rows[key] = row
+            out.append(dict(row))
+        return out
+
+
+def _sequential(samples):
+    rows = {}
+    for token, project, sample in samples:
+        count, avg = rows.get((token, project), (0, 0.0))
+        rows[(token, project)] = (count + 1, (avg * count + sample) / (count + 1))
+    return rows
+
+
+def test_batched_flushes_match_sequential_running_average():
+    rng = random.Random(7)
+    samples = [(f"t{rng.randrange(5)}", rng.choice(["global", "p1"]), rng.random()) for _ in range(300)]
+    table = _Table()
+    buffer = TokenMetricsBuffer(table.write, flush_size=1000)
+
+    async def run():
+        for i, (token, project, sample) in enumerate(samples):
+            buffer.add(token, None if project == "global" else project, sample, T0 + timedelta(seconds=i))
+            if i % 37 == 0:
+                await buffer.flush()
+        await buffer.stop()
+
+    asyncio.run(run())
+
+    expected = _sequential(samples)
+    assert set(table.rows) == set(expected)
+    for key, (count, avg) in expected.items():
+        assert table.rows[key]["activationCount"] == count
+        assert abs(table.rows[key]["effectivenessScore"] - avg) < 1e-9
+    assert len(table.batches) <= 300 // 37 + 2
+
+
+def test_size_trigger_bound_and_failed_write_requeue():
+    table = _Table()
+    failures = [RuntimeError("db down")]
+
+    async def flaky(aggregates):
+        if failures:
+            raise failures.pop()
+        return await table.write(aggregates)
+
+    flushed = []
+    buffer = TokenMetricsBuffer(flaky, flush_seconds=3600, flush_size=2, max_pending=3, on_flush=flushed.append)
+
+    async def run():
+        assert buffer.add("a", None, 0.2, T0)
+        assert buffer.add("b", "p", 0.4, T0)  # reaches flush_size: early flush scheduled
+        assert buffer.add("c", None, 0.6, T0)
+        assert not buffer.add("d", None, 0.8, T0)  # over the bound
+        assert buffer.add("a", "global", 0.4, T0 + timedelta(seconds=1))  # existing keys still merge
+        await asyncio.sleep(0)  # the scheduled flush fails and requeues
+        assert table.batches == [] and buffer.pending_count == 3
+        await buffer.stop()
+
+    asyncio.run(run())
+
+    assert buffer.dropped == 1 and buffer.pending_count == 0
+    assert table.rows[("a", "global")]["activationCount"] == 2
+    assert abs(table.rows[("a", "global")]["effectivenessScore"] - 0.3) < 1e-9
+    assert table.rows[("a", "global")]["lastAppliedAt"] == T0 + timedelta(seconds=1)
+    assert ("d", "global") not in table.rows
+    assert [r["tokenId"] for r in flushed[0]] == ["a", "b", "c"]
+
+
+def test_engine_buffers_samples_and_projects_cached_metrics(monkeypatch):
+    table = _Table()
+    buffer = TokenMetricsBuffer(table.write, flush_seconds=3600)
+    engine = PreActionGovernanceEngine(token_loader=lambda *_: {"tokens": []}, metrics_buffer=buffer)
+    monkeypatch.setattr("server.governance.pre_action_engine.get_async_engine", lambda: object())
+    rule = GovernanceRule.from_dict({"name": "Guard", "priority": "high", "tokenRef": "security/Guard.yml"})
+    context = GovernanceContext(ActivityType.CODING, 0.8, [], "", ["security"], project_id="p1")
+
+    async def run():
+        applied = [AppliedRule(rule) for _ in range(3)]
+        for item in applied:
+            await engine._record_token_metrics(context, [item])
+        assert table.batches == []
+        return applied, await buffer.flush()
+
+    applied, records = asyncio.run(run())
+
+    sample = 0.8 * 0.85
+    assert applied[-1].usage_metrics["activationCount"] == 3
+    assert abs(applied[-1].usage_metrics["effectivenessScore"] - sample) < 1e-9
+    # One batch row for three activations; the stored record replaces the projection
+    assert len(table.batches) == 1 and table.batches[0][0]["activation_count"] == 3
+    assert engine.token_metrics_cache["security/Guard.yml"] == records[0]
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+
+class _Conn:
+    def __init__(self, calls):
+        self.calls = calls
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params):
+        self.calls.append((str(query), params))
+        return _Result([])
+
+
+class _Engine:
+    def __init__(self):
+        self.calls = []
+
+    def begin(self):
+        return _Conn(self.calls)
+
+
+def test_batch_upsert_merges_duplicate_keys_into_one_row():
+    engine = _Engine()
+    aggregates = [
+        {"token_id": "a", "project_id": None, "activation_count": 2, "effectiveness_sum": 1.0, "last_applied_at": T0},
+        {"token_id": "a", "project_id": "global", "activation_count": 1, "effectiveness_sum": 0.5,
+         "last_applied_at": T0 + timedelta(seconds=5)},
+        {"token_id": "b", "project_id": "p", "activation_count": 0, "effectiveness_sum": 0.0, "last_applied_at": T0},
+    ]
+
+    asyncio.run(record_governance_token_metrics_batch_pg(engine, aggregates=aggregates))
+
+    (query, params), = engine.calls
+    assert "ON CONFLICT (token_id, project_id)" in query
+    assert params["token_id_0"] == "a" and params["project_id_0"] == "global"
+    assert params["count_0"] == 3 and params["effectiveness_0"] == 0.5
+    assert params["applied_0"] == T0 + timedelta(seconds=5)
+    assert "token_id_1" not in params
@@ -0,0 +1,81 @@
+import asyncio
+
+from server.governance.pre_action_engine import ActivityType, GovernanceContext, PreActionGovernanceEngine
+from server.governance.rule_index import RuleIndex, query_terms, top_k
+
+
+def _context(keywords, domains):
+    return GovernanceContext(
+        activity_type=ActivityType.CODING,
+        confidence=0.6,
+        detected_keywords=list(keywords),
+        user_intent="",
+        relevant_domains=list(domains),
+    )
+
+
+def _token(kind, name, **fields):
+    return {"kind": kind, "name": name, "description": "", "rules": [], "source": f"{kind}/{name}.yml", **fields}
+
+
+def _engine(tokens_by_kind):
+    calls = []
+
+    def loader(project_id, kinds):
+        calls.append(tuple(kinds))
+        return {"tokens": [dict(t) for kind in kinds for t in tokens_by_kind.get(kind, [])]}
+
+    return PreActionGovernanceEngine(token_loader=loader, cache_ttl=3600), calls
+
+
+def test_query_terms_normalize_phrases_and_words():
+    assert query_terms(["Rate_Limiting", "the api"]) == {"rate limiting", "rate", "limiting", "the api", "api"}
+    index = RuleIndex([{"linkedTags": ["rate_limiting"]}, {"triggers": ["rate limiting"]}])
+    assert index.score({"rate limiting"}) == {0: 0.5, 1: 1.0}
+    assert top_k([(1.0, 1, 0), (1.0, 0, 3), (2.0, 1, 5)], 2) == [(1, 5), (0, 3)]
+
+
+def test_relevant_rules_ranked_by_trigger_index():
+    security = [_token("security", f"Filler{i}") for i in range(12)]
+    security.append(_token("security", "RateLimitGuard", linkedTags={"context_triggers": ["rate_limiting"]}))
+    performance = [_token("performance", "Caching", appliesTo=["API responses"], patterns=["Read-through cache"])]
+    engine, calls = _engine({"security": security, "performance": performance})
+
+    rules = asyncio.run(engine._get_relevant_rules(_context(["rate limiting", "cache"], ["security", "performance"])))
+
+    # Matches first, then the remaining slots in catalog order
+    assert [r["name"] for r in rules[:2]] == ["RateLimitGuard", "Caching"]
+    assert [r["name"] for r in rules[2:]] == [f"Filler{i}" for i in range(8)]
+    assert sorted(calls[:2]) == [("performance",), ("security",)]
+
+
+def test_relevant_rules_without_keywords_keep_catalog_order():
+    security = [_token("security", f"S{i}") for i in range(6)]
+    performance = [_token("performance", f"P{i}") for i in range(6)]
+    engine, _ = _engine({"security": security, "performance": performance})
+
+    rules = asyncio.run(engine._get_relevant_rules(_context([], ["security", "performance"])))
+
+    assert [r["name"] for r in rules] == [f"S{i}" for i in range(6)] + [f"P{i}" for i in range(4)]
+
+
+def test_usage_metrics_break_ties_and_cached_rules_are_reused():
+    security = [_token("security", name, appliesTo=["API endpoints"]) for name in ("A", "B", "C")]
+    engine, calls = _engine({"security": security})
+    engine.token_metrics_cache["security/C.yml"] = {"tokenId": "security/C.yml", "effectivenessScore": 0.9}
+
+    rules = asyncio.run(engine._get_relevant_rules(_context(["api"], ["security"])))
+    assert [r["name"] for r in rules] == ["C", "A", "B"]
+    loads = len(calls)
+
+    assert rules[0]["usageMetrics"]["effectivenessScore"] == 0.9
+    again = asyncio.run(engine._get_relevant_rules(_context(["api"], ["security"])))
+    assert again[0].rule is rules[0].rule
+    assert len(calls) == loads
+
+
+def test_real_catalog_prefers_matching_tokens():
+    engine = PreActionGovernanceEngine()
+    rules = asyncio.run(engine._get_relevant_rules(_context(["rate limiting", "api"], ["security", "performance"])))
+    assert len(rules) == 10
+    assert rules[0]["name"] == "RateLimitGuard"
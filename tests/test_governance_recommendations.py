@@ -0,0 +1,98 @@
+import asyncio
+
+from server.governance.pre_action_engine import ActivityType, GovernanceContext, PreActionGovernanceEngine
+
+
+class _Watcher:
+    def __init__(self):
+        self.value = 0
+
+    def generation(self):
+        return self.value
+
+
+def _token(name, description):
+    return {"kind": "security", "name": name, "description": description, "rules": [], "source": f"security/{name}.yml",
+            "appliesTo": [name.lower()]}
+
+
+def _engine(**kwargs):
+    calls = []
+
+    def loader(project_id, kinds):
+        calls.append(tuple(kinds))
+        return {"tokens": [
+            _token("Auth", "authentication checks"), _token("Secrets", "secret storage"), _token("Caching", "performance")
+        ] if "security" in kinds else []}
+
+    engine = PreActionGovernanceEngine(token_loader=loader, cache_ttl=3600, **kwargs)
+    engine._watcher = _Watcher()
+    return engine, calls
+
+
+def _context(confidence=0.5, keywords=("auth",), project_id=None):
+    return GovernanceContext(ActivityType.SECURITY, confidence, list(keywords), "", ["security"], project_id=project_id)
+
+
+def _recommend(engine, context):
+    async def run():
+        recommendation = await engine.get_governance_recommendations(context)
+        return recommendation, await engine.format_governance_output(recommendation)
+
+    return asyncio.run(run())
+
+
+def test_repeated_context_reuses_memoized_recommendation():
+    engine, calls = _engine()
+    ranked = []
+    get_relevant_rules = engine._get_relevant_rules
+
+    async def counting(context):
+        ranked.append(context)
+        return await get_relevant_rules(context)
+
+    engine._get_relevant_rules = counting
+
+    first, first_text = _recommend(engine, _context(0.5))
+    loads = len(calls)
+    second, second_text = _recommend(engine, _context(0.9))
+
+    assert len(ranked) == 1 and len(calls) == loads
+    assert "CRITICAL" in first_text
+    assert [r.rule for r in second.relevant_rules] == [r.rule for r in first.relevant_rules]
+    assert second.confidence == 0.9 and "**Confidence:** 90.0%" in second_text
+    assert second_text.replace("90.0%", "50.0%") == first_text
+    # Matches a fresh, unmemoized rendering
+    fresh, fresh_text = _recommend(_engine(recommendation_ttl=0)[0], _context(0.9))
+    assert fresh_text == second_text
+    assert [r.rule.name for r in fresh.relevant_rules] == [r.rule.name for r in second.relevant_rules]
+
+
+def test_memo_key_and_invalidation():
+    engine, _ = _engine()
+    ranked = []
+    get_relevant_rules = engine._get_relevant_rules
+
+    async def counting(context):
+        ranked.append(context)
+        return await get_relevant_rules(context)
+
+    engine._get_relevant_rules = counting
+
+    _recommend(engine, _context())
+    _recommend(engine, _context(project_id="  global "))  # same normalized project
+    assert len(ranked) == 1
+    first, _ = _recommend(engine, _context(keywords=("secrets",)))
+    _recommend(engine, _context(project_id="other"))
+    assert len(ranked) == 3
+    assert first.relevant_rules[0]["name"] == "Secrets"
+
+    engine._watcher.value += 1  # catalog changed
+    _recommend(engine, _context())
+    assert len(ranked) == 4
+
+    # Edited recommendations are rendered from their own fields
+    recommendation, _ = _recommend(engine, _context())
+    recommendation.warnings.append("custom warning")
+    assert "custom warning" in asyncio.run(engine.format_governance_output(recommendation))
+    assert "custom warning" not in _recommend(engine, _context())[1]
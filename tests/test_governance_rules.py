@@ -0,0 +1,112 @@
+import asyncio
+import copy
+import dataclasses
+import time
+import tracemalloc
+
+import pytest
+
+from server.governance.pre_action_engine import ActivityType, GovernanceContext, PreActionGovernanceEngine
+from server.governance.rules import AppliedRule, GovernanceRule
+
+_DOMAINS = ["security", "performance", "reliability"]
+
+
+def _context():
+    return GovernanceContext(
+        activity_type=ActivityType.DEPLOYMENT,
+        confidence=0.6,
+        detected_keywords=["deploy", "production", "api"],
+        user_intent="",
+        relevant_domains=list(_DOMAINS),
+        project_id="p1",
+    )
+
+
+def test_rules_are_frozen_and_metrics_are_per_request():
+    rule = GovernanceRule.from_dict({"name": "RateLimitGuard", "triggers": ["ratelimitguard"], "rules": ["a"], "tokenRef": "ref"})
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        rule.name = "other"  # type: ignore[misc]
+    with pytest.raises(TypeError):
+        rule["name"] = "other"  # type: ignore[index]
+    assert not hasattr(rule, "__dict__")
+
+    first, second = AppliedRule(rule), AppliedRule(rule, {"effectivenessScore": 0.5})
+    first.usage_metrics = {"effectivenessScore": 0.9}
+    assert second["usageMetrics"] == {"effectivenessScore": 0.5}
+    assert "usageMetrics" not in AppliedRule(rule)
+    assert rule.get("tokenRef") == "ref" and rule.get("usageMetrics") is None
+    assert second.to_dict() == {
+        "name": "RateLimitGuard",
+        "description": "No description available",
+        "priority": "medium",
+        "triggers": ["ratelimitguard"],
+        "category": None,
+        "rules": ["a"],
+        "tokenRef": "ref",
+        "source": None,
+        "usageMetrics": {"effectivenessScore": 0.5},
+    }
+
+
+def test_recommendations_share_cached_rules():
+    engine = PreActionGovernanceEngine()
+
+    async def run():
+        first = await engine.get_governance_recommendations(_context())
+        second = await engine.get_governance_recommendations(_context())
+        return first, second
+
+    first, second = asyncio.run(run())
+    # Recorded usage metrics may reorder the second ranking; the records themselves are shared
+    shared = {r.rule.name: r.rule for r in second.relevant_rules}
+    assert all(shared.get(r.rule.name) is r.rule for r in first.relevant_rules)
+    assert "For Deployment activities, 10 relevant governance rules apply." in first.summary
+
+
+def _measure(fn, rounds=200):
+    fn()  # warm caches
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    elapsed_us = (time.perf_counter() - start) / rounds * 1e6
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_us, peak
+
+
+@pytest.mark.benchmark
+def test_cache_hit_allocation_benchmark():
+    engine = PreActionGovernanceEngine()
+    context = _context()
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(engine._get_relevant_rules(context))
+        cached = [[rule.to_dict() for rule in engine.rule_cache[d]["rules"]] for d in _DOMAINS]
+
+        def deepcopy_hit():
+            # Previous cache hit: deep-copy every cached rule of every domain
+            rules = []
+            for domain_rules in cached:
+                rules.extend(copy.deepcopy(domain_rules))
+            return rules[:10]
+
+        async def shared_hit_async():
+            rules = []
+            for domain in _DOMAINS:
+                entry = await engine._load_domain_entry(domain)
+                rules.extend(entry["rules"])
+            return [AppliedRule(rule, engine.token_metrics_cache.get(rule.token_ref)) for rule in rules[:10]]
+
+        def shared_hit():
+            return loop.run_until_complete(shared_hit_async())
+
+        legacy_us, legacy_peak = _measure(deepcopy_hit)
+        shared_us, shared_peak = _measure(shared_hit)
+    finally:
+        loop.close()
+
+    assert shared_peak * 2 < legacy_peak
+    assert shared_us < legacy_us
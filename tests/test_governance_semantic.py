@@ -0,0 +1,89 @@
+import asyncio
+
+import numpy as np
+
+from server.governance.pre_action_engine import ActivityType, GovernanceContext, PreActionGovernanceEngine
+from server.nf_client.catalog import TokenCatalog
+from server.nf_client.embeddings import EmbeddingStore
+
+VOCABULARY = ["latency", "p99", "spikes", "payment", "password", "hashing", "cache"]
+
+TOKENS = [
+    {"kind": "security", "name": "PasswordHashing", "description": "password hashing", "rules": [], "source": "security/PasswordHashing.yml"},
+    {"kind": "security", "name": "InputValidation", "description": "validate input", "rules": [], "source": "security/InputValidation.yml"},
+    {"kind": "performance", "name": "LatencyBudget", "description": "p99 latency spikes", "rules": ["alert on p99"],
+     "source": "performance/LatencyBudget.yml"},
+    {"kind": "performance", "name": "Caching", "description": "cache", "rules": [], "source": "performance/Caching.yml"},
+]
+
+
+def _embed(text):
+    words = text.lower().replace("\n", " ").split()
+    return [float(words.count(word)) for word in VOCABULARY]
+
+
+def _catalog(tokens, content_hash="v1"):
+    return TokenCatalog({"fingerprint": "f", "contentHash": content_hash, "builtAt": 0.0, "tokens": tokens,
+                         "policies": [], "resolutionGraph": {}})
+
+
+def _patch(monkeypatch):
+    monkeypatch.setenv("SEMANTIC_MODEL", "mock")
+    embedded = []
+
+    def embed_texts(texts):
+        embedded.append(len(texts))
+        return [_embed(text) for text in texts]
+
+    async def compute_embedding(text):
+        return _embed(text)
+
+    monkeypatch.setattr("server.nf_client.embeddings.embed_texts", embed_texts)
+    monkeypatch.setattr("server.governance.pre_action_engine.compute_embedding", compute_embedding)
+    return embedded
+
+
+def test_embedding_matrix_persisted_and_rebuilt_on_change(tmp_path, monkeypatch):
+    embedded = _patch(monkeypatch)
+    catalog = [_catalog(TOKENS)]
+    path = str(tmp_path / ".catalog.embeddings.npz")
+
+    store = EmbeddingStore(path, catalog_loader=lambda: catalog[0])
+    embeddings = store.get()
+    assert embeddings.matrix.dtype == np.float32 and embeddings.matrix.shape == (4, len(VOCABULARY))
+    # Rows are unit length; a token sharing no vocabulary stays a zero row
+    assert np.allclose(sorted(np.linalg.norm(embeddings.matrix, axis=1)), [0.0, 1.0, 1.0, 1.0])
+    (match,) = embeddings.similar(_embed("p99 spikes in payment"), 2, min_score=0.1)
+    assert match[:2] == ("performance", "LatencyBudget") and abs(match[2] - 3 / 18 ** 0.5) < 1e-6
+    assert store.current() is embeddings
+
+    # Another worker loads the file instead of embedding again
+    other = EmbeddingStore(path, catalog_loader=lambda: catalog[0])
+    assert other.get().refs == embeddings.refs and other.builds == 0
+    assert embedded == [4]
+
+    catalog[0] = _catalog(TOKENS[:2], content_hash="v2")
+    assert store.current() is None
+    assert store.get().names == ["PasswordHashing", "InputValidation"]
+    monkeypatch.setenv("SEMANTIC_MODEL", "disabled")
+    assert store.get() is None
+
+
+def test_semantic_matches_rank_rules_from_other_domains(tmp_path, monkeypatch):
+    _patch(monkeypatch)
+    store = EmbeddingStore(str(tmp_path / "emb.npz"), catalog_loader=lambda: _catalog(TOKENS))
+
+    def loader(project_id, kinds):
+        return {"tokens": [dict(t) for t in TOKENS if t["kind"] in kinds]}
+
+    engine = PreActionGovernanceEngine(token_loader=loader, cache_ttl=3600, embedding_store=store)
+    context = GovernanceContext(ActivityType.SECURITY, 0.5, [], "p99 spikes in our payment service", ["security"])
+
+    rules = asyncio.run(engine._get_relevant_rules(context))
+
+    # No keyword matched; the performance token is pulled in by similarity alone
+    assert [r["name"] for r in rules] == ["LatencyBudget", "PasswordHashing", "InputValidation"]
+
+    monkeypatch.setenv("SEMANTIC_MODEL", "disabled")
+    rules = asyncio.run(engine._get_relevant_rules(context))
+    assert [r["name"] for r in rules] == ["PasswordHashing", "InputValidation"]
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+
+from server.core.events import Event, EventBus
+from server.tools import ingest_event, ingest_events
+from server.utils.logger import get_logger
+
+
+class _CaptureHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+async def _capture(bus: EventBus, evt_type: str):
+    seen = []
+
+    async def h(evt: Event):
+        seen.append(evt)
+
+    await bus.subscribe(evt_type, h)
+    return seen
+
+
+def _transcript(n: int):
+    return [
+        {"type": "conversation.message", "role": "User" if i % 2 == 0 else "assistant", "content": f"msg-{i}"}
+        for i in range(n)
+    ]
+
+
+def test_ingest_events_publishes_in_order_with_normalized_project(monkeypatch):
+    bus = EventBus()
+    monkeypatch.setattr(ingest_events, "bus", bus)
+    seen = asyncio.run(_capture(bus, "conversation.message"))
+
+    resp = asyncio.run(ingest_events.handler({"projectId": "  Project-XYZ ", "events": _transcript(4)}))
+
+    assert resp["status"] == "ok"
+    assert resp["count"] == 4
+    assert resp["projectId"] == "project-xyz"
+    assert [evt.payload["content"] for evt in seen] == ["msg-0", "msg-1", "msg-2", "msg-3"]
+    assert {evt.project_id for evt in seen} == {"project-xyz"}
+    assert seen[0].payload["role"] == "user"
+    assert {evt.request_id for evt in seen} == {resp["requestId"]}
+    assert bus.events_published_total["conversation.message"] == 4
+
+
+def test_ingest_events_rejects_whole_batch_on_invalid_item(monkeypatch):
+    bus = EventBus()
+    monkeypatch.setattr(ingest_events, "bus", bus)
+    monkeypatch.setattr(ingest_event, "MAX_CONTENT", 5)
+
+    events = _transcript(3)
+    events[1]["content"] = "far too long"
+    resp = asyncio.run(ingest_events.handler({"projectId": "p1", "events": events}))
+
+    assert resp["error"]["code"] == "ERR.BAD_REQUEST"
+    assert resp["error"]["message"].startswith("events[1]:")
+    assert bus.events_published_total["conversation.message"] == 0
+
+
+def test_ingest_events_enforces_batch_limits(monkeypatch):
+    bus = EventBus()
+    monkeypatch.setattr(ingest_events, "bus", bus)
+    monkeypatch.setattr(ingest_events, "MAX_BATCH", 2)
+
+    empty = asyncio.run(ingest_events.handler({"projectId": "p1", "events": []}))
+    assert empty["error"]["code"] == "ERR.BAD_REQUEST"
+
+    too_many = asyncio.run(ingest_events.handler({"projectId": "p1", "events": _transcript(3)}))
+    assert "max batch size" in too_many["error"]["message"]
+
+    bad_project = asyncio.run(ingest_events.handler({"projectId": "Bad Project!", "events": _transcript(1)}))
+    assert "projectId" in bad_project["error"]["message"]
+
+
+def test_ingest_events_amortizes_per_event_logging(monkeypatch):
+    bus = EventBus()
+    monkeypatch.setattr(ingest_events, "bus", bus)
+    asyncio.run(_capture(bus, "conversation.message"))
+
+    logger = get_logger()
+    cap = _CaptureHandler()
+    logger.addHandler(cap)
+    try:
+        resp = asyncio.run(ingest_events.handler({"projectId": "p1", "events": _transcript(50)}))
+    finally:
+        logger.removeHandler(cap)
+
+    assert resp["count"] == 50
+    assert cap.messages.count("eventbus.publish_batch") == 1
+    assert "eventbus.publish" not in cap.messages
+    assert "eventbus.consume" not in cap.messages
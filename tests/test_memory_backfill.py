@@ -0,0 +1,125 @@
+import asyncio
+
+from server.memory import backfill, chunking, semantic
+from server.tools import add_memory
+
+
+def _fake_store(monkeypatch, rows):
+    """Pending rows ordered by (createdAt, id); updates remove them from the backlog."""
+    pending = {row["id"]: row for row in rows}
+    pages = []
+    updates = []
+    regrouped = []
+
+    async def list_pending(engine, *, limit, project_id=None, after=None):
+        pages.append(after)
+        ordered = sorted(pending.values(), key=lambda r: (r["createdAt"], r["id"]))
+        if after is not None:
+            ordered = [r for r in ordered if (r["createdAt"], r["id"]) > tuple(after)]
+        if project_id:
+            ordered = [r for r in ordered if r["projectId"] == project_id]
+        return [dict(r, ageSeconds=1.0) for r in ordered[:limit]]
+
+    async def update_many(engine, *, embeddings):
+        updates.append(sorted(embeddings))
+        for mem_id in embeddings:
+            pending.pop(mem_id, None)
+        return len(embeddings)
+
+    async def replace_chunks(engine, *, mem_id, chunks):
+        regrouped.append((mem_id, len(chunks)))
+        pending.pop(mem_id, None)
+        return True
+
+    async def stats(engine, *, project_id=None):
+        return {"pending": len(pending), "lagSeconds": 0.0}
+
+    monkeypatch.setattr(backfill, "get_async_engine", lambda: object())
+    monkeypatch.setattr(backfill, "list_pending_embeddings_pg", list_pending)
+    monkeypatch.setattr(backfill, "update_memory_embeddings_pg", update_many)
+    monkeypatch.setattr(backfill, "replace_memory_chunks_pg", replace_chunks)
+    monkeypatch.setattr(backfill, "pending_embedding_stats_pg", stats)
+    return pending, pages, updates, regrouped
+
+
+def _rows(n, project="p"):
+    return [
+        {"id": f"m{i:02d}", "projectId": project, "content": f"entry {i}", "createdAt": f"2026-01-01T00:00:{i:02d}"}
+        for i in range(n)
+    ]
+
+
+def test_pass_embeds_backlog_in_keyset_batches(monkeypatch):
+    monkeypatch.setenv("SEMANTIC_MODEL", "mock")
+    monkeypatch.setattr(semantic, "_embedder", None)
+    pending, pages, updates, _ = _fake_store(monkeypatch, _rows(5))
+
+    result = asyncio.run(backfill.EmbeddingBackfill(batch_size=2).run_pass())
+
+    assert result["embedded"] == 5 and result["failed"] == 0
+    assert updates == [["m00", "m01"], ["m02", "m03"], ["m04"]]
+    # Each page continues after the last row of the previous one
+    assert pages == [None, ("2026-01-01T00:00:01", "m01"), ("2026-01-01T00:00:03", "m03"), ("2026-01-01T00:00:04", "m04")]
+    assert result["cursor"] == ["2026-01-01T00:00:04", "m04"]
+    assert not pending
+
+
+def test_pass_resumes_after_cursor_and_respects_limit(monkeypatch):
+    monkeypatch.setenv("SEMANTIC_MODEL", "mock")
+    monkeypatch.setattr(semantic, "_embedder", None)
+    pending, _, updates, _ = _fake_store(monkeypatch, _rows(6))
+
+    result = asyncio.run(
+        backfill.EmbeddingBackfill(batch_size=10).run_pass(after=("2026-01-01T00:00:01", "m01"), max_rows=3)
+    )
+
+    assert updates == [["m02", "m03", "m04"]]
+    assert result["cursor"] == ["2026-01-01T00:00:04", "m04"]
+    assert sorted(pending) == ["m00", "m01", "m05"]
+
+
+def test_long_entries_are_chunked(monkeypatch):
+    monkeypatch.setenv("SEMANTIC_MODEL", "mock")
+    monkeypatch.setattr(semantic, "_embedder", None)
+    monkeypatch.setattr(chunking, "CHUNK_TOKENS", 8)
+    monkeypatch.setattr(chunking, "CHUNK_OVERLAP", 0)
+    rows = _rows(2)
+    rows[1]["content"] = " ".join(f"w{i}" for i in range(20))
+    _, _, updates, regrouped = _fake_store(monkeypatch, rows)
+
+    result = asyncio.run(backfill.EmbeddingBackfill().run_pass())
+
+    assert result["embedded"] == 2
+    assert updates == [["m00"]]
+    assert regrouped == [("m01", 3)]
+
+
+def test_pass_stops_when_no_embedder(monkeypatch):
+    monkeypatch.setattr(backfill, "is_semantic_enabled", lambda: True)
+    monkeypatch.setattr(semantic, "get_embedder", lambda: None)
+    pending, pages, updates, _ = _fake_store(monkeypatch, _rows(4))
+
+    result = asyncio.run(backfill.EmbeddingBackfill(batch_size=2).run_pass())
+
+    assert result["failed"] == 2 and result["embedded"] == 0
+    assert len(pages) == 1 and not updates and len(pending) == 4
+
+
+def test_async_mode_inserts_without_embedding_and_wakes_pipeline(monkeypatch):
+    inserted = []
+    woken = []
+
+    async def fake_insert(engine, **kw):
+        inserted.append(kw)
+
+    monkeypatch.setenv("SEMANTIC_MODEL", "mock")
+    monkeypatch.setattr(semantic, "_embedder", None)
+    monkeypatch.setattr(backfill, "EMBED_ASYNC", True)
+    monkeypatch.setattr(add_memory, "get_async_engine", lambda: object())
+    monkeypatch.setattr(add_memory, "add_memory_pg", fake_insert)
+    monkeypatch.setattr(add_memory.embedding_backfill, "wake", lambda: woken.append(True))
+
+    res = asyncio.run(add_memory.handler({"projectId": "p", "content": "remember this"}))
+
+    assert inserted[0]["mem_id"] == res["id"] and inserted[0]["embedding"] is None
+    assert woken == [True]
@@ -0,0 +1,85 @@
+import asyncio
+
+from server.memory import chunking, semantic
+from server.tools import add_memory
+
+
+def _words(n):
+    return " ".join(f"w{i}" for i in range(n))
+
+
+def test_short_content_is_one_chunk_and_not_chunked():
+    text = _words(10)
+    assert not chunking.needs_chunking(text, max_tokens=10)
+    assert [c.text for c in chunking.iter_chunks(text, max_tokens=10, overlap=3)] == [text]
+
+
+def test_chunks_overlap_and_cover_the_text():
+    text = "alpha, beta\n\ngamma " + _words(40)
+    chunks = list(chunking.iter_chunks(text, max_tokens=12, overlap=4))
+
+    assert chunking.needs_chunking(text, max_tokens=12)
+    assert [c.index for c in chunks] == list(range(len(chunks)))
+    # Slices of the original text, formatting intact
+    assert chunks[0].text.startswith("alpha, beta\n\ngamma")
+    assert all(text[c.start:c.end] == c.text for c in chunks)
+    assert chunks[0].start == 0 and chunks[-1].end == len(text)
+    for prev, cur in zip(chunks, chunks[1:]):
+        shared = chunking._TOKEN_RE.findall(text[cur.start:prev.end])
+        assert len(shared) == 4
+    assert all(len(chunking._TOKEN_RE.findall(c.text)) <= 12 for c in chunks)
+
+
+def test_no_trailing_chunk_made_only_of_overlap():
+    # 8 + 6 tokens fill exactly two windows of 8 with overlap 2
+    chunks = list(chunking.iter_chunks(_words(14), max_tokens=8, overlap=2))
+    assert len(chunks) == 2
+
+
+def test_embed_chunks_batches_model_calls(monkeypatch):
+    calls = []
+
+    def embed(texts):
+        calls.append(len(texts))
+        return [[float(len(t))] for t in texts]
+
+    monkeypatch.setattr(semantic, "get_embedder", lambda: embed)
+    monkeypatch.setattr(semantic, "embed_texts", embed)
+    embedded = asyncio.run(chunking.embed_chunks(_words(50), max_tokens=10, overlap=0, batch_size=2))
+
+    assert calls == [2, 2, 1]
+    assert [vec for _, vec in embedded] == [[float(len(c.text))] for c, _ in embedded]
+
+    rows = chunking.chunk_rows("m1", embedded)
+    assert [r["id"] for r in rows] == [f"m1#{i}" for i in range(5)]
+    assert rows[2]["metadata"]["chunk"]["parent"] == "m1"
+    assert rows[2]["metadata"]["chunk"]["count"] == 5
+
+
+def test_add_memory_stores_long_content_as_a_group(monkeypatch):
+    groups = []
+    singles = []
+
+    async def fake_group(engine, **kw):
+        groups.append(kw)
+
+    async def fake_single(engine, **kw):
+        singles.append(kw)
+
+    monkeypatch.setenv("SEMANTIC_MODEL", "mock")
+    monkeypatch.setattr(semantic, "_embedder", None)
+    monkeypatch.setattr(chunking, "CHUNK_TOKENS", 16)
+    monkeypatch.setattr(chunking, "CHUNK_OVERLAP", 4)
+    monkeypatch.setattr(add_memory, "get_async_engine", lambda: object())
+    monkeypatch.setattr(add_memory, "add_memory_group_pg", fake_group)
+    monkeypatch.setattr(add_memory, "add_memory_pg", fake_single)
+
+    long_res = asyncio.run(add_memory.handler({"projectId": "p", "content": _words(40)}))
+    short_res = asyncio.run(add_memory.handler({"projectId": "p", "content": _words(5)}))
+
+    assert len(groups) == 1 and len(singles) == 1
+    group = groups[0]
+    assert group["mem_id"] == long_res["id"] and group["content"] == _words(40)
+    assert len(group["chunks"]) == 3
+    assert all(len(c["embedding"]) == semantic.get_dimension() for c in group["chunks"])
+    assert singles[0]["mem_id"] == short_res["id"] and singles[0]["embedding"] is not None
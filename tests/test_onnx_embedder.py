@@ -0,0 +1,147 @@
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from server.memory import onnx_backend, semantic
+
+DIM = 384
+PAD = 0
+
+
+class FakeEncoding:
+    def __init__(self, ids, length):
+        self.ids = ids + [PAD] * (length - len(ids))
+        self.attention_mask = [1] * len(ids) + [0] * (length - len(ids))
+        self.type_ids = [0] * length
+
+
+class FakeTokenizer:
+    """Whitespace tokenizer with [CLS]/[SEP], truncation and pad-to-longest like `tokenizers`."""
+
+    def __init__(self):
+        self.max_length = 512
+        self.vocab = {"[PAD]": PAD, "[CLS]": 1, "[SEP]": 2}
+
+    @classmethod
+    def from_file(cls, path):
+        return cls()
+
+    def enable_truncation(self, max_length):
+        self.max_length = max_length
+
+    def enable_padding(self, pad_id, pad_token):
+        assert pad_id == PAD and pad_token == "[PAD]"
+
+    def token_to_id(self, token):
+        return self.vocab.get(token)
+
+    def _ids(self, text):
+        words = [self.vocab.setdefault(w, len(self.vocab)) for w in text.lower().split()]
+        return ([1] + words + [2])[: self.max_length]
+
+    def encode_batch(self, texts):
+        ids = [self._ids(t) for t in texts]
+        length = max(len(i) for i in ids)
+        return [FakeEncoding(i, length) for i in ids]
+
+
+class FakeSession:
+    runs = []
+
+    def __init__(self, path, sess_options=None, providers=None):
+        self.path = path
+        self.options = sess_options
+
+    def get_inputs(self):
+        return [SimpleNamespace(name=n) for n in ("input_ids", "attention_mask", "token_type_ids")]
+
+    def get_outputs(self):
+        return [SimpleNamespace(name="last_hidden_state")]
+
+    def run(self, outputs, feed):
+        assert outputs == ["last_hidden_state"] and set(feed) == {"input_ids", "attention_mask", "token_type_ids"}
+        ids = feed["input_ids"]
+        FakeSession.runs.append(ids.shape)
+        # Token vector depends only on the token id; padding gets large values that pooling must ignore
+        hidden = np.zeros(ids.shape + (DIM,), dtype=np.float32)
+        for b, row in enumerate(ids):
+            for s, token in enumerate(row):
+                if token == PAD:
+                    hidden[b, s, :] = 100.0
+                else:
+                    hidden[b, s, token % DIM] = 1.0
+        return [hidden]
+
+
+@pytest.fixture
+def fake_runtime(monkeypatch, tmp_path):
+    fake_ort = SimpleNamespace(
+        SessionOptions=lambda: SimpleNamespace(graph_optimization_level=None, intra_op_num_threads=0),
+        GraphOptimizationLevel=SimpleNamespace(ORT_ENABLE_ALL="all"),
+        InferenceSession=FakeSession,
+    )
+    monkeypatch.setitem(sys.modules, "onnxruntime", fake_ort)
+    monkeypatch.setitem(sys.modules, "tokenizers", SimpleNamespace(Tokenizer=FakeTokenizer))
+    (tmp_path / "onnx").mkdir()
+    for name in ("model.onnx", "model_quantized.onnx"):
+        (tmp_path / "onnx" / name).write_bytes(b"")
+    (tmp_path / "tokenizer.json").write_text("{}")
+    monkeypatch.setenv("SEMANTIC_ONNX_MODEL_DIR", str(tmp_path))
+    FakeSession.runs = []
+    return tmp_path
+
+
+def test_mean_pooling_ignores_padding_and_normalizes():
+    hidden = np.array([[[3.0, 4.0], [9.0, 9.0]]], dtype=np.float32)
+    pooled = onnx_backend.mean_pool_normalize(hidden, np.array([[1, 0]]))
+    assert np.allclose(pooled, [[0.6, 0.8]])
+
+
+def test_batches_are_length_sorted_and_padding_invariant(fake_runtime, monkeypatch):
+    monkeypatch.setenv("SEMANTIC_ONNX_BATCH_SIZE", "2")
+    embedder = onnx_backend.load_onnx_embedder()
+    texts = ["a much longer text with many more words in it", "short", "mid sized text", "tiny"]
+
+    batched = embedder.embed(texts)
+    single = np.stack([embedder.embed([t])[0] for t in texts])
+
+    assert batched.dtype == np.float32 and batched.shape == (4, DIM)
+    assert np.allclose(np.linalg.norm(batched, axis=1), 1.0, atol=1e-6)
+    # Same vectors whatever the batch composition and padding, in input order
+    assert np.allclose(batched, single, atol=1e-6)
+    # Two shortest texts share a batch, two longest the other
+    assert FakeSession.runs[:2] == [(2, 3), (2, 12)]
+
+
+def test_quantized_graph_and_truncation_from_env(fake_runtime, monkeypatch):
+    monkeypatch.setenv("SEMANTIC_ONNX_QUANTIZED", "true")
+    monkeypatch.setenv("SEMANTIC_ONNX_MAX_LENGTH", "4")
+    embedder = onnx_backend.load_onnx_embedder(threads=3)
+
+    assert embedder.model_path.endswith("model_quantized.onnx")
+    assert embedder._session.options.intra_op_num_threads == 3
+    embedder.embed(["one two three four five six"])
+    assert FakeSession.runs == [(1, 4)]
+    assert onnx_backend.onnx_model_name() == f"onnx:{fake_runtime.name}:int8"
+
+
+def test_semantic_onnx_backend(fake_runtime, monkeypatch):
+    monkeypatch.setenv("SEMANTIC_MODEL", "onnx")
+    monkeypatch.setattr(semantic, "_embedder", None)
+    try:
+        assert semantic.is_semantic_enabled()
+        vectors = semantic.embed_texts(["hello world", "hello"])
+        single = semantic.get_embedder()("hello world")
+        assert len(vectors) == 2 and len(vectors[0]) == semantic.get_dimension()
+        assert np.allclose(vectors[0], single, atol=1e-6)
+        assert getattr(semantic.get_embedder(), "_semantic_offload") is True
+    finally:
+        semantic.close_embedder()
+
+
+def test_missing_runtime_raises_clear_error(monkeypatch, tmp_path):
+    monkeypatch.setitem(sys.modules, "onnxruntime", None)
+    with pytest.raises(RuntimeError, match="requires onnxruntime and tokenizers"):
+        onnx_backend.OnnxEmbedder(str(tmp_path / "model.onnx"), str(tmp_path / "tokenizer.json"))
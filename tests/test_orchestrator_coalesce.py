@@ -0,0 +1,91 @@
+import asyncio
+import importlib
+import time
+
+from server.core.events import Event, EventBus
+from server.core.orchestrator import CONV_MSG, GOVERNANCE_GUIDANCE, Orchestrator
+
+orchestrator_module = importlib.import_module("server.core.orchestrator")
+
+
+def _make_event(project_id: str, content: str) -> Event:
+    return Event(type=CONV_MSG, project_id=project_id, payload={"content": content}, ts=time.time())
+
+
+def _record_calls(monkeypatch):
+    calls = []
+
+    async def fake_activate(content, history, project_id=None, classification=None):  # noqa: ANN001 - test stub
+        calls.append((project_id, content, list(history)))
+        return f"guidance:{content}"
+
+    monkeypatch.setattr(orchestrator_module, "activate_pre_action_governance", fake_activate)
+    return calls
+
+
+def test_burst_coalesced_into_single_run_per_project(monkeypatch):
+    monkeypatch.setattr(orchestrator_module, "_GOVERNANCE_COALESCE_MS", 30)
+    calls = _record_calls(monkeypatch)
+    bus = EventBus()
+    orch = Orchestrator(bus)
+    guidance = []
+
+    async def on_guidance(evt: Event) -> None:
+        guidance.append((evt.project_id, evt.payload["content"]))
+
+    async def run() -> None:
+        await bus.subscribe(GOVERNANCE_GUIDANCE, on_guidance)
+        for i in range(4):
+            await orch._maybe_emit_governance(_make_event("p1", f"part-{i}"), {"content": f"part-{i}"})
+        await orch._maybe_emit_governance(_make_event("p2", "other"), {"content": "other"})
+        # History is visible immediately, before the window closes
+        assert list(orch._recent_history["p1"]) == ["part-0", "part-1", "part-2", "part-3"]
+        assert calls == []
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+
+    # Latest message per project analysed once, with the history preceding it
+    assert sorted(calls) == [
+        ("p1", "part-3", ["part-0", "part-1", "part-2"]),
+        ("p2", "other", []),
+    ]
+    assert sorted(guidance) == [("p1", "guidance:part-3"), ("p2", "guidance:other")]
+    assert orch.governance_runs_total == 2
+    assert orch.governance_coalesced_total == 3
+
+
+def test_stop_flushes_pending_governance(monkeypatch):
+    monkeypatch.setattr(orchestrator_module, "_GOVERNANCE_COALESCE_MS", 60_000)
+    calls = _record_calls(monkeypatch)
+    bus = EventBus()
+    orch = Orchestrator(bus)
+
+    async def run() -> None:
+        await orch.start()
+        await bus.publish(_make_event("p1", "first"))
+        await bus.publish(_make_event("p1", "second"))
+        await orch.stop()
+
+    asyncio.run(run())
+
+    assert calls == [("p1", "second", ["first"])]
+    assert orch._governance_timers == {}
+    assert orch._pending_governance == {}
+
+
+def test_coalescing_disabled_by_default_runs_every_message(monkeypatch):
+    monkeypatch.setattr(orchestrator_module, "_GOVERNANCE_COALESCE_MS", 0)
+    calls = _record_calls(monkeypatch)
+    orch = Orchestrator(EventBus())
+
+    async def run() -> None:
+        for content in ("a", "b", "c"):
+            await orch._maybe_emit_governance(_make_event("p1", content), {"content": content})
+
+    asyncio.run(run())
+
+    assert [c[1] for c in calls] == ["a", "b", "c"]
+    assert calls[-1][2] == ["a", "b"]
+    assert orch.governance_runs_total == 3
+    assert orch.governance_coalesced_total == 0
@@ -5,6 +5,7 @@ import time
 import pytest
 
 from server.core.events import Event, EventBus
+from server.core.history import PostgresHistoryStore
 from server.core.orchestrator import CONV_MSG, Orchestrator
 
 orchestrator_module = importlib.import_module("server.core.orchestrator")
@@ -73,3 +74,91 @@ def test_history_eviction_by_ttl(monkeypatch):
 
     assert "project-1" not in orch._recent_history
     assert "project-2" in orch._recent_history
+
+
+def test_incremental_classification_matches_full_analysis(monkeypatch):
+    monkeypatch.setattr(orchestrator_module, "_HISTORY_MAX_PROJECTS", 100)
+    seen = []
+
+    async def capture(content, history, project_id=None, classification=None):  # noqa: ANN001 - test stub
+        seen.append((content, list(history), classification))
+        return None
+
+    monkeypatch.setattr(orchestrator_module, "activate_pre_action_governance", capture)
+    orch = Orchestrator(EventBus())
+    messages = ["Let's plan", "how", "to write unit", "test code for the API", "then deploy", "step by step"]
+    for content in messages:
+        asyncio.run(_emit_history(orch, _make_event("p1", content)))
+
+    engine = orchestrator_module.governance_engine
+    for content, history, classification in seen:
+        full = asyncio.run(engine.analyze_context(content, history))
+        incremental = asyncio.run(engine.analyze_context(content, history, classification=classification))
+        assert classification is not None
+        assert (incremental.activity_type, incremental.confidence) == (full.activity_type, full.confidence)
+        assert set(incremental.detected_keywords) == set(full.detected_keywords)
+
+
+class _HistoryTable:
+    """Stands in for the conversation_history ring buffers."""
+
+    def __init__(self, max_len=5):
+        self.max_len = max_len
+        self.rows = {}
+        self.reads = []
+        self.writes = []
+
+    async def read(self, keys):
+        self.reads.append(sorted(keys))
+        return {key: list(self.rows.get(key, [])) for key in keys}
+
+    async def write(self, entries):
+        self.writes.append(entries)
+        for key, texts in entries.items():
+            self.rows[key] = (self.rows.get(key, []) + texts)[-self.max_len:]
+
+    def store(self):
+        return PostgresHistoryStore(self.max_len, reader=self.read, writer=self.write, flush_seconds=3600)
+
+
+def test_persistent_history_survives_restart_and_eviction(monkeypatch):
+    monkeypatch.setattr(orchestrator_module, "_HISTORY_MAX_PROJECTS", 1)
+    seen = []
+
+    async def capture(content, history, project_id=None, classification=None):  # noqa: ANN001 - test stub
+        seen.append((project_id, content, list(history)))
+        return None
+
+    monkeypatch.setattr(orchestrator_module, "activate_pre_action_governance", capture)
+    table = _HistoryTable()
+
+    async def run(orch, messages):
+        for project_id, content in messages:
+            await _emit_history(orch, _make_event(project_id, content))
+        await orch._history_store.stop()
+
+    asyncio.run(run(Orchestrator(EventBus(), history_store=table.store()), [("p1", "a"), ("p1", "b"), ("p2", "x")]))
+    # p2 evicted p1 locally; p1 comes back from the store
+    asyncio.run(run(Orchestrator(EventBus(), history_store=table.store()), [("p1", "c"), ("p2", "y")]))
+
+    assert table.rows == {"p1": ["a", "b", "c"], "p2": ["x", "y"]}
+    assert seen[-2:] == [("p1", "c", ["a", "b"]), ("p2", "y", ["x"])]
+
+
+def test_history_store_batches_reads_and_writes():
+    table = _HistoryTable(max_len=3)
+    table.rows = {"p1": ["old"]}
+    store = table.store()
+    orch = Orchestrator(EventBus(), history_store=store)
+
+    async def run():
+        await asyncio.gather(*(_emit_history(orch, _make_event(p, f"{p}-1")) for p in ("p1", "p2", "p3")))
+        for i in range(2, 6):
+            await _emit_history(orch, _make_event("p2", f"p2-{i}"))
+        await store.stop()
+
+    asyncio.run(run())
+
+    assert table.reads == [["p1", "p2", "p3"]]
+    assert table.writes == [{"p1": ["p1-1"], "p2": ["p2-3", "p2-4", "p2-5"], "p3": ["p3-1"]}]
+    assert list(orch._recent_history["p1"]) == ["old", "p1-1"]
@@ -0,0 +1,117 @@
+import asyncio
+import importlib
+import time
+
+from server.core.events import Event, EventBus
+from server.core.orchestrator import CONV_MSG, GOVERNANCE_GUIDANCE, Orchestrator
+from server.governance import ActivityType, governance_engine
+from server.governance.classifier import classify_in_worker, init_worker_classifier
+
+orchestrator_module = importlib.import_module("server.core.orchestrator")
+
+
+def _make_event(project_id: str, content: str) -> Event:
+    return Event(type=CONV_MSG, project_id=project_id, payload={"content": content}, ts=time.time())
+
+
+def _workers(monkeypatch, workers=1, queue_max=16, deadline_ms=5000):
+    monkeypatch.setattr(orchestrator_module, "_GOVERNANCE_COALESCE_MS", 0)
+    monkeypatch.setattr(orchestrator_module, "_GOVERNANCE_WORKERS", workers)
+    monkeypatch.setattr(orchestrator_module, "_GOVERNANCE_QUEUE_MAX", queue_max)
+    monkeypatch.setattr(orchestrator_module, "_GOVERNANCE_DEADLINE_MS", deadline_ms)
+    monkeypatch.setattr(orchestrator_module, "_GOVERNANCE_CLASSIFY_PROCESSES", 0)
+
+
+def _slow_activate(monkeypatch, delay):
+    calls = []
+
+    async def fake_activate(content, history, project_id=None, classification=None):  # noqa: ANN001 - test stub
+        calls.append(content)
+        await asyncio.sleep(delay)
+        return f"guidance:{content}"
+
+    monkeypatch.setattr(orchestrator_module, "activate_pre_action_governance", fake_activate)
+    return calls
+
+
+def test_handler_returns_before_governance_and_guidance_follows(monkeypatch):
+    _workers(monkeypatch)
+    calls = _slow_activate(monkeypatch, 0.05)
+    bus = EventBus()
+    orch = Orchestrator(bus)
+    guidance = []
+
+    async def on_guidance(evt: Event) -> None:
+        guidance.append(evt.payload["content"])
+
+    async def run() -> float:
+        await orch.start()
+        await bus.subscribe(GOVERNANCE_GUIDANCE, on_guidance)
+        started = time.perf_counter()
+        for content in ("a", "b"):
+            await orch._maybe_emit_governance(_make_event("p1", content), {"content": content})
+        elapsed = time.perf_counter() - started
+        assert guidance == []
+        await asyncio.sleep(0.2)
+        await orch.stop()
+        return elapsed
+
+    elapsed = asyncio.run(run())
+
+    assert elapsed < 0.05
+    assert calls == ["a", "b"]
+    assert guidance == ["guidance:a", "guidance:b"]
+    assert orch.governance_dropped_total == 0
+
+
+def test_evaluation_past_deadline_is_dropped(monkeypatch):
+    _workers(monkeypatch, deadline_ms=30)
+    _slow_activate(monkeypatch, 1.0)
+    bus = EventBus()
+    orch = Orchestrator(bus)
+    guidance = []
+
+    async def on_guidance(evt: Event) -> None:
+        guidance.append(evt.payload["content"])
+
+    async def run() -> None:
+        await orch.start()
+        await bus.subscribe(GOVERNANCE_GUIDANCE, on_guidance)
+        await orch._maybe_emit_governance(_make_event("p1", "slow"), {"content": "slow"})
+        await asyncio.sleep(0.1)
+        await orch.stop()
+
+    asyncio.run(run())
+
+    assert guidance == []
+    assert orch.governance_dropped_total == 1
+
+
+def test_full_queue_drops_oldest(monkeypatch):
+    _workers(monkeypatch, queue_max=2)
+    calls = _slow_activate(monkeypatch, 0)
+    orch = Orchestrator(EventBus())
+
+    async def run() -> None:
+        orch._start_governance_workers()
+        for content in ("a", "b", "c", "d"):
+            # No await between enqueues: the worker has not taken any job yet
+            await orch._dispatch_governance(_make_event("p1", content), {"content": content}, content, [])
+        await orch._stop_governance_workers()
+
+    asyncio.run(run())
+
+    assert calls == ["c", "d"]
+    assert orch.governance_dropped_total == 2
+
+
+def test_process_pool_classification_maps_back_to_activity_types():
+    patterns = {activity.value: list(p) for activity, p in governance_engine.activity_patterns.items()}
+    init_worker_classifier(patterns)
+    text = "fix the sql injection vulnerability in the login form"
+
+    found = classify_in_worker(text)
+    expected = governance_engine.activity_classifier.classify(text)
+
+    assert {ActivityType(key): score for key, score in found.scores.items()} == expected.scores
+    assert found.keywords == expected.keywords
@@ -0,0 +1,51 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from server.db import repo
+
+
+class _Engine:
+    """Records the statements executed through begin()/connect()."""
+
+    def __init__(self):
+        self.executed = []
+
+    @asynccontextmanager
+    async def _conn(self):
+        yield self
+
+    begin = connect = _conn
+
+    async def execute(self, statement, params=None):
+        self.executed.append((statement, params or {}))
+        return SimpleNamespace(rowcount=1, first=lambda: None, fetchall=lambda: [])
+
+
+def _compiled_params(statement):
+    return set(statement.compile(dialect=postgresql.dialect()).params)
+
+
+def test_update_memory_embedding_binds_the_vector():
+    engine = _Engine()
+    asyncio.run(repo.update_memory_embedding_pg(engine, mem_id="m1", embedding=[0.5, 0.25]))
+
+    statement, params = engine.executed[0]
+    assert _compiled_params(statement) == {"embedding", "id"}
+    assert "CAST(%(embedding)s AS vector)" in str(statement.compile(dialect=postgresql.dialect()))
+    assert params["embedding"] == "[0.500000, 0.250000]"
+
+
+def test_memory_inserts_bind_every_vector():
+    engine = _Engine()
+    asyncio.run(repo.add_memory_pg(
+        engine, mem_id="m1", project_id="p", content="c", metadata=None, quarantined=False, embedding=[1.0]
+    ))
+    chunks = [{"id": f"c{i}", "content": "x", "embedding": [float(i)]} for i in range(2)]
+    asyncio.run(repo._insert_memory_chunks(engine, parent_id="m1", project_id="p", quarantined=False, chunks=chunks))
+
+    single, grouped = (_compiled_params(statement) for statement, _ in engine.executed)
+    assert "embedding" in single
+    assert {"embedding_0", "embedding_1"} <= grouped
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from server.core.events import Event, EventBus
+from server.core.sse import SseBroker
+
+
+def _event(evt_type: str, project_id: str, n: int = 0) -> Event:
+    return Event(type=evt_type, project_id=project_id, payload={"n": n}, ts=time.time())
+
+
+def _data(frame: str) -> dict:
+    line = next(part for part in frame.split("\n") if part.startswith("data: "))
+    return json.loads(line[len("data: "):])
+
+
+def test_broker_filters_by_project_and_type():
+    bus = EventBus()
+    broker = SseBroker(bus)
+
+    async def run():
+        await broker.start()
+        p1 = broker.connect("P1")
+        p1_tasks = broker.connect("p1", ["task.*"])
+        everyone = broker.connect()
+        await bus.publish(_event("governance.guidance", "p1"))
+        await bus.publish(_event("task.claimed", "p1"))
+        await bus.publish(_event("task.claimed", "p2"))
+        await bus.publish(_event("conversation.message", "p1"))
+        return [await c.drain(0.01) for c in (p1, p1_tasks, everyone)]
+
+    p1, p1_tasks, everyone = asyncio.run(run())
+
+    assert [(_data(f)["type"], _data(f)["projectId"]) for f in p1] == [("governance.guidance", "p1"), ("task.claimed", "p1")]
+    assert [_data(f)["type"] for f in p1_tasks] == ["task.claimed"]
+    assert [_data(f)["projectId"] for f in everyone] == ["p1", "p1", "p2"]
+    assert p1[0].startswith("id: 1\nevent: governance.guidance\n")
+
+
+def test_slow_consumer_drops_oldest_and_reports():
+    bus = EventBus()
+    broker = SseBroker(bus, buffer_size=3)
+
+    async def run():
+        await broker.start()
+        client = broker.connect("p1")
+        for n in range(5):
+            await bus.publish(_event("task.updated", "p1", n))
+        return client, await client.drain(0.01)
+
+    client, frames = asyncio.run(run())
+
+    assert client.dropped == 2
+    assert frames[0] == 'event: dropped\ndata: {"count": 2}\n\n'
+    assert [_data(f)["payload"]["n"] for f in frames[1:]] == [2, 3, 4]
+
+
+def test_last_event_id_resume_from_replay_buffer():
+    bus = EventBus()
+    broker = SseBroker(bus, replay_size=10)
+
+    async def run():
+        await broker.start()
+        for n in range(4):
+            await bus.publish(_event("governance.guidance", "p1" if n % 2 == 0 else "p2", n))
+        client = broker.connect("p1", last_event_id=1)
+        return await client.drain(0.01)
+
+    frames = asyncio.run(run())
+
+    # Only frames after id 1 for the requested project are replayed
+    assert [f.split("\n", 1)[0] for f in frames] == ["id: 3"]
+
+
+def test_connection_count_and_invalid_types():
+    bus = EventBus()
+    broker = SseBroker(bus)
+
+    async def run():
+        a = broker.connect("p1")
+        b = broker.connect("p1")
+        assert broker.connection_count == 2
+        broker.disconnect(a)
+        broker.disconnect(a)
+        assert broker.connection_count == 1
+        broker.disconnect(b)
+        assert broker.connection_count == 0
+        assert await b.drain(0.01) == []
+
+    asyncio.run(run())
+    with pytest.raises(ValueError):
+        broker.connect("p1", ["task*"])
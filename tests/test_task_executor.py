@@ -0,0 +1,174 @@
+import asyncio
+import importlib
+from collections import Counter
+
+from server.core.events import TASK_UPDATED, EventBus
+from server.core.executor import TaskExecutor, register_task_handler
+
+executor_module = importlib.import_module("server.core.executor")
+
+
+class _Queue:
+    """In-memory tasks table implementing the executor's repo calls."""
+
+    def __init__(self, tasks):
+        self.tasks = {t["id"]: dict(t, status="queued") for t in tasks}
+        self.claims = []
+        self.results = {}
+        self.heartbeats = []
+
+    async def claim(self, engine, *, limit, project_id=None, exclude_projects=None):
+        excluded = set(exclude_projects or [])
+        batch = [
+            t for t in self.tasks.values()
+            if t["status"] == "queued" and t["projectId"] not in excluded
+        ][:limit]
+        for t in batch:
+            t["status"] = "in_progress"
+        self.claims.append(len(batch))
+        return [{"id": t["id"], "projectId": t["projectId"], "payload": t["payload"], "createdAt": ""} for t in batch]
+
+    async def release(self, engine, *, task_ids):
+        for tid in task_ids:
+            self.tasks[tid]["status"] = "queued"
+        return len(task_ids)
+
+    async def update(self, engine, *, task_id, status, result):
+        self.tasks[task_id]["status"] = status
+        self.results[task_id] = result
+        return self.tasks[task_id]["projectId"]
+
+    async def heartbeat(self, engine, *, task_ids):
+        self.heartbeats.append(sorted(task_ids))
+        return len(task_ids)
+
+
+def _install(monkeypatch, tasks):
+    queue = _Queue(tasks)
+    monkeypatch.setattr(executor_module, "get_async_engine", lambda: object())
+    monkeypatch.setattr(executor_module, "claim_tasks_pg", queue.claim)
+    monkeypatch.setattr(executor_module, "release_tasks_pg", queue.release)
+    monkeypatch.setattr(executor_module, "update_task_status_pg", queue.update)
+    monkeypatch.setattr(executor_module, "heartbeat_tasks_pg", queue.heartbeat)
+    monkeypatch.setattr(executor_module, "_HANDLERS", {})
+    return queue
+
+
+def _task(tid, project, task_type, **payload):
+    return {"id": tid, "projectId": project, "payload": {"type": task_type, **payload}}
+
+
+async def _run_until_drained(executor, queue, timeout=2.0):
+    runner = asyncio.create_task(executor.run())
+    deadline = asyncio.get_running_loop().time() + timeout
+    while any(t["status"] in ("queued", "in_progress") for t in queue.tasks.values()):
+        assert asyncio.get_running_loop().time() < deadline, "queue not drained"
+        await asyncio.sleep(0.01)
+    await executor.stop()
+    await runner
+
+
+def test_dispatch_by_type_records_results_and_failures(monkeypatch):
+    queue = _install(monkeypatch, [
+        _task("t1", "p1", "echo", value=1),
+        _task("t2", "p1", "boom"),
+        _task("t3", "p2", "missing"),
+    ])
+
+    async def echo(task):
+        return {"value": task["payload"]["value"]}
+
+    async def boom(task):
+        raise ValueError("bad input")
+
+    register_task_handler("echo", echo)
+    register_task_handler("boom", boom)
+    bus = EventBus()
+    updates = []
+
+    async def on_update(evt):
+        updates.append((evt.payload["id"], evt.payload["status"]))
+
+    async def run():
+        await bus.subscribe(TASK_UPDATED, on_update)
+        await _run_until_drained(TaskExecutor(bus, poll_seconds=0.01), queue)
+
+    asyncio.run(run())
+
+    assert {tid: t["status"] for tid, t in queue.tasks.items()} == {"t1": "done", "t2": "failed", "t3": "failed"}
+    assert queue.results["t1"] == {"value": 1}
+    assert queue.results["t2"] == {"error": "bad input"}
+    assert "no handler" in queue.results["t3"]["error"]
+    assert sorted(updates) == [("t1", "done"), ("t2", "failed"), ("t3", "failed")]
+
+
+def test_global_and_per_project_concurrency_limits(monkeypatch):
+    tasks = [_task(f"a{i}", "pa", "work") for i in range(6)] + [_task(f"b{i}", "pb", "work") for i in range(6)]
+    queue = _install(monkeypatch, tasks)
+    running = Counter()
+    peaks = {"total": 0, "pa": 0, "pb": 0}
+
+    async def work(task):
+        project = task["projectId"]
+        running[project] += 1
+        peaks[project] = max(peaks[project], running[project])
+        peaks["total"] = max(peaks["total"], sum(running.values()))
+        await asyncio.sleep(0.02)
+        running[project] -= 1
+        return {}
+
+    register_task_handler("work", work)
+    executor = TaskExecutor(EventBus(), concurrency=3, project_concurrency=2, batch_size=10, poll_seconds=0.01,
+                            heartbeat_seconds=0.01)
+
+    asyncio.run(_run_until_drained(executor, queue))
+
+    assert all(t["status"] == "done" for t in queue.tasks.values())
+    assert peaks["total"] == 3
+    assert peaks["pa"] <= 2 and peaks["pb"] <= 2
+    assert queue.heartbeats and all(len(ids) <= 3 for ids in queue.heartbeats)
+
+
+def test_stop_requeues_tasks_past_the_grace_period(monkeypatch):
+    queue = _install(monkeypatch, [_task("slow", "p1", "hang"), _task("quick", "p2", "noop")])
+
+    async def hang(task):
+        await asyncio.sleep(10)
+
+    async def noop(task):
+        return {}
+
+    register_task_handler("hang", hang)
+    register_task_handler("noop", noop)
+    executor = TaskExecutor(EventBus(), poll_seconds=0.01, shutdown_seconds=0.05)
+
+    async def run():
+        runner = asyncio.create_task(executor.run())
+        while queue.tasks["quick"]["status"] != "done":
+            await asyncio.sleep(0.01)
+        await executor.stop()
+        await runner
+
+    asyncio.run(run())
+
+    assert queue.tasks["slow"]["status"] == "queued"
+    assert executor.running_count == 0 and executor.tasks_completed == 1
+
+
+def test_batch_claimed_during_stop_is_released(monkeypatch):
+    queue = _install(monkeypatch, [_task("t1", "p1", "noop"), _task("t2", "p2", "noop")])
+    claim = queue.claim
+    executor = TaskExecutor(EventBus(), poll_seconds=0.01)
+
+    async def slow_claim(engine, **kwargs):
+        # stop() runs while the claim query is in flight
+        await executor.stop()
+        return await claim(engine, **kwargs)
+
+    monkeypatch.setattr(executor_module, "claim_tasks_pg", slow_claim)
+    register_task_handler("noop", lambda task: asyncio.sleep(0))
+
+    asyncio.run(executor.run())
+
+    assert {t["status"] for t in queue.tasks.values()} == {"queued"}
+    assert executor.running_count == 0
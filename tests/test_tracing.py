@@ -19,6 +19,7 @@ except Exception:  # fallback for versions where it's only in submodule
 
 from server.core.events import Event, bus
 from server.core.orchestrator import CONV_MSG, orchestrator
+from server.observability.tracing import refresh_tracing
 from server.utils.logger import log_json
 
 
@@ -41,6 +42,8 @@ def otel_memory_provider(monkeypatch):
     except Exception:
         if provider is not None:
             provider.add_span_processor(SimpleSpanProcessor(exporter))
+    # The span gate is cached; re-resolve it for the new env and provider
+    refresh_tracing()
     yield exporter
     # Do not attempt to reset global provider; just detach by dropping exporter ref
 
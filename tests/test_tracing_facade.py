@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import time
+
+import server.observability.tracing as tracingmod
+from server.core.events import Event, EventBus
+from server.core.orchestrator import CONV_MSG, Orchestrator
+from server.utils.logger import get_logger
+
+
+class _CaptureHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+def _count_resolutions(monkeypatch, active=False):
+    calls = []
+
+    def resolve():
+        calls.append(1)
+        return tracingmod._TracerState(active)
+
+    monkeypatch.setattr(tracingmod, "_resolve_tracer_state", resolve)
+    monkeypatch.setattr(tracingmod, "_tracer_state", None)
+    return calls
+
+
+def test_gate_resolved_once_until_refreshed(monkeypatch):
+    monkeypatch.setenv("TRACING_ENABLED", "false")
+    calls = _count_resolutions(monkeypatch)
+
+    spans = [tracingmod.start_span("x") for _ in range(100)]
+    assert all(span is tracingmod.NOOP_SPAN for span in spans)
+    assert tracingmod.current_traceparent() is None
+    assert len(calls) == 1
+
+    # Config changes are not probed per call; refresh_tracing() picks them up
+    monkeypatch.setenv("TRACING_ENABLED", "true")
+    tracingmod.start_span("x")
+    assert len(calls) == 1
+
+    tracingmod.refresh_tracing()
+    assert len(calls) == 2
+
+
+def test_noop_span_swallows_span_calls():
+    with tracingmod.NOOP_SPAN as span:
+        span.set_attribute("k", "v")
+        span.set_error(RuntimeError("boom"))
+    assert not span.recording
+
+
+def test_hot_paths_do_not_probe_or_log_per_event(monkeypatch):
+    calls = _count_resolutions(monkeypatch)
+    bus = EventBus()
+    orch = Orchestrator(bus)
+    logger = get_logger()
+    cap = _CaptureHandler()
+
+    async def run() -> None:
+        await orch.start()
+        for i in range(20):
+            await bus.publish(Event(type=CONV_MSG, project_id="p1", payload={"content": f"m{i}"}, ts=time.time()))
+        await orch.stop()
+
+    logger.addHandler(cap)
+    try:
+        asyncio.run(run())
+    finally:
+        logger.removeHandler(cap)
+
+    # Resolved once on first use, not per event or on (un)subscribe
+    assert len(calls) == 1
+    bus.reload_config()
+    assert len(calls) == 2
+    assert "orchestrator.gate_dbg" not in cap.messages
+    assert cap.messages.count("orchestrator.handle") == 20
@@ -61,6 +61,8 @@ def otel_http_memory_provider(monkeypatch):
     except Exception:
         # Ignore if already instrumented
         pass
+    # The span gate is cached; re-resolve it for the patched gate and new provider
+    tracingmod.refresh_tracing()
 
     yield exporter
 
@@ -0,0 +1,129 @@
+import asyncio
+import ctypes
+import errno
+import os
+import time
+
+import pytest
+
+from server.governance.pre_action_engine import PreActionGovernanceEngine
+from server.nf_client import catalog
+from server.nf_client.watcher import FileWatcher
+
+
+def _touch(path, text):
+    path.write_text(text, encoding="utf-8")
+    ts = time.time() + 5
+    os.utime(path, (ts, ts))
+
+
+@pytest.mark.parametrize("backend", ["inotify", "poll"])
+def test_generation_bumps_on_change(tmp_path, backend):
+    (tmp_path / "security").mkdir()
+    token = tmp_path / "security" / "RateLimitGuard.yml"
+    token.write_text("a", encoding="utf-8")
+    watcher = FileWatcher(str(tmp_path), backend=backend, poll_seconds=0)
+
+    start = watcher.generation()
+    if backend == "inotify" and watcher.backend != "inotify":
+        pytest.skip("inotify not available")
+    assert watcher.generation() == start
+
+    _touch(token, "b")
+    changed = watcher.generation()
+    assert changed > start
+    assert watcher.generation() == changed
+
+    # New directories are watched as they appear
+    (tmp_path / "performance").mkdir()
+    after_mkdir = watcher.generation()
+    assert after_mkdir > changed
+    (tmp_path / "performance" / "Caching.yml").write_text("c", encoding="utf-8")
+    assert watcher.generation() > after_mkdir
+
+    # The compiled snapshot lives in the watched tree but must not invalidate it
+    stable = watcher.generation()
+    (tmp_path / ".catalog.bin").write_bytes(b"snapshot")
+    assert watcher.generation() == stable
+    watcher.close()
+
+
+class _OutOfWatches:
+    """libc stand-in whose inotify_add_watch fails like a full watch table."""
+
+    def __init__(self, libc):
+        self._libc = libc
+
+    def __getattr__(self, name):
+        return getattr(self._libc, name)
+
+    def inotify_add_watch(self, fd, path, mask):
+        ctypes.set_errno(errno.ENOSPC)
+        return -1
+
+
+def test_unwatchable_new_directory_falls_back_to_polling(tmp_path):
+    watcher = FileWatcher(str(tmp_path), backend="inotify", poll_seconds=0)
+    start = watcher.generation()
+    if watcher.backend != "inotify":
+        pytest.skip("inotify not available")
+    inotify = watcher._inotify
+    inotify._libc = _OutOfWatches(inotify._libc)
+
+    (tmp_path / "security").mkdir()
+    after_mkdir = watcher.generation()
+    assert after_mkdir > start
+    assert watcher.backend == "poll" and inotify.fd == -1
+
+    # Edits under the directory inotify could not watch still bump the generation
+    (tmp_path / "security" / "RateLimitGuard.yml").write_text("a", encoding="utf-8")
+    assert watcher.generation() > after_mkdir
+    watcher.close()
+
+
+def test_poll_interval_limits_rescans(tmp_path):
+    token = tmp_path / "a.yml"
+    token.write_text("a", encoding="utf-8")
+    watcher = FileWatcher(str(tmp_path), backend="poll", poll_seconds=3600)
+    start = watcher.generation()
+    _touch(token, "b")
+    assert watcher.generation() == start
+
+
+def test_warm_rule_cache_does_no_filesystem_walk(tmp_path, monkeypatch):
+    (tmp_path / "security").mkdir()
+    (tmp_path / "security" / "RateLimitGuard.yml").write_text("a", encoding="utf-8")
+    calls = []
+
+    def loader(project_id, kinds):
+        calls.append(kinds)
+        return {"tokens": [{"kind": "security", "name": "RateLimitGuard", "description": "", "rules": [], "source": "x"}]}
+
+    engine = PreActionGovernanceEngine(token_loader=loader, tags_dir=tmp_path, cache_ttl=3600)
+    asyncio.run(engine._load_domain_rules("security"))
+
+    def no_walk(*args, **kwargs):
+        raise AssertionError("os.walk on a warm cache")
+
+    monkeypatch.setattr(os, "walk", no_walk)
+    if engine._watcher.backend == "inotify":
+        for _ in range(3):
+            assert asyncio.run(engine._load_domain_rules("security"))[0]["name"] == "RateLimitGuard"
+        assert len(calls) == 1
+
+
+def test_engine_shares_the_catalog_watcher(tmp_path, monkeypatch):
+    memory = tmp_path / "memory"
+    (memory / "tags" / "security").mkdir(parents=True)
+    token = memory / "tags" / "security" / "RateLimitGuard.yml"
+    token.write_text("description: limits\n", encoding="utf-8")
+    watcher = FileWatcher(str(memory), backend="poll", poll_seconds=0)
+    monkeypatch.setattr(catalog, "_store", catalog.CatalogStore(str(memory), str(tmp_path / "catalog.bin"), watcher=watcher))
+
+    engine = PreActionGovernanceEngine(cache_ttl=3600)
+    assert engine._watcher is watcher
+    assert asyncio.run(engine._load_domain_rules("security"))[0]["description"] == "limits"
+
+    # The generation that invalidates the rule cache also makes the catalog re-stat its sources
+    _touch(token, "description: updated\n")
+    assert asyncio.run(engine._load_domain_rules("security"))[0]["description"] == "updated"